@@ -2,6 +2,8 @@
 import time
 from typing import Dict, List, Optional
 from botocore.exceptions import ClientError
+from .batch import batch_get_async
+from .pagination import iter_query, iter_scan
 
 
 class AsyncSubscriptionPlanRepository:
@@ -36,6 +38,30 @@ class AsyncSubscriptionPlanRepository:
                 return None
             raise
 
+    async def get_plans(self, plan_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Get several subscription plans at once (BatchGetItem)
+
+        Args:
+            plan_ids: Plan IDs (duplicates allowed)
+
+        Returns:
+            Dict of plan ID -> plan for the plans that exist
+        """
+        plan_ids = list(dict.fromkeys(plan_ids))
+        if not plan_ids:
+            return {}
+
+        try:
+            items = await batch_get_async(self.table, [('PLAN', f'META#{plan_id}') for plan_id in plan_ids])
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ResourceNotFoundException':
+                return {}
+            raise
+
+        plans = [self._transform_to_long_format(item) for item in items if item is not None]
+        return {plan['id']: plan for plan in plans}
+
     async def list_plans(self, limit: int = 100) -> List[Dict]:
         """
         List all subscription plans using efficient Query
@@ -43,33 +69,17 @@ class AsyncSubscriptionPlanRepository:
         Uses Query with PK=PLAN instead of Scan for better performance.
         """
         try:
-            plans = []
-            last_evaluated_key = None
-
-            # Query with PK=PLAN to get all plans efficiently
-            while True:
-                query_kwargs = {
-                    'KeyConditionExpression': 'PK = :pk AND begins_with(SK, :sk)',
-                    'ExpressionAttributeValues': {
-                        ':pk': 'PLAN',
-                        ':sk': 'META#'
-                    }
+            # Query with PK=PLAN to get all plans efficiently (all pages)
+            items = iter_query(
+                self.table,
+                KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
+                ExpressionAttributeValues={
+                    ':pk': 'PLAN',
+                    ':sk': 'META#'
                 }
+            )
 
-                if last_evaluated_key:
-                    query_kwargs['ExclusiveStartKey'] = last_evaluated_key
-
-                response = await self.table.query(**query_kwargs)
-
-                for item in response.get('Items', []):
-                    plans.append(self._transform_to_long_format(item))
-
-                # Check if there are more items to query
-                last_evaluated_key = response.get('LastEvaluatedKey')
-                if not last_evaluated_key:
-                    break
-
-            return plans
+            return [self._transform_to_long_format(item) async for item in items]
 
         except ClientError as e:
             if e.response['Error']['Code'] == 'ResourceNotFoundException':
@@ -229,9 +239,18 @@ class AsyncProblemRepository:
     async def add_testcase(self, *args, **kwargs):
         return await sync_to_async(self._repo.add_testcase)(*args, **kwargs)
 
+    async def add_testcases(self, *args, **kwargs):
+        return await sync_to_async(self._repo.add_testcases)(*args, **kwargs)
+
+    async def update_testcase_outputs(self, *args, **kwargs):
+        return await sync_to_async(self._repo.update_testcase_outputs)(*args, **kwargs)
+
     async def get_testcases(self, *args, **kwargs):
         return await sync_to_async(self._repo.get_testcases)(*args, **kwargs)
 
+    async def bump_test_set_version(self, *args, **kwargs):
+        return await sync_to_async(self._repo.bump_test_set_version)(*args, **kwargs)
+
 
 class AsyncUserRepository:
     """True async User repository using aioboto3"""
@@ -248,8 +267,10 @@ class AsyncUserRepository:
     async def list_active_users(self, limit: int = 1000) -> List[Dict]:
         """List all active users"""
         try:
-            # Scan for active users
-            response = await self.table.scan(
+            # Scan for active users, up to limit of them
+            items = iter_scan(
+                self.table,
+                max_items=limit,
                 FilterExpression='#tp = :tp AND #dat.#act = :act',
                 ExpressionAttributeNames={
                     '#tp': 'tp',
@@ -259,12 +280,11 @@ class AsyncUserRepository:
                 ExpressionAttributeValues={
                     ':tp': 'usr',
                     ':act': True
-                },
-                Limit=limit
+                }
             )
 
             users = []
-            for item in response.get('Items', []):
+            async for item in items:
                 # Extract user_id from PK (format: USR#{user_id})
                 user_id = int(item['PK'].replace('USR#', ''))
                 dat = item.get('dat', {})
@@ -531,6 +551,9 @@ class AsyncSearchHistoryRepository:
     async def get_history(self, *args, **kwargs):
         return await sync_to_async(self._repo.get_history)(*args, **kwargs)
 
+    async def get_histories(self, *args, **kwargs):
+        return await sync_to_async(self._repo.get_histories)(*args, **kwargs)
+
     async def get_history_with_testcases(self, *args, **kwargs):
         return await sync_to_async(self._repo.get_history_with_testcases)(*args, **kwargs)
 
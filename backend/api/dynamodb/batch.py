@@ -0,0 +1,133 @@
+"""Multi-key reads with BatchGetItem
+
+BatchGetItem reads up to 100 keys per request, in any order, and may hand
+back part of them as UnprocessedKeys when the table is throttled. The
+functions below split any number of keys into such requests, run them
+concurrently, retry unprocessed keys with exponential backoff and return
+the items in the order the keys were given:
+
+    items = batch_get(table, [('PLAN', 'META#1'), ('PLAN', 'META#2')])
+    # [item or None, item or None]
+
+    items = await batch_get_async(table, keys, projection=['dat.tit', 'crt'])
+
+BaseRepository.batch_get does the same for repositories.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .projections import projection_params
+
+BATCH_GET_SIZE = 100  # BatchGetItem limit
+BATCH_GET_ATTEMPTS = 8
+BATCH_GET_CONCURRENCY = 8  # requests in flight per call
+
+
+def _key(key):
+    """(pk, sk) tuple or {'PK', 'SK'} dict -> (pk, sk)"""
+    if isinstance(key, dict):
+        return key['PK'], key['SK']
+    return tuple(key)
+
+
+def _requests(table, keys, projection):
+    """
+    Split keys into BatchGetItem request bodies
+
+    Returns:
+        list: RequestItems dicts
+    """
+    # BatchGetItem rejects duplicate keys within a request
+    unique = list(dict.fromkeys(_key(key) for key in keys))
+
+    params = projection_params(projection) if projection else {}
+    requests = []
+    for start in range(0, len(unique), BATCH_GET_SIZE):
+        chunk = unique[start:start + BATCH_GET_SIZE]
+        requests.append({
+            table.name: dict(params, Keys=[{'PK': pk, 'SK': sk} for pk, sk in chunk])
+        })
+    return requests
+
+
+def _backoff(attempt):
+    return min(0.05 * 2 ** attempt, 2.0)
+
+
+def _unprocessed(table, response):
+    """Next RequestItems (UnprocessedKeys) and the items returned by a response"""
+    items = response.get('Responses', {}).get(table.name, [])
+    pending = response.get('UnprocessedKeys', {}).get(table.name)
+    if not pending or not pending.get('Keys'):
+        return None, items
+    return {table.name: pending}, items
+
+
+def _in_order(keys, items):
+    found = {(item['PK'], item['SK']): item for item in items}
+    return [found.get(_key(key)) for key in keys]
+
+
+def batch_get(table, keys, projection=None):
+    """
+    Get many items by key
+
+    Args:
+        table: boto3 DynamoDB table resource
+        keys: (pk, sk) tuples or {'PK': ..., 'SK': ...} dicts
+        projection: Optional view name or list of attribute paths to read (see projections.py)
+
+    Returns:
+        list: Item (raw) or None for every key, in the order of keys
+
+    Raises:
+        RuntimeError: If keys are still unprocessed after BATCH_GET_ATTEMPTS requests
+    """
+    client = table.meta.client
+    requests = _requests(table, keys, projection)
+
+    def fetch(request_items):
+        items = []
+        for attempt in range(BATCH_GET_ATTEMPTS):
+            response = client.batch_get_item(RequestItems=request_items)
+            request_items, page = _unprocessed(table, response)
+            items.extend(page)
+            if request_items is None:
+                return items
+            time.sleep(_backoff(attempt))
+        raise RuntimeError(f'Keys unprocessed after {BATCH_GET_ATTEMPTS} batch gets')
+
+    if len(requests) <= 1:
+        items = [item for request_items in requests for item in fetch(request_items)]
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(requests), BATCH_GET_CONCURRENCY)) as executor:
+            items = [item for page in executor.map(fetch, requests) for item in page]
+
+    return _in_order(keys, items)
+
+
+async def batch_get_async(table, keys, projection=None):
+    """
+    Get many items by key on an aioboto3 table (see batch_get)
+
+    Returns:
+        list: Item (raw) or None for every key, in the order of keys
+    """
+    client = table.meta.client
+    requests = _requests(table, keys, projection)
+    semaphore = asyncio.Semaphore(BATCH_GET_CONCURRENCY)
+
+    async def fetch(request_items):
+        items = []
+        async with semaphore:
+            for attempt in range(BATCH_GET_ATTEMPTS):
+                response = await client.batch_get_item(RequestItems=request_items)
+                request_items, page = _unprocessed(table, response)
+                items.extend(page)
+                if request_items is None:
+                    return items
+                await asyncio.sleep(_backoff(attempt))
+        raise RuntimeError(f'Keys unprocessed after {BATCH_GET_ATTEMPTS} batch gets')
+
+    pages = await asyncio.gather(*(fetch(request_items) for request_items in requests))
+    return _in_order(keys, [item for page in pages for item in page])
@@ -0,0 +1,167 @@
+"""DynamoDB wire format <-> plain Python values in one pass
+
+The boto3 resource layer deserializes every attribute value into Python
+types with Decimal numbers, and BaseRepository._from_dynamodb_item then
+rebuilds every nested dict and list a second time to turn those Decimals
+into int/float (writes go through _to_dynamodb_item and the serializer the
+same way). With DYNAMODB_FAST_CODEC, repositories talk to the low-level
+client instead and convert with the functions below, which go straight
+from wire format ({'M': {'dat': {'S': ...}}}) to plain values and back in a
+single iterative pass (an explicit stack, so deep items cannot hit the
+recursion limit).
+
+Conversions match the resource layer followed by _from_dynamodb_item /
+preceded by _to_dynamodb_item:
+
+    N        int if integral, else float
+    S / B    str / bytes
+    SS/NS/BS set
+    BOOL     bool
+    NULL     None (map entries that are None are not written)
+    M / L    dict / list
+
+scripts/benchmark_dynamodb_codec.py compares both paths.
+"""
+from decimal import Decimal
+
+
+def _number(text):
+    """N value -> int if integral, else float"""
+    if '.' not in text and 'e' not in text and 'E' not in text:
+        return int(text)
+    value = Decimal(text)
+    return int(value) if value % 1 == 0 else float(value)
+
+
+def _scalar(tag, value):
+    if tag == 'S' or tag == 'BOOL':
+        return value
+    if tag == 'N':
+        return _number(value)
+    if tag == 'NULL':
+        return None
+    if tag == 'B':
+        return bytes(value)
+    if tag == 'SS':
+        return set(value)
+    if tag == 'NS':
+        return {_number(element) for element in value}
+    if tag == 'BS':
+        return {bytes(element) for element in value}
+    raise TypeError(f'Unknown DynamoDB type: {tag}')
+
+
+def decode_item(item):
+    """
+    Decode a wire-format item ({name: {'S': ...}, ...}) into plain Python values
+
+    Args:
+        item: Item as returned by the low-level client (or None)
+
+    Returns:
+        dict, or None if item is None
+    """
+    if item is None:
+        return None
+
+    result = {}
+    # (wire map or list, target dict or list)
+    stack = [(item, result)]
+    while stack:
+        source, target = stack.pop()
+        entries = source.items() if isinstance(target, dict) else enumerate(source)
+        for key, wire in entries:
+            (tag, value), = wire.items()
+            if tag == 'S' or tag == 'BOOL':
+                pass
+            elif tag == 'N':
+                value = int(value) if value.isdigit() else _number(value)
+            elif tag == 'M':
+                value, nested = {}, value
+                stack.append((nested, value))
+            elif tag == 'L':
+                value, nested = [None] * len(value), value
+                stack.append((nested, value))
+            else:
+                value = _scalar(tag, value)
+            target[key] = value
+    return result
+
+
+def _encode_scalar(value):
+    value_type = type(value)
+    if value_type is str:
+        return {'S': value}
+    if value_type is bool:
+        return {'BOOL': value}
+    if value_type is int:
+        return {'N': str(value)}
+    if isinstance(value, str):
+        return {'S': value}
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, (int, Decimal)):
+        return {'N': str(value)}
+    if isinstance(value, float):
+        return {'N': str(Decimal(str(value)))}
+    if value is None:
+        return {'NULL': True}
+    if isinstance(value, (bytes, bytearray)):
+        return {'B': bytes(value)}
+    if isinstance(value, (set, frozenset)):
+        elements = list(value)
+        if all(isinstance(element, str) for element in elements):
+            return {'SS': elements}
+        if all(isinstance(element, (bytes, bytearray)) for element in elements):
+            return {'BS': [bytes(element) for element in elements]}
+        return {'NS': [_encode_scalar(element)['N'] for element in elements]}
+    raise TypeError(f'Unsupported type for DynamoDB: {type(value).__name__}')
+
+
+def encode_value(value):
+    """
+    Encode one Python value into wire format (e.g. ExpressionAttributeValues)
+
+    Args:
+        value: Plain Python value (nested dicts and lists allowed)
+
+    Returns:
+        dict: Wire-format attribute value ({'S': ...}, {'M': {...}}, ...)
+    """
+    return encode_item({'v': value})['v'] if value is not None else {'NULL': True}
+
+
+def encode_item(item):
+    """
+    Encode a Python dict into a wire-format item, skipping None map entries
+
+    Args:
+        item: dict with str, int, float, Decimal, bool, bytes, set, dict, list values
+
+    Returns:
+        dict: {name: wire-format attribute value}
+    """
+    result = {}
+    # (python dict or list, target wire dict or list)
+    stack = [(item, result)]
+    while stack:
+        source, target = stack.pop()
+        is_map = isinstance(source, dict)
+        entries = source.items() if is_map else enumerate(source)
+        for key, value in entries:
+            if value is None and is_map:
+                continue
+            if type(value) is str:
+                wire = {'S': value}
+            elif isinstance(value, dict):
+                nested = {}
+                stack.append((value, nested))
+                wire = {'M': nested}
+            elif isinstance(value, (list, tuple)):
+                nested = [None] * len(value)
+                stack.append((value, nested))
+                wire = {'L': nested}
+            else:
+                wire = _encode_scalar(value)
+            target[key] = wire
+    return result
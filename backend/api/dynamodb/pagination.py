@@ -0,0 +1,171 @@
+"""Lazily paginated DynamoDB query and scan results
+
+A single Query or Scan call returns at most 1MB and reports the rest with
+LastEvaluatedKey. PagedItems follows that key page by page while the caller
+iterates, so results of any size are read completely without being held in
+memory at once, and stops at an optional item or byte budget.
+
+    items = PagedItems(table.query, {'KeyConditionExpression': ...}, max_items=100)
+    for item in items:            # boto3 table
+        ...
+    async for item in items:      # aioboto3 table (fetch is a coroutine function)
+        ...
+    next_page = items.cursor      # ExclusiveStartKey to resume after the last item yielded
+
+BaseRepository.iter_query / iter_scan build these for repositories;
+iter_query / iter_scan below do the same for aioboto3 tables.
+"""
+from decimal import Decimal
+
+
+def item_size(value) -> int:
+    """
+    Approximate DynamoDB size of an item or attribute value in bytes
+
+    Attribute names and strings count their UTF-8 length, numbers up to
+    21 bytes, lists and maps 3 bytes plus their elements.
+    """
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        return min(21, len(str(value)))
+    if isinstance(value, dict):
+        return 3 + sum(len(key.encode('utf-8')) + item_size(element) for key, element in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return 3 + sum(item_size(element) for element in value)
+    return len(str(value))
+
+
+def item_key(item, index_name=None):
+    """
+    ExclusiveStartKey that resumes right after an item
+
+    Args:
+        item: Item as returned by DynamoDB
+        index_name: GSI the item was read from; GSIn is keyed by GSInPK/GSInSK
+                    (see table_schema.py)
+
+    Returns:
+        dict: Table key (PK, SK) plus the index key attributes
+    """
+    names = ['PK', 'SK']
+    if index_name:
+        names += [f'{index_name}PK', f'{index_name}SK']
+    return {name: item[name] for name in names if name in item}
+
+
+class PagedItems:
+    """
+    Iterable over the items of a Query or Scan, fetched one page at a time
+
+    Attributes:
+        cursor: ExclusiveStartKey to resume after the last item yielded,
+                None once all items were read
+        count: Items yielded so far
+        size: Approximate bytes yielded so far (see item_size)
+        pages: Requests made so far
+    """
+
+    def __init__(
+        self,
+        fetch,
+        params,
+        max_items=None,
+        max_bytes=None,
+        start_key=None,
+        convert=None
+    ):
+        """
+        Args:
+            fetch: table.query or table.scan (boto3, or aioboto3 for async for)
+            params: Request parameters; 'Limit' is the page size
+            max_items: Stop after this many items
+            max_bytes: Stop before the item that would exceed this size
+                       (at least one item is always yielded)
+            start_key: Cursor of an earlier iteration to resume from
+            convert: Optional function applied to every item yielded
+        """
+        self._fetch = fetch
+        self._params = dict(params)
+        self._index_name = self._params.get('IndexName')
+        self._convert = convert
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+
+        self.cursor = start_key
+        self.count = 0
+        self.size = 0
+        self.pages = 0
+        self._done = False
+
+    def _request(self):
+        params = dict(self._params)
+        if self.cursor:
+            params['ExclusiveStartKey'] = self.cursor
+        if self.max_items is not None and 'FilterExpression' not in params:
+            # Without a filter every item read is returned: read no more than the budget
+            params['Limit'] = min(params.get('Limit', self.max_items), self.max_items - self.count)
+        return params
+
+    def _accept(self, response):
+        """Yield the items of one page that fit the budget, moving the cursor along"""
+        self.pages += 1
+        items = response.get('Items', [])
+        last_key = response.get('LastEvaluatedKey')
+
+        for index, item in enumerate(items):
+            size = item_size(item)
+            if (
+                (self.max_items is not None and self.count >= self.max_items)
+                or (self.max_bytes is not None and self.count and self.size + size > self.max_bytes)
+            ):
+                # Budget spent: the cursor points right after the previous item
+                self._done = True
+                return
+            self.count += 1
+            self.size += size
+            self.cursor = last_key if index == len(items) - 1 else item_key(item, self._index_name)
+            yield self._convert(item) if self._convert else item
+
+        if not items:
+            self.cursor = last_key
+        if last_key is None or (self.max_items is not None and self.count >= self.max_items):
+            self._done = True
+
+    def __iter__(self):
+        while not self._done:
+            yield from self._accept(self._fetch(**self._request()))
+
+    async def __aiter__(self):
+        while not self._done:
+            for item in self._accept(await self._fetch(**self._request())):
+                yield item
+
+    @property
+    def exhausted(self) -> bool:
+        """True once every matching item was read (nothing left to resume)"""
+        return self._done and self.cursor is None
+
+
+def iter_query(table, max_items=None, max_bytes=None, start_key=None, **params):
+    """
+    Paginated Query on a (boto3 or aioboto3) table
+
+    Args:
+        table: DynamoDB table resource
+        max_items / max_bytes / start_key: See PagedItems
+        **params: Query parameters (KeyConditionExpression, IndexName, Limit as page size, ...)
+
+    Returns:
+        PagedItems of raw items
+    """
+    return PagedItems(table.query, params, max_items=max_items, max_bytes=max_bytes, start_key=start_key)
+
+
+def iter_scan(table, max_items=None, max_bytes=None, start_key=None, **params):
+    """Paginated Scan on a (boto3 or aioboto3) table (see iter_query)"""
+    return PagedItems(table.scan, params, max_items=max_items, max_bytes=max_bytes, start_key=start_key)
@@ -0,0 +1,79 @@
+"""Named projections ("views") of entities
+
+List endpoints need only a few attributes of each item, but a plain Query
+or GetItem returns all of them: a PROB# META item carries the base64
+solution code and constraints, a HIST# item the submitted code and the
+test result array. A view names the attribute paths an endpoint reads;
+passing it as ProjectionExpression makes DynamoDB return only those, so
+less is sent, deserialized and converted per item. (Read capacity is still
+metered on full item size.)
+
+    items = repo.iter_query(condition, projection='problem.summary')
+    response = await table.query(IndexName='GSI3', ..., **projection_params('problem.summary', 'GSI3'))
+
+A projection is either a view name from VIEWS or a list of attribute paths
+('crt', 'dat.tit', 'dat.hnt[0]'). The table keys (and the keys of the index
+queried) are always included.
+"""
+import re
+
+VIEWS = {
+    # Problem lists (ProblemListView, drafts, registered, list_*_problems)
+    'problem.summary': [
+        'crt', 'upd',
+        'dat.tit', 'dat.url', 'dat.tag', 'dat.lng',
+        'dat.cmp', 'dat.nrv', 'dat.vrf', 'dat.tcc', 'dat.del'
+    ],
+    # SearchHistoryListView rows: no test results and only the first hint
+    # (the row just reports whether there are hints)
+    'history.list_row': [
+        'crt',
+        'dat.uid', 'dat.uidt', 'dat.plt', 'dat.pno', 'dat.ptt', 'dat.lng',
+        'dat.cod', 'dat.psc', 'dat.fsc', 'dat.toc', 'dat.pub', 'dat.tid',
+        'dat.hnt[0]'
+    ],
+}
+
+_SEGMENT = re.compile(r'^([^\[\]]+)((?:\[\d+\])*)$')
+
+
+def projection_params(projection, index_name=None):
+    """
+    ProjectionExpression request parameters for a view or list of paths
+
+    Every path segment goes through ExpressionAttributeNames so reserved
+    words are safe (list indexes like [0] are kept as they are).
+
+    Args:
+        projection: View name (see VIEWS) or list of attribute paths
+        index_name: GSI being queried; its key attributes are included too so
+                    that pagination cursors can be built from the items
+
+    Returns:
+        dict: ProjectionExpression and ExpressionAttributeNames (a new dict
+              every call, since boto3 adds its own placeholders to it)
+
+    Raises:
+        KeyError: Unknown view name
+        ValueError: Malformed attribute path
+    """
+    paths = VIEWS[projection] if isinstance(projection, str) else projection
+
+    keys = ['PK', 'SK']
+    if index_name:
+        keys += [f'{index_name}PK', f'{index_name}SK']
+
+    placeholders = {}  # attribute name -> placeholder
+    expressions = []
+    for path in keys + [path for path in paths if path not in keys]:
+        segments = []
+        for segment in path.split('.'):
+            match = _SEGMENT.match(segment)
+            if match is None:
+                raise ValueError(f'Invalid attribute path: {path}')
+            placeholder = placeholders.setdefault(match.group(1), f'#p{len(placeholders)}')
+            segments.append(placeholder + match.group(2))
+        expressions.append('.'.join(segments))
+
+    names = {placeholder: name for name, placeholder in placeholders.items()}
+    return {'ProjectionExpression': ', '.join(expressions), 'ExpressionAttributeNames': names}
@@ -2,12 +2,19 @@
 import time
 from decimal import Decimal
 from typing import Dict, Any, Optional, List
-from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.conditions import Key, Attr, ConditionExpressionBuilder
+from ..batch import batch_get as batch_get_items
+from ..codec import decode_item, encode_item, encode_value
+from ..pagination import PagedItems
+from ..projections import projection_params
 
 
 class BaseRepository:
     """Base repository with common DynamoDB operations"""
 
+    BATCH_WRITE_SIZE = 25  # BatchWriteItem limit
+    BATCH_WRITE_ATTEMPTS = 8
+
     def __init__(self, table):
         """
         Initialize repository
@@ -15,7 +22,98 @@ class BaseRepository:
         Args:
             table: DynamoDB table resource
         """
+        from django.conf import settings
+
         self.table = table
+        # Low-level client for the DYNAMODB_FAST_CODEC path (see api/dynamodb/codec.py)
+        self._client = None
+        if getattr(settings, 'DYNAMODB_FAST_CODEC', False):
+            from ..client import DynamoDBClient
+            self._client = DynamoDBClient.get_client()
+
+    def _wire_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Turn resource-style request parameters (condition objects, Python
+        values) into low-level client parameters for the fast path
+
+        Args:
+            params: Request parameters as passed to table.query/scan/get_item/put_item
+
+        Returns:
+            Parameters for the same low-level client operation
+        """
+        params = dict(params, TableName=self.table.name)
+        names = dict(params.pop('ExpressionAttributeNames', {}))
+        values = {
+            placeholder: encode_value(value)
+            for placeholder, value in params.pop('ExpressionAttributeValues', {}).items()
+        }
+
+        builder = ConditionExpressionBuilder()
+        for name, is_key_condition in (('KeyConditionExpression', True), ('FilterExpression', False)):
+            condition = params.get(name)
+            if condition is None or isinstance(condition, str):
+                continue
+            expression = builder.build_expression(condition, is_key_condition=is_key_condition)
+            params[name] = expression.condition_expression
+            names.update(expression.attribute_name_placeholders)
+            values.update(
+                (placeholder, encode_value(value))
+                for placeholder, value in expression.attribute_value_placeholders.items()
+            )
+
+        for name in ('Key', 'Item', 'ExclusiveStartKey'):
+            if name in params:
+                params[name] = encode_item(params[name])
+        if names:
+            params['ExpressionAttributeNames'] = names
+        if values:
+            params['ExpressionAttributeValues'] = values
+        return params
+
+    @staticmethod
+    def _apply_projection(params: Dict[str, Any], projection, index_name: Optional[str] = None) -> None:
+        """
+        Add ProjectionExpression for a view or list of paths to request parameters
+
+        Args:
+            params: Request parameters (updated in place)
+            projection: View name or list of attribute paths (see projections.py), or None
+            index_name: GSI being queried, if any
+        """
+        if not projection:
+            return
+        projection = projection_params(projection, index_name)
+        params['ProjectionExpression'] = projection['ProjectionExpression']
+        params['ExpressionAttributeNames'] = dict(
+            params.get('ExpressionAttributeNames', {}),
+            **projection['ExpressionAttributeNames']
+        )
+
+    def _page_reader(self, operation: str):
+        """
+        Page fetch function and item conversion for PagedItems
+
+        Args:
+            operation: 'query' or 'scan'
+
+        Returns:
+            Tuple of (fetch, convert): the resource method with _from_dynamodb_item,
+            or a low-level client call that already returns plain items
+        """
+        if self._client is None:
+            return getattr(self.table, operation), self._from_dynamodb_item
+
+        call = getattr(self._client, operation)
+
+        def fetch(**params):
+            response = call(**self._wire_params(params))
+            response['Items'] = [decode_item(item) for item in response.get('Items', [])]
+            if 'LastEvaluatedKey' in response:
+                response['LastEvaluatedKey'] = decode_item(response['LastEvaluatedKey'])
+            return response
+
+        return fetch, None
 
     def _to_dynamodb_item(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -82,22 +180,34 @@ class BaseRepository:
         Returns:
             Inserted item
         """
+        if self._client is not None:
+            self._client.put_item(**self._wire_params({'Item': item}))
+            return item
+
         dynamodb_item = self._to_dynamodb_item(item)
         self.table.put_item(Item=dynamodb_item)
         return item
 
-    def get_item(self, pk: str, sk: str) -> Optional[Dict[str, Any]]:
+    def get_item(self, pk: str, sk: str, projection=None) -> Optional[Dict[str, Any]]:
         """
         Get item by primary key
 
         Args:
             pk: Partition key
             sk: Sort key
+            projection: Optional view name or list of attribute paths to read (see projections.py)
 
         Returns:
             Item or None if not found
         """
-        response = self.table.get_item(Key={'PK': pk, 'SK': sk})
+        params = {'Key': {'PK': pk, 'SK': sk}}
+        self._apply_projection(params, projection)
+
+        if self._client is not None:
+            response = self._client.get_item(**self._wire_params(params))
+            return decode_item(response.get('Item'))
+
+        response = self.table.get_item(**params)
         return self._from_dynamodb_item(response.get('Item'))
 
     def query(
@@ -110,7 +220,7 @@ class BaseRepository:
         **kwargs
     ) -> List[Dict[str, Any]]:
         """
-        Query items
+        Query items (all pages; use iter_query to stream large results)
 
         Args:
             key_condition_expression: Key condition expression
@@ -123,6 +233,46 @@ class BaseRepository:
         Returns:
             List of items
         """
+        return list(self.iter_query(
+            key_condition_expression,
+            filter_expression=filter_expression,
+            index_name=index_name,
+            max_items=limit,
+            scan_index_forward=scan_index_forward,
+            **kwargs
+        ))
+
+    def iter_query(
+        self,
+        key_condition_expression,
+        filter_expression=None,
+        index_name: Optional[str] = None,
+        scan_index_forward: bool = True,
+        max_items: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        start_key: Optional[Dict[str, Any]] = None,
+        page_size: Optional[int] = None,
+        projection=None,
+        **kwargs
+    ) -> PagedItems:
+        """
+        Query items lazily, following LastEvaluatedKey page by page
+
+        Args:
+            key_condition_expression: Key condition expression
+            filter_expression: Optional filter expression
+            index_name: Optional GSI name
+            scan_index_forward: Sort order (True = ascending, False = descending)
+            max_items: Stop after this many items
+            max_bytes: Stop before exceeding this many (approximate) bytes
+            start_key: Cursor (PagedItems.cursor) of an earlier query to resume from
+            page_size: Items evaluated per request (default: up to 1MB)
+            projection: Optional view name or list of attribute paths to read (see projections.py)
+            **kwargs: Additional query parameters
+
+        Returns:
+            PagedItems: Iterable of items; .cursor resumes after the last item yielded
+        """
         query_params = {
             'KeyConditionExpression': key_condition_expression,
             'ScanIndexForward': scan_index_forward
@@ -134,13 +284,18 @@ class BaseRepository:
         if index_name:
             query_params['IndexName'] = index_name
 
-        if limit:
-            query_params['Limit'] = limit
+        if page_size:
+            query_params['Limit'] = page_size
 
         query_params.update(kwargs)
+        self._apply_projection(query_params, projection, index_name)
 
-        response = self.table.query(**query_params)
-        return [self._from_dynamodb_item(item) for item in response.get('Items', [])]
+        fetch, convert = self._page_reader('query')
+        return PagedItems(
+            fetch, query_params,
+            max_items=max_items, max_bytes=max_bytes, start_key=start_key,
+            convert=convert
+        )
 
     def scan(
         self,
@@ -149,7 +304,7 @@ class BaseRepository:
         **kwargs
     ) -> List[Dict[str, Any]]:
         """
-        Scan items (expensive operation, use sparingly)
+        Scan items (expensive operation, use sparingly; all pages)
 
         Args:
             filter_expression: Optional filter expression
@@ -159,18 +314,46 @@ class BaseRepository:
         Returns:
             List of items
         """
+        return list(self.iter_scan(filter_expression=filter_expression, max_items=limit, **kwargs))
+
+    def iter_scan(
+        self,
+        filter_expression=None,
+        max_items: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        start_key: Optional[Dict[str, Any]] = None,
+        page_size: Optional[int] = None,
+        projection=None,
+        **kwargs
+    ) -> PagedItems:
+        """
+        Scan items lazily, following LastEvaluatedKey page by page
+
+        Args:
+            filter_expression: Optional filter expression
+            max_items / max_bytes / start_key / page_size / projection: See iter_query
+            **kwargs: Additional scan parameters
+
+        Returns:
+            PagedItems: Iterable of items; .cursor resumes after the last item yielded
+        """
         scan_params = {}
 
         if filter_expression is not None:
             scan_params['FilterExpression'] = filter_expression
 
-        if limit:
-            scan_params['Limit'] = limit
+        if page_size:
+            scan_params['Limit'] = page_size
 
         scan_params.update(kwargs)
+        self._apply_projection(scan_params, projection, scan_params.get('IndexName'))
 
-        response = self.table.scan(**scan_params)
-        return [self._from_dynamodb_item(item) for item in response.get('Items', [])]
+        fetch, convert = self._page_reader('scan')
+        return PagedItems(
+            fetch, scan_params,
+            max_items=max_items, max_bytes=max_bytes, start_key=start_key,
+            convert=convert
+        )
 
     def update_item(
         self,
@@ -244,6 +427,51 @@ class BaseRepository:
             print(f"Error in batch write: {e}")
             return False
 
+    def batch_put(self, items: List[Dict[str, Any]]) -> None:
+        """
+        Put items with BatchWriteItem (25 per request), retrying unprocessed
+        items with exponential backoff
+
+        Args:
+            items: Items to write (at most one per key)
+
+        Raises:
+            RuntimeError: If items are still unprocessed after BATCH_WRITE_ATTEMPTS requests
+        """
+        client = self.table.meta.client
+        requests = [{'PutRequest': {'Item': self._to_dynamodb_item(item)}} for item in items]
+
+        for start in range(0, len(requests), self.BATCH_WRITE_SIZE):
+            pending = requests[start:start + self.BATCH_WRITE_SIZE]
+            for attempt in range(self.BATCH_WRITE_ATTEMPTS):
+                response = client.batch_write_item(RequestItems={self.table.name: pending})
+                pending = response.get('UnprocessedItems', {}).get(self.table.name, [])
+                if not pending:
+                    break
+                time.sleep(min(0.05 * 2 ** attempt, 2.0))
+            else:
+                raise RuntimeError(f'{len(pending)} items unprocessed after {self.BATCH_WRITE_ATTEMPTS} batch writes')
+
+    def batch_get(
+        self,
+        keys: List[Any],
+        projection=None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get many items with BatchGetItem (100 keys per request, requests run
+        concurrently, unprocessed keys retried with exponential backoff)
+
+        Args:
+            keys: (pk, sk) tuples or {'PK': ..., 'SK': ...} dicts
+            projection: Optional view name or list of attribute paths to read (see projections.py)
+
+        Returns:
+            Item or None (not found) for every key, in the order of keys
+        """
+        if not keys:
+            return []
+        return [self._from_dynamodb_item(item) for item in batch_get_items(self.table, keys, projection)]
+
     @staticmethod
     def get_timestamp() -> int:
         """Get current Unix timestamp"""
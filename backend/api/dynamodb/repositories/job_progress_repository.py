@@ -121,20 +121,13 @@ class JobProgressHistoryRepository(BaseRepository):
 
         pk = f'JOB#{job_type}#{job_id}'
 
-        # Query all progress entries for this job
-        query_params = {
-            'KeyConditionExpression': Key('PK').eq(pk) & Key('SK').begins_with('PROG#'),
-            'ScanIndexForward': True,  # Oldest first
-            'Limit': limit
-        }
-
-        if last_evaluated_key:
-            query_params['ExclusiveStartKey'] = last_evaluated_key
-
-        response = self.table.query(**query_params)
-
-        items = response.get('Items', [])
-        next_key = response.get('LastEvaluatedKey')
+        # Query up to limit progress entries for this job
+        items = self.iter_query(
+            Key('PK').eq(pk) & Key('SK').begins_with('PROG#'),
+            scan_index_forward=True,  # Oldest first
+            max_items=limit,
+            start_key=last_evaluated_key
+        )
 
         # Transform to response format
         result = []
@@ -149,7 +142,7 @@ class JobProgressHistoryRepository(BaseRepository):
                 'created_at': item.get('crt', 0)
             })
 
-        return result, next_key
+        return result, items.cursor
 
     def get_latest_progress(
         self,
@@ -216,27 +209,17 @@ class JobProgressHistoryRepository(BaseRepository):
 
         pk = f'JOB#{job_type}#{job_id}'
 
-        # Get all progress entries
-        response = self.table.query(
-            KeyConditionExpression=Key('PK').eq(pk) & Key('SK').begins_with('PROG#')
-        )
-
-        items = response.get('Items', [])
-
-        if not items:
-            return True
-
-        # Delete in batches of 25 (DynamoDB batch limit)
-        for i in range(0, len(items), 25):
-            batch = items[i:i+25]
-
-            with self.table.batch_writer() as writer:
-                for item in batch:
-                    writer.delete_item(
-                        Key={
-                            'PK': item['PK'],
-                            'SK': item['SK']
-                        }
-                    )
+        # Delete all progress entries as they are read (batch_writer sends 25 per request)
+        with self.table.batch_writer() as writer:
+            for item in self.iter_query(
+                Key('PK').eq(pk) & Key('SK').begins_with('PROG#'),
+                ProjectionExpression='PK, SK'
+            ):
+                writer.delete_item(
+                    Key={
+                        'PK': item['PK'],
+                        'SK': item['SK']
+                    }
+                )
 
         return True
@@ -299,30 +299,21 @@ class ProblemExtractionJobRepository(BaseRepository):
         """
         # If status filter provided, use GSI1
         if status:
-            query_params = {
-                'IndexName': 'GSI1',
-                'KeyConditionExpression': Key('GSI1PK').eq(f'PEJOB#STATUS#{status}'),
-                'Limit': limit,
-                'ScanIndexForward': False  # Newest first
-            }
-
-            if last_evaluated_key:
-                query_params['ExclusiveStartKey'] = last_evaluated_key
-
-            response = self.table.query(**query_params)
-            items = response.get('Items', [])
+            items = self.iter_query(
+                Key('GSI1PK').eq(f'PEJOB#STATUS#{status}'),
+                index_name='GSI1',
+                scan_index_forward=False,  # Newest first
+                max_items=limit,
+                start_key=last_evaluated_key
+            )
         else:
             # Otherwise, scan with filter
-            scan_params = {
-                'FilterExpression': Attr('tp').eq('pejob'),
-                'Limit': limit
-            }
-
-            if last_evaluated_key:
-                scan_params['ExclusiveStartKey'] = last_evaluated_key
-
-            response = self.table.scan(**scan_params)
-            items = response.get('Items', [])
+            items = self.iter_scan(
+                Attr('tp').eq('pejob'),
+                max_items=limit,
+                start_key=last_evaluated_key,
+                page_size=limit
+            )
 
         # Apply additional filters
         filtered_items = items
@@ -340,8 +331,7 @@ class ProblemExtractionJobRepository(BaseRepository):
         # Sort by created_at descending
         result.sort(key=lambda x: x.get('created_at', 0), reverse=True)
 
-        next_key = response.get('LastEvaluatedKey')
-        return result, next_key
+        return result, items.cursor
 
     def find_stale_jobs(self, cutoff_time) -> List[Dict[str, Any]]:
         """
@@ -355,15 +345,12 @@ class ProblemExtractionJobRepository(BaseRepository):
         """
         cutoff_timestamp = int(cutoff_time.timestamp())
 
-        # Query jobs with PROCESSING status
-        query_params = {
-            'IndexName': 'GSI1',
-            'KeyConditionExpression': Key('GSI1PK').eq('PEJOB#STATUS#PROCESSING'),
-            'FilterExpression': Attr('upd').lt(cutoff_timestamp)
-        }
-
-        response = self.table.query(**query_params)
-        items = response.get('Items', [])
+        # Query jobs with PROCESSING status (all pages)
+        items = self.iter_query(
+            Key('GSI1PK').eq('PEJOB#STATUS#PROCESSING'),
+            filter_expression=Attr('upd').lt(cutoff_timestamp),
+            index_name='GSI1'
+        )
 
         # Transform items
         result = []
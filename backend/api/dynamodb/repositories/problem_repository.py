@@ -1,4 +1,5 @@
 """Problem repository for DynamoDB operations"""
+import asyncio
 from typing import Dict, Optional, List, Any
 from boto3.dynamodb.conditions import Key, Attr
 from .base_repository import BaseRepository
@@ -113,6 +114,58 @@ class ProblemRepository(BaseRepository):
 
         return self.put_item(item)
 
+    def _problem_from_item(self, platform: str, problem_id: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Expand a META item's short field names into a problem dict"""
+        # Decode solution_code from base64
+        import base64
+        solution_code_encoded = item['dat'].get('sol', '')
+        solution_code = base64.b64decode(solution_code_encoded).decode('utf-8') if solution_code_encoded else ''
+
+        return {
+            'platform': platform,
+            'problem_id': problem_id,
+            'title': item['dat'].get('tit', ''),
+            'problem_url': item['dat'].get('url', ''),
+            'tags': item['dat'].get('tag', []),
+            'solution_code': solution_code,
+            'solution_model': item['dat'].get('slm', ''),  # Model used for solution generation
+            'language': item['dat'].get('lng', ''),
+            'constraints': item['dat'].get('con', ''),
+            'is_completed': item['dat'].get('cmp', False),
+            'test_case_count': item['dat'].get('tcc', 0),
+            'test_set_version': item['dat'].get('tsv', 0),  # Bumped whenever test cases change
+            'testcases': item['dat'].get('tcs', []),  # Include testcases from dat
+            'is_deleted': item['dat'].get('del', False),
+            'deleted_at': item['dat'].get('ddt'),
+            'deleted_reason': item['dat'].get('drs'),
+            'needs_review': item['dat'].get('nrv', False),
+            'review_notes': item['dat'].get('rvn'),
+            'verified_by_admin': item['dat'].get('vrf', False),
+            'reviewed_at': item['dat'].get('rvt'),
+            'metadata': item['dat'].get('met', {}),
+            'tc_failures': item['dat'].get('tcf', {}),  # Failed runs per test case id, reset with tsv
+            'created_at': item.get('crt'),
+            'updated_at': item.get('upd')
+        }
+
+    def _query_partition(self, pk: str, sk_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Read every item of a partition (optionally only SKs with a prefix),
+        across all query pages
+
+        Args:
+            pk: Partition key
+            sk_prefix: Optional sort key prefix (e.g., 'TC#')
+
+        Returns:
+            List of items
+        """
+        key_condition = Key('PK').eq(pk)
+        if sk_prefix:
+            key_condition = key_condition & Key('SK').begins_with(sk_prefix)
+
+        return list(self.iter_query(key_condition))
+
     def get_problem(
         self,
         platform: str,
@@ -137,105 +190,67 @@ class ProblemRepository(BaseRepository):
 
         # Expand short field names for easier consumption
         if item.get('dat'):
-            # Decode solution_code from base64
-            import base64
-            solution_code_encoded = item['dat'].get('sol', '')
-            solution_code = base64.b64decode(solution_code_encoded).decode('utf-8') if solution_code_encoded else ''
-
-            problem = {
-                'platform': platform,
-                'problem_id': problem_id,
-                'title': item['dat'].get('tit', ''),
-                'problem_url': item['dat'].get('url', ''),
-                'tags': item['dat'].get('tag', []),
-                'solution_code': solution_code,
-                'solution_model': item['dat'].get('slm', ''),  # Model used for solution generation
-                'language': item['dat'].get('lng', ''),
-                'constraints': item['dat'].get('con', ''),
-                'is_completed': item['dat'].get('cmp', False),
-                'test_case_count': item['dat'].get('tcc', 0),
-                'testcases': item['dat'].get('tcs', []),  # Include testcases from dat
-                'is_deleted': item['dat'].get('del', False),
-                'deleted_at': item['dat'].get('ddt'),
-                'deleted_reason': item['dat'].get('drs'),
-                'needs_review': item['dat'].get('nrv', False),
-                'review_notes': item['dat'].get('rvn'),
-                'verified_by_admin': item['dat'].get('vrf', False),
-                'reviewed_at': item['dat'].get('rvt'),
-                'metadata': item['dat'].get('met', {}),
-                'created_at': item.get('crt'),
-                'updated_at': item.get('upd')
-            }
-            return problem
+            return self._problem_from_item(platform, problem_id, item)
 
         return None
 
     def get_problem_with_testcases(
         self,
         platform: str,
-        problem_id: str
+        problem_id: str,
+        raw: bool = False
     ) -> Optional[Dict[str, Any]]:
         """
         Get problem with all test cases
 
+        Reads the problem's partition once (META, TC# and GEN# items) and
+        fetches S3-backed test cases concurrently.
+
         Args:
             platform: Platform name
             problem_id: Problem identifier
+            raw: Keep S3-backed inputs/outputs as bytes (see get_testcases)
 
         Returns:
             Problem dict with test_cases list, or None if not found
+
+        Raises:
+            GeneratedInputError: If inputs stored by seed cannot be reproduced
         """
+        from api.services.generated_inputs import GeneratedInputError
+
         pk = f'PROB#{platform}#{problem_id}'
 
-        items = self.query(
-            key_condition_expression=Key('PK').eq(pk)
-        )
+        items = self._query_partition(pk)
 
         if not items:
             return None
 
         problem = None
-        test_cases = []
+        testcase_items = []
+        generator_items = []
 
         for item in items:
-            if item.get('SK') == 'META':
+            sk = item.get('SK', '')
+            if sk == 'META':
                 # Problem metadata
-                # Decode solution_code from base64
-                import base64
-                solution_code_encoded = item['dat'].get('sol', '')
-                solution_code = base64.b64decode(solution_code_encoded).decode('utf-8') if solution_code_encoded else ''
-
-                problem = {
-                    'platform': platform,
-                    'problem_id': problem_id,
-                    'title': item['dat'].get('tit', ''),
-                    'problem_url': item['dat'].get('url', ''),
-                    'tags': item['dat'].get('tag', []),
-                    'solution_code': solution_code,
-                    'solution_model': item['dat'].get('slm', ''),  # Model used for solution generation
-                    'language': item['dat'].get('lng', ''),
-                    'constraints': item['dat'].get('con', ''),
-                    'is_completed': item['dat'].get('cmp', False),
-                    'test_case_count': item['dat'].get('tcc', 0),
-                    'testcases': item['dat'].get('tcs', []),  # Include testcases from dat
-                    'is_deleted': item['dat'].get('del', False),
-                    'deleted_at': item['dat'].get('ddt'),
-                    'deleted_reason': item['dat'].get('drs'),
-                    'needs_review': item['dat'].get('nrv', False),
-                    'review_notes': item['dat'].get('rvn'),
-                    'verified_by_admin': item['dat'].get('vrf', False),
-                    'reviewed_at': item['dat'].get('rvt'),
-                    'metadata': item['dat'].get('met', {}),
-                    'created_at': item.get('crt'),
-                    'updated_at': item.get('upd')
-                }
+                problem = self._problem_from_item(platform, problem_id, item)
+            elif sk.startswith('TC#'):
+                testcase_items.append(item)
+            elif sk.startswith('GEN#'):
+                generator_items.append(item)
 
         # Return problem with testcases
         if problem:
-            # Load test cases using get_testcases method (handles TC# items and S3)
+            # Build test cases from the TC# items read above (handles S3 and regenerated inputs)
             try:
-                test_cases = self.get_testcases(platform, problem_id)
-                problem['test_cases'] = test_cases
+                problem['test_cases'] = self._testcases_from_items(
+                    platform, problem_id, testcase_items, raw=raw,
+                    generators={item['SK'].replace('GEN#', ''): self._generator_code(item) for item in generator_items}
+                )
+            except GeneratedInputError:
+                # Running or showing fewer test cases than stored would be silently wrong
+                raise
             except Exception as e:
                 logger.warning(f"Failed to load testcases for {platform}/{problem_id}: {e}")
                 problem['test_cases'] = []
@@ -355,14 +370,9 @@ class ProblemRepository(BaseRepository):
         """
         pk = f'PROB#{platform}#{problem_id}'
 
-        # Get all items for this problem (META + test cases)
-        items = self.query(
-            key_condition_expression=Key('PK').eq(pk)
-        )
-
-        # Delete all items from DynamoDB
+        # Delete all items for this problem (META + test cases) as they are read
         success = True
-        for item in items:
+        for item in self.iter_query(Key('PK').eq(pk), ProjectionExpression='PK, SK'):
             if not self.delete_item(item['PK'], item['SK']):
                 success = False
 
@@ -376,37 +386,71 @@ class ProblemRepository(BaseRepository):
 
         return success
 
-    def add_testcase(
+    # Concurrent S3 uploads when adding or rewriting many large test cases
+    S3_UPLOAD_CONCURRENCY = 8
+
+    async def _testcase_item(
         self,
         platform: str,
         problem_id: str,
         testcase_id: str,
-        input_str: str,
-        output_str: str
+        input_str,
+        output_str,
+        seed: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        generator_hash: Optional[str] = None,
+        reproducible: bool = False
     ) -> Dict[str, Any]:
         """
-        Add a test case to a problem and update test case count
-        Automatically routes to S3 if test case is large (>=100KB)
+        Build a TC# item, storing large test cases in S3 first (see add_testcase)
 
         Args:
-            platform: Platform name
-            problem_id: Problem identifier
-            testcase_id: Test case identifier (e.g., '1', '2', 'custom1')
-            input_str: Test case input
-            output_str: Expected output
+            reproducible: Set by _mark_reproducible once the generator reproduced
+                          input_str; only then is the input stored by seed
 
         Returns:
-            Created test case item
+            TC# item (not written yet)
         """
+        from api.services import program_input
+        from api.services.generated_inputs import GeneratedInputCache, content_hash
+
         timestamp = self.get_timestamp()
 
         # Check if test case should be stored in S3
         use_s3 = self.s3_service.should_use_s3(input_str, output_str)
 
-        if use_s3:
+        # Large generated input with a small output: keep only what regenerates the input
+        use_generated = reproducible and self._storable_by_seed(
+            input_str, output_str, seed, difficulty, generator_hash
+        )
+
+        if use_generated:
+            # Cache the input we already have, so this host does not regenerate it
+            input_file = GeneratedInputCache().put(input_str)
+            item = {
+                'PK': f'PROB#{platform}#{problem_id}',
+                'SK': f'TC#{testcase_id}',
+                'tp': 'tc',
+                'dat': {
+                    'gen': generator_hash,
+                    'ihs': input_file.path.name,
+                    'isz': input_file.size,
+                    'out': output_str,
+                    'ohs': content_hash(output_str),
+                    'storage': 'generated'
+                },
+                'crt': timestamp
+            }
+
+            logger.info(
+                f"Stored generated test case by seed: {platform}/{problem_id}/{testcase_id} "
+                f"({item['dat']['isz']} byte input not uploaded)"
+            )
+
+        elif use_s3:
             # Store in S3 and save reference in DynamoDB
             try:
-                s3_metadata = async_to_sync(self.s3_service.store_testcase)(
+                s3_metadata = await self.s3_service.store_testcase(
                     platform=platform,
                     problem_id=problem_id,
                     testcase_id=testcase_id,
@@ -440,8 +484,8 @@ class ProblemRepository(BaseRepository):
                     'SK': f'TC#{testcase_id}',
                     'tp': 'tc',
                     'dat': {
-                        'inp': input_str,
-                        'out': output_str,
+                        'inp': program_input.to_text(input_str),
+                        'out': program_input.to_text(output_str),
                         'storage': 'dynamodb'
                     },
                     'crt': timestamp
@@ -453,31 +497,569 @@ class ProblemRepository(BaseRepository):
                 'SK': f'TC#{testcase_id}',
                 'tp': 'tc',
                 'dat': {
-                    'inp': input_str,
-                    'out': output_str,
+                    'inp': program_input.to_text(input_str),
+                    'out': program_input.to_text(output_str),
                     'storage': 'dynamodb'
                 },
                 'crt': timestamp
             }
 
+        # How a generated input can be reproduced
+        if seed is not None:
+            item['dat']['sed'] = seed
+        if difficulty:
+            item['dat']['dif'] = difficulty
+
+        return item
+
+    def _storable_by_seed(
+        self,
+        input_str,
+        output_str,
+        seed: Optional[int],
+        difficulty: Optional[str],
+        generator_hash: Optional[str]
+    ) -> bool:
+        """Whether a test case qualifies for storage 'generated' (a large input with a small output)"""
+        from django.conf import settings
+
+        return (
+            getattr(settings, 'TEST_CASE_LAZY_INPUTS', False)
+            and generator_hash is not None
+            and seed is not None
+            and bool(difficulty)
+            and self.s3_service.should_use_s3(input_str, output_str)
+            and not self.s3_service.should_use_s3('', output_str)
+        )
+
+    def _mark_reproducible(
+        self,
+        platform: str,
+        problem_id: str,
+        builds: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Set 'reproducible' on the _testcase_item kwargs whose input the
+        generator regenerates byte for byte
+
+        Only test cases that qualify for storage 'generated' are regenerated;
+        the others, and inputs that do not reproduce (or whose generator is
+        not stored), are stored in S3 as usual.
+
+        Args:
+            platform: Platform name
+            problem_id: Problem identifier
+            builds: _testcase_item kwargs, updated in place
+        """
+        from api.services.generated_inputs import GeneratedInputCache
+
+        by_generator = {}
+        for build in builds:
+            build['reproducible'] = False
+            if self._storable_by_seed(
+                build['input_str'], build['output_str'], build.get('seed'),
+                build.get('difficulty'), build.get('generator_hash')
+            ):
+                by_generator.setdefault(build['generator_hash'], []).append(build)
+
+        for generator_hash, generator_builds in by_generator.items():
+            generator_code = self.get_generator(platform, problem_id, generator_hash)
+            if generator_code is None:
+                logger.error(f"Generator {generator_hash[:12]} not found for {platform}/{problem_id}; storing inputs in S3")
+                continue
+
+            reproduced = GeneratedInputCache().verify(generator_code, [
+                (build['difficulty'], build['seed'], build['input_str']) for build in generator_builds
+            ])
+            for build, ok in zip(generator_builds, reproduced):
+                build['reproducible'] = ok
+
+            if not all(reproduced):
+                logger.warning(
+                    f"Generator {generator_hash[:12]} of {platform}/{problem_id} did not reproduce "
+                    f"{reproduced.count(False)} of {len(reproduced)} inputs; storing them in S3"
+                )
+
+    async def _testcase_items(self, builds: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run _testcase_item for many test cases, uploading to S3 concurrently"""
+        semaphore = asyncio.Semaphore(self.S3_UPLOAD_CONCURRENCY)
+
+        async def build(kwargs):
+            async with semaphore:
+                return await self._testcase_item(**kwargs)
+
+        return list(await asyncio.gather(*(build(kwargs) for kwargs in builds)))
+
+    def add_testcase(
+        self,
+        platform: str,
+        problem_id: str,
+        testcase_id: str,
+        input_str: str,
+        output_str: str,
+        seed: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        generator_hash: Optional[str] = None,
+        update_count: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Add a test case to a problem and update test case count
+        Automatically routes to S3 if test case is large (>=100KB), or, with
+        TEST_CASE_LAZY_INPUTS, stores a large generated input as its
+        generator hash, seed and size (regenerated when read) once
+        regenerating it here reproduced input_str
+
+        Args:
+            platform: Platform name
+            problem_id: Problem identifier
+            testcase_id: Test case identifier (e.g., '1', '2', 'custom1')
+            input_str: Test case input
+            output_str: Expected output
+            seed: random.seed() the generator produced this input with
+            difficulty: Generator size/difficulty ('small', 'medium', 'large', ...)
+            generator_hash: Hash returned by put_generator() for the generator code
+                            that produced input_str (enables lazy storage)
+            update_count: Increment the problem's test case count (and test set
+                          version); callers adding many test cases can skip it
+                          and call bump_test_set_version() themselves
+
+        Returns:
+            Created test case item
+        """
+        build = {
+            'platform': platform,
+            'problem_id': problem_id,
+            'testcase_id': testcase_id,
+            'input_str': input_str,
+            'output_str': output_str,
+            'seed': seed,
+            'difficulty': difficulty,
+            'generator_hash': generator_hash
+        }
+        self._mark_reproducible(platform, problem_id, [build])
+        item = async_to_sync(self._testcase_item)(**build)
+
         result = self.put_item(item)
+        if not update_count:
+            return result
 
-        # Update test case count
-        problem = self.get_problem(platform, problem_id)
-        if problem:
-            current_count = problem.get('test_case_count', 0)
-            self.update_problem(
+        # Atomically add one to the test case count (and bump the test set version)
+        self.bump_test_set_version(platform, problem_id, added_test_cases=1)
+
+        return result
+
+    def add_testcases(
+        self,
+        platform: str,
+        problem_id: str,
+        cases: List[Dict[str, Any]],
+        generator_hash: Optional[str] = None,
+        test_case_count: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Add many test cases at once
+
+        Large test cases are uploaded to S3 concurrently, the TC# items are
+        written with BatchWriteItem and the test case count is updated once
+        (together with the test set version).
+
+        Args:
+            platform: Platform name
+            problem_id: Problem identifier
+            cases: List of dicts with 'testcase_id', 'input', 'output' and
+                   optionally 'seed' and 'difficulty' (see add_testcase)
+            generator_hash: Hash returned by put_generator() (see add_testcase)
+            test_case_count: Set the test case count to this value (default:
+                             atomically add len(cases) to it)
+
+        Returns:
+            Created test case items
+        """
+        if not cases:
+            return []
+
+        builds = [
+            {
+                'platform': platform,
+                'problem_id': problem_id,
+                'testcase_id': case['testcase_id'],
+                'input_str': case['input'],
+                'output_str': case['output'],
+                'seed': case.get('seed'),
+                'difficulty': case.get('difficulty'),
+                'generator_hash': generator_hash
+            }
+            for case in cases
+        ]
+        self._mark_reproducible(platform, problem_id, builds)
+        items = async_to_sync(self._testcase_items)(builds)
+        self.batch_put(items)
+
+        if test_case_count is not None:
+            self.bump_test_set_version(platform, problem_id, test_case_count=test_case_count)
+        else:
+            self.bump_test_set_version(platform, problem_id, added_test_cases=len(items))
+
+        logger.info(f"Stored {len(items)} test cases for {platform}/{problem_id}")
+        return items
+
+    def update_testcase_outputs(
+        self,
+        platform: str,
+        problem_id: str,
+        outputs: Dict[str, str]
+    ) -> int:
+        """
+        Replace the expected outputs of existing test cases
+
+        Test cases are re-routed like in add_testcase (an output can move a
+        test case to S3), rewritten with BatchWriteItem, and the test set
+        version is bumped once.
+
+        Args:
+            platform: Platform name
+            problem_id: Problem identifier
+            outputs: {testcase_id: new expected output}
+
+        Returns:
+            Number of test cases updated
+        """
+        from api.services.generated_inputs import content_hash
+
+        pk = f'PROB#{platform}#{problem_id}'
+        items = [
+            item for item in self.query(
+                key_condition_expression=Key('PK').eq(pk) & Key('SK').begins_with('TC#')
+            )
+            if item['SK'].replace('TC#', '') in outputs
+        ]
+        if not items:
+            return 0
+
+        updated = []
+        rebuilds = []
+        s3_items = []
+        for item in items:
+            testcase_id = item['SK'].replace('TC#', '')
+            dat = item['dat']
+            output_str = outputs[testcase_id]
+            storage = dat.get('storage', 'dynamodb')
+
+            if storage == 'generated' and not self.s3_service.should_use_s3('', output_str):
+                # Input stays regenerable: only the output changes
+                dat['out'] = output_str
+                dat['ohs'] = content_hash(output_str)
+                updated.append(item)
+                continue
+
+            build = {
+                'platform': platform,
+                'problem_id': problem_id,
+                'testcase_id': testcase_id,
+                'input_str': dat.get('inp', ''),
+                'output_str': output_str,
+                'seed': int(dat['sed']) if 'sed' in dat else None,
+                'difficulty': dat.get('dif'),
+                'generator_hash': dat.get('gen'),
+                'crt': item.get('crt')
+            }
+            if storage == 's3':
+                s3_items.append(build)
+            rebuilds.append((storage, build))
+
+        # Inputs of test cases that are not stored inline
+        generated_inputs = self.load_generated_inputs(platform, problem_id, items, raw=True)
+
+        if s3_items:
+            s3_testcases = async_to_sync(self.s3_service.retrieve_testcases_by_id)(
                 platform=platform,
                 problem_id=problem_id,
-                updates={'test_case_count': current_count + 1}
+                testcase_ids=[build['testcase_id'] for build in s3_items],
+                raw=True
             )
+            for build in s3_items:
+                testcase = s3_testcases.get(build['testcase_id'])
+                build['input_str'] = testcase['input'] if testcase else None
+
+        builds = []
+        for storage, build in rebuilds:
+            if storage == 'generated':
+                build['input_str'] = generated_inputs.get(build['testcase_id'])
+            if build['input_str'] is None:
+                logger.error(f"Input of test case {build['testcase_id']} not found; output not updated")
+                continue
+            builds.append(build)
 
-        return result
+        created = [build.pop('crt') for build in builds]
+        self._mark_reproducible(platform, problem_id, builds)
+        for item, crt in zip(async_to_sync(self._testcase_items)(builds), created):
+            if crt is not None:
+                item['crt'] = crt
+            updated.append(item)
+
+        if updated:
+            self.batch_put(updated)
+            # Expected outputs changed: invalidate memoized executions of this problem
+            self.bump_test_set_version(platform, problem_id)
+
+        return len(updated)
+
+    def bump_test_set_version(
+        self,
+        platform: str,
+        problem_id: str,
+        test_case_count: Optional[int] = None,
+        added_test_cases: Optional[int] = None
+    ) -> int:
+        """
+        Increment the problem's test set version (dat.tsv)
+
+        Call whenever test case inputs or outputs change. Memoized execution
+        results are keyed by this version (see api.services.execution_memo),
+        so bumping it invalidates them. Per-test failure counts (dat.tcf) are
+        reset too, since regenerated test cases reuse their ids.
+
+        Args:
+            platform: Platform name
+            problem_id: Problem identifier
+            test_case_count: Optional new test case count to set in the same update
+            added_test_cases: Optional number to atomically add to the test case count
+                              (instead of test_case_count)
+
+        Returns:
+            New test set version
+        """
+        update_parts = [
+            'dat.#tsv = if_not_exists(dat.#tsv, :zero) + :one',
+            'dat.#tcf = :empty',
+            '#upd = :upd'
+        ]
+        expression_values = {':zero': 0, ':one': 1, ':empty': {}, ':upd': self.get_timestamp()}
+        expression_names = {'#tsv': 'tsv', '#tcf': 'tcf', '#upd': 'upd'}
+
+        if test_case_count is not None:
+            update_parts.append('dat.#tcc = :tcc')
+            expression_values[':tcc'] = test_case_count
+            expression_names['#tcc'] = 'tcc'
+        elif added_test_cases is not None:
+            update_parts.append('dat.#tcc = if_not_exists(dat.#tcc, :zero) + :added')
+            expression_values[':added'] = added_test_cases
+            expression_names['#tcc'] = 'tcc'
+
+        item = self.update_item(
+            pk=f'PROB#{platform}#{problem_id}',
+            sk='META',
+            update_expression='SET ' + ', '.join(update_parts),
+            expression_attribute_values=expression_values,
+            expression_attribute_names=expression_names
+        )
+        return int(item['dat']['tsv'])
+
+    def record_execution(
+        self,
+        platform: str,
+        problem_id: str,
+        failed_testcase_ids: List[str]
+    ) -> None:
+        """
+        Atomically count one execution and the test cases it failed
+
+        Increments dat.met.execution_count and dat.tcf.<testcase_id> for each
+        failed test case in a single update, so concurrent executions of the
+        same problem never lose each other's counts or overwrite other
+        metadata keys.
+
+        Args:
+            platform: Platform name
+            problem_id: Problem identifier
+            failed_testcase_ids: Ids of the test cases the execution failed
+        """
+        pk = f'PROB#{platform}#{problem_id}'
+        update_parts = ['dat.#met.#exc = if_not_exists(dat.#met.#exc, :zero) + :one', '#upd = :upd']
+        expression_values = {':zero': 0, ':one': 1, ':upd': self.get_timestamp()}
+        expression_names = {'#met': 'met', '#exc': 'execution_count', '#upd': 'upd'}
+
+        for index, testcase_id in enumerate(sorted(set(failed_testcase_ids))):
+            update_parts.append(f'dat.#tcf.#f{index} = if_not_exists(dat.#tcf.#f{index}, :zero) + :one')
+            expression_names[f'#f{index}'] = str(testcase_id)
+        if failed_testcase_ids:
+            expression_names['#tcf'] = 'tcf'
+
+        try:
+            self.update_item(
+                pk=pk,
+                sk='META',
+                update_expression='SET ' + ', '.join(update_parts),
+                expression_attribute_values=expression_values,
+                expression_attribute_names=expression_names
+            )
+        except Exception as e:
+            if 'ValidationException' not in str(e):
+                raise
+            # dat.met / dat.tcf do not exist yet (older problems): create the maps and retry
+            self.update_item(
+                pk=pk,
+                sk='META',
+                update_expression='SET dat.#met = if_not_exists(dat.#met, :empty), '
+                                  'dat.#tcf = if_not_exists(dat.#tcf, :empty)',
+                expression_attribute_values={':empty': {}},
+                expression_attribute_names={'#met': 'met', '#tcf': 'tcf'}
+            )
+            self.update_item(
+                pk=pk,
+                sk='META',
+                update_expression='SET ' + ', '.join(update_parts),
+                expression_attribute_values=expression_values,
+                expression_attribute_names=expression_names
+            )
+
+    def put_generator(
+        self,
+        platform: str,
+        problem_id: str,
+        generator_code: str
+    ) -> str:
+        """
+        Store generator code as a GEN#<hash> item, for regenerating lazily
+        stored test case inputs (see add_testcase)
+
+        Args:
+            platform: Platform name
+            problem_id: Problem identifier
+            generator_code: Generator code
+
+        Returns:
+            Generator hash (sha256 of the code) to pass to add_testcase
+        """
+        import base64
+        from api.services.generated_inputs import content_hash
+
+        generator_hash = content_hash(generator_code)
+        self.put_item({
+            'PK': f'PROB#{platform}#{problem_id}',
+            'SK': f'GEN#{generator_hash}',
+            'tp': 'gen',
+            'dat': {
+                'cod': base64.b64encode(generator_code.encode('utf-8')).decode('utf-8')
+            },
+            'crt': self.get_timestamp()
+        })
+        return generator_hash
+
+    def get_generator(
+        self,
+        platform: str,
+        problem_id: str,
+        generator_hash: str
+    ) -> Optional[str]:
+        """
+        Get generator code stored by put_generator
+
+        Args:
+            platform: Platform name
+            problem_id: Problem identifier
+            generator_hash: Generator hash
+
+        Returns:
+            Generator code or None if not found
+        """
+        item = self.get_item(f'PROB#{platform}#{problem_id}', f'GEN#{generator_hash}')
+        if not item:
+            return None
+        return self._generator_code(item)
+
+    @staticmethod
+    def _generator_code(item: Dict[str, Any]) -> str:
+        """Decode the generator code of a GEN# item"""
+        import base64
+        return base64.b64decode(item['dat'].get('cod', '')).decode('utf-8')
+
+    def load_generated_inputs(
+        self,
+        platform: str,
+        problem_id: str,
+        items: List[Dict[str, Any]],
+        raw: bool = False,
+        generators: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the inputs of TC# items with storage 'generated', regenerating
+        the ones not in this host's GeneratedInputCache
+
+        Args:
+            platform: Platform name
+            problem_id: Problem identifier
+            items: TC# items (other storage types are ignored)
+            raw: Return inputs as program_input.InputFile instead of str
+            generators: Generator codes already read, {generator hash: code}
+                        (others are read with get_generator when needed)
+
+        Returns:
+            dict: {testcase_id: input}
+
+        Raises:
+            GeneratedInputError: If any input could not be reproduced (generator
+                                 missing, failing or producing other bytes)
+        """
+        from api.services.generated_inputs import GeneratedInputCache, GeneratedInputError
+        from api.services import program_input
+
+        by_generator = {}
+        for item in items:
+            if item['dat'].get('storage') == 'generated':
+                by_generator.setdefault(item['dat']['gen'], []).append(item)
+
+        cache = GeneratedInputCache()
+        inputs = {}
+        missing = []
+        for generator_hash, generator_items in by_generator.items():
+            files = {}
+            for item in generator_items:
+                input_file = cache.get(item['dat']['ihs'])
+                if input_file is not None:
+                    files[item['dat']['ihs']] = input_file
+
+            # The generator is only needed for inputs this host has not cached
+            if len(files) < len(generator_items):
+                generator_code = (generators or {}).get(generator_hash)
+                if generator_code is None:
+                    generator_code = self.get_generator(platform, problem_id, generator_hash)
+                if generator_code is None:
+                    logger.error(f"Generator {generator_hash[:12]} not found for {platform}/{problem_id}")
+                else:
+                    files.update(cache.regenerate(generator_code, [
+                        (item['dat']['dif'], int(item['dat']['sed']), item['dat']['ihs'])
+                        for item in generator_items if item['dat']['ihs'] not in files
+                    ]))
+
+            for item in generator_items:
+                testcase_id = item['SK'].replace('TC#', '')
+                input_file = files.get(item['dat']['ihs'])
+                if input_file is None:
+                    missing.append(testcase_id)
+                    continue
+                inputs[testcase_id] = input_file if raw else program_input.to_text(input_file)
+
+        if missing:
+            raise GeneratedInputError(
+                f"Test cases {', '.join(missing)} of {platform}/{problem_id} could not be regenerated"
+            )
+
+        return inputs
+
+    @staticmethod
+    def _generation_fields(dat: Dict[str, Any]) -> Dict[str, Any]:
+        """Seed and difficulty of a generated test case (None for other test cases)"""
+        return {
+            'seed': int(dat['sed']) if 'sed' in dat else None,
+            'difficulty': dat.get('dif')
+        }
 
     def get_testcases(
         self,
         platform: str,
-        problem_id: str
+        problem_id: str,
+        raw: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Get all test cases for a problem (hybrid: DynamoDB + S3)
@@ -485,16 +1067,69 @@ class ProblemRepository(BaseRepository):
         Args:
             platform: Platform name
             problem_id: Problem identifier
+            raw: Return S3-backed (large) inputs and outputs as bytes-like
+                 objects, and regenerated inputs as program_input.InputFile,
+                 instead of str, for passing them to executors without a
+                 decode/encode round trip
 
         Returns:
-            List of test case dictionaries with 'testcase_id', 'input', 'output'
+            List of test case dictionaries with 'testcase_id', 'input', 'output',
+            'seed' and 'difficulty' (None unless generated)
+
+        Raises:
+            GeneratedInputError: If inputs stored by seed cannot be reproduced
         """
         pk = f'PROB#{platform}#{problem_id}'
 
         # Query DynamoDB for all test case items
-        items = self.query(
-            key_condition_expression=Key('PK').eq(pk) & Key('SK').begins_with('TC#')
-        )
+        items = self._query_partition(pk, 'TC#')
+
+        return self._testcases_from_items(platform, problem_id, items, raw=raw)
+
+    def _testcases_from_items(
+        self,
+        platform: str,
+        problem_id: str,
+        items: List[Dict[str, Any]],
+        raw: bool = False,
+        generators: Optional[Dict[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Build test case dicts from TC# items (see get_testcases)
+
+        S3-backed test cases are fetched concurrently through one S3 client,
+        lazily stored inputs are regenerated (or read from the local cache)
+        in one batch.
+
+        Args:
+            platform: Platform name
+            problem_id: Problem identifier
+            items: TC# items
+            raw: See get_testcases
+            generators: See load_generated_inputs
+
+        Returns:
+            List of test case dictionaries, sorted by testcase_id
+        """
+        s3_testcase_ids = []
+        for item in items:
+            if item['dat'].get('storage') == 's3':
+                if item['dat'].get('s3_key'):
+                    s3_testcase_ids.append(item['SK'].replace('TC#', ''))
+                else:
+                    logger.warning(f"Test case {item['SK'].replace('TC#', '')} marked as S3 but no s3_key found")
+
+        s3_testcases = {}
+        if s3_testcase_ids:
+            s3_testcases = async_to_sync(self.s3_service.retrieve_testcases_by_id)(
+                platform=platform,
+                problem_id=problem_id,
+                testcase_ids=s3_testcase_ids,
+                raw=raw
+            )
+
+        # Lazily stored inputs, regenerated (or cached) in one batch
+        generated_inputs = self.load_generated_inputs(platform, problem_id, items, raw=raw, generators=generators)
 
         test_cases = []
 
@@ -503,34 +1138,30 @@ class ProblemRepository(BaseRepository):
             testcase_id = item['SK'].replace('TC#', '')
             storage_type = item['dat'].get('storage', 'dynamodb')
 
-            try:
-                if storage_type == 's3':
-                    # Retrieve from S3 using s3_key
-                    s3_key = item['dat'].get('s3_key')
-                    if s3_key:
-                        testcase_data = async_to_sync(self.s3_service.retrieve_testcase)(
-                            platform=platform,
-                            problem_id=problem_id,
-                            testcase_id=testcase_id
-                        )
-                        if testcase_data:
-                            test_cases.append({
-                                'testcase_id': testcase_id,
-                                'input': testcase_data['input'],
-                                'output': testcase_data['output']
-                            })
-                    else:
-                        logger.warning(f"Test case {testcase_id} marked as S3 but no s3_key found")
-                else:
-                    # Retrieve from DynamoDB
+            if storage_type == 'generated':
+                test_cases.append({
+                    'testcase_id': testcase_id,
+                    'input': generated_inputs[testcase_id],
+                    'output': item['dat'].get('out', ''),
+                    **self._generation_fields(item['dat'])
+                })
+            elif storage_type == 's3':
+                testcase_data = s3_testcases.get(testcase_id)
+                if testcase_data:
                     test_cases.append({
                         'testcase_id': testcase_id,
-                        'input': item['dat'].get('inp', ''),
-                        'output': item['dat'].get('out', '')
+                        'input': testcase_data['input'],
+                        'output': testcase_data['output'],
+                        **self._generation_fields(item['dat'])
                     })
-            except Exception as e:
-                logger.error(f"Failed to retrieve test case {testcase_id}: {e}")
-                continue
+            else:
+                # Retrieve from DynamoDB
+                test_cases.append({
+                    'testcase_id': testcase_id,
+                    'input': item['dat'].get('inp', ''),
+                    'output': item['dat'].get('out', ''),
+                    **self._generation_fields(item['dat'])
+                })
 
         # Sort by testcase_id (numeric sort if possible)
         try:
@@ -555,20 +1186,17 @@ class ProblemRepository(BaseRepository):
         Returns:
             Tuple of (problems list, next_cursor)
         """
-        query_params = {
-            'IndexName': 'GSI3',
-            'KeyConditionExpression': Key('GSI3PK').eq('PROB#COMPLETED'),
-            'FilterExpression': Attr('dat.del').eq(False),
-            'Limit': limit,
-            'ScanIndexForward': False  # Newest first (descending by GSI3SK timestamp)
-        }
-
-        if last_evaluated_key:
-            query_params['ExclusiveStartKey'] = last_evaluated_key
-
-        response = self.table.query(**query_params)
-        items = response.get('Items', [])
-        next_key = response.get('LastEvaluatedKey')
+        # Up to limit non-deleted problems, reading further pages when the filter drops some
+        items = self.iter_query(
+            Key('GSI3PK').eq('PROB#COMPLETED'),
+            filter_expression=Attr('dat.del').eq(False),
+            index_name='GSI3',
+            scan_index_forward=False,  # Newest first (descending by GSI3SK timestamp)
+            max_items=limit,
+            start_key=last_evaluated_key,
+            page_size=limit,
+            projection='problem.summary'  # No solution code or constraints
+        )
 
         problems = []
         for item in items:
@@ -592,7 +1220,7 @@ class ProblemRepository(BaseRepository):
                     'updated_at': item.get('upd')
                 })
 
-        return problems, next_key
+        return problems, items.cursor
 
     def list_draft_problems(
         self,
@@ -609,20 +1237,17 @@ class ProblemRepository(BaseRepository):
         Returns:
             Tuple of (problems list, next_cursor)
         """
-        query_params = {
-            'IndexName': 'GSI3',
-            'KeyConditionExpression': Key('GSI3PK').eq('PROB#DRAFT'),
-            'FilterExpression': Attr('dat.del').eq(False),
-            'Limit': limit,
-            'ScanIndexForward': False  # Newest first (descending by GSI3SK timestamp)
-        }
-
-        if last_evaluated_key:
-            query_params['ExclusiveStartKey'] = last_evaluated_key
-
-        response = self.table.query(**query_params)
-        items = response.get('Items', [])
-        next_key = response.get('LastEvaluatedKey')
+        # Up to limit non-deleted problems, reading further pages when the filter drops some
+        items = self.iter_query(
+            Key('GSI3PK').eq('PROB#DRAFT'),
+            filter_expression=Attr('dat.del').eq(False),
+            index_name='GSI3',
+            scan_index_forward=False,  # Newest first (descending by GSI3SK timestamp)
+            max_items=limit,
+            start_key=last_evaluated_key,
+            page_size=limit,
+            projection='problem.summary'  # No solution code or constraints
+        )
 
         problems = []
         for item in items:
@@ -646,7 +1271,7 @@ class ProblemRepository(BaseRepository):
                     'updated_at': item.get('upd')
                 })
 
-        return problems, next_key
+        return problems, items.cursor
 
     def soft_delete_problem(
         self,
@@ -278,53 +278,36 @@ class ScriptGenerationJobRepository(BaseRepository):
         """
         # Priority 1: If platform AND problem_id provided, use GSI2 (most efficient)
         if platform and problem_id:
-            query_params = {
-                'IndexName': 'GSI2',
-                'KeyConditionExpression': Key('GSI2PK').eq(f'SGJOB#{platform}#{problem_id}'),
-                'Limit': limit,
-                'ScanIndexForward': False  # Newest first
-            }
-
-            if last_evaluated_key:
-                query_params['ExclusiveStartKey'] = last_evaluated_key
-
-            response = self.table.query(**query_params)
-            gsi_items = response.get('Items', [])
-
-            # GSI2 has KEYS_ONLY projection, so fetch full items
-            items = []
-            for gsi_item in gsi_items:
-                pk = gsi_item['PK']
-                sk = gsi_item['SK']
-                full_item_response = self.table.get_item(Key={'PK': pk, 'SK': sk})
-                if 'Item' in full_item_response:
-                    items.append(full_item_response['Item'])
+            pages = self.iter_query(
+                Key('GSI2PK').eq(f'SGJOB#{platform}#{problem_id}'),
+                index_name='GSI2',
+                scan_index_forward=False,  # Newest first
+                max_items=limit,
+                start_key=last_evaluated_key
+            )
+
+            # GSI2 has KEYS_ONLY projection, so fetch full items (one batch)
+            items = [
+                item for item in self.batch_get([(gsi_item['PK'], gsi_item['SK']) for gsi_item in pages])
+                if item is not None
+            ]
         # Priority 2: If status filter provided, use GSI1
         elif status:
-            query_params = {
-                'IndexName': 'GSI1',
-                'KeyConditionExpression': Key('GSI1PK').eq(f'SGJOB#STATUS#{status}'),
-                'Limit': limit,
-                'ScanIndexForward': False  # Newest first
-            }
-
-            if last_evaluated_key:
-                query_params['ExclusiveStartKey'] = last_evaluated_key
-
-            response = self.table.query(**query_params)
-            items = response.get('Items', [])
+            items = pages = self.iter_query(
+                Key('GSI1PK').eq(f'SGJOB#STATUS#{status}'),
+                index_name='GSI1',
+                scan_index_forward=False,  # Newest first
+                max_items=limit,
+                start_key=last_evaluated_key
+            )
         # Priority 3: Otherwise, scan with filter
         else:
-            scan_params = {
-                'FilterExpression': Attr('tp').eq('sgjob'),
-                'Limit': limit
-            }
-
-            if last_evaluated_key:
-                scan_params['ExclusiveStartKey'] = last_evaluated_key
-
-            response = self.table.scan(**scan_params)
-            items = response.get('Items', [])
+            items = pages = self.iter_scan(
+                Attr('tp').eq('sgjob'),
+                max_items=limit,
+                start_key=last_evaluated_key,
+                page_size=limit
+            )
 
         # Apply additional filters (only needed if not using GSI2)
         filtered_items = items
@@ -344,8 +327,7 @@ class ScriptGenerationJobRepository(BaseRepository):
         # Sort by created_at descending
         result.sort(key=lambda x: x.get('created_at', 0), reverse=True)
 
-        next_key = response.get('LastEvaluatedKey')
-        return result, next_key
+        return result, pages.cursor
 
     def find_stale_jobs(self, cutoff_time) -> List[Dict[str, Any]]:
         """
@@ -359,15 +341,12 @@ class ScriptGenerationJobRepository(BaseRepository):
         """
         cutoff_timestamp = int(cutoff_time.timestamp())
 
-        # Query jobs with PROCESSING status
-        query_params = {
-            'IndexName': 'GSI1',
-            'KeyConditionExpression': Key('GSI1PK').eq('SGJOB#STATUS#PROCESSING'),
-            'FilterExpression': Attr('upd').lt(cutoff_timestamp)
-        }
-
-        response = self.table.query(**query_params)
-        items = response.get('Items', [])
+        # Query jobs with PROCESSING status (all pages)
+        items = self.iter_query(
+            Key('GSI1PK').eq('SGJOB#STATUS#PROCESSING'),
+            filter_expression=Attr('upd').lt(cutoff_timestamp),
+            index_name='GSI1'
+        )
 
         # Transform items
         result = []
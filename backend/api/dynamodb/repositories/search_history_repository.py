@@ -112,6 +112,23 @@ class SearchHistoryRepository(BaseRepository):
         except Exception:
             return None
 
+    def get_histories(self, keys: List[Dict], projection: Optional[str] = None) -> List[Dict]:
+        """
+        Get many histories at once (BatchGetItem)
+
+        GSI2 (public history) only projects keys, so its query results are
+        turned into full items here.
+
+        Args:
+            keys: Items or keys with PK and SK (e.g. GSI2 query results)
+            projection: Optional view to read (e.g. 'history.list_row', see projections.py)
+
+        Returns:
+            Full history items in the order of keys (deleted ones are skipped)
+        """
+        items = self.batch_get([(key['PK'], key['SK']) for key in keys], projection=projection)
+        return [item for item in items if item is not None]
+
     def get_history_with_testcases(self, history_id: int) -> Optional[Dict]:
         """
         Get history with test cases
@@ -164,7 +181,8 @@ class SearchHistoryRepository(BaseRepository):
         self,
         user_id: int,
         limit: int = 20,
-        last_evaluated_key: Optional[Dict] = None
+        last_evaluated_key: Optional[Dict] = None,
+        projection: Optional[str] = None
     ) -> Tuple[List[Dict], Optional[Dict]]:
         """
         List user's history with pagination
@@ -173,6 +191,7 @@ class SearchHistoryRepository(BaseRepository):
             user_id: User ID
             limit: Max items to return
             last_evaluated_key: Pagination key
+            projection: Optional view to read (e.g. 'history.list_row', see projections.py)
 
         Returns:
             Tuple of (items, next_key)
@@ -181,24 +200,20 @@ class SearchHistoryRepository(BaseRepository):
         logger = logging.getLogger(__name__)
 
         try:
-            query_params = {
-                'IndexName': 'GSI1',
-                'KeyConditionExpression': Key('GSI1PK').eq(f'USER#{user_id}') & Key('GSI1SK').begins_with('HIST#'),
-                'Limit': limit,
-                'ScanIndexForward': False  # Newest first
-            }
-
-            if last_evaluated_key:
-                query_params['ExclusiveStartKey'] = last_evaluated_key
-
             logger.info(f"[SearchHistory] Querying user history: user_id={user_id}, limit={limit}")
-            response = self.table.query(**query_params)
-            items = response.get('Items', [])
-            next_key = response.get('LastEvaluatedKey')
+            pages = self.iter_query(
+                Key('GSI1PK').eq(f'USER#{user_id}') & Key('GSI1SK').begins_with('HIST#'),
+                index_name='GSI1',
+                scan_index_forward=False,  # Newest first
+                max_items=limit,
+                start_key=last_evaluated_key,
+                projection=projection
+            )
+            items = list(pages)
 
             logger.info(f"[SearchHistory] Query returned {len(items)} items")
 
-            return items, next_key
+            return items, pages.cursor
         except Exception as e:
             logger.error(f"[SearchHistory] Failed to list user history: {str(e)}", exc_info=True)
             return [], None
@@ -206,7 +221,8 @@ class SearchHistoryRepository(BaseRepository):
     def list_public_history(
         self,
         limit: int = 20,
-        last_evaluated_key: Optional[Dict] = None
+        last_evaluated_key: Optional[Dict] = None,
+        projection: Optional[str] = None
     ) -> Tuple[List[Dict], Optional[Dict]]:
         """
         List public history with pagination
@@ -214,26 +230,22 @@ class SearchHistoryRepository(BaseRepository):
         Args:
             limit: Max items to return
             last_evaluated_key: Pagination key
+            projection: Optional view to read (e.g. 'history.list_row', see projections.py)
 
         Returns:
             Tuple of (items, next_key)
         """
         try:
-            query_params = {
-                'IndexName': 'GSI2',
-                'KeyConditionExpression': Key('GSI2PK').eq('PUBLIC#HIST'),
-                'Limit': limit,
-                'ScanIndexForward': False  # Newest first
-            }
-
-            if last_evaluated_key:
-                query_params['ExclusiveStartKey'] = last_evaluated_key
-
-            response = self.table.query(**query_params)
-            items = response.get('Items', [])
-            next_key = response.get('LastEvaluatedKey')
+            pages = self.iter_query(
+                Key('GSI2PK').eq('PUBLIC#HIST'),
+                index_name='GSI2',
+                scan_index_forward=False,  # Newest first
+                max_items=limit,
+                start_key=last_evaluated_key
+            )
+            items = self.get_histories(list(pages), projection=projection)
 
-            return items, next_key
+            return items, pages.cursor
         except Exception:
             return [], None
 
@@ -241,7 +253,9 @@ class SearchHistoryRepository(BaseRepository):
         self,
         partition: str,
         limit: int = 20,
-        last_evaluated_key: Optional[Dict] = None
+        last_evaluated_key: Optional[Dict] = None,
+        keys_only: bool = False,
+        projection: Optional[str] = None
     ) -> Tuple[List[Dict], Optional[Dict]]:
         """
         List public history for a specific time partition
@@ -250,6 +264,9 @@ class SearchHistoryRepository(BaseRepository):
             partition: Time partition (format: YYYYMMDDHH)
             limit: Max items to return
             last_evaluated_key: Pagination key
+            keys_only: Return only the keys (PK, SK, GSI2PK, GSI2SK) so that
+                       several partitions can be fetched with one get_histories()
+            projection: Optional view to read (e.g. 'history.list_row', see projections.py)
 
         Returns:
             Tuple of (items, next_key)
@@ -259,21 +276,18 @@ class SearchHistoryRepository(BaseRepository):
             - Queries specific time partition instead of single 'PUBLIC#HIST' partition
         """
         try:
-            query_params = {
-                'IndexName': 'GSI2',
-                'KeyConditionExpression': Key('GSI2PK').eq(f'PUBLIC#HIST#{partition}'),
-                'Limit': limit,
-                'ScanIndexForward': False  # Newest first
-            }
-
-            if last_evaluated_key:
-                query_params['ExclusiveStartKey'] = last_evaluated_key
-
-            response = self.table.query(**query_params)
-            items = response.get('Items', [])
-            next_key = response.get('LastEvaluatedKey')
+            pages = self.iter_query(
+                Key('GSI2PK').eq(f'PUBLIC#HIST#{partition}'),
+                index_name='GSI2',
+                scan_index_forward=False,  # Newest first
+                max_items=limit,
+                start_key=last_evaluated_key
+            )
+            items = list(pages)
+            if not keys_only:
+                items = self.get_histories(items, projection=projection)
 
-            return items, next_key
+            return items, pages.cursor
         except Exception:
             return [], None
 
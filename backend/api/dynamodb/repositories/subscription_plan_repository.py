@@ -117,29 +117,10 @@ class SubscriptionPlanRepository(BaseRepository):
         try:
             from boto3.dynamodb.conditions import Key
 
-            plans = []
-            last_evaluated_key = None
+            # Query with PK=PLAN to get all plans efficiently (all pages)
+            items = self.iter_query(Key('PK').eq('PLAN') & Key('SK').begins_with('META#'))
 
-            # Query with PK=PLAN to get all plans efficiently
-            while True:
-                query_kwargs = {
-                    'KeyConditionExpression': Key('PK').eq('PLAN') & Key('SK').begins_with('META#')
-                }
-
-                if last_evaluated_key:
-                    query_kwargs['ExclusiveStartKey'] = last_evaluated_key
-
-                response = self.table.query(**query_kwargs)
-
-                for item in response.get('Items', []):
-                    plans.append(self._transform_to_long_format(item))
-
-                # Check if there are more items to query
-                last_evaluated_key = response.get('LastEvaluatedKey')
-                if not last_evaluated_key:
-                    break
-
-            return plans
+            return [self._transform_to_long_format(item) for item in items]
 
         except ClientError as e:
             if e.response['Error']['Code'] == 'ResourceNotFoundException':
@@ -0,0 +1,46 @@
+"""
+Django management command to run the code execution daemon
+
+Usage:
+    python manage.py execution_daemon [--socket /tmp/algoitny-exec.sock] [--workers 8]
+
+Celery workers on the same host send prepared programs and test inputs to
+this process over a Unix socket when CODE_EXECUTION_DAEMON_ENABLED is set
+(see api/services/execution_daemon.py).
+"""
+import signal
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.services.execution_daemon import ExecutionDaemon
+
+
+class Command(BaseCommand):
+    help = 'Run the per-host code execution daemon on a Unix socket'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--socket',
+            default=None,
+            help=f'Unix socket path (default: {settings.CODE_EXECUTION_DAEMON_SOCKET})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Concurrent test runs across all clients (default: CODE_EXECUTION_DAEMON_WORKERS, 0 = CPU cores)'
+        )
+
+    def handle(self, *args, **options):
+        daemon = ExecutionDaemon(socket_path=options['socket'], workers=options['workers'])
+
+        def stop(signum, frame):
+            # shutdown() blocks until serve_forever() returns, so not from the serving thread
+            threading.Thread(target=daemon.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(f'Execution daemon listening on {daemon.socket_path} ({daemon.workers} run slots)')
+        daemon.serve_forever()
+        self.stdout.write(self.style.SUCCESS('Execution daemon stopped'))
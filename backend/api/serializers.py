@@ -188,6 +188,7 @@ class ExecuteCodeSerializer(serializers.Serializer):
     problem_identifier = serializers.CharField(required=False, allow_blank=True)
     is_code_public = serializers.BooleanField(default=False)
     user_identifier = serializers.CharField(required=False, default='anonymous')
+    fail_fast = serializers.BooleanField(default=False)
 
 
 class HintRequestSerializer(serializers.Serializer):
@@ -0,0 +1,255 @@
+"""Content-addressed on-disk cache for compiled solution artifacts"""
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactCache:
+    """
+    Host-wide cache of compiled artifacts (binaries, .class files) (Singleton)
+
+    Entries live under CODE_ARTIFACT_CACHE_DIR/<key>/ where key is a SHA-256 of
+    (source, language, compiler flags, toolchain version), so every executor
+    path and every worker process on the host shares the same entries.
+
+    - Publish is atomic: files are staged in a sibling directory and renamed
+      into place, so readers never see a half-written entry.
+    - Eviction is LRU by entry mtime (touched on every hit) once the total
+      size exceeds CODE_ARTIFACT_CACHE_MAX_BYTES.
+    - Hits are copied (never hard-linked) into the caller's work directory,
+      so eviction never pulls a file out from under a running program and a
+      program rewriting its own binary cannot poison the shared entry.
+    - Entry files are published read-only as a second line of defence.
+    """
+
+    # Singleton instance
+    _instance = None
+    _initialized = False
+
+    # Toolchain version strings, resolved once per process
+    _toolchain_versions: Dict[str, str] = {}
+
+    def __new__(cls):
+        """Ensure only one instance exists (Singleton pattern)"""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """Initialize cache configuration (only once)"""
+        if self.__class__._initialized:
+            return
+
+        self.enabled = getattr(settings, 'CODE_ARTIFACT_CACHE_ENABLED', True)
+        self.root = Path(getattr(settings, 'CODE_ARTIFACT_CACHE_DIR', '/tmp/algoitny-artifacts'))
+        self.max_bytes = getattr(settings, 'CODE_ARTIFACT_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+        }
+
+        if self.enabled:
+            try:
+                self.root.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"[ArtifactCache] Disabled, cannot create {self.root}: {e}")
+                self.enabled = False
+
+        # Mark as initialized
+        self.__class__._initialized = True
+
+    @classmethod
+    def toolchain_version(cls, compiler: str) -> str:
+        """
+        Get the version banner of a compiler (cached per process)
+
+        Args:
+            compiler: Compiler executable (e.g., 'g++', 'javac')
+
+        Returns:
+            First line of the compiler's version output, or 'unknown'
+        """
+        if compiler not in cls._toolchain_versions:
+            version_flag = '-version' if compiler == 'javac' else '--version'
+            try:
+                result = subprocess.run(
+                    [compiler, version_flag],
+                    capture_output=True,
+                    text=True,
+                    timeout=10
+                )
+                # javac prints its version to stderr on older JDKs
+                output = (result.stdout or result.stderr).strip()
+                cls._toolchain_versions[compiler] = output.splitlines()[0] if output else 'unknown'
+            except Exception as e:
+                logger.warning(f"[ArtifactCache] Could not determine {compiler} version: {e}")
+                cls._toolchain_versions[compiler] = 'unknown'
+
+        return cls._toolchain_versions[compiler]
+
+    @classmethod
+    def make_key(cls, source: str, language: str, flags: List[str], compiler: str) -> str:
+        """
+        Build the content address for a compiled artifact
+
+        Args:
+            source: Source code
+            language: Normalized language name
+            flags: Compiler flags that affect the output
+            compiler: Compiler executable, used to look up the toolchain version
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        for part in (language, ' '.join(flags), cls.toolchain_version(compiler), source):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def fetch(self, key: str, dest_dir: Path) -> bool:
+        """
+        Copy a cached artifact into dest_dir
+
+        Args:
+            key: Key from make_key()
+            dest_dir: Work directory of the program being prepared
+
+        Returns:
+            True on a cache hit, False on a miss
+        """
+        if not self.enabled:
+            return False
+
+        entry = self.root / key
+        try:
+            files = list(entry.iterdir())
+            for path in files:
+                shutil.copy2(path, Path(dest_dir) / path.name)
+            # Touch entry for LRU ordering
+            os.utime(entry)
+        except FileNotFoundError:
+            self._count('misses')
+            return False
+        except OSError as e:
+            # Entry evicted mid-copy or unreadable; treat as a miss
+            logger.warning(f"[ArtifactCache] Failed to read entry {key[:12]}: {e}")
+            self._count('misses')
+            return False
+
+        self._count('hits')
+        logger.debug(f"[ArtifactCache] HIT {key[:12]} ({len(files)} files)")
+        return True
+
+    def store(self, key: str, files: List[Path]) -> bool:
+        """
+        Atomically publish compiled files under key, then evict if over capacity
+
+        Args:
+            key: Key from make_key()
+            files: Artifact files produced by the compiler
+
+        Returns:
+            True if this call published the entry
+        """
+        if not self.enabled or not files:
+            return False
+
+        entry = self.root / key
+        if entry.exists():
+            return False
+
+        staging = self.root / f'.staging-{uuid.uuid4().hex}'
+        try:
+            staging.mkdir()
+            for path in files:
+                staged = staging / Path(path).name
+                shutil.copy2(path, staged)
+                # Strip write bits so nothing can modify the entry in place
+                os.chmod(staged, staged.stat().st_mode & ~0o222)
+            os.rename(staging, entry)
+        except OSError as e:
+            # Lost a publish race (entry already exists) or disk error
+            shutil.rmtree(staging, ignore_errors=True)
+            if not entry.exists():
+                logger.warning(f"[ArtifactCache] Failed to store entry {key[:12]}: {e}")
+            return False
+
+        self._count('stores')
+        logger.debug(f"[ArtifactCache] STORE {key[:12]} ({len(files)} files)")
+
+        self.evict()
+        return True
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+
+        Returns:
+            Number of entries removed
+        """
+        if not self.enabled:
+            return 0
+
+        lock_path = self.root / '.evict.lock'
+        with open(lock_path, 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another process is already evicting
+                return 0
+
+            entries = []
+            total_bytes = 0
+            for entry in self.root.iterdir():
+                if entry.name.startswith('.') or not entry.is_dir():
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in entry.iterdir())
+                    entries.append((entry.stat().st_mtime, size, entry))
+                    total_bytes += size
+                except OSError:
+                    continue
+
+            if total_bytes <= self.max_bytes:
+                return 0
+
+            removed = 0
+            for _, size, entry in sorted(entries, key=lambda e: e[0]):
+                if total_bytes <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total_bytes -= size
+                removed += 1
+
+        self._count('evictions', removed)
+        logger.info(f"[ArtifactCache] Evicted {removed} entries, {total_bytes} bytes remain")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get hit/miss counters for this process
+
+        Returns:
+            Dict with 'hits', 'misses', 'stores', 'evictions'
+        """
+        with self._lock:
+            return dict(self._counters)
@@ -1,26 +1,221 @@
 """Async code execution service - supports both local and Judge0"""
+import asyncio
+import os
 from django.conf import settings
 from .async_judge0_service import AsyncJudge0Service
 from .async_code_executor import AsyncCodeExecutor
+from .output_compare import OutputCheck
+from . import program_input
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _resource_fields(result):
+    """Verdict and resource usage of a run, copied into the per-test result"""
+    return {
+        'verdict': result.get('verdict'),
+        'cpu_ms': result.get('cpu_ms'),
+        'wall_ms': result.get('wall_ms'),
+        'peak_rss_kb': result.get('peak_rss_kb'),
+    }
+
+
+# Output comparison fields set when an expected output was given (see OutputCheck)
+_COMPARISON_FIELDS = ('matched', 'output_hash', 'output_size', 'output_truncated')
+
+
+def _comparison_fields(result):
+    """Output comparison fields of a run, copied into the per-test result"""
+    return {key: result[key] for key in _COMPARISON_FIELDS if key in result}
+
+
+class AsyncPreparedSubmission:
+    """
+    Submission-level execution handle (async)
+
+    Compiles the code once (local executor) and then runs it against any
+    number of test inputs. With Judge0 enabled, compilation happens remotely
+    and this simply forwards inputs to AsyncJudge0Service.
+
+    Create via AsyncCodeExecutionService.prepare().
+    """
+
+    def __init__(self, code, language, program=None):
+        """
+        Args:
+            code: Source code to execute
+            language: Programming language
+            program: AsyncPreparedProgram for the local executor (None for Judge0)
+        """
+        self.code = code
+        self.language = language
+        self._program = program
+
+    @property
+    def remote(self):
+        """True if runs go to Judge0 (batch all inputs in one call to save round trips)"""
+        return self._program is None
+
+    async def execute_with_test_cases(self, test_inputs, concurrency=None, expected_outputs=None):
+        """
+        Execute the prepared code with multiple test case inputs (async)
+
+        Local runs fan out with at most `concurrency` test cases in flight.
+        Each run keeps its own timeout, and results are returned in input order.
+
+        Args:
+            test_inputs: List of input strings for test cases
+            concurrency: Max simultaneous runs (default: CODE_EXECUTION_CONCURRENCY,
+                         or the number of usable CPU cores when that is 0)
+            expected_outputs: Optional list of expected outputs (see
+                              PreparedSubmission.execute_with_test_cases)
+
+        Returns:
+            list: List of results for each test case (see
+                AsyncCodeExecutionService.execute_with_test_cases)
+        """
+        if self._program is None:
+            # Use Judge0 API (async)
+            judge0_service = AsyncJudge0Service()
+            results = await judge0_service.execute_with_test_cases(self.code, self.language, test_inputs)
+            if expected_outputs is not None:
+                for result, expected in zip(results, expected_outputs):
+                    result.update(OutputCheck(expected).check_string(result['output']))
+            return results
+
+        # Use local executor (already compiled)
+        if concurrency is None:
+            concurrency = AsyncCodeExecutionService.default_concurrency()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        total = len(test_inputs)
+
+        async def _run_one(idx, test_input):
+            expected = expected_outputs[idx] if expected_outputs is not None else None
+            async with semaphore:
+                return await self._execute_one(idx, total, test_input, expected)
+
+        results = await asyncio.gather(
+            *(_run_one(idx, test_input) for idx, test_input in enumerate(test_inputs))
+        )
+
+        success_count = sum(1 for r in results if r['status'] == 'success')
+        error_count = len(results) - success_count
+        logger.info(
+            f"[AsyncCodeExecutionService] Execution complete: {success_count} success, {error_count} errors "
+            f"(concurrency={concurrency})"
+        )
+        return list(results)
+
+    async def _execute_one(self, idx, total, test_input, expected_output=None):
+        """Run a single test case and convert it to the service result format"""
+        try:
+            logger.info(f"[AsyncCodeExecutionService] Executing test case {idx+1}/{total}, input_len={program_input.size(test_input)}")
+            result = await self._program.run(test_input, expected_output=expected_output)
+
+            if result['success']:
+                logger.info(f"[AsyncCodeExecutionService] Test case {idx+1} SUCCESS, output_len={len(result['output'])}")
+                return {
+                    'input': test_input,
+                    'output': result['output'],
+                    'error': None,
+                    'status': 'success',
+                    **_resource_fields(result),
+                    **_comparison_fields(result),
+                }
+
+            error_msg = result.get('error', 'Execution failed')
+            logger.error(f"[AsyncCodeExecutionService] Test case {idx+1} FAILED: {error_msg}")
+            return {
+                'input': test_input,
+                'output': result.get('output', ''),
+                'error': error_msg,
+                'status': 'error',
+                **_resource_fields(result),
+                **_comparison_fields(result),
+            }
+        except Exception as e:
+            logger.error(f"[AsyncCodeExecutionService] Test case {idx+1} EXCEPTION: {str(e)}", exc_info=True)
+            return {
+                'input': test_input,
+                'output': '',
+                'error': str(e),
+                'status': 'error',
+            }
+
+    def close(self):
+        """Release the compiled program"""
+        if self._program is not None:
+            self._program.close()
+            self._program = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 class AsyncCodeExecutionService:
     """Unified async code execution service"""
 
     @staticmethod
-    async def execute_with_test_cases(code, language, test_inputs):
+    def default_concurrency():
+        """
+        Number of test cases to run at once on this worker
+
+        Returns CODE_EXECUTION_CONCURRENCY if set (> 0), otherwise the number
+        of CPU cores this process may run on.
+        """
+        configured = getattr(settings, 'CODE_EXECUTION_CONCURRENCY', 0)
+        if configured and configured > 0:
+            return configured
+        try:
+            return len(os.sched_getaffinity(0))
+        except AttributeError:
+            return os.cpu_count() or 1
+
+    @staticmethod
+    async def prepare(code, language):
+        """
+        Prepare code for repeated execution (compile once, run many)
+
+        Example:
+            async with await AsyncCodeExecutionService.prepare(code, language) as submission:
+                results = await submission.execute_with_test_cases(inputs)
+
+        Args:
+            code: Source code to execute
+            language: Programming language
+
+        Returns:
+            AsyncPreparedSubmission: Use as an async context manager or call close()
+        """
+        logger.info(f"[AsyncCodeExecutionService] Preparing {language} code, length: {len(code)} chars")
+        logger.info(f"[AsyncCodeExecutionService] USE_JUDGE0: {settings.USE_JUDGE0}")
+
+        if settings.USE_JUDGE0:
+            return AsyncPreparedSubmission(code, language)
+
+        program = await AsyncCodeExecutor.prepare(code, language)
+        if not program.success:
+            logger.error(f"[AsyncCodeExecutionService] Preparation failed for {language}: {program.error}")
+        return AsyncPreparedSubmission(code, language, program=program)
+
+    @staticmethod
+    async def execute_with_test_cases(code, language, test_inputs, concurrency=None):
         """
         Execute code with multiple test case inputs (async)
 
-        Uses Judge0 if USE_JUDGE0=true, otherwise uses local executor
+        Uses Judge0 if USE_JUDGE0=true, otherwise uses local executor.
+        The code is compiled once for all inputs, and local runs are executed
+        concurrently (bounded by `concurrency`), results kept in input order.
 
         Args:
             code: Source code to execute
             language: Programming language
             test_inputs: List of input strings for test cases
+            concurrency: Max simultaneous runs (default: default_concurrency())
 
         Returns:
             list: List of results for each test case
@@ -30,58 +225,15 @@ class AsyncCodeExecutionService:
                         'output': str,
                         'error': str or None,
                         'status': str,
+                        'verdict': str,  # OK / RE / TLE / MLE / OLE / CE
+                        'cpu_ms': int or None,
+                        'wall_ms': int or None,
+                        'peak_rss_kb': int or None,
                     },
                     ...
                 ]
         """
         logger.info(f"[AsyncCodeExecutionService] Executing {language} code with {len(test_inputs)} test inputs")
-        logger.info(f"[AsyncCodeExecutionService] Code length: {len(code)} chars")
-        logger.info(f"[AsyncCodeExecutionService] USE_JUDGE0: {settings.USE_JUDGE0}")
 
-        if settings.USE_JUDGE0:
-            # Use Judge0 API (async)
-            judge0_service = AsyncJudge0Service()
-            return await judge0_service.execute_with_test_cases(code, language, test_inputs)
-        else:
-            # Use local executor (async)
-            logger.info(f"[AsyncCodeExecutionService] Using local AsyncCodeExecutor")
-            results = []
-            success_count = 0
-            error_count = 0
-
-            for idx, test_input in enumerate(test_inputs):
-                try:
-                    logger.info(f"[AsyncCodeExecutionService] Executing test case {idx+1}/{len(test_inputs)}, input_len={len(test_input)}")
-                    result = await AsyncCodeExecutor.execute(code, language, test_input)
-
-                    if result['success']:
-                        success_count += 1
-                        results.append({
-                            'input': test_input,
-                            'output': result['output'],
-                            'error': None,
-                            'status': 'success',
-                        })
-                        logger.info(f"[AsyncCodeExecutionService] Test case {idx+1} SUCCESS, output_len={len(result['output'])}")
-                    else:
-                        error_count += 1
-                        error_msg = result.get('error', 'Execution failed')
-                        results.append({
-                            'input': test_input,
-                            'output': result.get('output', ''),
-                            'error': error_msg,
-                            'status': 'error',
-                        })
-                        logger.error(f"[AsyncCodeExecutionService] Test case {idx+1} FAILED: {error_msg}")
-                except Exception as e:
-                    error_count += 1
-                    results.append({
-                        'input': test_input,
-                        'output': '',
-                        'error': str(e),
-                        'status': 'error',
-                    })
-                    logger.error(f"[AsyncCodeExecutionService] Test case {idx+1} EXCEPTION: {str(e)}", exc_info=True)
-
-            logger.info(f"[AsyncCodeExecutionService] Execution complete: {success_count} success, {error_count} errors")
-            return results
+        async with await AsyncCodeExecutionService.prepare(code, language) as submission:
+            return await submission.execute_with_test_cases(test_inputs, concurrency=concurrency)
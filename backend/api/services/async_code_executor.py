@@ -1,9 +1,136 @@
 """Async Code Execution Service using asyncio subprocess"""
 import asyncio
-import tempfile
 import os
 from pathlib import Path
 from django.conf import settings
+from .artifact_cache import ArtifactCache
+from .cpp_toolchain import CppToolchain
+from .workdir_pool import WorkdirPool
+from .zygote_runner import ZygoteRunner, ZygoteError
+from .jvm_pool import WarmJavaRunner, JvmPoolError
+from .output_compare import OutputCheck
+from . import sandbox
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPreparedProgram:
+    """
+    A program that has been written to disk and compiled (if needed) once,
+    and can then be run against any number of inputs (async).
+
+    Use as an async context manager so the work directory is cleaned up:
+
+        async with await AsyncCodeExecutor.prepare(code, 'cpp') as program:
+            for input_data in inputs:
+                result = await program.run(input_data)
+    """
+
+    def __init__(self, language, temp_dir=None, command=None, cwd=None, error=None, runner=None):
+        """
+        Args:
+            language: Normalized language name
+            temp_dir: WorkDir (workdir_pool) owning the program files
+            command: argv used to run the program
+            cwd: Working directory for the program
+            error: Preparation (compilation) error message, if any
+            runner: Warm runner used instead of a fresh process per run
+                    (ZygoteRunner for Python, WarmJavaRunner for Java)
+        """
+        self.language = language
+        self.command = command
+        self.cwd = cwd
+        self.error = error
+        self._temp_dir = temp_dir
+        self._runner = runner
+
+    @property
+    def success(self):
+        """True if the program is ready to run"""
+        return self.error is None
+
+    async def run(self, input_data, expected_output=None):
+        """
+        Run the prepared program with given input (async)
+
+        Args:
+            input_data: Program input (str, bytes or program_input.InputFile)
+            expected_output: If given, stdout is compared against it while being
+                             read (see output_compare.OutputCheck) and only a
+                             bounded prefix is returned as 'output'
+
+        Returns:
+            dict: {
+                'output': str,
+                'error': str,
+                'success': bool,
+                'cpu_ms': int or None,
+                'wall_ms': int,
+                'peak_rss_kb': int or None,
+                'verdict': str  # OK / RE / TLE / MLE / OLE / CE (see sandbox)
+            }
+            With expected_output, also 'matched', 'output_hash', 'output_size'
+            and 'output_truncated'.
+        """
+        if not self.success:
+            return sandbox.error_result(self.error, sandbox.VERDICT_CE)
+
+        limits = sandbox.get_limits()
+        # rlimits applied to the run; the verdict is still classified against the real limits
+        run_limits = limits
+        if self.language in ('java', 'javascript'):
+            # The JVM and V8 reserve large address ranges; memory is capped by -Xmx / checked via RSS
+            run_limits = {**limits, 'memory_bytes': 0}
+        # Files the program writes into its work directory are capped like compiler output
+        max_file_bytes = self._temp_dir.max_file_bytes if self._temp_dir is not None else 0
+        if max_file_bytes and (not run_limits['output_bytes'] or max_file_bytes < run_limits['output_bytes']):
+            run_limits = {**run_limits, 'output_bytes': max_file_bytes}
+
+        read_output = OutputCheck(expected_output).read if expected_output is not None else None
+
+        result = None
+        if self._runner is not None and self._runner.alive:
+            try:
+                raw = await asyncio.to_thread(
+                    self._runner.run, input_data, settings.CODE_EXECUTION_TIMEOUT, run_limits,
+                    read_output=read_output
+                )
+                result = sandbox.make_result(limits=limits, **raw)
+            except (ZygoteError, JvmPoolError) as e:
+                logger.warning(f"[AsyncCodeExecutor] Warm runner unavailable, falling back to subprocess: {e}")
+
+        if result is None:
+            result = await asyncio.to_thread(
+                sandbox.run, self.command, input_data, cwd=self.cwd,
+                limit_memory=bool(run_limits['memory_bytes']), read_output=read_output,
+                max_file_bytes=max_file_bytes
+            )
+        if self._temp_dir is not None and await asyncio.to_thread(self._temp_dir.over_quota):
+            # The run left more than the work directory limit in its slot
+            return {
+                **result,
+                'output': '',
+                'error': 'Work directory limit exceeded',
+                'success': False,
+                'verdict': sandbox.VERDICT_OLE
+            }
+        return result
+
+    def close(self):
+        """Stop the warm runner (if any) and remove the program's work directory"""
+        if self._runner is not None:
+            self._runner.close()
+            self._runner = None
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 class AsyncCodeExecutor:
@@ -19,7 +146,7 @@ class AsyncCodeExecutor:
         Args:
             code: Source code string
             language: Programming language
-            input_data: Input string for the program
+            input_data: Program input (str, bytes or program_input.InputFile)
 
         Returns:
             dict: {
@@ -28,238 +155,183 @@ class AsyncCodeExecutor:
                 'success': bool
             }
         """
+        async with await AsyncCodeExecutor.prepare(code, language) as program:
+            return await program.run(input_data)
+
+    @staticmethod
+    async def prepare(code, language):
+        """
+        Write and compile code once so it can be run against many inputs (async)
+
+        Compilation errors (and unsupported languages) do not raise; they are
+        stored on the returned program and reported by every run() call.
+
+        Args:
+            code: Source code string
+            language: Programming language
+
+        Returns:
+            AsyncPreparedProgram: Caller is responsible for calling close()
+        """
         language = language.lower()
 
         if language not in AsyncCodeExecutor.SUPPORTED_LANGUAGES:
-            return {
-                'output': '',
-                'error': f'Unsupported language: {language}',
-                'success': False
-            }
+            return AsyncPreparedProgram(language, error=f'Unsupported language: {language}')
 
-        # Create temp directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
+        # Scratch directory from the tmpfs pool (owned by the returned program)
+        temp_dir = WorkdirPool().acquire()
+        temp_path = Path(temp_dir.name)
 
-            try:
-                if language in ['python', 'python3']:
-                    return await AsyncCodeExecutor._execute_python(code, input_data, temp_path)
-                elif language in ['javascript', 'node']:
-                    return await AsyncCodeExecutor._execute_javascript(code, input_data, temp_path)
-                elif language in ['cpp', 'c++']:
-                    return await AsyncCodeExecutor._execute_cpp(code, input_data, temp_path)
-                elif language == 'java':
-                    return await AsyncCodeExecutor._execute_java(code, input_data, temp_path)
-            except Exception as e:
-                return {
-                    'output': '',
-                    'error': str(e),
-                    'success': False
-                }
+        try:
+            if language in ['python', 'python3']:
+                return await AsyncCodeExecutor._prepare_python(code, temp_dir, temp_path)
+            elif language in ['javascript', 'node']:
+                return AsyncCodeExecutor._prepare_javascript(code, temp_dir, temp_path)
+            elif language in ['cpp', 'c++']:
+                return await AsyncCodeExecutor._prepare_cpp(code, temp_dir, temp_path)
+            elif language == 'java':
+                return await AsyncCodeExecutor._prepare_java(code, temp_dir, temp_path)
+        except Exception as e:
+            return AsyncPreparedProgram(language, temp_dir=temp_dir, error=str(e))
 
     @staticmethod
-    async def _execute_python(code, input_data, temp_path):
-        """Execute Python code (async)"""
-        file_path = temp_path / 'solution.py'
-        file_path.write_text(code)
+    async def _compile(command, workdir, cwd=None):
+        """
+        Run a compiler command (async)
+
+        Args:
+            command: Compiler argv
+            workdir: WorkDir of the program (compiler temporaries and size cap)
+            cwd: Working directory
 
-        process = await asyncio.create_subprocess_exec(
-            'python3', str(file_path),
-            stdin=asyncio.subprocess.PIPE,
+        Returns:
+            str or None: Error message if compilation failed, None on success
+        """
+        compile_process = await asyncio.create_subprocess_exec(
+            *command,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            env=workdir.compile_env(),
+            preexec_fn=workdir.limit_file_size
         )
 
         try:
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(input=input_data.encode()),
+            compile_stdout, compile_stderr = await asyncio.wait_for(
+                compile_process.communicate(),
                 timeout=settings.CODE_EXECUTION_TIMEOUT
             )
         except asyncio.TimeoutError:
-            process.kill()
-            await process.wait()
-            return {
-                'output': '',
-                'error': 'Execution timeout',
-                'success': False
-            }
+            compile_process.kill()
+            await compile_process.wait()
+            return 'Compilation timeout'
+
+        if compile_process.returncode != 0:
+            return compile_stderr.decode()
 
-        return {
-            'output': stdout.decode(),
-            'error': stderr.decode(),
-            'success': process.returncode == 0
-        }
+        if workdir.over_quota():
+            return 'Compilation output exceeds the work directory limit'
+
+        return None
 
     @staticmethod
-    async def _execute_javascript(code, input_data, temp_path):
-        """Execute JavaScript code (async)"""
-        file_path = temp_path / 'solution.js'
+    async def _prepare_python(code, temp_dir, temp_path):
+        """Prepare Python code (async), starting a zygote when enabled"""
+        file_path = temp_path / 'solution.py'
         file_path.write_text(code)
 
-        process = await asyncio.create_subprocess_exec(
-            'node', str(file_path),
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+        zygote = None
+        if getattr(settings, 'CODE_EXECUTION_ZYGOTE', True):
+            zygote = ZygoteRunner(file_path, temp_path)
+            try:
+                await asyncio.to_thread(zygote.start)
+            except (ZygoteError, OSError) as e:
+                # e.g. syntax error: plain runs report it exactly like `python3 solution.py`
+                logger.info(f"[AsyncCodeExecutor] Zygote not started: {str(e).strip().splitlines()[-1:]}")
+                zygote = None
+
+        return AsyncPreparedProgram(
+            'python',
+            temp_dir=temp_dir,
+            command=['python3', str(file_path)],
+            runner=zygote
         )
 
-        try:
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(input=input_data.encode()),
-                timeout=settings.CODE_EXECUTION_TIMEOUT
-            )
-        except asyncio.TimeoutError:
-            process.kill()
-            await process.wait()
-            return {
-                'output': '',
-                'error': 'Execution timeout',
-                'success': False
-            }
+    @staticmethod
+    def _prepare_javascript(code, temp_dir, temp_path):
+        """Prepare JavaScript code"""
+        file_path = temp_path / 'solution.js'
+        file_path.write_text(code)
 
-        return {
-            'output': stdout.decode(),
-            'error': stderr.decode(),
-            'success': process.returncode == 0
-        }
+        return AsyncPreparedProgram(
+            'javascript',
+            temp_dir=temp_dir,
+            command=['node', str(file_path)]
+        )
 
     @staticmethod
-    async def _execute_cpp(code, input_data, temp_path):
-        """Execute C++ code (async)"""
+    async def _prepare_cpp(code, temp_dir, temp_path):
+        """Compile C++ code (async)"""
         source_path = temp_path / 'solution.cpp'
         exec_path = temp_path / 'solution'
 
-        source_path.write_text(code)
+        # Reuse a previously compiled binary if available (the PCH does not change the output)
+        toolchain = CppToolchain()
+        cache = ArtifactCache()
+        cache_key = cache.make_key(code, 'cpp', toolchain.flags(), 'g++')
 
-        # Compile
-        compile_process = await asyncio.create_subprocess_exec(
-            'g++', str(source_path), '-o', str(exec_path),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+        if not cache.fetch(cache_key, temp_path):
+            source_path.write_text(code)
 
-        try:
-            compile_stdout, compile_stderr = await asyncio.wait_for(
-                compile_process.communicate(),
-                timeout=settings.CODE_EXECUTION_TIMEOUT
-            )
-        except asyncio.TimeoutError:
-            compile_process.kill()
-            await compile_process.wait()
-            return {
-                'output': '',
-                'error': 'Compilation timeout',
-                'success': False
-            }
+            # Compile (the first compile of a process may build the PCH)
+            command = await asyncio.to_thread(toolchain.compile_command, source_path, exec_path)
+            error = await AsyncCodeExecutor._compile(command, temp_dir)
+            if error is not None:
+                return AsyncPreparedProgram('cpp', temp_dir=temp_dir, error=error)
 
-        if compile_process.returncode != 0:
-            return {
-                'output': '',
-                'error': compile_stderr.decode(),
-                'success': False
-            }
+            cache.store(cache_key, [exec_path])
 
-        # Execute
-        exec_process = await asyncio.create_subprocess_exec(
-            str(exec_path),
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+        return AsyncPreparedProgram(
+            'cpp',
+            temp_dir=temp_dir,
+            command=[str(exec_path)]
         )
 
-        try:
-            stdout, stderr = await asyncio.wait_for(
-                exec_process.communicate(input=input_data.encode()),
-                timeout=settings.CODE_EXECUTION_TIMEOUT
-            )
-        except asyncio.TimeoutError:
-            exec_process.kill()
-            await exec_process.wait()
-            return {
-                'output': '',
-                'error': 'Execution timeout',
-                'success': False
-            }
-
-        return {
-            'output': stdout.decode(),
-            'error': stderr.decode(),
-            'success': exec_process.returncode == 0
-        }
-
     @staticmethod
-    async def _execute_java(code, input_data, temp_path):
-        """Execute Java code (async)"""
+    async def _prepare_java(code, temp_dir, temp_path):
+        """Compile Java code (async)"""
         import re
 
         # Extract class name from code
         class_match = re.search(r'public\s+class\s+(\w+)', code)
         if not class_match:
-            return {
-                'output': '',
-                'error': 'No public class found in code',
-                'success': False
-            }
+            return AsyncPreparedProgram('java', temp_dir=temp_dir, error='No public class found in code')
 
         class_name = class_match.group(1)
         source_path = temp_path / f'{class_name}.java'
 
-        source_path.write_text(code)
+        # Reuse previously compiled classes if available
+        cache = ArtifactCache()
+        cache_key = cache.make_key(code, 'java', [], 'javac')
 
-        # Compile
-        compile_process = await asyncio.create_subprocess_exec(
-            'javac', str(source_path),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=str(temp_path)
-        )
+        if not cache.fetch(cache_key, temp_path):
+            source_path.write_text(code)
 
-        try:
-            compile_stdout, compile_stderr = await asyncio.wait_for(
-                compile_process.communicate(),
-                timeout=settings.CODE_EXECUTION_TIMEOUT
+            # Compile
+            error = await AsyncCodeExecutor._compile(
+                ['javac', str(source_path)],
+                temp_dir,
+                cwd=str(temp_path)
             )
-        except asyncio.TimeoutError:
-            compile_process.kill()
-            await compile_process.wait()
-            return {
-                'output': '',
-                'error': 'Compilation timeout',
-                'success': False
-            }
+            if error is not None:
+                return AsyncPreparedProgram('java', temp_dir=temp_dir, error=error)
 
-        if compile_process.returncode != 0:
-            return {
-                'output': '',
-                'error': compile_stderr.decode(),
-                'success': False
-            }
+            cache.store(cache_key, list(temp_path.glob('*.class')))
 
-        # Execute
-        exec_process = await asyncio.create_subprocess_exec(
-            'java', class_name,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=str(temp_path)
+        return AsyncPreparedProgram(
+            'java',
+            temp_dir=temp_dir,
+            command=['java', *sandbox.jvm_memory_flags(), class_name],
+            cwd=str(temp_path),
+            runner=WarmJavaRunner(temp_path, class_name) if getattr(settings, 'JAVA_WARM_POOL_ENABLED', True) else None
         )
-
-        try:
-            stdout, stderr = await asyncio.wait_for(
-                exec_process.communicate(input=input_data.encode()),
-                timeout=settings.CODE_EXECUTION_TIMEOUT
-            )
-        except asyncio.TimeoutError:
-            exec_process.kill()
-            await exec_process.wait()
-            return {
-                'output': '',
-                'error': 'Execution timeout',
-                'success': False
-            }
-
-        return {
-            'output': stdout.decode(),
-            'error': stderr.decode(),
-            'success': exec_process.returncode == 0
-        }
@@ -1,6 +1,56 @@
-"""Async Judge0 API Service for code execution using httpx"""
+"""Async Judge0 API Service for code execution using httpx
+
+Same batch submit / poll flow as judge0_service.py. One keep-alive
+httpx.AsyncClient is shared per event loop (an AsyncClient cannot be used
+from a loop other than the one it was created on) and closed when that loop
+shuts down, so the short-lived loops of async_to_sync do not leak sockets.
+"""
+import asyncio
+import logging
+import time
+import weakref
 import httpx
 from django.conf import settings
+from .judge0_service import PENDING_STATUS_IDS, RESULT_FIELDS
+from . import program_input
+
+logger = logging.getLogger(__name__)
+
+# event loop -> (shared AsyncClient, its lifetime generator), see _get_client()
+_clients = weakref.WeakKeyDictionary()
+
+
+async def _client_lifetime(client):
+    """
+    Close client when its event loop shuts down
+
+    Stays suspended at its yield; loop.shutdown_asyncgens() (run by
+    asyncio.run() and async_to_sync before closing their loop) finalizes it.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+async def _get_client():
+    """
+    Get the keep-alive HTTP client of the running event loop, creating it if needed
+
+    Returns:
+        httpx.AsyncClient
+    """
+    loop = asyncio.get_running_loop()
+    client, _ = _clients.get(loop, (None, None))
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16)
+        )
+        lifetime = _client_lifetime(client)
+        await lifetime.__anext__()  # Registers the generator with the loop
+        _clients[loop] = (client, lifetime)
+    return client
 
 
 class AsyncJudge0Service:
@@ -14,7 +64,23 @@ class AsyncJudge0Service:
         'java': 62,  # Java (OpenJDK 13.0.1)
     }
 
+    # Judge0 status description -> local executor verdict (see sandbox.py)
+    STATUS_VERDICTS = {
+        'Accepted': 'OK',
+        'Time Limit Exceeded': 'TLE',
+        'Compilation Error': 'CE',
+    }
+
+    # Max submissions per batch request (Judge0 MAX_SUBMISSION_BATCH_SIZE)
+    BATCH_SIZE = 20
+
+    # Polling backoff (seconds)
+    POLL_INITIAL_DELAY = 0.1
+    POLL_MAX_DELAY = 2.0
+
     def __init__(self):
+        self.batch_size = max(1, min(getattr(settings, 'JUDGE0_BATCH_SIZE', self.BATCH_SIZE), self.BATCH_SIZE))
+        self.poll_timeout = getattr(settings, 'JUDGE0_POLL_TIMEOUT', 120)
         self.api_url = settings.JUDGE0_API_URL
         self.api_key = settings.JUDGE0_API_KEY
         self.headers = {
@@ -61,22 +127,23 @@ class AsyncJudge0Service:
             'cpu_time_limit': timeout,
         }
 
-        # Submit code using async httpx client
+        # Submit code using the shared async httpx client
         submit_url = f"{self.api_url}/submissions?base64_encoded=false&wait=true"
+        client = await _get_client()
+        response = await client.post(
+            submit_url,
+            json=submission_data,
+            headers=self.headers
+        )
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                submit_url,
-                json=submission_data,
-                headers=self.headers
-            )
-
-            if not response.is_success:
-                raise Exception(f'Judge0 API error: {response.status_code} - {response.text}')
+        if not response.is_success:
+            raise Exception(f'Judge0 API error: {response.status_code} - {response.text}')
 
-            result = response.json()
+        return self._parse_result(response.json())
 
-        # Parse result
+    @staticmethod
+    def _parse_result(result):
+        """Normalize a Judge0 submission (see execute_code for the format)"""
         return {
             'stdout': (result.get('stdout') or '').strip(),
             'stderr': (result.get('stderr') or '').strip(),
@@ -86,6 +153,16 @@ class AsyncJudge0Service:
             'memory': int(result.get('memory') or 0),
         }
 
+    @classmethod
+    def _resource_fields(cls, result):
+        """Map a Judge0 result to verdict/resource fields of a per-test result"""
+        return {
+            'verdict': cls.STATUS_VERDICTS.get(result['status'], 'RE'),
+            'cpu_ms': int(result['time'] * 1000),
+            'wall_ms': None,
+            'peak_rss_kb': result['memory'] or None,
+        }
+
     async def execute_with_test_cases(self, code, language, test_inputs):
         """
         Execute code with multiple test case inputs (async)
@@ -103,38 +180,145 @@ class AsyncJudge0Service:
                         'output': str,
                         'error': str or None,
                         'status': str,
+                        'verdict': str,  # OK / RE / TLE / CE
+                        'cpu_ms': int,
+                        'wall_ms': None,
+                        'peak_rss_kb': int,
                     },
                     ...
                 ]
         """
-        results = []
+        try:
+            batch = await self.execute_batch(code, language, test_inputs)
+        except Exception as e:
+            logger.error(f"[AsyncJudge0Service] Batch execution failed: {e}")
+            return [
+                {'input': test_input, 'output': '', 'error': str(e), 'status': 'error'}
+                for test_input in test_inputs
+            ]
 
-        for test_input in test_inputs:
-            try:
-                result = await self.execute_code(code, language, stdin=test_input)
-
-                if result['status'] == 'Accepted':
-                    results.append({
-                        'input': test_input,
-                        'output': result['stdout'],
-                        'error': None,
-                        'status': 'success',
-                    })
-                else:
-                    error_msg = result['stderr'] or result['compile_output'] or result['status']
-                    results.append({
-                        'input': test_input,
-                        'output': result['stdout'],
-                        'error': error_msg,
-                        'status': 'error',
-                    })
-
-            except Exception as e:
+        results = []
+        for test_input, result in zip(test_inputs, batch):
+            if isinstance(result, Exception):
                 results.append({
                     'input': test_input,
                     'output': '',
-                    'error': str(e),
+                    'error': str(result),
                     'status': 'error',
                 })
+            elif result['status'] == 'Accepted':
+                results.append({
+                    'input': test_input,
+                    'output': result['stdout'],
+                    'error': None,
+                    'status': 'success',
+                    **self._resource_fields(result),
+                })
+            else:
+                error_msg = result['stderr'] or result['compile_output'] or result['status']
+                results.append({
+                    'input': test_input,
+                    'output': result['stdout'],
+                    'error': error_msg,
+                    'status': 'error',
+                    **self._resource_fields(result),
+                })
+
+        return results
+
+    async def execute_batch(self, code, language, test_inputs, timeout=None):
+        """
+        Execute code against all inputs with batch submissions (async)
+
+        Batches are submitted concurrently, then every pending token is polled
+        together (see Judge0Service.execute_batch).
+
+        Args:
+            code: Source code to execute
+            language: Programming language (python, javascript, cpp, java)
+            test_inputs: List of input strings
+            timeout: CPU time limit in seconds (default: CODE_EXECUTION_TIMEOUT)
+
+        Returns:
+            list: One entry per input, in order: a dict as returned by
+                  execute_code, or an Exception for a submission that was
+                  rejected or did not finish within JUDGE0_POLL_TIMEOUT
+
+        Raises:
+            ValueError: If language is not supported
+            Exception: If a batch request fails
+        """
+        if language not in self.LANGUAGE_IDS:
+            raise ValueError(f'Unsupported language: {language}')
+        if timeout is None:
+            timeout = settings.CODE_EXECUTION_TIMEOUT
+
+        client = await _get_client()
+        results = [None] * len(test_inputs)
+        pending = {}  # token -> index
+
+        async def submit(start):
+            response = await client.post(
+                f"{self.api_url}/submissions/batch?base64_encoded=false",
+                json={'submissions': [
+                    {
+                        'source_code': code,
+                        'language_id': self.LANGUAGE_IDS[language],
+                        'stdin': program_input.to_text(test_input),
+                        'cpu_time_limit': timeout,
+                    }
+                    for test_input in test_inputs[start:start + self.batch_size]
+                ]},
+                headers=self.headers
+            )
+            if not response.is_success:
+                raise Exception(f'Judge0 API error: {response.status_code} - {response.text}')
+
+            for offset, entry in enumerate(response.json()):
+                if entry.get('token'):
+                    pending[entry['token']] = start + offset
+                else:
+                    # Rejected submission, e.g. {"language_id": ["can't be blank"]}
+                    results[start + offset] = Exception(f'Judge0 rejected submission: {entry}')
+
+        async def poll(tokens):
+            response = await client.get(
+                f"{self.api_url}/submissions/batch",
+                params={
+                    'tokens': ','.join(tokens),
+                    'base64_encoded': 'false',
+                    'fields': RESULT_FIELDS,
+                },
+                headers=self.headers
+            )
+            if not response.is_success:
+                raise Exception(f'Judge0 API error: {response.status_code} - {response.text}')
+
+            for submission in response.json().get('submissions', []):
+                if not submission or submission.get('token') not in pending:
+                    continue
+                if (submission.get('status') or {}).get('id') in PENDING_STATUS_IDS:
+                    continue
+                results[pending.pop(submission['token'])] = self._parse_result(submission)
+
+        await asyncio.gather(*(submit(start) for start in range(0, len(test_inputs), self.batch_size)))
+        logger.info(f"[AsyncJudge0Service] Submitted {len(pending)} submissions, polling")
+
+        deadline = time.monotonic() + self.poll_timeout
+        delay = self.POLL_INITIAL_DELAY
+        while pending:
+            await asyncio.sleep(delay)
+            tokens = list(pending)
+            await asyncio.gather(*(
+                poll(tokens[start:start + self.batch_size])
+                for start in range(0, len(tokens), self.batch_size)
+            ))
+
+            if pending and time.monotonic() >= deadline:
+                logger.warning(f"[AsyncJudge0Service] {len(pending)} submissions still pending after {self.poll_timeout}s")
+                for index in pending.values():
+                    results[index] = Exception('Judge0 polling timeout')
+                break
+            delay = min(delay * 2, self.POLL_MAX_DELAY)
 
         return results
@@ -1,12 +1,15 @@
 """Async S3 TestCase Service for storing large test cases using aioboto3"""
+import asyncio
 import gzip
 import json
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 import aioboto3
+from aiobotocore.config import AioConfig
 from botocore.exceptions import ClientError
 from django.conf import settings
 import os
+from . import program_input, testcase_blob
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +20,9 @@ class AsyncS3TestCaseService:
     # Size threshold: 100KB (conservative, allows for metadata overhead)
     SIZE_THRESHOLD_BYTES = 100 * 1024
 
+    # Concurrent GETs (and pooled connections) in retrieve_testcases_by_id
+    FETCH_CONCURRENCY = 16
+
     # Singleton instance
     _instance = None
     _initialized = False
@@ -122,9 +128,12 @@ class AsyncS3TestCaseService:
                 raise
 
     @staticmethod
-    def calculate_size(input_str: str, output_str: str) -> int:
-        """Calculate the total size of test case data in bytes"""
-        return len(input_str.encode('utf-8')) + len(output_str.encode('utf-8'))
+    def calculate_size(input_str, output_str) -> int:
+        """Calculate the total size of test case data in bytes (str, bytes or InputFile)"""
+        return sum(
+            len(value.encode('utf-8')) if isinstance(value, str) else program_input.size(value)
+            for value in (input_str, output_str)
+        )
 
     @staticmethod
     def should_use_s3(input_str: str, output_str: str) -> bool:
@@ -260,8 +269,8 @@ class AsyncS3TestCaseService:
         platform: str,
         problem_id: str,
         testcase_id: str,
-        input_str: str,
-        output_str: str
+        input_str: Union[str, bytes],
+        output_str: Union[str, bytes]
     ) -> Dict[str, Any]:
         """
         Store a single test case in S3 with gzip compression (async)
@@ -270,26 +279,17 @@ class AsyncS3TestCaseService:
             platform: Platform name
             problem_id: Problem identifier
             testcase_id: Test case identifier
-            input_str: Test case input
-            output_str: Expected output
+            input_str: Test case input (str or bytes)
+            output_str: Expected output (str or bytes)
 
         Returns:
             Dict with S3 metadata: {'s3_key': str, 'size': int, 'compressed_size': int}
         """
         s3_key = self._get_s3_key(platform, problem_id, testcase_id)
 
-        # Create JSON payload for single test case
-        payload = {
-            'platform': platform,
-            'problem_id': problem_id,
-            'testcase_id': testcase_id,
-            'input': input_str,
-            'output': output_str
-        }
-
-        # Compress with gzip
-        json_data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
-        compressed_data = gzip.compress(json_data, compresslevel=6)
+        # Binary blob or legacy JSON, depending on TESTCASE_S3_BINARY_FORMAT (see testcase_blob)
+        data, content_type = testcase_blob.serialize(platform, problem_id, testcase_id, input_str, output_str)
+        compressed_data = gzip.compress(data, compresslevel=6)
 
         session = aioboto3.Session()
         async with session.client('s3', **self.aws_config) as s3_client:
@@ -300,7 +300,7 @@ class AsyncS3TestCaseService:
                     Bucket=self.bucket_name,
                     Key=s3_key,
                     Body=compressed_data,
-                    ContentType='application/json',
+                    ContentType=content_type,
                     ContentEncoding='gzip'
                 )
 
@@ -310,12 +310,12 @@ class AsyncS3TestCaseService:
 
                 logger.info(
                     f"Stored test case in S3: {s3_key} "
-                    f"(original: {len(json_data)} bytes, compressed: {len(compressed_data)} bytes)"
+                    f"(original: {len(data)} bytes, compressed: {len(compressed_data)} bytes)"
                 )
 
                 return {
                     's3_key': s3_key,
-                    'size': len(json_data),
+                    'size': len(data),
                     'compressed_size': len(compressed_data)
                 }
 
@@ -323,12 +323,48 @@ class AsyncS3TestCaseService:
                 logger.error(f"Failed to store test case in S3: {e}")
                 raise
 
+    async def _get_testcase(
+        self,
+        s3_client,
+        platform: str,
+        problem_id: str,
+        testcase_id: str,
+        raw: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch and decode one test case object with an open client (see retrieve_testcase)"""
+        s3_key = self._get_s3_key(platform, problem_id, testcase_id)
+
+        async def _get_object():
+            return await s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+
+        try:
+            # Retrieve from S3 with retry
+            response = await self._execute_with_retry(_get_object)
+
+            # Read response body asynchronously
+            async with response['Body'] as stream:
+                compressed_data = await stream.read()
+
+            # Decompress and split (binary blob or legacy JSON)
+            return testcase_blob.decode(gzip.decompress(compressed_data), raw=raw)
+
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'NoSuchKey':
+                logger.warning(f"No S3 test case found for {platform}/{problem_id}/{testcase_id}")
+                return None
+            logger.error(f"Failed to retrieve test case from S3 ({s3_key}): {e}")
+            raise
+        except (gzip.BadGzipFile, ValueError) as e:
+            logger.error(f"Failed to decompress/parse test case from S3 ({s3_key}): {e}")
+            raise
+
     async def retrieve_testcase(
         self,
         platform: str,
         problem_id: str,
-        testcase_id: str
-    ) -> Optional[Dict[str, str]]:
+        testcase_id: str,
+        raw: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
         Retrieve a single test case from S3 (async)
 
@@ -336,43 +372,60 @@ class AsyncS3TestCaseService:
             platform: Platform name
             problem_id: Problem identifier
             testcase_id: Test case identifier
+            raw: Return 'input' and 'output' as bytes-like objects (memoryviews
+                 of the decompressed object) instead of decoding them to str;
+                 executors take them as program input directly
 
         Returns:
             Dict with 'input' and 'output', or None if not found
         """
-        s3_key = self._get_s3_key(platform, problem_id, testcase_id)
-
         session = aioboto3.Session()
         async with session.client('s3', **self.aws_config) as s3_client:
-            async def _get_object():
-                return await s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
-
-            try:
-                # Retrieve from S3 with retry
-                response = await self._execute_with_retry(_get_object)
+            return await self._get_testcase(s3_client, platform, problem_id, testcase_id, raw=raw)
 
-                # Read response body asynchronously
-                async with response['Body'] as stream:
-                    compressed_data = await stream.read()
+    async def retrieve_testcases_by_id(
+        self,
+        platform: str,
+        problem_id: str,
+        testcase_ids: List[str],
+        raw: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve several single test cases concurrently through one client (async)
 
-                # Decompress and parse JSON
-                json_data = gzip.decompress(compressed_data)
-                payload = json.loads(json_data.decode('utf-8'))
+        Args:
+            platform: Platform name
+            problem_id: Problem identifier
+            testcase_ids: Test case identifiers
+            raw: See retrieve_testcase
 
-                return {
-                    'input': payload.get('input', ''),
-                    'output': payload.get('output', '')
-                }
+        Returns:
+            Dict {testcase_id: {'input', 'output'}}; test cases that are
+            missing or fail to load are logged and left out
+        """
+        if not testcase_ids:
+            return {}
 
-            except ClientError as e:
-                if e.response.get('Error', {}).get('Code') == 'NoSuchKey':
-                    logger.warning(f"No S3 test case found for {platform}/{problem_id}/{testcase_id}")
-                    return None
-                logger.error(f"Failed to retrieve test case from S3 ({s3_key}): {e}")
-                raise
-            except (gzip.BadGzipFile, json.JSONDecodeError) as e:
-                logger.error(f"Failed to decompress/parse test case from S3 ({s3_key}): {e}")
-                raise
+        semaphore = asyncio.Semaphore(self.FETCH_CONCURRENCY)
+        session = aioboto3.Session()
+        async with session.client(
+            's3', config=AioConfig(max_pool_connections=self.FETCH_CONCURRENCY), **self.aws_config
+        ) as s3_client:
+            async def fetch(testcase_id):
+                async with semaphore:
+                    try:
+                        return await self._get_testcase(s3_client, platform, problem_id, testcase_id, raw=raw)
+                    except Exception as e:
+                        logger.error(f"Failed to retrieve test case {testcase_id}: {e}")
+                        return None
+
+            results = await asyncio.gather(*(fetch(testcase_id) for testcase_id in testcase_ids))
+
+        return {
+            testcase_id: testcase
+            for testcase_id, testcase in zip(testcase_ids, results)
+            if testcase is not None
+        }
 
     async def delete_testcases(
         self,
@@ -1,21 +1,247 @@
-"""Code execution service - supports both local and Judge0"""
+"""Code execution service - supports local, execution daemon and Judge0"""
 from django.conf import settings
 from .judge0_service import Judge0Service
 from .code_executor import CodeExecutor
+from .execution_daemon import DaemonProgram, DaemonError
+from .output_compare import OutputCheck
+from . import program_input
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _resource_fields(result):
+    """Verdict and resource usage of a run, copied into the per-test result"""
+    return {
+        'verdict': result.get('verdict'),
+        'cpu_ms': result.get('cpu_ms'),
+        'wall_ms': result.get('wall_ms'),
+        'peak_rss_kb': result.get('peak_rss_kb'),
+    }
+
+
+# Output comparison fields set when an expected output was given (see OutputCheck)
+_COMPARISON_FIELDS = ('matched', 'output_hash', 'output_size', 'output_truncated')
+
+
+def _comparison_fields(result):
+    """Output comparison fields of a run, copied into the per-test result"""
+    return {key: result[key] for key in _COMPARISON_FIELDS if key in result}
+
+
+def _test_result(test_input, result):
+    """Per-test result (see CodeExecutionService.execute_with_test_cases) of a program run"""
+    if result['success']:
+        return {
+            'input': test_input,
+            'output': result['output'],
+            'error': None,
+            'status': 'success',
+            **_resource_fields(result),
+            **_comparison_fields(result),
+        }
+    return {
+        'input': test_input,
+        'output': result.get('output', ''),
+        'error': result.get('error', 'Execution failed'),
+        'status': 'error',
+        **_resource_fields(result),
+        **_comparison_fields(result),
+    }
+
+
+def _exception_result(test_input, error):
+    """Per-test result of a run that raised"""
+    return {
+        'input': test_input,
+        'output': '',
+        'error': str(error),
+        'status': 'error',
+    }
+
+
+class PreparedSubmission:
+    """
+    Submission-level execution handle
+
+    Compiles the code once (local executor or execution daemon) and then
+    runs it against any number of test inputs. With Judge0 enabled,
+    compilation happens remotely and this simply forwards inputs to
+    Judge0Service.
+
+    Create via CodeExecutionService.prepare().
+    """
+
+    def __init__(self, code, language, program=None):
+        """
+        Args:
+            code: Source code to execute
+            language: Programming language
+            program: PreparedProgram for the local executor, DaemonProgram for
+                     the execution daemon (None for Judge0)
+        """
+        self.code = code
+        self.language = language
+        self._program = program
+
+    @property
+    def remote(self):
+        """True if runs go to Judge0 (batch all inputs in one call to save round trips)"""
+        return self._program is None
+
+    @property
+    def streaming(self):
+        """True if runs go to the execution daemon (submit all inputs, results stream back)"""
+        return isinstance(self._program, DaemonProgram)
+
+    def iter_results(self, test_inputs, expected_outputs=None):
+        """
+        Execute all test inputs at once, yielding results as they finish
+
+        The execution daemon runs the inputs in parallel and results arrive in
+        completion order; other backends yield them in input order.
+
+        Args:
+            test_inputs: List of input strings for test cases
+            expected_outputs: Optional list of expected outputs (same order)
+
+        Yields:
+            tuple: (index into test_inputs, result as in execute_with_test_cases)
+        """
+        if not self.streaming:
+            yield from enumerate(self.execute_with_test_cases(test_inputs, expected_outputs))
+            return
+
+        pending = set(range(len(test_inputs)))
+        try:
+            for idx, result in self._program.iter_results(test_inputs, expected_outputs):
+                pending.discard(idx)
+                yield idx, _test_result(test_inputs[idx], result)
+        except DaemonError as e:
+            logger.error(f"[CodeExecutionService] Execution daemon failed: {e}")
+            for idx in sorted(pending):
+                yield idx, _exception_result(test_inputs[idx], e)
+
+    def execute_with_test_cases(self, test_inputs, expected_outputs=None):
+        """
+        Execute the prepared code with multiple test case inputs
+
+        Args:
+            test_inputs: List of input strings for test cases
+            expected_outputs: Optional list of expected outputs (same order).
+                              Each output is then compared token-wise while it
+                              is read; results get 'matched', 'output_hash',
+                              'output_size', 'output_truncated' and 'output'
+                              is only a bounded prefix.
+
+        Returns:
+            list: List of results for each test case (see
+                CodeExecutionService.execute_with_test_cases)
+        """
+        if self._program is None:
+            # Use Judge0 API
+            judge0_service = Judge0Service()
+            results = judge0_service.execute_with_test_cases(self.code, self.language, test_inputs)
+            if expected_outputs is not None:
+                for result, expected in zip(results, expected_outputs):
+                    result.update(OutputCheck(expected).check_string(result['output']))
+            return results
+
+        if self.streaming and len(test_inputs) > 1:
+            # Execution daemon: run all inputs in parallel, keep input order
+            results = [None] * len(test_inputs)
+            for idx, result in self.iter_results(test_inputs, expected_outputs):
+                results[idx] = result
+            return results
+
+        # Use local executor or execution daemon (already compiled)
+        results = []
+        success_count = 0
+        error_count = 0
+
+        for idx, test_input in enumerate(test_inputs):
+            try:
+                logger.info(f"[CodeExecutionService] Executing test case {idx+1}/{len(test_inputs)}, input_len={program_input.size(test_input)}")
+                expected = expected_outputs[idx] if expected_outputs is not None else None
+                result = self._program.run(test_input, expected_output=expected)
+                results.append(_test_result(test_input, result))
+
+                if result['success']:
+                    success_count += 1
+                    logger.info(f"[CodeExecutionService] Test case {idx+1} SUCCESS, output_len={len(result['output'])}")
+                else:
+                    error_count += 1
+                    logger.error(f"[CodeExecutionService] Test case {idx+1} FAILED: {results[-1]['error']}")
+            except Exception as e:
+                error_count += 1
+                results.append(_exception_result(test_input, e))
+                logger.error(f"[CodeExecutionService] Test case {idx+1} EXCEPTION: {str(e)}", exc_info=True)
+
+        logger.info(f"[CodeExecutionService] Execution complete: {success_count} success, {error_count} errors")
+        return results
+
+    def close(self):
+        """Release the compiled program"""
+        if self._program is not None:
+            self._program.close()
+            self._program = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 class CodeExecutionService:
     """Unified code execution service"""
 
+    @staticmethod
+    def prepare(code, language):
+        """
+        Prepare code for repeated execution (compile once, run many)
+
+        Example:
+            with CodeExecutionService.prepare(code, language) as submission:
+                for tc in test_cases:
+                    result = submission.execute_with_test_cases([tc['input']])[0]
+
+        Args:
+            code: Source code to execute
+            language: Programming language
+
+        Returns:
+            PreparedSubmission: Use as a context manager or call close()
+        """
+        logger.info(f"[CodeExecutionService] Preparing {language} code, length: {len(code)} chars")
+        logger.info(f"[CodeExecutionService] USE_JUDGE0: {settings.USE_JUDGE0}")
+
+        if settings.USE_JUDGE0:
+            return PreparedSubmission(code, language)
+
+        if settings.CODE_EXECUTION_DAEMON_ENABLED:
+            try:
+                program = DaemonProgram(code, language)
+            except DaemonError as e:
+                logger.warning(f"[CodeExecutionService] {e}, executing locally")
+            else:
+                if not program.success:
+                    logger.error(f"[CodeExecutionService] Preparation failed for {language}: {program.error}")
+                return PreparedSubmission(code, language, program=program)
+
+        program = CodeExecutor.prepare(code, language)
+        if not program.success:
+            logger.error(f"[CodeExecutionService] Preparation failed for {language}: {program.error}")
+        return PreparedSubmission(code, language, program=program)
+
     @staticmethod
     def execute_with_test_cases(code, language, test_inputs):
         """
         Execute code with multiple test case inputs
 
-        Uses Judge0 if USE_JUDGE0=true, otherwise uses local executor
+        Uses Judge0 if USE_JUDGE0=true, otherwise the execution daemon if
+        CODE_EXECUTION_DAEMON_ENABLED=true (and reachable) or the local executor.
+        The code is compiled once for all inputs.
 
         Args:
             code: Source code to execute
@@ -30,58 +256,15 @@ class CodeExecutionService:
                         'output': str,
                         'error': str or None,
                         'status': str,
+                        'verdict': str,  # OK / RE / TLE / MLE / OLE / CE
+                        'cpu_ms': int or None,
+                        'wall_ms': int or None,
+                        'peak_rss_kb': int or None,
                     },
                     ...
                 ]
         """
         logger.info(f"[CodeExecutionService] Executing {language} code with {len(test_inputs)} test inputs")
-        logger.info(f"[CodeExecutionService] Code length: {len(code)} chars")
-        logger.info(f"[CodeExecutionService] USE_JUDGE0: {settings.USE_JUDGE0}")
 
-        if settings.USE_JUDGE0:
-            # Use Judge0 API
-            judge0_service = Judge0Service()
-            return judge0_service.execute_with_test_cases(code, language, test_inputs)
-        else:
-            # Use local executor
-            logger.info(f"[CodeExecutionService] Using local CodeExecutor")
-            results = []
-            success_count = 0
-            error_count = 0
-
-            for idx, test_input in enumerate(test_inputs):
-                try:
-                    logger.info(f"[CodeExecutionService] Executing test case {idx+1}/{len(test_inputs)}, input_len={len(test_input)}")
-                    result = CodeExecutor.execute(code, language, test_input)
-
-                    if result['success']:
-                        success_count += 1
-                        results.append({
-                            'input': test_input,
-                            'output': result['output'],
-                            'error': None,
-                            'status': 'success',
-                        })
-                        logger.info(f"[CodeExecutionService] Test case {idx+1} SUCCESS, output_len={len(result['output'])}")
-                    else:
-                        error_count += 1
-                        error_msg = result.get('error', 'Execution failed')
-                        results.append({
-                            'input': test_input,
-                            'output': result.get('output', ''),
-                            'error': error_msg,
-                            'status': 'error',
-                        })
-                        logger.error(f"[CodeExecutionService] Test case {idx+1} FAILED: {error_msg}")
-                except Exception as e:
-                    error_count += 1
-                    results.append({
-                        'input': test_input,
-                        'output': '',
-                        'error': str(e),
-                        'status': 'error',
-                    })
-                    logger.error(f"[CodeExecutionService] Test case {idx+1} EXCEPTION: {str(e)}", exc_info=True)
-
-            logger.info(f"[CodeExecutionService] Execution complete: {success_count} success, {error_count} errors")
-            return results
+        with CodeExecutionService.prepare(code, language) as submission:
+            return submission.execute_with_test_cases(test_inputs)
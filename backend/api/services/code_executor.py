@@ -1,9 +1,138 @@
 """Code Execution Service"""
 import subprocess
-import tempfile
 import os
 from pathlib import Path
 from django.conf import settings
+from .artifact_cache import ArtifactCache
+from .cpp_toolchain import CppToolchain
+from .workdir_pool import WorkdirPool
+from .zygote_runner import ZygoteRunner, ZygoteError
+from .jvm_pool import WarmJavaRunner, JvmPoolError
+from .output_compare import OutputCheck
+from . import sandbox
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PreparedProgram:
+    """
+    A program that has been written to disk and compiled (if needed) once,
+    and can then be run against any number of inputs.
+
+    Use as a context manager so the work directory is cleaned up:
+
+        with CodeExecutor.prepare(code, 'cpp') as program:
+            for input_data in inputs:
+                result = program.run(input_data)
+    """
+
+    def __init__(self, language, temp_dir=None, command=None, cwd=None, error=None, runner=None):
+        """
+        Args:
+            language: Normalized language name
+            temp_dir: WorkDir (workdir_pool) owning the program files
+            command: argv used to run the program
+            cwd: Working directory for the program
+            error: Preparation (compilation) error message, if any
+            runner: Warm runner used instead of a fresh process per run
+                    (ZygoteRunner for Python, WarmJavaRunner for Java)
+        """
+        self.language = language
+        self.command = command
+        self.cwd = cwd
+        self.error = error
+        self._temp_dir = temp_dir
+        self._runner = runner
+
+    @property
+    def success(self):
+        """True if the program is ready to run"""
+        return self.error is None
+
+    def run(self, input_data, expected_output=None):
+        """
+        Run the prepared program with given input
+
+        Args:
+            input_data: Program input (str, bytes or program_input.InputFile)
+            expected_output: If given, stdout is compared against it while being
+                             read (see output_compare.OutputCheck) and only a
+                             bounded prefix is returned as 'output'
+
+        Returns:
+            dict: {
+                'output': str,
+                'error': str,
+                'success': bool,
+                'cpu_ms': int or None,
+                'wall_ms': int,
+                'peak_rss_kb': int or None,
+                'verdict': str  # OK / RE / TLE / MLE / OLE / CE (see sandbox)
+            }
+            With expected_output, also 'matched', 'output_hash', 'output_size'
+            and 'output_truncated'.
+        """
+        if not self.success:
+            return sandbox.error_result(self.error, sandbox.VERDICT_CE)
+
+        limits = sandbox.get_limits()
+        # rlimits applied to the run; the verdict is still classified against the real limits
+        run_limits = limits
+        if self.language in ('java', 'javascript'):
+            # The JVM and V8 reserve large address ranges; memory is capped by -Xmx / checked via RSS
+            run_limits = {**limits, 'memory_bytes': 0}
+        # Files the program writes into its work directory are capped like compiler output
+        max_file_bytes = self._temp_dir.max_file_bytes if self._temp_dir is not None else 0
+        if max_file_bytes and (not run_limits['output_bytes'] or max_file_bytes < run_limits['output_bytes']):
+            run_limits = {**run_limits, 'output_bytes': max_file_bytes}
+
+        read_output = OutputCheck(expected_output).read if expected_output is not None else None
+
+        result = None
+        if self._runner is not None and self._runner.alive:
+            try:
+                raw = self._runner.run(
+                    input_data, settings.CODE_EXECUTION_TIMEOUT, run_limits, read_output=read_output
+                )
+                result = sandbox.make_result(limits=limits, **raw)
+            except (ZygoteError, JvmPoolError) as e:
+                logger.warning(f"[CodeExecutor] Warm runner unavailable, falling back to subprocess: {e}")
+
+        if result is None:
+            result = sandbox.run(
+                self.command, input_data, cwd=self.cwd,
+                limit_memory=bool(run_limits['memory_bytes']), read_output=read_output,
+                max_file_bytes=max_file_bytes
+            )
+        return self._check_quota(result)
+
+    def _check_quota(self, result):
+        """Fail a run that left more than the work directory limit in its slot"""
+        if self._temp_dir is not None and self._temp_dir.over_quota():
+            return {
+                **result,
+                'output': '',
+                'error': 'Work directory limit exceeded',
+                'success': False,
+                'verdict': sandbox.VERDICT_OLE
+            }
+        return result
+
+    def close(self):
+        """Stop the warm runner (if any) and remove the program's work directory"""
+        if self._runner is not None:
+            self._runner.close()
+            self._runner = None
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 class CodeExecutor:
@@ -19,7 +148,7 @@ class CodeExecutor:
         Args:
             code: Source code string
             language: Programming language
-            input_data: Input string for the program
+            input_data: Program input (str, bytes or program_input.InputFile)
 
         Returns:
             dict: {
@@ -28,160 +157,159 @@ class CodeExecutor:
                 'success': bool
             }
         """
+        with CodeExecutor.prepare(code, language) as program:
+            return program.run(input_data)
+
+    @staticmethod
+    def prepare(code, language):
+        """
+        Write and compile code once so it can be run against many inputs
+
+        Compilation errors (and unsupported languages) do not raise; they are
+        stored on the returned program and reported by every run() call.
+
+        Args:
+            code: Source code string
+            language: Programming language
+
+        Returns:
+            PreparedProgram: Caller is responsible for calling close()
+        """
         language = language.lower()
 
         if language not in CodeExecutor.SUPPORTED_LANGUAGES:
-            return {
-                'output': '',
-                'error': f'Unsupported language: {language}',
-                'success': False
-            }
+            return PreparedProgram(language, error=f'Unsupported language: {language}')
 
-        # Create temp directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
+        # Scratch directory from the tmpfs pool (owned by the returned program)
+        temp_dir = WorkdirPool().acquire()
+        temp_path = Path(temp_dir.name)
 
-            try:
-                if language in ['python', 'python3']:
-                    return CodeExecutor._execute_python(code, input_data, temp_path)
-                elif language in ['javascript', 'node']:
-                    return CodeExecutor._execute_javascript(code, input_data, temp_path)
-                elif language in ['cpp', 'c++']:
-                    return CodeExecutor._execute_cpp(code, input_data, temp_path)
-                elif language == 'java':
-                    return CodeExecutor._execute_java(code, input_data, temp_path)
-            except Exception as e:
-                return {
-                    'output': '',
-                    'error': str(e),
-                    'success': False
-                }
+        try:
+            if language in ['python', 'python3']:
+                return CodeExecutor._prepare_python(code, temp_dir, temp_path)
+            elif language in ['javascript', 'node']:
+                return CodeExecutor._prepare_javascript(code, temp_dir, temp_path)
+            elif language in ['cpp', 'c++']:
+                return CodeExecutor._prepare_cpp(code, temp_dir, temp_path)
+            elif language == 'java':
+                return CodeExecutor._prepare_java(code, temp_dir, temp_path)
+        except Exception as e:
+            return PreparedProgram(language, temp_dir=temp_dir, error=str(e))
 
     @staticmethod
-    def _execute_python(code, input_data, temp_path):
-        """Execute Python code"""
+    def _prepare_python(code, temp_dir, temp_path):
+        """Prepare Python code, starting a zygote when enabled"""
         file_path = temp_path / 'solution.py'
         file_path.write_text(code)
 
-        result = subprocess.run(
-            ['python3', str(file_path)],
-            input=input_data,
-            capture_output=True,
-            text=True,
-            timeout=settings.CODE_EXECUTION_TIMEOUT
-        )
+        zygote = None
+        if getattr(settings, 'CODE_EXECUTION_ZYGOTE', True):
+            zygote = ZygoteRunner(file_path, temp_path)
+            try:
+                zygote.start()
+            except (ZygoteError, OSError) as e:
+                # e.g. syntax error: plain runs report it exactly like `python3 solution.py`
+                logger.info(f"[CodeExecutor] Zygote not started: {str(e).strip().splitlines()[-1:]}")
+                zygote = None
 
-        return {
-            'output': result.stdout,
-            'error': result.stderr,
-            'success': result.returncode == 0
-        }
+        return PreparedProgram(
+            'python',
+            temp_dir=temp_dir,
+            command=['python3', str(file_path)],
+            runner=zygote
+        )
 
     @staticmethod
-    def _execute_javascript(code, input_data, temp_path):
-        """Execute JavaScript code"""
+    def _prepare_javascript(code, temp_dir, temp_path):
+        """Prepare JavaScript code"""
         file_path = temp_path / 'solution.js'
         file_path.write_text(code)
 
-        result = subprocess.run(
-            ['node', str(file_path)],
-            input=input_data,
-            capture_output=True,
-            text=True,
-            timeout=settings.CODE_EXECUTION_TIMEOUT
+        return PreparedProgram(
+            'javascript',
+            temp_dir=temp_dir,
+            command=['node', str(file_path)]
         )
 
-        return {
-            'output': result.stdout,
-            'error': result.stderr,
-            'success': result.returncode == 0
-        }
-
     @staticmethod
-    def _execute_cpp(code, input_data, temp_path):
-        """Execute C++ code"""
+    def _prepare_cpp(code, temp_dir, temp_path):
+        """Compile C++ code"""
         source_path = temp_path / 'solution.cpp'
         exec_path = temp_path / 'solution'
 
-        source_path.write_text(code)
+        # Reuse a previously compiled binary if available (the PCH does not change the output)
+        toolchain = CppToolchain()
+        cache = ArtifactCache()
+        cache_key = cache.make_key(code, 'cpp', toolchain.flags(), 'g++')
 
-        # Compile
-        compile_result = subprocess.run(
-            ['g++', str(source_path), '-o', str(exec_path)],
-            capture_output=True,
-            text=True,
-            timeout=settings.CODE_EXECUTION_TIMEOUT
-        )
+        if not cache.fetch(cache_key, temp_path):
+            source_path.write_text(code)
 
-        if compile_result.returncode != 0:
-            return {
-                'output': '',
-                'error': compile_result.stderr,
-                'success': False
-            }
+            # Compile
+            compile_result = subprocess.run(
+                toolchain.compile_command(source_path, exec_path),
+                capture_output=True,
+                text=True,
+                timeout=settings.CODE_EXECUTION_TIMEOUT,
+                env=temp_dir.compile_env(),
+                preexec_fn=temp_dir.limit_file_size
+            )
 
-        # Execute
-        result = subprocess.run(
-            [str(exec_path)],
-            input=input_data,
-            capture_output=True,
-            text=True,
-            timeout=settings.CODE_EXECUTION_TIMEOUT
-        )
+            if compile_result.returncode != 0:
+                return PreparedProgram('cpp', temp_dir=temp_dir, error=compile_result.stderr)
+            if temp_dir.over_quota():
+                return PreparedProgram('cpp', temp_dir=temp_dir, error='Compilation output exceeds the work directory limit')
 
-        return {
-            'output': result.stdout,
-            'error': result.stderr,
-            'success': result.returncode == 0
-        }
+            cache.store(cache_key, [exec_path])
+
+        return PreparedProgram(
+            'cpp',
+            temp_dir=temp_dir,
+            command=[str(exec_path)]
+        )
 
     @staticmethod
-    def _execute_java(code, input_data, temp_path):
-        """Execute Java code"""
+    def _prepare_java(code, temp_dir, temp_path):
+        """Compile Java code"""
         import re
 
         # Extract class name from code
         class_match = re.search(r'public\s+class\s+(\w+)', code)
         if not class_match:
-            return {
-                'output': '',
-                'error': 'No public class found in code',
-                'success': False
-            }
+            return PreparedProgram('java', temp_dir=temp_dir, error='No public class found in code')
 
         class_name = class_match.group(1)
         source_path = temp_path / f'{class_name}.java'
 
-        source_path.write_text(code)
+        # Reuse previously compiled classes if available
+        cache = ArtifactCache()
+        cache_key = cache.make_key(code, 'java', [], 'javac')
 
-        # Compile
-        compile_result = subprocess.run(
-            ['javac', str(source_path)],
-            capture_output=True,
-            text=True,
-            timeout=settings.CODE_EXECUTION_TIMEOUT,
-            cwd=str(temp_path)
-        )
+        if not cache.fetch(cache_key, temp_path):
+            source_path.write_text(code)
 
-        if compile_result.returncode != 0:
-            return {
-                'output': '',
-                'error': compile_result.stderr,
-                'success': False
-            }
+            # Compile
+            compile_result = subprocess.run(
+                ['javac', str(source_path)],
+                capture_output=True,
+                text=True,
+                timeout=settings.CODE_EXECUTION_TIMEOUT,
+                cwd=str(temp_path),
+                env=temp_dir.compile_env(),
+                preexec_fn=temp_dir.limit_file_size
+            )
 
-        # Execute
-        result = subprocess.run(
-            ['java', class_name],
-            input=input_data,
-            capture_output=True,
-            text=True,
-            timeout=settings.CODE_EXECUTION_TIMEOUT,
-            cwd=str(temp_path)
-        )
+            if compile_result.returncode != 0:
+                return PreparedProgram('java', temp_dir=temp_dir, error=compile_result.stderr)
+            if temp_dir.over_quota():
+                return PreparedProgram('java', temp_dir=temp_dir, error='Compilation output exceeds the work directory limit')
 
-        return {
-            'output': result.stdout,
-            'error': result.stderr,
-            'success': result.returncode == 0
-        }
+            cache.store(cache_key, list(temp_path.glob('*.class')))
+
+        return PreparedProgram(
+            'java',
+            temp_dir=temp_dir,
+            command=['java', *sandbox.jvm_memory_flags(), class_name],
+            cwd=str(temp_path),
+            runner=WarmJavaRunner(temp_path, class_name) if getattr(settings, 'JAVA_WARM_POOL_ENABLED', True) else None
+        )
@@ -0,0 +1,293 @@
+"""C++ compiler profiles and precompiled <bits/stdc++.h>
+
+Almost every C++ submission starts with `#include <bits/stdc++.h>`, and
+parsing that header is most of a g++ run. For each compiler profile the
+header is precompiled once per host into
+
+    CPP_PCH_DIR/<fingerprint>/bits/stdc++.h.gch
+
+and compiles get `-I CPP_PCH_DIR/<fingerprint>`: g++ checks that directory
+for `bits/stdc++.h.gch` before the system headers, uses it when it was built
+with compatible flags and otherwise silently falls back to the real header.
+
+The fingerprint covers the profile flags, the g++ version and the installed
+header (path and mtime), so a toolchain upgrade selects a new directory and
+the PCH is rebuilt. CppToolchain.self_check() (run when a Celery worker
+starts) rebuilds missing PCHs, verifies that g++ actually picks them up and
+removes PCHs of old toolchains.
+"""
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+from django.conf import settings
+from .artifact_cache import ArtifactCache
+
+logger = logging.getLogger(__name__)
+
+PCH_HEADER = 'bits/stdc++.h'
+
+# Named compiler profiles: language standard, optimization level, warnings
+PROFILES = {
+    # Submissions run against test cases
+    'judge': {'std': 'c++17', 'optimization': '-O2', 'warnings': []},
+    # Generated solutions validated against samples
+    'validate': {'std': 'c++17', 'optimization': '-O2', 'warnings': ['-Wall']},
+}
+
+
+class CppToolchain:
+    """
+    g++ command lines per compiler profile, with per-profile PCHs (Singleton)
+    """
+
+    BUILD_TIMEOUT = 120  # seconds to precompile the header
+
+    # Singleton instance
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        """Ensure only one instance exists (Singleton pattern)"""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """Initialize toolchain configuration (only once)"""
+        if self.__class__._initialized:
+            return
+
+        self.pch_enabled = getattr(settings, 'CPP_PCH_ENABLED', True)
+        self.root = Path(getattr(settings, 'CPP_PCH_DIR', '/tmp/algoitny-pch'))
+        self.default_profile = getattr(settings, 'CPP_COMPILER_PROFILE', 'judge')
+
+        self._lock = threading.Lock()
+        # profile -> include directory with the PCH, or None if unavailable
+        self._pch_dirs: Dict[str, Optional[Path]] = {}
+        self._header_path = None
+
+        # Mark as initialized
+        self.__class__._initialized = True
+
+    def resolve_profile(self, profile: Optional[str] = None) -> str:
+        """Get a valid profile name (unknown names fall back to 'judge')"""
+        profile = profile or self.default_profile
+        if profile not in PROFILES:
+            logger.warning(f"[CppToolchain] Unknown compiler profile '{profile}', using 'judge'")
+            return 'judge'
+        return profile
+
+    def flags(self, profile: Optional[str] = None) -> List[str]:
+        """
+        Compiler flags of a profile (part of the artifact cache key)
+
+        Args:
+            profile: Profile name (default: CPP_COMPILER_PROFILE)
+
+        Returns:
+            e.g. ['-std=c++17', '-O2']
+        """
+        spec = PROFILES[self.resolve_profile(profile)]
+        return [f"-std={spec['std']}", spec['optimization'], *spec['warnings']]
+
+    def compile_command(self, source_path, output_path, profile: Optional[str] = None) -> List[str]:
+        """
+        Build the g++ argv for a submission, using the profile's PCH when available
+
+        Args:
+            source_path: C++ source file
+            output_path: Executable to produce
+            profile: Profile name (default: CPP_COMPILER_PROFILE)
+
+        Returns:
+            argv list
+        """
+        profile = self.resolve_profile(profile)
+        pch_dir = self.ensure_pch(profile)
+        include = ['-I', str(pch_dir)] if pch_dir is not None else []
+        return ['g++', *self.flags(profile), *include, str(source_path), '-o', str(output_path)]
+
+    def _find_header(self) -> Optional[Path]:
+        """Locate the installed bits/stdc++.h"""
+        if self._header_path is None:
+            try:
+                result = subprocess.run(
+                    ['g++', '-x', 'c++', '-M', '-'],
+                    input=f'#include <{PCH_HEADER}>\n',
+                    capture_output=True,
+                    text=True,
+                    timeout=30
+                )
+            except (OSError, subprocess.TimeoutExpired) as e:
+                logger.warning(f"[CppToolchain] Cannot run g++: {e}")
+                return None
+
+            # Make-style dependency list: "-.o: <header> <its includes> ..."
+            for token in result.stdout.replace('\\\n', ' ').split():
+                if token.endswith(PCH_HEADER):
+                    self._header_path = Path(token)
+                    break
+            else:
+                logger.warning(f"[CppToolchain] {PCH_HEADER} not found: {result.stderr.strip()}")
+
+        return self._header_path
+
+    def fingerprint(self, profile: str) -> Optional[str]:
+        """
+        Identify the PCH of a profile for the installed toolchain
+
+        Returns:
+            Hex digest, or None if g++ or the header is unavailable
+        """
+        header = self._find_header()
+        if header is None:
+            return None
+        try:
+            header_mtime = str(header.stat().st_mtime_ns)
+        except OSError:
+            return None
+
+        digest = hashlib.sha256()
+        for part in (' '.join(self.flags(profile)), ArtifactCache.toolchain_version('g++'), str(header), header_mtime):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()[:24]
+
+    def ensure_pch(self, profile: str) -> Optional[Path]:
+        """
+        Get the include directory holding the profile's PCH, building it if needed
+
+        Args:
+            profile: Profile name
+
+        Returns:
+            Path, or None when PCHs are disabled or cannot be built
+        """
+        if not self.pch_enabled:
+            return None
+
+        with self._lock:
+            if profile in self._pch_dirs:
+                return self._pch_dirs[profile]
+
+            pch_dir = None
+            fingerprint = self.fingerprint(profile)
+            if fingerprint is not None:
+                try:
+                    pch_dir = self._build(profile, fingerprint)
+                except OSError as e:
+                    logger.warning(f"[CppToolchain] Cannot build PCH for '{profile}': {e}")
+
+            self._pch_dirs[profile] = pch_dir
+            return pch_dir
+
+    def _build(self, profile: str, fingerprint: str) -> Optional[Path]:
+        """Precompile the header into root/<fingerprint> unless it is already there"""
+        pch_dir = self.root / fingerprint
+        gch_path = pch_dir / f'{PCH_HEADER}.gch'
+        if gch_path.exists():
+            return pch_dir
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        # One builder per host; the others wait and then reuse its result
+        with open(self.root / f'.{fingerprint}.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if gch_path.exists():
+                return pch_dir
+
+            staging = self.root / f'.staging-{uuid.uuid4().hex}'
+            staged_gch = staging / f'{PCH_HEADER}.gch'
+            staged_gch.parent.mkdir(parents=True)
+            try:
+                try:
+                    result = subprocess.run(
+                        ['g++', *self.flags(profile), '-x', 'c++-header', str(self._find_header()), '-o', str(staged_gch)],
+                        capture_output=True,
+                        text=True,
+                        timeout=self.BUILD_TIMEOUT
+                    )
+                except subprocess.TimeoutExpired:
+                    logger.warning(f"[CppToolchain] PCH build for '{profile}' timed out")
+                    return None
+
+                if result.returncode != 0:
+                    logger.warning(f"[CppToolchain] PCH build for '{profile}' failed: {result.stderr.strip()[:500]}")
+                    return None
+
+                os.rename(staging, pch_dir)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+
+        logger.info(f"[CppToolchain] Built PCH for '{profile}' in {pch_dir}")
+        return pch_dir
+
+    def _pch_used(self, profile: str, pch_dir: Path) -> bool:
+        """Compile a probe with -H and check that g++ reads the PCH"""
+        try:
+            result = subprocess.run(
+                ['g++', *self.flags(profile), '-I', str(pch_dir), '-H', '-fsyntax-only', '-x', 'c++', '-'],
+                input=f'#include <{PCH_HEADER}>\nint main() {{ return 0; }}\n',
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        # -H marks a usable PCH with '!' ('x' = found but invalid)
+        return any(line.startswith('!') and line.endswith('.gch') for line in result.stderr.splitlines())
+
+    def self_check(self) -> Dict[str, bool]:
+        """
+        Make sure every profile has a PCH matching the installed toolchain
+
+        Rebuilds missing/stale PCHs (a changed toolchain yields a new
+        fingerprint), verifies g++ accepts each one (an invalid PCH is
+        rebuilt once, then disabled for this process) and deletes PCH
+        directories no current profile uses.
+
+        Returns:
+            dict: profile -> True if compiles of that profile use a PCH
+        """
+        if not self.pch_enabled:
+            return {profile: False for profile in PROFILES}
+
+        status = {}
+        current = set()
+        for profile in PROFILES:
+            with self._lock:
+                self._pch_dirs.pop(profile, None)
+            pch_dir = self.ensure_pch(profile)
+
+            if pch_dir is not None and not self._pch_used(profile, pch_dir):
+                logger.warning(f"[CppToolchain] PCH for '{profile}' rejected by g++, rebuilding")
+                shutil.rmtree(pch_dir, ignore_errors=True)
+                with self._lock:
+                    self._pch_dirs.pop(profile, None)
+                pch_dir = self.ensure_pch(profile)
+                if pch_dir is not None and not self._pch_used(profile, pch_dir):
+                    with self._lock:
+                        self._pch_dirs[profile] = None
+                    pch_dir = None
+
+            status[profile] = pch_dir is not None
+            if pch_dir is not None:
+                current.add(pch_dir.name)
+
+        # PCHs of previous toolchains/flags
+        if self.root.is_dir():
+            for entry in self.root.iterdir():
+                if entry.is_dir() and not entry.name.startswith('.') and entry.name not in current:
+                    shutil.rmtree(entry, ignore_errors=True)
+                    logger.info(f"[CppToolchain] Removed stale PCH {entry.name}")
+                elif entry.suffix == '.lock' and entry.stem[1:] not in current:
+                    entry.unlink(missing_ok=True)
+
+        logger.info(f"[CppToolchain] Self-check: {status}")
+        return status
@@ -0,0 +1,457 @@
+"""Per-host code execution daemon reachable over a Unix socket
+
+Celery worker processes each keep their own executor caches (Python
+zygotes, warm JVMs, the sandbox spawner, the workdir pool), so prefork
+children cannot share them and every child competes for the cores. The
+daemon is one long-lived process per host (`python manage.py
+execution_daemon`) that owns all of that state. Workers start it lazily:
+when the socket does not answer, the first worker to take the start lock
+spawns it and waits until it answers a ping, so a crashed daemon is
+restarted by the next submission. Workers send it programs and inputs; it
+compiles with CodeExecutor, schedules the runs of all clients on a shared
+pool of CODE_EXECUTION_DAEMON_WORKERS slots and streams each result back as
+soon as it is ready.
+
+Protocol: one JSON object per line. A connection holds at most one
+prepared program, which is closed with the connection.
+
+    client -> daemon  {"op": "prepare", "code": str, "language": str}
+    daemon -> client  {"type": "prepared", "error": str or null}
+
+    client -> daemon  {"op": "run", "inputs": [str], "expected_outputs": [str] or null}
+    daemon -> client  {"type": "result", "index": int, "result": {...}}   (one per input, in completion order)
+    daemon -> client  {"type": "done"}
+
+    client -> daemon  {"op": "ping"}
+    daemon -> client  {"type": "pong", "pid": int, "workers": int, "connections": int}
+
+Inputs and expected outputs are strings or {"file": path}: byte inputs (and
+InputFiles stored elsewhere) are placed once in a tmpfs scratch slot of the
+client and the daemon hands that file to the child as stdin. The daemon only
+accepts paths inside the workdir pool root (WorkdirPool.contains), since it
+reads them with its own permissions.
+
+Errors are reported as {"type": "error", "error": str}. Results are the
+dicts returned by PreparedProgram.run(). Resource limits are the daemon's
+own settings (CODE_EXECUTION_TIMEOUT, CODE_EXECUTION_MEMORY_LIMIT_MB, ...).
+"""
+import fcntl
+import json
+import logging
+import os
+import shutil
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from .code_executor import CodeExecutor
+from .program_input import InputFile, stage
+from .workdir_pool import WorkdirPool
+from . import sandbox
+
+logger = logging.getLogger(__name__)
+
+
+class DaemonError(Exception):
+    """Raised when the execution daemon is unreachable or breaks the protocol"""
+
+
+def _send(stream, message):
+    stream.write(json.dumps(message).encode() + b'\n')
+    stream.flush()
+
+
+def _decode_input(value):
+    """
+    Protocol value -> program input (str or InputFile)
+
+    Raises:
+        ValueError: If a file path is outside the workdir pool
+    """
+    if isinstance(value, dict):
+        path = WorkdirPool().contains(value['file'])
+        if path is None:
+            raise ValueError(f"Input file outside the work directory pool: {value['file']}")
+        return InputFile(path)
+    return value
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    """One client connection (one prepared program at a time)"""
+
+    def handle(self):
+        daemon = self.server.daemon
+        program = None
+        daemon.connection_opened()
+        try:
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                    op = request.get('op')
+                except (ValueError, AttributeError):
+                    _send(self.wfile, {'type': 'error', 'error': 'Invalid request'})
+                    continue
+
+                if op == 'ping':
+                    _send(self.wfile, {'type': 'pong', **daemon.stats()})
+
+                elif op == 'prepare':
+                    if program is not None:
+                        program.close()
+                    program = CodeExecutor.prepare(request.get('code', ''), request.get('language', ''))
+                    _send(self.wfile, {'type': 'prepared', 'error': program.error})
+
+                elif op == 'run':
+                    if program is None:
+                        _send(self.wfile, {'type': 'error', 'error': 'No prepared program'})
+                        continue
+                    try:
+                        inputs = [_decode_input(value) for value in request.get('inputs') or []]
+                        expected_outputs = request.get('expected_outputs')
+                        if expected_outputs is not None:
+                            expected_outputs = [_decode_input(value) for value in expected_outputs]
+                    except (ValueError, KeyError, TypeError) as e:
+                        _send(self.wfile, {'type': 'error', 'error': f'Invalid run request: {e}'})
+                        continue
+                    daemon.run_all(
+                        program, inputs, expected_outputs,
+                        lambda message: _send(self.wfile, message)
+                    )
+                    _send(self.wfile, {'type': 'done'})
+
+                else:
+                    _send(self.wfile, {'type': 'error', 'error': f'Unknown op: {op}'})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            if program is not None:
+                program.close()
+            daemon.connection_closed()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ExecutionDaemon:
+    """
+    Execution daemon server
+
+    Usage:
+        ExecutionDaemon(socket_path, workers).serve_forever()
+    """
+
+    def __init__(self, socket_path=None, workers=None):
+        """
+        Args:
+            socket_path: Unix socket path (default: CODE_EXECUTION_DAEMON_SOCKET)
+            workers: Concurrent test runs across all clients
+                     (default: CODE_EXECUTION_DAEMON_WORKERS, 0 = CPU cores)
+        """
+        self.socket_path = socket_path or settings.CODE_EXECUTION_DAEMON_SOCKET
+        if workers is None:
+            workers = getattr(settings, 'CODE_EXECUTION_DAEMON_WORKERS', 0)
+        self.workers = workers or len(os.sched_getaffinity(0))
+
+        self._runs = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='exec-run')
+        self._lock = threading.Lock()
+        self._connections = 0
+        self._server = None
+
+    def stats(self):
+        """Daemon status for ping"""
+        with self._lock:
+            connections = self._connections
+        return {'pid': os.getpid(), 'workers': self.workers, 'connections': connections}
+
+    def connection_opened(self):
+        with self._lock:
+            self._connections += 1
+
+    def connection_closed(self):
+        with self._lock:
+            self._connections -= 1
+
+    def run_all(self, program, inputs, expected_outputs, send):
+        """
+        Run a prepared program on every input through the shared run pool
+
+        Args:
+            program: PreparedProgram
+            inputs: List of decoded inputs (str or InputFile, see _decode_input)
+            expected_outputs: Optional list of expected outputs (same order and form)
+            send: Callable(message) streaming each result to the client
+        """
+        def run(index, input_data):
+            expected = None
+            if expected_outputs is not None:
+                expected = expected_outputs[index]
+                if isinstance(expected, InputFile):
+                    expected = expected.read_bytes()
+            return program.run(input_data, expected_output=expected)
+
+        futures = {
+            self._runs.submit(run, index, input_data): index
+            for index, input_data in enumerate(inputs)
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"[ExecutionDaemon] Run failed: {e}", exc_info=True)
+                result = sandbox.error_result(str(e))
+            send({'type': 'result', 'index': futures[future], 'result': result})
+
+    def serve_forever(self):
+        """Listen on the Unix socket until shutdown() is called"""
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+        self._server = _UnixServer(self.socket_path, _ConnectionHandler)
+        self._server.daemon = self
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"[ExecutionDaemon] Listening on {self.socket_path} with {self.workers} run slots")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self._runs.shutdown(wait=False, cancel_futures=True)
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self):
+        """Stop serve_forever() (call from another thread)"""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+# Daemon started by this process, see ensure_daemon()
+_spawned = None
+
+
+def _ping(socket_path, timeout=1):
+    """True if a daemon answers on socket_path"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            with sock.makefile('rwb') as stream:
+                _send(stream, {'op': 'ping'})
+                return json.loads(stream.readline() or b'{}').get('type') == 'pong'
+    except (OSError, ValueError):
+        return False
+
+
+def ensure_daemon(socket_path=None, timeout=None):
+    """
+    Start the execution daemon if it does not answer on its socket
+
+    Worker processes on the host serialize on a lock file next to the socket,
+    so only one of them spawns the daemon; the others find it running.
+
+    Args:
+        socket_path: Unix socket path (default: CODE_EXECUTION_DAEMON_SOCKET)
+        timeout: Seconds to wait until the daemon answers (default: DaemonProgram.START_TIMEOUT)
+
+    Raises:
+        DaemonError: If the daemon could not be started
+    """
+    global _spawned
+
+    socket_path = socket_path or settings.CODE_EXECUTION_DAEMON_SOCKET
+    timeout = DaemonProgram.START_TIMEOUT if timeout is None else timeout
+    if _ping(socket_path):
+        return
+
+    with open(f'{socket_path}.lock', 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        if _ping(socket_path):
+            # Started by another worker while we waited for the lock
+            return
+
+        # Reap a daemon this process started earlier that has exited
+        if _spawned is not None and _spawned.poll() is not None:
+            logger.warning(f"[ExecutionDaemon] Daemon exited with status {_spawned.returncode}, restarting")
+            _spawned = None
+
+        logger.info(f"[ExecutionDaemon] Starting daemon on {socket_path}")
+        try:
+            _spawned = subprocess.Popen(
+                [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'execution_daemon', '--socket', socket_path],
+                stdin=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except OSError as e:
+            raise DaemonError(f'Cannot start execution daemon: {e}')
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if _ping(socket_path):
+                return
+            if _spawned.poll() is not None:
+                raise DaemonError(f'Execution daemon exited with status {_spawned.returncode}')
+            time.sleep(0.1)
+
+    raise DaemonError(f'Execution daemon not ready after {timeout}s')
+
+
+class DaemonProgram:
+    """
+    Client side of a program prepared by the execution daemon
+
+    Same interface as PreparedProgram (success / error / run / close), plus
+    iter_results() to run many inputs at once.
+    """
+
+    CONNECT_TIMEOUT = 2  # seconds
+    REPLY_TIMEOUT = 300  # seconds without any message from the daemon
+    START_TIMEOUT = 20  # seconds for a lazily started daemon to answer
+
+    def __init__(self, code, language, socket_path=None):
+        """
+        Connect to the daemon (starting it if needed) and prepare (compile)
+        the program there
+
+        Args:
+            code: Source code
+            language: Programming language
+            socket_path: Unix socket path (default: CODE_EXECUTION_DAEMON_SOCKET)
+
+        Raises:
+            DaemonError: If the daemon is not reachable and cannot be started
+        """
+        self.language = language
+        self.error = None
+        socket_path = socket_path or settings.CODE_EXECUTION_DAEMON_SOCKET
+        try:
+            self._sock = self._connect(socket_path)
+        except OSError:
+            ensure_daemon(socket_path)
+            try:
+                self._sock = self._connect(socket_path)
+            except OSError as e:
+                raise DaemonError(f'Execution daemon not reachable: {e}')
+        self._stream = self._sock.makefile('rwb')
+
+        reply = self._request({'op': 'prepare', 'code': code, 'language': language})
+        if reply.get('type') != 'prepared':
+            self.close()
+            raise DaemonError(f'Unexpected reply: {reply}')
+        self.error = reply.get('error')
+
+    @classmethod
+    def _connect(cls, socket_path):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(cls.CONNECT_TIMEOUT)
+            sock.connect(socket_path)
+            sock.settimeout(cls.REPLY_TIMEOUT)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    @property
+    def success(self):
+        """True if the program is ready to run"""
+        return self.error is None
+
+    def _read(self):
+        try:
+            line = self._stream.readline()
+        except OSError as e:
+            raise DaemonError(f'Execution daemon connection failed: {e}')
+        if not line:
+            raise DaemonError('Execution daemon closed the connection')
+        return json.loads(line)
+
+    def _request(self, message):
+        try:
+            _send(self._stream, message)
+        except OSError as e:
+            raise DaemonError(f'Execution daemon connection failed: {e}')
+        return self._read()
+
+    def _encode(self, values, workdir, kind):
+        """Program inputs -> protocol values, spilling byte inputs to files in workdir"""
+        encoded = []
+        for index, value in enumerate(values):
+            if isinstance(value, str):
+                encoded.append(value)
+            elif isinstance(value, InputFile) and WorkdirPool().contains(value.path):
+                encoded.append({'file': str(value.path)})
+            elif isinstance(value, InputFile):
+                # The daemon only reads files inside the workdir pool
+                target = workdir.path / f'{kind}-{index}'
+                try:
+                    os.link(value.path, target)
+                except OSError:
+                    shutil.copyfile(value.path, target)
+                encoded.append({'file': str(target)})
+            else:
+                encoded.append({'file': str(stage(value, workdir.path / f'{kind}-{index}'))})
+        return encoded
+
+    def iter_results(self, inputs, expected_outputs=None):
+        """
+        Run all inputs on the daemon, yielding results as they finish
+
+        Args:
+            inputs: List of program inputs (str, bytes or program_input.InputFile)
+            expected_outputs: Optional list of expected outputs (same order; str or bytes)
+
+        Yields:
+            tuple: (index, result dict as returned by PreparedProgram.run)
+
+        Raises:
+            DaemonError: If the connection fails
+        """
+        if not self.success:
+            for index in range(len(inputs)):
+                yield index, sandbox.error_result(self.error, sandbox.VERDICT_CE)
+            return
+
+        # Byte inputs stay bytes: written once to tmpfs, read by the child as stdin
+        workdir = WorkdirPool().acquire()
+        try:
+            message = self._request({
+                'op': 'run',
+                'inputs': self._encode(inputs, workdir, 'input'),
+                'expected_outputs': self._encode(expected_outputs, workdir, 'expected') if expected_outputs is not None else None,
+            })
+            while message.get('type') == 'result':
+                yield message['index'], message['result']
+                message = self._read()
+
+            if message.get('type') != 'done':
+                raise DaemonError(message.get('error') or f'Unexpected reply: {message}')
+        finally:
+            workdir.cleanup()
+
+    def run(self, input_data, expected_output=None):
+        """Run once (see PreparedProgram.run)"""
+        expected_outputs = [expected_output] if expected_output is not None else None
+        for _, result in self.iter_results([input_data], expected_outputs):
+            return result
+
+    def close(self):
+        """Close the connection (the daemon releases the program)"""
+        try:
+            self._stream.close()
+        except OSError:
+            pass
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
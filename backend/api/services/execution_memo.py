@@ -0,0 +1,140 @@
+"""Memoized code executions for identical resubmissions
+
+Pressing "run" again on unchanged code would queue another execute_code_task
+that runs every test case again. Instead, ExecuteCodeView keys each request by
+
+    sha256(code, language, problem, test set version, user, options)
+
+and keeps key -> Celery task id in the Django cache:
+
+- a repeated request gets the earlier task id back; its results are already
+  stored in the search history (dat.tid), so nothing is executed again
+- the key is claimed with cache.add() before the task is queued (under a
+  pre-generated task id), so concurrent identical requests share a single
+  in-flight execution (singleflight)
+
+The test set version (dat.tsv on the problem) is bumped by add_testcase and
+generate_outputs_task, which changes the key of every later request and so
+invalidates results computed against the old test cases. An execution that
+fails releases its key (forget()) so the next request runs again, and a key
+whose task the result backend reports as failed or revoked is reclaimed.
+
+The key must be visible to the web processes (claim) and the Celery workers
+(forget), so memoization is only enabled with a shared cache backend; with a
+per-process cache (LocMemCache, DummyCache) every request runs.
+"""
+import hashlib
+import json
+import logging
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'exec_memo'
+
+# Cache backends that are not shared between processes
+_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+_warned_local_cache = False
+
+
+def enabled():
+    """
+    Check whether executions are memoized
+
+    Returns:
+        bool: True if CODE_EXECUTION_MEMO_TTL > 0 and the default cache is shared
+    """
+    global _warned_local_cache
+
+    if getattr(settings, 'CODE_EXECUTION_MEMO_TTL', 600) <= 0:
+        return False
+
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend in _LOCAL_CACHE_BACKENDS:
+        if not _warned_local_cache:
+            logger.warning(f"[ExecutionMemo] Disabled: cache backend {backend} is not shared between processes")
+            _warned_local_cache = True
+        return False
+
+    return True
+
+
+def _failed(task_id):
+    """True if the result backend reports the task as failed or revoked"""
+    if not getattr(settings, 'CELERY_RESULT_BACKEND', None):
+        return False
+
+    from celery.result import AsyncResult
+    try:
+        return AsyncResult(task_id).state in ('FAILURE', 'REVOKED')
+    except Exception as e:
+        logger.warning(f"[ExecutionMemo] Could not read state of {task_id}: {e}")
+        return False
+
+
+def make_key(code, language, platform, problem_identifier, test_set_version, user, **options):
+    """
+    Build the memo key of an execution request
+
+    Args:
+        code: User's code
+        language: Programming language
+        platform: Platform name
+        problem_identifier: Problem identifier on platform
+        test_set_version: Problem's test set version (dat.tsv)
+        user: User ID or identifier (results and history are per user)
+        **options: Other task arguments that change the results (e.g. fail_fast)
+
+    Returns:
+        str: Cache key
+    """
+    payload = json.dumps(
+        [code, language, platform, problem_identifier, int(test_set_version or 0), str(user), options],
+        sort_keys=True
+    )
+    return f"{KEY_PREFIX}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def claim(key):
+    """
+    Get the task id for an execution request, claiming the key if it is new
+
+    Returns:
+        tuple: (task_id, is_new) - when is_new is True the caller must queue the
+               task under task_id; otherwise task_id is the earlier (possibly
+               still running) execution of the same request
+    """
+    task_id = str(uuid.uuid4())
+    if not enabled():
+        return task_id, True
+    ttl = settings.CODE_EXECUTION_MEMO_TTL
+
+    if cache.add(key, task_id, ttl):
+        return task_id, True
+
+    existing = cache.get(key)
+    if existing is None:
+        # Expired between add() and get()
+        cache.set(key, task_id, ttl)
+        return task_id, True
+
+    if _failed(existing):
+        # The worker could not release the key (e.g. it was killed)
+        logger.info(f"[ExecutionMemo] Earlier execution {existing} failed, running again")
+        cache.set(key, task_id, ttl)
+        return task_id, True
+
+    logger.info(f"[ExecutionMemo] Reusing execution {existing}")
+    return existing, False
+
+
+def forget(key, task_id):
+    """Release a key claimed by task_id (failed execution), unless it was reclaimed"""
+    if key and enabled() and cache.get(key) == task_id:
+        cache.delete(key)
@@ -1132,6 +1132,8 @@ Your code MUST have ZERO undefined names or it will be rejected:"""
         import tempfile
         import subprocess
         import os
+        from .artifact_cache import ArtifactCache
+        from .cpp_toolchain import CppToolchain
 
         try:
             # Create temp directory for compilation
@@ -1139,30 +1141,30 @@ Your code MUST have ZERO undefined names or it will be rejected:"""
                 source_file = os.path.join(tmpdir, 'solution.cpp')
                 binary_file = os.path.join(tmpdir, 'solution')
 
-                # Write C++ code to file
-                with open(source_file, 'w', encoding='utf-8') as f:
-                    f.write(solution_code)
-
-                # Compile C++ code
-                compile_cmd = [
-                    'g++',
-                    '-std=c++17',
-                    '-O2',
-                    '-Wall',
-                    source_file,
-                    '-o',
-                    binary_file
-                ]
-
-                compile_result = subprocess.run(
-                    compile_cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+                # Reuse a previously compiled binary if available
+                toolchain = CppToolchain()
+                cache = ArtifactCache()
+                cache_key = cache.make_key(solution_code, 'cpp', toolchain.flags('validate'), 'g++')
+
+                if not cache.fetch(cache_key, tmpdir):
+                    # Write C++ code to file
+                    with open(source_file, 'w', encoding='utf-8') as f:
+                        f.write(solution_code)
+
+                    # Compile C++ code
+                    compile_cmd = toolchain.compile_command(source_file, binary_file, profile='validate')
+
+                    compile_result = subprocess.run(
+                        compile_cmd,
+                        capture_output=True,
+                        text=True,
+                        timeout=10
+                    )
+
+                    if compile_result.returncode != 0:
+                        return False, f"Compilation error: {compile_result.stderr}"
 
-                if compile_result.returncode != 0:
-                    return False, f"Compilation error: {compile_result.stderr}"
+                    cache.store(cache_key, [binary_file])
 
                 # Test each sample
                 for idx, sample in enumerate(samples, 1):
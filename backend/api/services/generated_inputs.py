@@ -0,0 +1,247 @@
+"""Host-local cache of test inputs regenerated from their generator
+
+Large generated inputs used to be pushed to S3 and downloaded on every
+execution, although each one is fully determined by (generator code,
+size, seed) since generation is seeded (see generator_worker). With
+TEST_CASE_LAZY_INPUTS, ProblemRepository.add_testcase stores such a test
+case, once regenerating it reproduced the input byte for byte (see
+GeneratedInputCache.verify; inputs that do not reproduce go to S3), as a
+TC# item with storage 'generated' that holds only
+
+    gen  sha256 of the generator code (the code itself is a GEN#<hash> item)
+    sed  seed
+    dif  size / difficulty
+    ihs  sha256 of the input bytes
+    isz  input size in bytes
+    out  expected output (inline) and ohs, its sha256
+
+get_testcases() then asks this cache for the inputs. Cached inputs are files
+
+    TEST_CASE_INPUT_CACHE_DIR/<input sha256>
+
+that executors take as program_input.InputFile (no copy into memory).
+Missing inputs are regenerated with a GeneratorPool and only kept if their
+hash matches ihs byte for byte; a generator that no longer reproduces its
+inputs makes get_testcases() raise GeneratedInputError, so executions fail
+instead of silently running fewer test cases. Least recently used files are
+removed once the cache grows past TEST_CASE_INPUT_CACHE_MB.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from .generator_worker import GeneratorPool, GeneratorError
+from .program_input import InputFile, to_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class GeneratedInputError(Exception):
+    """Raised when test case inputs stored by seed cannot be reproduced"""
+
+
+def content_hash(data):
+    """sha256 hex digest of a str or bytes-like value (generator code, inputs, outputs)"""
+    return hashlib.sha256(to_bytes(data)).hexdigest()
+
+
+class GeneratedInputCache:
+    """
+    Content-addressed file cache of generated test inputs (one per process)
+
+    Usage:
+        cache = GeneratedInputCache()
+        inputs = cache.regenerate(generator_code, [(size, seed, input_hash), ...])
+        # inputs: {input_hash: InputFile} for every input that is now cached
+    """
+
+    _instance = None
+    _initialized = False
+
+    # Files used within this many seconds are never evicted (a run may be about to open them)
+    EVICT_MIN_AGE = 300
+
+    def __new__(cls):
+        """Singleton pattern"""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """Create the cache directory"""
+        if self.__class__._initialized:
+            return
+
+        self.root = Path(getattr(settings, 'TEST_CASE_INPUT_CACHE_DIR', '/tmp/algoitny-inputs'))
+        self.max_bytes = getattr(settings, 'TEST_CASE_INPUT_CACHE_MB', 2048) * 1024 * 1024
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self.__class__._initialized = True
+
+    def _path(self, input_hash):
+        return self.root / input_hash
+
+    def get(self, input_hash):
+        """
+        Get a cached input
+
+        Args:
+            input_hash: sha256 hex digest of the input
+
+        Returns:
+            InputFile, or None if the input is not cached
+        """
+        path = self._path(input_hash)
+        try:
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            return None
+        return InputFile(path)
+
+    def put(self, input_data, input_hash=None):
+        """
+        Store an input
+
+        Args:
+            input_data: str or bytes-like input
+            input_hash: Expected sha256 hex digest (computed if None)
+
+        Returns:
+            InputFile, or None if input_hash does not match the data
+        """
+        data = to_bytes(input_data)
+        actual_hash = content_hash(data)
+        if input_hash is not None and actual_hash != input_hash:
+            return None
+
+        # Write under a temporary name so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(actual_hash))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        self._evict()
+        return InputFile(self._path(actual_hash))
+
+    def regenerate(self, generator_code, cases):
+        """
+        Make sure generated inputs are cached, regenerating the missing ones
+
+        Args:
+            generator_code: Generator code the inputs were generated with
+            cases: List of (size, seed, input_hash) tuples
+
+        Returns:
+            dict: {input_hash: InputFile}; inputs that could not be reproduced
+                  (generator error or hash mismatch) are missing
+        """
+        inputs = {}
+        missing = {}
+        for size, seed, input_hash in cases:
+            cached = self.get(input_hash)
+            if cached is not None:
+                inputs[input_hash] = cached
+            else:
+                missing.setdefault(input_hash, (size, seed, input_hash))
+        missing = list(missing.values())
+
+        if not missing:
+            return inputs
+
+        started = time.monotonic()
+        try:
+            with GeneratorPool(generator_code, workers=min(len(missing), len(os.sched_getaffinity(0)))) as pool:
+                generated = pool.imap([(size, seed) for size, seed, _ in missing])
+                for index, test_case in generated:
+                    size, seed, input_hash = missing[index]
+                    cached = self.put(test_case, input_hash)
+                    if cached is None:
+                        logger.error(
+                            f"[GeneratedInputCache] Regenerated input (size={size}, seed={seed}) "
+                            f"does not match {input_hash[:12]}; skipping it"
+                        )
+                        continue
+                    inputs[input_hash] = cached
+        except GeneratorError as e:
+            logger.error(f"[GeneratedInputCache] Failed to regenerate inputs: {e}")
+
+        logger.info(
+            f"[GeneratedInputCache] Regenerated {len(missing)} inputs "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        return inputs
+
+    def verify(self, generator_code, cases):
+        """
+        Regenerate inputs and compare them with the inputs they are meant to reproduce
+
+        Args:
+            generator_code: Generator code the inputs were generated with
+            cases: List of (size, seed, input) tuples; input is str or bytes-like
+
+        Returns:
+            list: One bool per case, True if the generator reproduced the input
+                  byte for byte
+        """
+        reproduced = [False] * len(cases)
+        if not cases:
+            return reproduced
+
+        try:
+            with GeneratorPool(generator_code, workers=min(len(cases), len(os.sched_getaffinity(0)))) as pool:
+                generated = pool.imap([(size, seed) for size, seed, _ in cases])
+                for index, test_case in generated:
+                    size, seed, input_data = cases[index]
+                    reproduced[index] = content_hash(test_case) == content_hash(input_data)
+                    if not reproduced[index]:
+                        logger.warning(
+                            f"[GeneratedInputCache] Generator does not reproduce input "
+                            f"(size={size}, seed={seed})"
+                        )
+        except GeneratorError as e:
+            logger.error(f"[GeneratedInputCache] Failed to verify inputs: {e}")
+
+        return reproduced
+
+    def _evict(self):
+        """Remove least recently used inputs while the cache is over TEST_CASE_INPUT_CACHE_MB"""
+        if not self.max_bytes:
+            return
+
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.root):
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            cutoff = time.time() - self.EVICT_MIN_AGE
+            for mtime, file_size, path in sorted(entries):
+                if total <= self.max_bytes or mtime > cutoff:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= file_size
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,402 @@
+"""Persistent worker process for test case generator code
+
+execute_test_cases_task used to start `python -c <wrapper>` for every test
+case, paying interpreter startup, module imports and the generator's own
+module-level code each time. A GeneratorWorker instead starts one Python
+process that executes the generator code once and then answers
+`generate_test_cases(1, size=...)` requests over a pipe. Generation still
+runs outside the Celery worker (memory isolation), and the process is
+recycled (restarted before the next case) after
+TEST_CASE_GENERATOR_MAX_CASES cases or once its peak RSS passes
+TEST_CASE_GENERATOR_MAX_RSS_MB.
+
+Every case can carry an explicit seed: the worker calls random.seed(seed)
+right before generate_test_cases(1, ...), so a case depends only on
+(generator code, size, seed) and not on which process generated it or what
+ran there before. GeneratorPool fans cases out over several workers.
+
+To keep that guarantee across processes, workers run with a fixed
+PYTHONHASHSEED (set and str-key ordering), random.Random() instances created
+without a seed are seeded from the per-case random state, random.seed()
+without an argument keeps the per-case seed instead of reseeding from the
+OS, and generators that import or call randomness the worker cannot seed
+(SystemRandom, os.urandom, secrets, uuid1/uuid4) are rejected.
+
+This module is also the worker's entry point, so it must only import the
+standard library at module level:
+
+    python3 generator_worker.py
+
+Protocol (JSON lines; the generator's own prints go to stderr):
+    parent -> worker  {"code": str}                     (once)
+    worker -> parent  {"ready": true} | {"error": str}
+    parent -> worker  {"size": str, "seed": int or null}
+    worker -> parent  {"test_case": str, "peak_rss_kb": int} | {"error": str, "peak_rss_kb": int}
+"""
+import ast
+import json
+import os
+import queue
+import random
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Fixed hash seed of every worker process (see module docstring)
+HASH_SEED = '0'
+
+# Randomness sources the worker cannot make depend on the case seed: {module: names}
+# (None = the whole module)
+_UNSEEDED_RANDOMNESS = {
+    'random': {'SystemRandom'},
+    'os': {'urandom', 'getrandom'},
+    'uuid': {'uuid1', 'uuid4'},
+    'secrets': None,
+}
+
+
+class GeneratorError(Exception):
+    """Raised when the generator fails, times out or its worker dies"""
+
+
+def new_base_seed():
+    """Random base seed for a generation run (case i uses base_seed + i)"""
+    return random.SystemRandom().randrange(2 ** 31)
+
+
+class GeneratorWorker:
+    """
+    Parent-side handle for a generator worker process
+
+    Usage:
+        with GeneratorWorker(generator_code) as worker:
+            for size in difficulties:
+                test_case = worker.generate(size)
+
+    Not thread-safe: one request at a time.
+    """
+
+    STARTUP_TIMEOUT = 30  # seconds to import and run the generator's module code
+
+    def __init__(self, generator_code, timeout=None, max_cases=None, max_rss_mb=None):
+        """
+        Args:
+            generator_code: Python code defining generate_test_cases(n, size=...)
+            timeout: Seconds per test case (default: TEST_CASE_GENERATOR_TIMEOUT)
+            max_cases: Recycle after this many cases (default: TEST_CASE_GENERATOR_MAX_CASES)
+            max_rss_mb: Recycle once peak RSS exceeds this (default: TEST_CASE_GENERATOR_MAX_RSS_MB)
+        """
+        # Not at module level: the worker process imports only the standard library
+        from django.conf import settings
+
+        self.generator_code = generator_code
+        self.timeout = timeout or getattr(settings, 'TEST_CASE_GENERATOR_TIMEOUT', 60)
+        self.max_cases = max_cases or getattr(settings, 'TEST_CASE_GENERATOR_MAX_CASES', 50)
+        self.max_rss_kb = (max_rss_mb or getattr(settings, 'TEST_CASE_GENERATOR_MAX_RSS_MB', 512)) * 1024
+
+        self.cases = 0  # served by the current process
+        self.processes = 0  # started so far (1 + recycles)
+        self._process = None
+        self._messages = None
+
+    def _start(self):
+        self._messages = queue.Queue()
+        self._process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env={**os.environ, 'PYTHONHASHSEED': HASH_SEED}
+        )
+        threading.Thread(target=self._read_loop, args=(self._process, self._messages), daemon=True).start()
+        self.cases = 0
+        self.processes += 1
+
+        reply = self._request({'code': self.generator_code}, self.STARTUP_TIMEOUT)
+        if 'error' in reply:
+            self.close()
+            raise GeneratorError(reply['error'])
+
+    @staticmethod
+    def _read_loop(process, messages):
+        for line in process.stdout:
+            try:
+                messages.put(json.loads(line))
+            except ValueError:
+                continue
+        messages.put(None)  # EOF: the worker exited
+
+    def _request(self, message, timeout):
+        process = self._process
+        try:
+            process.stdin.write((json.dumps(message) + '\n').encode())
+            process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            self.close()
+            raise GeneratorError(f'Generator worker is not running: {e}')
+
+        try:
+            reply = self._messages.get(timeout=timeout)
+        except queue.Empty:
+            self.close()
+            raise GeneratorError(f'Generator timed out after {timeout}s')
+        if reply is None:
+            returncode = process.wait()
+            self.close()
+            raise GeneratorError(f'Generator worker exited with code {returncode}')
+        return reply
+
+    def generate(self, size='mixed', seed=None):
+        """
+        Generate one test case
+
+        Args:
+            size: Difficulty passed as generate_test_cases(1, size=size)
+            seed: random.seed() value for this case (None = keep the current state)
+
+        Returns:
+            str: Test case input
+
+        Raises:
+            GeneratorError: On generator errors, timeouts or a dead worker
+                            (the next call starts a fresh worker)
+        """
+        if self._process is None:
+            self._start()
+
+        reply = self._request({'size': size, 'seed': seed}, self.timeout)
+        self.cases += 1
+        if self.cases >= self.max_cases or reply.get('peak_rss_kb', 0) > self.max_rss_kb:
+            self.close()
+
+        if 'error' in reply:
+            raise GeneratorError(reply['error'])
+        return reply['test_case']
+
+    def close(self):
+        """Stop the worker process"""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class GeneratorPool:
+    """
+    Several GeneratorWorkers generating seeded cases in parallel
+
+    Usage:
+        with GeneratorPool(generator_code) as pool:
+            for index, test_case in pool.imap([('small', seed), ('large', seed + 1)]):
+                ...
+    """
+
+    def __init__(self, generator_code, workers=None, **worker_options):
+        """
+        Args:
+            generator_code: Python code defining generate_test_cases(n, size=...)
+            workers: Worker processes (default: TEST_CASE_GENERATOR_WORKERS, 0 = CPU cores)
+            **worker_options: Passed to GeneratorWorker (timeout, max_cases, max_rss_mb)
+        """
+        from django.conf import settings
+
+        if workers is None:
+            workers = getattr(settings, 'TEST_CASE_GENERATOR_WORKERS', 0)
+        self.workers = max(1, workers or len(os.sched_getaffinity(0)))
+        self.generator_code = generator_code
+        self.worker_options = worker_options
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='generator')
+        self._idle = queue.Queue()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _generate(self, size, seed):
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            worker = GeneratorWorker(self.generator_code, **self.worker_options)
+            with self._lock:
+                self._all.append(worker)
+        try:
+            return worker.generate(size, seed)
+        finally:
+            self._idle.put(worker)
+
+    def imap(self, cases):
+        """
+        Generate cases in parallel, yielding them in order
+
+        Args:
+            cases: List of (size, seed) tuples
+
+        Yields:
+            tuple: (index, test case str)
+
+        Raises:
+            GeneratorError: For the first failing case (in order)
+        """
+        futures = [self._executor.submit(self._generate, size, seed) for size, seed in cases]
+        try:
+            for index, future in enumerate(futures):
+                yield index, future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _close_workers(self):
+        with self._lock:
+            workers, self._all = self._all, []
+        for worker in workers:
+            worker.close()
+
+    def close(self):
+        """Stop all worker processes (cases still running fail)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._close_workers()
+        self._executor.shutdown(wait=True)
+        # Workers started by cases that were already running
+        self._close_workers()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# ============================================================================
+# Worker process (runs under `python3 generator_worker.py`)
+# ============================================================================
+
+def _unseeded_randomness(code):
+    """
+    Find an import or use of randomness the worker cannot seed
+
+    Only real imports and module attribute accesses count, so the names in
+    comments, strings or local variables do not.
+
+    Args:
+        code: Generator code
+
+    Returns:
+        str: The offending name (e.g. 'os.urandom'), or None
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None  # Reported when the code is executed
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                module = alias.name.split('.')[0]
+                if module in _UNSEEDED_RANDOMNESS and _UNSEEDED_RANDOMNESS[module] is None:
+                    return module
+        elif isinstance(node, ast.ImportFrom) and node.module in _UNSEEDED_RANDOMNESS:
+            names = _UNSEEDED_RANDOMNESS[node.module]
+            for alias in node.names:
+                if names is None or alias.name in names:
+                    return f'{node.module}.{alias.name}'
+        elif isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+            names = _UNSEEDED_RANDOMNESS.get(node.value.id)
+            if names is not None and node.attr in names:
+                return f'{node.value.id}.{node.attr}'
+    return None
+
+
+def _make_seeding_deterministic():
+    """
+    Tie every random source of the generator to the per-case random.seed()
+
+    - random.Random() without a seed is seeded from the global random state
+    - random.seed() without a seed (reseed from the OS) is a no-op, so
+      generators that call it keep the per-case seed
+    """
+    global_seed = random.seed
+
+    class SeededRandom(random.Random):
+        def __init__(self, x=None):
+            super().__init__(random.getrandbits(64) if x is None else x)
+
+    def seed(a=None, *args, **kwargs):
+        if a is None:
+            return
+        global_seed(a, *args, **kwargs)
+
+    random.Random = SeededRandom
+    random.seed = seed
+
+
+def _serve():
+    import resource
+
+    # Private protocol channel; fd 1 (print) goes to stderr
+    channel = os.fdopen(os.dup(1), 'w', buffering=1)
+    os.dup2(2, 1)
+    sys.stdout = sys.__stdout__ = open(1, 'w', buffering=1, closefd=False)
+
+    def send(message):
+        message['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        channel.write(json.dumps(message) + '\n')
+
+    import inspect
+    namespace = {'__name__': '__generator__'}
+    generate = None
+    takes_size = False
+
+    for line in sys.stdin:
+        request = json.loads(line)
+
+        if 'code' in request:
+            unseeded = _unseeded_randomness(request['code'])
+            if unseeded:
+                send({'error': f'Generator uses unseeded randomness ({unseeded}); use the random module'})
+                continue
+            try:
+                _make_seeding_deterministic()
+                # Same modules the per-case wrapper script used to import
+                exec('import json, sys, random, math, string, itertools, collections', namespace)
+                exec(request['code'], namespace)
+                generate = namespace.get('generate_test_cases')
+                if generate is None:
+                    send({'error': 'generate_test_cases function not found'})
+                    continue
+                takes_size = 'size' in inspect.signature(generate).parameters
+                send({'ready': True})
+            except Exception as e:
+                send({'error': f'{type(e).__name__}: {e}'})
+            continue
+
+        try:
+            if request.get('seed') is not None:
+                random.seed(request['seed'])
+            result = generate(1, size=request['size']) if takes_size else generate(1)
+            if not isinstance(result, list) or len(result) == 0:
+                send({'error': 'generate_test_cases(1) must return a list with 1 element'})
+            elif not isinstance(result[0], str):
+                send({'error': f'Test case is not a string: {type(result[0])}'})
+            else:
+                send({'test_case': result[0]})
+        except Exception as e:
+            send({'error': str(e)})
+
+
+if __name__ == '__main__':
+    _serve()
@@ -0,0 +1,279 @@
+import java.io.BufferedInputStream;
+import java.io.BufferedOutputStream;
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileInputStream;
+import java.io.FileOutputStream;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.io.IOException;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.lang.management.ManagementFactory;
+import java.lang.management.ThreadMXBean;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.lang.reflect.Modifier;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.util.HashMap;
+import java.util.HashSet;
+import java.util.Locale;
+import java.util.Map;
+import java.util.Objects;
+import java.util.Properties;
+import java.util.Set;
+import java.util.TimeZone;
+
+/**
+ * Warm JVM worker used by api/services/jvm_pool.py.
+ *
+ * Runs compiled submissions one at a time, each in a fresh URLClassLoader so
+ * static state never leaks between runs, with System.in/out/err redirected
+ * to per-run files.
+ *
+ * Control protocol (tab-separated lines over stdin/stdout):
+ *   worker -> parent  READY
+ *   parent -> worker  RUN id classDir className cpuLimitMs outputLimitBytes stdinPath stdoutPath stderrPath
+ *   worker -> parent  DONE id exitCode cpuMs [RECYCLE]
+ *
+ * CPU time is summed over the submission's main thread and every thread it
+ * started. On a CPU-limit overrun the worker reports exit code "TLE" and
+ * halts; once stdout reaches outputLimitBytes it reports "OLE" and halts. If
+ * the submission calls System.exit the JVM exits with that code; the shutdown
+ * hook flushes its output first. RECYCLE means the submission left threads
+ * running or changed JVM-wide state (system properties, default locale or
+ * time zone, default uncaught exception handler) that the next submission
+ * would otherwise inherit, so the worker exits after replying.
+ */
+public class WarmJvmRunner {
+
+    private static volatile PrintStream currentOut;
+    private static volatile PrintStream currentErr;
+    private static volatile String currentRunId;
+    private static PrintStream reply;
+
+    public static void main(String[] args) throws Exception {
+        BufferedReader control = new BufferedReader(
+            new InputStreamReader(new FileInputStream(FileDescriptor.in), StandardCharsets.UTF_8));
+        reply = new PrintStream(
+            new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        ThreadMXBean threadBean = ManagementFactory.getThreadMXBean();
+
+        Runtime.getRuntime().addShutdownHook(new Thread(WarmJvmRunner::flushCurrent));
+
+        reply.println("READY");
+
+        String line;
+        while ((line = control.readLine()) != null) {
+            String[] fields = line.split("\t");
+            if (fields.length != 9 || !"RUN".equals(fields[0])) {
+                continue;
+            }
+
+            String runId = fields[1];
+            boolean recycle = runOnce(
+                fields[2], fields[3], Long.parseLong(fields[4]), Long.parseLong(fields[5]),
+                fields[6], fields[7], fields[8], runId, threadBean);
+            if (recycle) {
+                return;
+            }
+        }
+    }
+
+    private static boolean runOnce(String classDir, String className, long cpuLimitMs,
+                                   long outputLimitBytes, String stdinPath, String stdoutPath,
+                                   String stderrPath, String runId, ThreadMXBean threadBean)
+            throws Exception {
+        Set<Thread> before = new HashSet<>(Thread.getAllStackTraces().keySet());
+        Set<Long> beforeIds = new HashSet<>();
+        for (Thread thread : before) {
+            beforeIds.add(thread.getId());
+        }
+        GlobalState globalState = new GlobalState();
+
+        InputStream in = new BufferedInputStream(new FileInputStream(stdinPath));
+        OutputStream stdout = new FileOutputStream(stdoutPath);
+        if (outputLimitBytes > 0) {
+            stdout = new LimitedOutputStream(stdout, outputLimitBytes);
+        }
+        PrintStream out = new PrintStream(
+            new BufferedOutputStream(stdout, 1 << 16), false, "UTF-8");
+        PrintStream err = new PrintStream(
+            new BufferedOutputStream(new FileOutputStream(stderrPath)), false, "UTF-8");
+        currentOut = out;
+        currentErr = err;
+        currentRunId = runId;
+        System.setIn(in);
+        System.setOut(out);
+        System.setErr(err);
+
+        // Parent is the platform loader, so the submission cannot see this class
+        URLClassLoader loader = new URLClassLoader(
+            new URL[] {new File(classDir).toURI().toURL()},
+            ClassLoader.getSystemClassLoader().getParent());
+
+        int[] exitCode = {0};
+        Thread main = new Thread(() -> {
+            try {
+                Method entry = loader.loadClass(className).getMethod("main", String[].class);
+                if (!Modifier.isStatic(entry.getModifiers())) {
+                    throw new NoSuchMethodException("main is not static");
+                }
+                entry.invoke(null, (Object) new String[0]);
+            } catch (InvocationTargetException e) {
+                System.err.print("Exception in thread \"main\" ");
+                e.getCause().printStackTrace();
+                exitCode[0] = 1;
+            } catch (Throwable e) {
+                System.err.println("Error: " + e);
+                exitCode[0] = 1;
+            }
+        }, "main");
+        main.setContextClassLoader(loader);
+        main.start();
+
+        long cpuLimitNs = cpuLimitMs * 1_000_000L;
+        Map<Long, Long> threadCpuNs = new HashMap<>();
+        while (main.isAlive()) {
+            main.join(10);
+            long cpuNs = submissionCpuNs(threadBean, beforeIds, threadCpuNs);
+            if (cpuNs > cpuLimitNs) {
+                halt("TLE\t" + cpuNs / 1_000_000L);
+            }
+        }
+
+        // Like JVM exit, wait for non-daemon threads the submission started
+        boolean leaked = false;
+        for (Thread thread : Thread.getAllStackTraces().keySet()) {
+            if (before.contains(thread) || thread == main || !thread.isAlive()) {
+                continue;
+            }
+            if (!thread.isDaemon()) {
+                thread.join(Math.max(1, cpuLimitMs));
+            }
+            leaked |= thread.isAlive();
+        }
+        long cpuMs = submissionCpuNs(threadBean, beforeIds, threadCpuNs) / 1_000_000L;
+
+        flushCurrent();
+        currentOut = null;
+        currentErr = null;
+        currentRunId = null;
+        in.close();
+        out.close();
+        err.close();
+        loader.close();
+
+        boolean recycle = leaked || globalState.changed();
+        reply.println("DONE\t" + runId + "\t" + exitCode[0] + "\t" + cpuMs + (recycle ? "\tRECYCLE" : ""));
+        return recycle;
+    }
+
+    /**
+     * CPU time of every thread that did not exist before the run (main and
+     * anything it started). Threads that already finished keep the last
+     * value observed for them.
+     */
+    private static long submissionCpuNs(ThreadMXBean threadBean, Set<Long> beforeIds,
+                                        Map<Long, Long> threadCpuNs) {
+        for (long id : threadBean.getAllThreadIds()) {
+            if (beforeIds.contains(id)) {
+                continue;
+            }
+            long cpuNs = threadBean.getThreadCpuTime(id);
+            if (cpuNs > 0) {
+                threadCpuNs.merge(id, cpuNs, Math::max);
+            }
+        }
+        long total = 0;
+        for (long cpuNs : threadCpuNs.values()) {
+            total += cpuNs;
+        }
+        return total;
+    }
+
+    /** Flush the run's output, report a limit verdict and stop the JVM */
+    private static void halt(String verdict) {
+        flushCurrent();
+        reply.println("DONE\t" + currentRunId + "\t" + verdict);
+        Runtime.getRuntime().halt(0);
+    }
+
+    /** stdout wrapper that stops the run once it has written the output limit */
+    private static final class LimitedOutputStream extends OutputStream {
+        private final OutputStream target;
+        private final long limit;
+        private long written;
+
+        LimitedOutputStream(OutputStream target, long limit) {
+            this.target = target;
+            this.limit = limit;
+        }
+
+        @Override
+        public void write(int b) throws IOException {
+            write(new byte[] {(byte) b}, 0, 1);
+        }
+
+        @Override
+        public synchronized void write(byte[] b, int off, int len) throws IOException {
+            if (written >= limit) {
+                // Re-entered from halt()'s flush; the limit was already reported
+                return;
+            }
+            long room = limit - written;
+            if (len < room) {
+                target.write(b, off, len);
+                written += len;
+                return;
+            }
+            target.write(b, off, (int) room);
+            target.flush();
+            written = limit;
+            halt("OLE\t0");
+        }
+
+        @Override
+        public void flush() throws IOException {
+            target.flush();
+        }
+
+        @Override
+        public void close() throws IOException {
+            target.close();
+        }
+    }
+
+    /** Snapshot of JVM-wide state a submission can change for later runs */
+    private static final class GlobalState {
+        private final Properties properties = (Properties) System.getProperties().clone();
+        private final Locale locale = Locale.getDefault();
+        private final Locale displayLocale = Locale.getDefault(Locale.Category.DISPLAY);
+        private final Locale formatLocale = Locale.getDefault(Locale.Category.FORMAT);
+        private final TimeZone timeZone = TimeZone.getDefault();
+        private final Thread.UncaughtExceptionHandler handler = Thread.getDefaultUncaughtExceptionHandler();
+
+        boolean changed() {
+            return !properties.equals(System.getProperties())
+                || !locale.equals(Locale.getDefault())
+                || !displayLocale.equals(Locale.getDefault(Locale.Category.DISPLAY))
+                || !formatLocale.equals(Locale.getDefault(Locale.Category.FORMAT))
+                || !timeZone.equals(TimeZone.getDefault())
+                || !Objects.equals(handler, Thread.getDefaultUncaughtExceptionHandler());
+        }
+    }
+
+    private static void flushCurrent() {
+        PrintStream out = currentOut;
+        PrintStream err = currentErr;
+        if (out != null) {
+            out.flush();
+        }
+        if (err != null) {
+            err.flush();
+        }
+    }
+}
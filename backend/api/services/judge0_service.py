@@ -1,7 +1,52 @@
-"""Judge0 API Service for code execution"""
+"""Judge0 API Service for code execution
+
+Test cases are sent through Judge0's batch API: one POST /submissions/batch
+per JUDGE0_BATCH_SIZE inputs, then GET /submissions/batch polls all tokens
+(with exponential backoff) until every submission has finished. Requests go
+through one keep-alive requests.Session per process, so connections (and
+TLS sessions) are reused across submissions.
+"""
+import logging
+import os
+import threading
 import requests
 import time
+from requests.adapters import HTTPAdapter
 from django.conf import settings
+from . import program_input
+
+logger = logging.getLogger(__name__)
+
+# Judge0 status ids of submissions that have not finished yet
+PENDING_STATUS_IDS = (1, 2)  # In Queue, Processing
+
+# Fields requested when polling (everything _parse_result reads)
+RESULT_FIELDS = 'token,stdout,stderr,compile_output,status,time,memory'
+
+# Per-process HTTP session, see _get_session()
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    """
+    Get this process's keep-alive HTTP session, creating it if needed
+
+    Returns:
+        requests.Session
+    """
+    global _session, _session_pid
+
+    with _session_lock:
+        # A forked worker must not share its parent's sockets
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
 
 
 class Judge0Service:
@@ -15,7 +60,25 @@ class Judge0Service:
         'java': 62,  # Java (OpenJDK 13.0.1)
     }
 
+    # Judge0 status description -> local executor verdict (see sandbox.py)
+    STATUS_VERDICTS = {
+        'Accepted': 'OK',
+        'Time Limit Exceeded': 'TLE',
+        'Compilation Error': 'CE',
+    }
+
+    # Max submissions per batch request (Judge0 MAX_SUBMISSION_BATCH_SIZE)
+    BATCH_SIZE = 20
+
+    # Polling backoff (seconds)
+    POLL_INITIAL_DELAY = 0.1
+    POLL_MAX_DELAY = 2.0
+
+    REQUEST_TIMEOUT = 30  # seconds, per HTTP request
+
     def __init__(self):
+        self.batch_size = max(1, min(getattr(settings, 'JUDGE0_BATCH_SIZE', self.BATCH_SIZE), self.BATCH_SIZE))
+        self.poll_timeout = getattr(settings, 'JUDGE0_POLL_TIMEOUT', 120)
         self.api_url = settings.JUDGE0_API_URL
         self.api_key = settings.JUDGE0_API_KEY
         self.headers = {
@@ -64,18 +127,21 @@ class Judge0Service:
 
         # Submit code
         submit_url = f"{self.api_url}/submissions?base64_encoded=false&wait=true"
-        response = requests.post(
+        response = _get_session().post(
             submit_url,
             json=submission_data,
-            headers=self.headers
+            headers=self.headers,
+            timeout=self.REQUEST_TIMEOUT
         )
 
         if not response.ok:
             raise Exception(f'Judge0 API error: {response.status_code} - {response.text}')
 
-        result = response.json()
+        return self._parse_result(response.json())
 
-        # Parse result
+    @staticmethod
+    def _parse_result(result):
+        """Normalize a Judge0 submission (see execute_code for the format)"""
         return {
             'stdout': (result.get('stdout') or '').strip(),
             'stderr': (result.get('stderr') or '').strip(),
@@ -85,6 +151,16 @@ class Judge0Service:
             'memory': int(result.get('memory') or 0),
         }
 
+    @classmethod
+    def _resource_fields(cls, result):
+        """Map a Judge0 result to verdict/resource fields of a per-test result"""
+        return {
+            'verdict': cls.STATUS_VERDICTS.get(result['status'], 'RE'),
+            'cpu_ms': int(result['time'] * 1000),
+            'wall_ms': None,
+            'peak_rss_kb': result['memory'] or None,
+        }
+
     def execute_with_test_cases(self, code, language, test_inputs):
         """
         Execute code with multiple test case inputs
@@ -102,38 +178,143 @@ class Judge0Service:
                         'output': str,
                         'error': str or None,
                         'status': str,
+                        'verdict': str,  # OK / RE / TLE / CE
+                        'cpu_ms': int,
+                        'wall_ms': None,
+                        'peak_rss_kb': int,
                     },
                     ...
                 ]
         """
-        results = []
+        try:
+            batch = self.execute_batch(code, language, test_inputs)
+        except Exception as e:
+            logger.error(f"[Judge0Service] Batch execution failed: {e}")
+            return [
+                {'input': test_input, 'output': '', 'error': str(e), 'status': 'error'}
+                for test_input in test_inputs
+            ]
 
-        for test_input in test_inputs:
-            try:
-                result = self.execute_code(code, language, stdin=test_input)
-
-                if result['status'] == 'Accepted':
-                    results.append({
-                        'input': test_input,
-                        'output': result['stdout'],
-                        'error': None,
-                        'status': 'success',
-                    })
-                else:
-                    error_msg = result['stderr'] or result['compile_output'] or result['status']
-                    results.append({
-                        'input': test_input,
-                        'output': result['stdout'],
-                        'error': error_msg,
-                        'status': 'error',
-                    })
-
-            except Exception as e:
+        results = []
+        for test_input, result in zip(test_inputs, batch):
+            if isinstance(result, Exception):
                 results.append({
                     'input': test_input,
                     'output': '',
-                    'error': str(e),
+                    'error': str(result),
+                    'status': 'error',
+                })
+            elif result['status'] == 'Accepted':
+                results.append({
+                    'input': test_input,
+                    'output': result['stdout'],
+                    'error': None,
+                    'status': 'success',
+                    **self._resource_fields(result),
+                })
+            else:
+                error_msg = result['stderr'] or result['compile_output'] or result['status']
+                results.append({
+                    'input': test_input,
+                    'output': result['stdout'],
+                    'error': error_msg,
                     'status': 'error',
+                    **self._resource_fields(result),
                 })
 
         return results
+
+    def execute_batch(self, code, language, test_inputs, timeout=None):
+        """
+        Execute code against all inputs with batch submissions
+
+        All batches are submitted first, then every pending token is polled
+        together, so the whole run costs about two HTTP round trips per
+        BATCH_SIZE inputs instead of one blocking request per input.
+
+        Args:
+            code: Source code to execute
+            language: Programming language (python, javascript, cpp, java)
+            test_inputs: List of input strings
+            timeout: CPU time limit in seconds (default: CODE_EXECUTION_TIMEOUT)
+
+        Returns:
+            list: One entry per input, in order: a dict as returned by
+                  execute_code, or an Exception for a submission that was
+                  rejected or did not finish within JUDGE0_POLL_TIMEOUT
+
+        Raises:
+            ValueError: If language is not supported
+            Exception: If a batch request fails
+        """
+        if language not in self.LANGUAGE_IDS:
+            raise ValueError(f'Unsupported language: {language}')
+        if timeout is None:
+            timeout = settings.CODE_EXECUTION_TIMEOUT
+
+        session = _get_session()
+        results = [None] * len(test_inputs)
+        pending = {}  # token -> index
+
+        for start in range(0, len(test_inputs), self.batch_size):
+            chunk = test_inputs[start:start + self.batch_size]
+            response = session.post(
+                f"{self.api_url}/submissions/batch?base64_encoded=false",
+                json={'submissions': [
+                    {
+                        'source_code': code,
+                        'language_id': self.LANGUAGE_IDS[language],
+                        'stdin': program_input.to_text(test_input),
+                        'cpu_time_limit': timeout,
+                    }
+                    for test_input in chunk
+                ]},
+                headers=self.headers,
+                timeout=self.REQUEST_TIMEOUT
+            )
+            if not response.ok:
+                raise Exception(f'Judge0 API error: {response.status_code} - {response.text}')
+
+            for offset, entry in enumerate(response.json()):
+                if entry.get('token'):
+                    pending[entry['token']] = start + offset
+                else:
+                    # Rejected submission, e.g. {"language_id": ["can't be blank"]}
+                    results[start + offset] = Exception(f'Judge0 rejected submission: {entry}')
+
+        logger.info(f"[Judge0Service] Submitted {len(pending)} submissions, polling")
+
+        deadline = time.monotonic() + self.poll_timeout
+        delay = self.POLL_INITIAL_DELAY
+        while pending:
+            time.sleep(delay)
+            tokens = list(pending)
+            for start in range(0, len(tokens), self.batch_size):
+                response = session.get(
+                    f"{self.api_url}/submissions/batch",
+                    params={
+                        'tokens': ','.join(tokens[start:start + self.batch_size]),
+                        'base64_encoded': 'false',
+                        'fields': RESULT_FIELDS,
+                    },
+                    headers=self.headers,
+                    timeout=self.REQUEST_TIMEOUT
+                )
+                if not response.ok:
+                    raise Exception(f'Judge0 API error: {response.status_code} - {response.text}')
+
+                for submission in response.json().get('submissions', []):
+                    if not submission or submission.get('token') not in pending:
+                        continue
+                    if (submission.get('status') or {}).get('id') in PENDING_STATUS_IDS:
+                        continue
+                    results[pending.pop(submission['token'])] = self._parse_result(submission)
+
+            if pending and time.monotonic() >= deadline:
+                logger.warning(f"[Judge0Service] {len(pending)} submissions still pending after {self.poll_timeout}s")
+                for index in pending.values():
+                    results[index] = Exception('Judge0 polling timeout')
+                break
+            delay = min(delay * 2, self.POLL_MAX_DELAY)
+
+        return results
@@ -0,0 +1,401 @@
+"""Warm JVM worker pool for Java submissions
+
+Starting a JVM (and loading the JDK classes) for every test case costs more
+than most solutions take to run. Instead, each worker process keeps a small
+pool of long-lived `java` processes running WarmJvmRunner (java/WarmJvmRunner.java),
+which loads the compiled submission in a fresh classloader per run and calls
+main() with System.in/out/err redirected to per-run files.
+
+Limits: CPU time is summed over every thread the submission starts, stdout
+is capped at the output limit inside the harness (OLE), and the JVM itself
+runs under RLIMIT_FSIZE as a backstop for any other file it writes.
+
+A JVM worker is recycled (killed and respawned lazily) when:
+- it has served JAVA_WARM_MAX_RUNS runs
+- a run timed out (wall clock or CPU) or hit the output limit
+- the submission called System.exit
+- the submission left threads running after main() returned
+- the submission changed JVM-wide state (system properties, default locale
+  or time zone, default uncaught exception handler)
+"""
+import atexit
+import io
+import logging
+import os
+import queue
+import resource
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+from django.conf import settings
+from .artifact_cache import ArtifactCache
+from .output_compare import read_full_output
+from .program_input import stage
+from .sandbox import get_limits, jvm_memory_flags
+from .workdir_pool import WorkdirPool
+
+logger = logging.getLogger(__name__)
+
+HARNESS_SOURCE = Path(__file__).parent / 'java' / 'WarmJvmRunner.java'
+HARNESS_CLASS = 'WarmJvmRunner'
+
+# Returned by _JvmWorker._next_line when no line arrived in time
+_TIMED_OUT = object()
+
+
+class JvmPoolError(Exception):
+    """Raised when no warm JVM is available (e.g. no JDK installed)"""
+
+
+class _JvmWorker:
+    """One long-lived `java WarmJvmRunner` process"""
+
+    STARTUP_TIMEOUT = 15  # seconds
+
+    def __init__(self, harness_dir, jvm_flags=(), output_bytes=0):
+        self.runs = 0
+        self._lines = queue.Queue()
+        self._process = subprocess.Popen(
+            ['java', '-XX:+UseSerialGC', *jvm_flags, '-cp', str(harness_dir), HARNESS_CLASS],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            preexec_fn=lambda: self._apply_limits(output_bytes)
+        )
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+        if self._next_line(self.STARTUP_TIMEOUT) != 'READY':
+            self.kill()
+            raise JvmPoolError('Warm JVM failed to start')
+
+    @staticmethod
+    def _apply_limits(output_bytes):
+        """
+        rlimits for the long-lived JVM (runs in the child before exec)
+
+        RLIMIT_CPU and RLIMIT_AS would accumulate across runs / break the JVM's
+        address space reservations, so only file size and core dumps are capped.
+        """
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        if output_bytes:
+            resource.setrlimit(resource.RLIMIT_FSIZE, (output_bytes, output_bytes))
+
+    def _read_loop(self):
+        for line in self._process.stdout:
+            self._lines.put(line.rstrip('\n'))
+        self._lines.put(None)  # EOF: the JVM exited
+
+    def _next_line(self, timeout):
+        try:
+            return self._lines.get(timeout=timeout)
+        except queue.Empty:
+            return _TIMED_OUT
+
+    def run(self, class_dir, class_name, input_data, timeout, output_bytes=0, read_output=None):
+        """
+        Run one test case
+
+        Returns:
+            tuple: (raw result dict, reusable) - see JvmPool.run; reusable is
+                   False when the worker must be recycled
+        """
+        self.runs += 1
+        run_id = uuid.uuid4().hex[:12]
+        class_dir = Path(class_dir)
+        paths = {name: class_dir / f'.jvm-{run_id}.{name}' for name in ('stdin', 'stdout', 'stderr')}
+        stdin_path = stage(input_data, paths['stdin'])
+
+        try:
+            request = '\t'.join([
+                'RUN', run_id, str(class_dir), class_name, str(int(timeout * 1000)),
+                str(int(output_bytes)), str(stdin_path), str(paths['stdout']), str(paths['stderr'])
+            ])
+            started = time.monotonic()
+            try:
+                self._process.stdin.write(request + '\n')
+                self._process.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                raise JvmPoolError(f'Warm JVM is not running: {e}')
+
+            line = self._next_line(timeout)
+            while isinstance(line, str) and not line.startswith(f'DONE\t{run_id}\t'):
+                line = self._next_line(timeout)
+
+            if line is _TIMED_OUT:
+                # Wall-clock timeout
+                self.kill()
+                return self._result(paths, -9, None, started, read_output, timed_out=True), False
+
+            if line is None:
+                # Submission called System.exit (output was flushed by the shutdown hook)
+                self._process.wait()
+                return self._result(paths, self._process.returncode, None, started, read_output), False
+
+            fields = line.split('\t')
+            cpu_ms = int(fields[3]) if len(fields) > 3 and fields[3].isdigit() else None
+            if fields[2] == 'TLE':
+                self.kill()
+                return self._result(paths, -9, cpu_ms, started, read_output, timed_out=True), False
+            if fields[2] == 'OLE':
+                # stdout reached the output limit; reported like an RLIMIT_FSIZE kill
+                self.kill()
+                return self._result(paths, -signal.SIGXFSZ, cpu_ms, started, read_output), False
+
+            recycle = len(fields) > 4 and fields[4] == 'RECYCLE'
+            if recycle:
+                logger.info("[JvmPool] Recycling JVM: submission left threads running or changed global state")
+
+            return self._result(paths, int(fields[2]), cpu_ms, started, read_output), not recycle
+        finally:
+            for path in paths.values():
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _read(path):
+        try:
+            return path.read_text(errors='replace')
+        except FileNotFoundError:
+            return ''
+
+    def _result(self, paths, exit_code, cpu_ms, started, read_output=None, timed_out=False):
+        try:
+            with open(paths['stdout'], 'rb') as stdout:
+                output_fields = (read_output or read_full_output)(stdout)
+            output_size = paths['stdout'].stat().st_size
+        except FileNotFoundError:
+            output_fields = (read_output or read_full_output)(io.BytesIO())
+            output_size = 0
+
+        return {
+            'output_size': output_size,
+            **output_fields,
+            'error': self._read(paths['stderr']),
+            'exit_code': exit_code,
+            'cpu_ms': cpu_ms,
+            'wall_ms': int((time.monotonic() - started) * 1000),
+            # One JVM serves many runs, so per-run peak RSS is not available
+            'peak_rss_kb': None,
+            'timed_out': timed_out
+        }
+
+    def kill(self):
+        """Terminate the JVM"""
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+
+
+class JvmPool:
+    """
+    Per-process pool of warm JVMs (Singleton)
+
+    Workers are spawned lazily up to JAVA_WARM_POOL_SIZE. Each worker runs one
+    test case at a time, so callers block until one is idle.
+    """
+
+    # Singleton instance
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        """Ensure only one instance exists (Singleton pattern)"""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """Initialize pool configuration (only once)"""
+        if self.__class__._initialized:
+            return
+
+        self.enabled = getattr(settings, 'JAVA_WARM_POOL_ENABLED', True)
+        self.size = max(1, getattr(settings, 'JAVA_WARM_POOL_SIZE', 2))
+        self.max_runs = getattr(settings, 'JAVA_WARM_MAX_RUNS', 200)
+
+        self._condition = threading.Condition()
+        self._idle = []
+        self._spawned = 0
+        self._harness_dir = None
+        self._harness_workdir = None
+        self._harness_pid = None
+        self._harness_lock = threading.Lock()
+
+        # Mark as initialized
+        self.__class__._initialized = True
+
+    @property
+    def available(self):
+        """False once disabled or after the harness failed to build"""
+        return self.enabled
+
+    def _ensure_harness(self):
+        """Compile WarmJvmRunner once per process (via the artifact cache)"""
+        with self._harness_lock:
+            if self._harness_dir is not None:
+                return self._harness_dir
+
+            workdir = WorkdirPool().acquire()
+            harness_dir = workdir.path
+            source = HARNESS_SOURCE.read_text()
+            cache = ArtifactCache()
+            cache_key = cache.make_key(source, 'java', [], 'javac')
+
+            if not cache.fetch(cache_key, harness_dir):
+                try:
+                    compile_result = subprocess.run(
+                        ['javac', '-d', str(harness_dir), str(HARNESS_SOURCE)],
+                        capture_output=True,
+                        text=True,
+                        timeout=60
+                    )
+                except (OSError, subprocess.TimeoutExpired) as e:
+                    compile_result = None
+                    error = str(e)
+                else:
+                    error = compile_result.stderr
+
+                if compile_result is None or compile_result.returncode != 0:
+                    workdir.cleanup()
+                    self.enabled = False
+                    logger.warning(f"[JvmPool] Disabled, cannot build harness: {error}")
+                    raise JvmPoolError(f'Cannot build warm JVM harness: {error}')
+
+                cache.store(cache_key, list(harness_dir.glob('*.class')))
+
+            self._harness_dir, self._harness_workdir, self._harness_pid = harness_dir, workdir, os.getpid()
+            atexit.register(self._remove_harness)
+            return harness_dir
+
+    def _remove_harness(self):
+        """Release the harness directory (only in the process that built it)"""
+        with self._harness_lock:
+            if self._harness_workdir is None or self._harness_pid != os.getpid():
+                return
+            self._harness_workdir.cleanup()
+            self._harness_dir = self._harness_workdir = None
+
+    def _acquire(self):
+        harness_dir = self._ensure_harness()
+
+        with self._condition:
+            while not self._idle and self._spawned >= self.size:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._spawned += 1
+
+        try:
+            # Submissions run in work directory slots, so files are capped at the slot size too
+            file_bytes = [n for n in (get_limits()['output_bytes'], WorkdirPool().max_bytes) if n]
+            return _JvmWorker(harness_dir, jvm_memory_flags(), min(file_bytes, default=0))
+        except Exception as e:
+            with self._condition:
+                self._spawned -= 1
+                self._condition.notify()
+            if isinstance(e, JvmPoolError):
+                raise
+            raise JvmPoolError(f'Cannot start warm JVM: {e}')
+
+    def _release(self, worker, reusable):
+        if reusable and worker.runs < self.max_runs:
+            with self._condition:
+                self._idle.append(worker)
+                self._condition.notify()
+            return
+
+        worker.kill()
+        with self._condition:
+            self._spawned -= 1
+            self._condition.notify()
+
+    def run(self, class_dir, class_name, input_data, timeout, output_bytes=0, read_output=None):
+        """
+        Run a compiled Java submission once on a warm JVM
+
+        Args:
+            class_dir: Directory containing the compiled .class files
+            class_name: Name of the class with main()
+            input_data: Program input (str, bytes or program_input.InputFile)
+            timeout: Wall-clock (and CPU) limit in seconds
+            output_bytes: stdout limit enforced by the harness, 0 = unlimited
+            read_output: Callable(binary stdout file) -> dict of output fields
+                         (default: output_compare.read_full_output)
+
+        Returns:
+            dict: {
+                'output': str,  (plus any other fields from read_output)
+                'output_size': int,
+                'error': str,
+                'exit_code': int,
+                'cpu_ms': int or None,
+                'wall_ms': int,
+                'peak_rss_kb': None,
+                'timed_out': bool
+            }
+
+        Raises:
+            JvmPoolError: If no warm JVM could be provided
+        """
+        worker = self._acquire()
+        reusable = False
+        try:
+            result, reusable = worker.run(
+                class_dir, class_name, input_data, timeout, output_bytes, read_output
+            )
+            return result
+        finally:
+            self._release(worker, reusable)
+
+    def shutdown(self):
+        """Kill all idle JVMs and remove the harness classes"""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._spawned -= len(idle)
+        for worker in idle:
+            worker.kill()
+        self._remove_harness()
+
+
+class WarmJavaRunner:
+    """
+    Runner for one prepared Java program, backed by the shared JvmPool
+
+    Same interface as ZygoteRunner (alive / run / close), so PreparedProgram
+    can treat both the same way.
+    """
+
+    def __init__(self, class_dir, class_name):
+        """
+        Args:
+            class_dir: Directory containing the compiled .class files
+            class_name: Name of the class with main()
+        """
+        self.class_dir = str(class_dir)
+        self.class_name = class_name
+
+    @property
+    def alive(self):
+        """True while the pool can serve runs"""
+        return JvmPool().available
+
+    def run(self, input_data, timeout, limits=None, read_output=None):
+        """Run once on a warm JVM (see JvmPool.run); heap is capped via -Xmx, output via limits"""
+        output_bytes = (limits or get_limits())['output_bytes']
+        return JvmPool().run(
+            self.class_dir, self.class_name, input_data, timeout, output_bytes, read_output
+        )
+
+    def close(self):
+        """Nothing to release; JVMs belong to the pool"""
@@ -0,0 +1,120 @@
+"""Streaming comparison of program output against expected output
+
+Program stdout is written to a file by every executor path, so instead of
+loading it into one Python string (and stripping/copying it again for the
+comparison) the file is read in fixed-size chunks:
+
+- tokens (whitespace-separated) are compared against the expected output
+  until the first mismatch, after which only hashing continues
+- only a bounded prefix of the output is decoded and kept
+- the full output is identified by its SHA-256 and size
+"""
+import hashlib
+import io
+import re
+from django.conf import settings
+
+CHUNK_SIZE = 64 * 1024
+
+_TOKEN = re.compile(rb'\S+')
+_WHITESPACE = b' \t\n\r\x0b\x0c'
+
+
+def read_full_output(stream):
+    """
+    Default stdout reader: decode the whole stream
+
+    Returns:
+        dict: {'output': str}
+    """
+    return {'output': stream.read().decode(errors='replace')}
+
+
+class OutputCheck:
+    """
+    Token-mode comparison of a stdout stream with the expected output
+
+    Usage:
+        fields = OutputCheck(expected).read(stdout_file)
+        fields['matched']  # True if outputs are equal up to whitespace
+    """
+
+    def __init__(self, expected, prefix_bytes=None):
+        """
+        Args:
+            expected: Expected output (str or bytes)
+            prefix_bytes: Max output bytes to keep (default: CODE_EXECUTION_OUTPUT_PREFIX_BYTES)
+        """
+        self.expected = expected.encode() if isinstance(expected, str) else expected
+        if prefix_bytes is None:
+            prefix_bytes = getattr(settings, 'CODE_EXECUTION_OUTPUT_PREFIX_BYTES', 16 * 1024)
+        self.prefix_bytes = prefix_bytes
+
+    def read(self, stream):
+        """
+        Consume a binary stdout stream
+
+        Args:
+            stream: Binary file object positioned at the start of the output
+
+        Returns:
+            dict: {
+                'output': str,             # first prefix_bytes of the output
+                'output_truncated': bool,
+                'output_size': int,        # total bytes
+                'output_hash': str,        # SHA-256 of the full output
+                'matched': bool            # token-wise equal to the expected output
+            }
+        """
+        expected_tokens = (m.group() for m in _TOKEN.finditer(self.expected))
+        # No single actual token may be longer than the whole expected output
+        max_token = len(self.expected)
+
+        digest = hashlib.sha256()
+        prefix = bytearray()
+        size = 0
+        matched = True
+        carry = b''
+
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+
+            digest.update(chunk)
+            size += len(chunk)
+            if len(prefix) < self.prefix_bytes:
+                prefix += chunk[:self.prefix_bytes - len(prefix)]
+
+            if not matched:
+                continue
+
+            data = carry + chunk
+            # The last token may continue in the next chunk
+            cut = max(data.rfind(bytes([c])) for c in _WHITESPACE) + 1
+            complete, carry = data[:cut], data[cut:]
+
+            for token in _TOKEN.findall(complete):
+                if token != next(expected_tokens, None):
+                    matched = False
+                    break
+            if len(carry) > max_token:
+                matched = False
+
+        if matched:
+            if carry and carry != next(expected_tokens, None):
+                matched = False
+            elif next(expected_tokens, None) is not None:
+                matched = False
+
+        return {
+            'output': bytes(prefix).decode(errors='replace'),
+            'output_truncated': size > len(prefix),
+            'output_size': size,
+            'output_hash': digest.hexdigest(),
+            'matched': matched,
+        }
+
+    def check_string(self, output):
+        """Same as read() for an output that is already in memory (e.g. from Judge0)"""
+        return self.read(io.BytesIO((output or '').encode()))
@@ -0,0 +1,127 @@
+"""Program inputs as text, bytes or files
+
+Executors (PreparedProgram.run, ZygoteRunner, JvmPool, sandbox.run) accept
+any of
+
+- str: small inputs, e.g. test cases stored in DynamoDB
+- bytes / bytearray / memoryview: e.g. large S3-backed test cases, which are
+  never decoded to text
+- InputFile: an input that is already on disk; its file becomes the child's
+  stdin as is, without being read into this process
+
+Children always get stdin from a file, so stage() writes byte inputs
+without an encode step and passes InputFile paths straight through. Inputs
+that are run more than once or handed to another process (the execution
+daemon) should be spilled() to a file once up front, so no run copies them.
+"""
+import tempfile
+from pathlib import Path
+
+BYTES_TYPES = (bytes, bytearray, memoryview)
+
+
+class InputFile:
+    """Program input stored in a file"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: File holding the input (must stay until the run finished)
+        """
+        self.path = Path(path)
+
+    @property
+    def size(self):
+        """Input size in bytes"""
+        return self.path.stat().st_size
+
+    def read_bytes(self):
+        """Read the whole input (only when a backend needs it in memory)"""
+        return self.path.read_bytes()
+
+    def __repr__(self):
+        return f'InputFile({str(self.path)!r})'
+
+
+def to_bytes(input_data):
+    """
+    Get an input as a bytes-like object
+
+    Args:
+        input_data: str, bytes-like or InputFile
+
+    Returns:
+        bytes-like (byte inputs are returned as is, without a copy)
+    """
+    if isinstance(input_data, str):
+        return input_data.encode()
+    if isinstance(input_data, InputFile):
+        return input_data.read_bytes()
+    return input_data
+
+
+def to_text(input_data):
+    """Get an input as str (for APIs that only take text, e.g. Judge0)"""
+    if isinstance(input_data, str):
+        return input_data
+    return str(to_bytes(input_data), 'utf-8', 'replace')
+
+
+def size(input_data):
+    """Input length for ordering and logging (bytes; characters for str)"""
+    if isinstance(input_data, InputFile):
+        return input_data.size
+    if isinstance(input_data, memoryview):
+        return input_data.nbytes
+    return len(input_data)
+
+
+def stage(input_data, path):
+    """
+    Get a file to use as the child's stdin
+
+    Args:
+        input_data: str, bytes-like or InputFile
+        path: Where to write the input unless it already is a file
+
+    Returns:
+        Path: The InputFile's own path, or path after writing the input there
+              (the caller removes it)
+    """
+    if isinstance(input_data, InputFile):
+        return input_data.path
+    path = Path(path)
+    with open(path, 'wb') as f:
+        f.write(to_bytes(input_data))
+    return path
+
+
+def spill(input_data, path):
+    """
+    Write a byte input to a file once and return it as an InputFile
+
+    Args:
+        input_data: str, bytes-like or InputFile
+        path: File to create for a bytes-like input
+
+    Returns:
+        InputFile for bytes-like inputs; str and InputFile inputs as they are
+    """
+    if isinstance(input_data, BYTES_TYPES):
+        return InputFile(stage(input_data, path))
+    return input_data
+
+
+def open_stdin(input_data):
+    """
+    Open an input as a binary file positioned at its start (for Popen stdin)
+
+    Returns:
+        File object; use as a context manager
+    """
+    if isinstance(input_data, InputFile):
+        return open(input_data.path, 'rb')
+    stdin_file = tempfile.TemporaryFile()
+    stdin_file.write(to_bytes(input_data))
+    stdin_file.seek(0)
+    return stdin_file
@@ -2,11 +2,12 @@
 import gzip
 import json
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 import boto3
 from botocore.exceptions import ClientError
 from django.conf import settings
 import os
+from . import program_input, testcase_blob
 
 logger = logging.getLogger(__name__)
 
@@ -136,9 +137,12 @@ class S3TestCaseService:
                 raise
 
     @staticmethod
-    def calculate_size(input_str: str, output_str: str) -> int:
-        """Calculate the total size of test case data in bytes"""
-        return len(input_str.encode('utf-8')) + len(output_str.encode('utf-8'))
+    def calculate_size(input_str, output_str) -> int:
+        """Calculate the total size of test case data in bytes (str, bytes or InputFile)"""
+        return sum(
+            len(value.encode('utf-8')) if isinstance(value, str) else program_input.size(value)
+            for value in (input_str, output_str)
+        )
 
     @staticmethod
     def should_use_s3(input_str: str, output_str: str) -> bool:
@@ -266,8 +270,8 @@ class S3TestCaseService:
         platform: str,
         problem_id: str,
         testcase_id: str,
-        input_str: str,
-        output_str: str
+        input_str: Union[str, bytes],
+        output_str: Union[str, bytes]
     ) -> Dict[str, Any]:
         """
         Store a single test case in S3 with gzip compression
@@ -276,33 +280,24 @@ class S3TestCaseService:
             platform: Platform name
             problem_id: Problem identifier
             testcase_id: Test case identifier
-            input_str: Test case input
-            output_str: Expected output
+            input_str: Test case input (str or bytes)
+            output_str: Expected output (str or bytes)
 
         Returns:
             Dict with S3 metadata: {'s3_key': str, 'size': int, 'compressed_size': int}
         """
         s3_key = self._get_s3_key(platform, problem_id, testcase_id)
 
-        # Create JSON payload for single test case
-        payload = {
-            'platform': platform,
-            'problem_id': problem_id,
-            'testcase_id': testcase_id,
-            'input': input_str,
-            'output': output_str
-        }
-
-        # Compress with gzip
-        json_data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
-        compressed_data = gzip.compress(json_data, compresslevel=6)
+        # Binary blob or legacy JSON, depending on TESTCASE_S3_BINARY_FORMAT (see testcase_blob)
+        data, content_type = testcase_blob.serialize(platform, problem_id, testcase_id, input_str, output_str)
+        compressed_data = gzip.compress(data, compresslevel=6)
 
         def _put_object():
             return self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=s3_key,
                 Body=compressed_data,
-                ContentType='application/json',
+                ContentType=content_type,
                 ContentEncoding='gzip'
             )
 
@@ -312,12 +307,12 @@ class S3TestCaseService:
 
             logger.info(
                 f"Stored test case in S3: {s3_key} "
-                f"(original: {len(json_data)} bytes, compressed: {len(compressed_data)} bytes)"
+                f"(original: {len(data)} bytes, compressed: {len(compressed_data)} bytes)"
             )
 
             return {
                 's3_key': s3_key,
-                'size': len(json_data),
+                'size': len(data),
                 'compressed_size': len(compressed_data)
             }
 
@@ -329,8 +324,9 @@ class S3TestCaseService:
         self,
         platform: str,
         problem_id: str,
-        testcase_id: str
-    ) -> Optional[Dict[str, str]]:
+        testcase_id: str,
+        raw: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
         Retrieve a single test case from S3
 
@@ -338,6 +334,9 @@ class S3TestCaseService:
             platform: Platform name
             problem_id: Problem identifier
             testcase_id: Test case identifier
+            raw: Return 'input' and 'output' as bytes-like objects (memoryviews
+                 of the decompressed object) instead of decoding them to str;
+                 executors take them as program input directly
 
         Returns:
             Dict with 'input' and 'output', or None if not found
@@ -352,14 +351,8 @@ class S3TestCaseService:
             response = self._execute_with_retry(_get_object)
             compressed_data = response['Body'].read()
 
-            # Decompress and parse JSON
-            json_data = gzip.decompress(compressed_data)
-            payload = json.loads(json_data.decode('utf-8'))
-
-            return {
-                'input': payload.get('input', ''),
-                'output': payload.get('output', '')
-            }
+            # Decompress and split (binary blob or legacy JSON)
+            return testcase_blob.decode(gzip.decompress(compressed_data), raw=raw)
 
         except ClientError as e:
             if e.response.get('Error', {}).get('Code') == 'NoSuchKey':
@@ -367,7 +360,7 @@ class S3TestCaseService:
                 return None
             logger.error(f"Failed to retrieve test case from S3 ({s3_key}): {e}")
             raise
-        except (gzip.BadGzipFile, json.JSONDecodeError) as e:
+        except (gzip.BadGzipFile, ValueError) as e:
             logger.error(f"Failed to decompress/parse test case from S3 ({s3_key}): {e}")
             raise
 
@@ -0,0 +1,342 @@
+"""Resource-limited process runner with CPU/memory accounting
+
+Every run is started in its own session with setrlimit() limits applied in
+the child, reaped with wait4() to collect rusage, and classified into a
+verdict:
+
+    OK   - exited with status 0
+    RE   - non-zero exit status / killed by a signal
+    TLE  - CPU limit (RLIMIT_CPU) or wall-clock limit exceeded
+    MLE  - address-space limit (RLIMIT_AS) hit or peak RSS over the limit
+    OLE  - stdout reached the output limit (RLIMIT_FSIZE)
+    CE   - the program could not be prepared (compilation error)
+
+Runaway solutions are stopped by the kernel as soon as they cross a limit
+instead of holding the worker slot until the wall-clock timeout.
+
+Limits come from settings:
+    CODE_EXECUTION_TIMEOUT            - CPU and wall-clock limit (seconds)
+    CODE_EXECUTION_MEMORY_LIMIT_MB    - address-space / peak RSS limit
+    CODE_EXECUTION_OUTPUT_LIMIT_BYTES - max stdout size
+"""
+import math
+import os
+import resource
+import signal
+import subprocess
+import tempfile
+import logging
+import threading
+import time
+from django.conf import settings
+from .output_compare import read_full_output
+from .program_input import open_stdin
+from .workdir_pool import WorkdirPool
+from .zygote_runner import ZygoteRunner, ZygoteError
+
+logger = logging.getLogger(__name__)
+
+VERDICT_OK = 'OK'
+VERDICT_RE = 'RE'
+VERDICT_TLE = 'TLE'
+VERDICT_MLE = 'MLE'
+VERDICT_OLE = 'OLE'
+VERDICT_CE = 'CE'
+
+# stderr markers of an allocation failure under RLIMIT_AS
+_OOM_MARKERS = ('MemoryError', 'std::bad_alloc', 'OutOfMemoryError', 'heap out of memory')
+
+# Per-process spawner, see _get_spawner()
+_spawner = None
+_spawner_dir = None
+_spawner_pid = None
+_spawner_lock = threading.Lock()
+
+
+def get_limits():
+    """
+    Get the resource limits for one run
+
+    Returns:
+        dict: {
+            'time_limit': float,    # seconds (CPU and wall clock)
+            'memory_bytes': int,    # 0 = unlimited
+            'output_bytes': int,    # 0 = unlimited
+        }
+    """
+    memory_mb = getattr(settings, 'CODE_EXECUTION_MEMORY_LIMIT_MB', 256)
+    return {
+        'time_limit': settings.CODE_EXECUTION_TIMEOUT,
+        'memory_bytes': memory_mb * 1024 * 1024 if memory_mb > 0 else 0,
+        'output_bytes': getattr(settings, 'CODE_EXECUTION_OUTPUT_LIMIT_BYTES', 64 * 1024 * 1024),
+    }
+
+
+def jvm_memory_flags():
+    """
+    JVM flags enforcing the memory limit (RLIMIT_AS cannot be used with the JVM)
+
+    Returns:
+        list: e.g. ['-Xmx256m'], or [] when memory is unlimited
+    """
+    memory_mb = getattr(settings, 'CODE_EXECUTION_MEMORY_LIMIT_MB', 256)
+    return [f'-Xmx{memory_mb}m'] if memory_mb > 0 else []
+
+
+def apply_limits(time_limit, memory_bytes=0, output_bytes=0):
+    """
+    Apply rlimits to the current process (call in the child, before exec)
+
+    Args:
+        time_limit: CPU seconds; SIGXCPU at the limit, SIGKILL one second later
+        memory_bytes: RLIMIT_AS, 0 to leave unlimited (runtimes that reserve
+                      large virtual ranges such as the JVM and V8 must pass 0)
+        output_bytes: RLIMIT_FSIZE, 0 to leave unlimited
+    """
+    cpu_seconds = max(1, math.ceil(time_limit))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    if output_bytes:
+        resource.setrlimit(resource.RLIMIT_FSIZE, (output_bytes, output_bytes))
+
+
+def rusage_metrics(rusage):
+    """
+    Extract CPU time and peak memory from a wait4() rusage
+
+    Returns:
+        tuple: (cpu_ms, peak_rss_kb)
+    """
+    cpu_ms = int((rusage.ru_utime + rusage.ru_stime) * 1000)
+    # ru_maxrss is in kilobytes on Linux
+    return cpu_ms, int(rusage.ru_maxrss)
+
+
+def classify(exit_code, stderr, cpu_ms, peak_rss_kb, output_size, timed_out, limits):
+    """
+    Derive the verdict of a finished run
+
+    Args:
+        exit_code: Exit status (negative = killed by that signal)
+        stderr: Program error output
+        cpu_ms: CPU time used (None if unknown)
+        peak_rss_kb: Peak resident set size (None if unknown)
+        output_size: Bytes written to stdout
+        timed_out: True if the wall-clock limit killed the run
+        limits: Dict from get_limits()
+
+    Returns:
+        str: One of the VERDICT_* constants
+    """
+    if timed_out or exit_code == -signal.SIGXCPU:
+        return VERDICT_TLE
+    if cpu_ms is not None and cpu_ms >= limits['time_limit'] * 1000:
+        # Includes the hard RLIMIT_CPU SIGKILL for processes that ignore SIGXCPU
+        return VERDICT_TLE
+
+    if limits['output_bytes'] and (exit_code == -signal.SIGXFSZ or output_size >= limits['output_bytes']):
+        return VERDICT_OLE
+
+    memory_kb = limits['memory_bytes'] // 1024
+    if memory_kb and peak_rss_kb is not None and peak_rss_kb > memory_kb:
+        return VERDICT_MLE
+    if exit_code != 0 and memory_kb and any(marker in (stderr or '') for marker in _OOM_MARKERS):
+        return VERDICT_MLE
+
+    return VERDICT_OK if exit_code == 0 else VERDICT_RE
+
+
+def make_result(output, error, exit_code, cpu_ms, wall_ms, peak_rss_kb, timed_out, limits,
+                output_size=None, **output_fields):
+    """
+    Build the executor result dict for a finished run
+
+    Extra output fields from a stdout reader (e.g. OutputCheck: output_hash,
+    matched) are passed through unchanged.
+
+    Returns:
+        dict: {
+            'output': str,
+            'error': str,
+            'success': bool,
+            'cpu_ms': int or None,
+            'wall_ms': int,
+            'peak_rss_kb': int or None,
+            'verdict': str
+        }
+    """
+    if output_size is None:
+        output_size = len(output.encode('utf-8', errors='replace'))
+    elif output_fields:
+        # 'output' is only a prefix here, so report the real size
+        output_fields['output_size'] = output_size
+    verdict = classify(exit_code, error, cpu_ms, peak_rss_kb, output_size, timed_out, limits)
+
+    if verdict == VERDICT_TLE:
+        output, error = '', 'Execution timeout'
+    elif verdict == VERDICT_MLE and not error:
+        error = 'Memory limit exceeded'
+    elif verdict == VERDICT_OLE:
+        error = 'Output limit exceeded'
+
+    return {
+        'output': output,
+        'error': error,
+        'success': verdict == VERDICT_OK,
+        'cpu_ms': cpu_ms,
+        'wall_ms': wall_ms,
+        'peak_rss_kb': peak_rss_kb,
+        'verdict': verdict,
+        **output_fields,
+    }
+
+
+def error_result(error, verdict=VERDICT_RE):
+    """Result dict for a run that never started"""
+    return {
+        'output': '',
+        'error': error,
+        'success': False,
+        'cpu_ms': None,
+        'wall_ms': 0,
+        'peak_rss_kb': None,
+        'verdict': verdict,
+    }
+
+
+def _get_spawner():
+    """
+    Get this process's spawner (a code-less ZygoteRunner), starting it if needed
+
+    Returns:
+        ZygoteRunner or None if it cannot be started
+    """
+    global _spawner, _spawner_dir, _spawner_pid
+
+    with _spawner_lock:
+        # A forked worker must not share (or clean up) its parent's spawner
+        if _spawner is not None and _spawner_pid != os.getpid():
+            _spawner = _spawner_dir = None
+        elif _spawner is not None and not _spawner.alive:
+            _spawner.close()
+            _spawner_dir.cleanup()
+            _spawner = _spawner_dir = None
+
+        if _spawner is None:
+            # Held for the life of the process; the pool removes it once we exit
+            work_dir = WorkdirPool().acquire()
+            spawner = ZygoteRunner(None, str(work_dir.path))
+            try:
+                spawner.start()
+            except (ZygoteError, OSError) as e:
+                work_dir.cleanup()
+                logger.warning(f"[Sandbox] Spawner not started, using direct fork: {e}")
+                return None
+            _spawner, _spawner_dir, _spawner_pid = spawner, work_dir, os.getpid()
+
+        return _spawner
+
+
+def run(command, input_data, cwd=None, limit_memory=True, read_output=None, max_file_bytes=0):
+    """
+    Run a command once under resource limits
+
+    The command is forked from a small spawner process rather than from this
+    (large) worker: ru_maxrss carries over the pre-exec image's high-water
+    mark, so forking from the worker would report the worker's memory. The
+    spawner's own small image (~10MB) still sets a floor on peak_rss_kb.
+
+    Args:
+        command: argv to execute
+        input_data: Program input (str, bytes or program_input.InputFile)
+        cwd: Working directory
+        limit_memory: Apply RLIMIT_AS (False for the JVM and Node, whose
+                      memory is checked against peak RSS after the run)
+        read_output: Callable(binary stdout file) -> dict of output fields
+                     (default: output_compare.read_full_output)
+        max_file_bytes: Lower RLIMIT_FSIZE to this (e.g. the work directory
+                        size), 0 = output limit only
+
+    Returns:
+        dict: See make_result()
+    """
+    limits = get_limits()
+    if not limit_memory:
+        limits = {**limits, 'memory_bytes': 0}
+    if max_file_bytes and (not limits['output_bytes'] or max_file_bytes < limits['output_bytes']):
+        limits = {**limits, 'output_bytes': max_file_bytes}
+
+    spawner = _get_spawner() if getattr(settings, 'CODE_EXECUTION_ZYGOTE', True) else None
+    if spawner is not None:
+        try:
+            raw = spawner.run(
+                input_data, limits['time_limit'], limits,
+                argv=command, cwd=cwd, read_output=read_output
+            )
+            return make_result(limits=get_limits(), **raw)
+        except ZygoteError as e:
+            logger.warning(f"[Sandbox] Spawner unavailable, using direct fork: {e}")
+
+    return _run_direct(command, input_data, cwd, limits, read_output or read_full_output)
+
+
+def _run_direct(command, input_data, cwd, limits, read_output):
+    """
+    Fork/exec the command from this process (fallback when there is no spawner)
+
+    stdin/stdout/stderr are files (RLIMIT_FSIZE only applies to files; an
+    InputFile is used as stdin directly), and the child is reaped with
+    wait4() for its rusage.
+    """
+    memory_bytes = limits['memory_bytes']
+
+    with open_stdin(input_data) as stdin_file, \
+            tempfile.TemporaryFile() as stdout_file, \
+            tempfile.TemporaryFile() as stderr_file:
+
+        started = time.monotonic()
+        try:
+            process = subprocess.Popen(
+                command,
+                stdin=stdin_file,
+                stdout=stdout_file,
+                stderr=stderr_file,
+                cwd=cwd,
+                start_new_session=True,
+                preexec_fn=lambda: apply_limits(limits['time_limit'], memory_bytes, limits['output_bytes'])
+            )
+        except Exception as e:
+            return error_result(str(e))
+
+        timed_out = threading.Event()
+
+        def _kill():
+            timed_out.set()
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+        timer = threading.Timer(limits['time_limit'], _kill)
+        timer.start()
+        try:
+            _, status, rusage = os.wait4(process.pid, 0)
+        finally:
+            timer.cancel()
+        wall_ms = int((time.monotonic() - started) * 1000)
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        output_size = stdout_file.tell()
+        stdout_file.seek(0)
+        stderr_file.seek(0)
+        output_fields = read_output(stdout_file)
+        error = stderr_file.read().decode(errors='replace')
+
+    cpu_ms, peak_rss_kb = rusage_metrics(rusage)
+    return make_result(
+        error=error, exit_code=process.returncode, cpu_ms=cpu_ms, wall_ms=wall_ms,
+        peak_rss_kb=peak_rss_kb, timed_out=timed_out.is_set(), limits=get_limits(),
+        **{'output_size': output_size, **output_fields}
+    )
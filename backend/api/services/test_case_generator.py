@@ -398,24 +398,21 @@ class TestCaseGenerator:
         # Generate test case inputs
         test_inputs = TestCaseGenerator.execute_generator_code(generator_code)
 
-        # Execute solution code to get outputs
+        # Execute solution code to get outputs (compiled once for all inputs)
         test_cases_with_outputs = []
-        for i, test_input in enumerate(test_inputs):
-            execution_result = code_executor.execute(
-                code=solution_code,
-                language=language,
-                input_data=test_input
-            )
-
-            if not execution_result['success']:
-                raise ValueError(
-                    f'Solution code failed on test case {i+1}: {execution_result["error"]}'
-                )
-
-            test_cases_with_outputs.append({
-                'input': test_input,
-                'output': execution_result['output'].strip()
-            })
+        with code_executor.prepare(solution_code, language) as program:
+            for i, test_input in enumerate(test_inputs):
+                execution_result = program.run(test_input)
+
+                if not execution_result['success']:
+                    raise ValueError(
+                        f'Solution code failed on test case {i+1}: {execution_result["error"]}'
+                    )
+
+                test_cases_with_outputs.append({
+                    'input': test_input,
+                    'output': execution_result['output'].strip()
+                })
 
         return test_cases_with_outputs
 
@@ -0,0 +1,115 @@
+"""Binary encoding of single S3-backed test cases
+
+Single test cases used to be stored as gzipped JSON, so reading one meant
+decoding the whole (100KB+) input into a str that executors then encoded
+again for every run. They are now stored as
+
+    gzip( MAGIC + header JSON line + input bytes + output bytes )
+
+where the header holds platform, problem_id, testcase_id, input_size and
+output_size. decode() returns the input and output as memoryview slices
+of the decompressed buffer (raw=True), which executors accept as program
+input without a copy, or as str for display. Objects written in the old
+JSON format are still read.
+
+Writing the binary format is gated by TESTCASE_S3_BINARY_FORMAT (see
+serialize()): workers from before this reader cannot decode it, so during
+a rolling deploy the reader ships first and writing is switched on later.
+"""
+import json
+from django.conf import settings
+from . import program_input
+
+MAGIC = b'ALGOTC1\n'
+
+
+def encode(platform, problem_id, testcase_id, input_data, output_data):
+    """
+    Build the (uncompressed) blob of a test case
+
+    Args:
+        platform: Platform name
+        problem_id: Problem identifier
+        testcase_id: Test case identifier
+        input_data: Input (str or bytes)
+        output_data: Expected output (str or bytes)
+
+    Returns:
+        bytes
+    """
+    input_bytes = program_input.to_bytes(input_data)
+    output_bytes = program_input.to_bytes(output_data)
+    header = json.dumps({
+        'platform': platform,
+        'problem_id': problem_id,
+        'testcase_id': testcase_id,
+        'input_size': len(input_bytes),
+        'output_size': len(output_bytes)
+    }).encode()
+    return b''.join([MAGIC, header, b'\n', input_bytes, output_bytes])
+
+
+def encode_json(platform, problem_id, testcase_id, input_data, output_data):
+    """
+    Build the legacy JSON payload of a test case (readable by every release)
+
+    Returns:
+        bytes
+    """
+    payload = {
+        'platform': platform,
+        'problem_id': problem_id,
+        'testcase_id': testcase_id,
+        'input': program_input.to_text(input_data),
+        'output': program_input.to_text(output_data)
+    }
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+def serialize(platform, problem_id, testcase_id, input_data, output_data):
+    """
+    Build the object body to store, in the format selected by settings
+
+    Returns:
+        tuple: (uncompressed bytes, content type)
+    """
+    if getattr(settings, 'TESTCASE_S3_BINARY_FORMAT', False):
+        return encode(platform, problem_id, testcase_id, input_data, output_data), 'application/octet-stream'
+    return encode_json(platform, problem_id, testcase_id, input_data, output_data), 'application/json'
+
+
+def decode(data, raw=False):
+    """
+    Split a decompressed blob (or legacy JSON payload) into input and output
+
+    Args:
+        data: Decompressed object body
+        raw: Return memoryviews of data instead of str
+
+    Returns:
+        dict: {'input', 'output'}
+
+    Raises:
+        json.JSONDecodeError / ValueError: If data is malformed
+    """
+    if not data.startswith(MAGIC):
+        # Legacy gzipped JSON object
+        payload = json.loads(data.decode('utf-8'))
+        testcase = {'input': payload.get('input', ''), 'output': payload.get('output', '')}
+        if raw:
+            testcase = {key: value.encode() for key, value in testcase.items()}
+        return testcase
+
+    header_end = data.index(b'\n', len(MAGIC))
+    header = json.loads(data[len(MAGIC):header_end])
+    view = memoryview(data)
+    input_start = header_end + 1
+    output_start = input_start + header['input_size']
+    output_end = output_start + header['output_size']
+    if output_end != len(data):
+        raise ValueError('Test case blob size does not match its header')
+
+    testcase = {'input': view[input_start:output_start], 'output': view[output_start:output_end]}
+    if not raw:
+        testcase = {key: program_input.to_text(value) for key, value in testcase.items()}
+    return testcase
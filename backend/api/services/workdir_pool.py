@@ -0,0 +1,244 @@
+"""Pool of reusable scratch directories for code executors
+
+Each prepared program used to get a fresh tempfile.TemporaryDirectory() on
+the root volume, written through the page cache and removed recursively
+afterwards. Instead, every worker process keeps a few slot directories
+
+    CODE_EXECUTION_WORKDIR_ROOT/<pid>/slot-<n>/
+
+on a tmpfs mount (/dev/shm by default). A slot is reset (its few entries
+unlinked) when the program is closed and handed to the next one. Compilers
+get TMPDIR=<slot>/.tmp so their temporaries stay on tmpfs too. Every file
+written by a compiler or by the program itself is capped at
+CODE_EXECUTION_WORKDIR_MAX_BYTES (RLIMIT_FSIZE, see WorkDir.max_file_bytes),
+and a slot whose total size exceeds it after a compile or run fails that
+step (over_quota()).
+
+Directories left behind by dead worker processes are removed when a process
+creates its pool.
+"""
+import logging
+import os
+import resource
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TMP_SUBDIR = '.tmp'
+
+
+def _fallback_root():
+    """Root used when CODE_EXECUTION_WORKDIR_ROOT is not usable"""
+    return Path(tempfile.gettempdir()) / 'algoitny-work'
+
+
+class WorkDir:
+    """
+    One scratch directory slot
+
+    Drop-in for tempfile.TemporaryDirectory (.name and cleanup()); cleanup()
+    resets the slot and returns it to the pool.
+    """
+
+    def __init__(self, pool, path, pooled=True):
+        """
+        Args:
+            pool: Owning WorkdirPool
+            path: Slot directory
+            pooled: False for overflow slots, which are deleted on cleanup
+        """
+        self.name = str(path)
+        self.path = Path(path)
+        self.pooled = pooled
+        self._pool = pool
+        self._released = False
+
+    @property
+    def tmp(self):
+        """Directory for compiler temporaries (TMPDIR)"""
+        return self.path / TMP_SUBDIR
+
+    def compile_env(self):
+        """Environment for compiler subprocesses (temporaries inside the slot)"""
+        return {**os.environ, 'TMPDIR': str(self.tmp)}
+
+    @property
+    def max_file_bytes(self):
+        """RLIMIT_FSIZE for processes writing into the slot (0 = unlimited)"""
+        return self._pool.max_bytes
+
+    def limit_file_size(self):
+        """preexec_fn for compiler subprocesses: cap every written file at the slot size"""
+        max_bytes = self._pool.max_bytes
+        if max_bytes:
+            resource.setrlimit(resource.RLIMIT_FSIZE, (max_bytes, max_bytes))
+
+    def usage(self):
+        """Bytes currently stored in the slot"""
+        total = 0
+        for dirpath, _, filenames in os.walk(self.path):
+            for filename in filenames:
+                try:
+                    total += os.lstat(os.path.join(dirpath, filename)).st_size
+                except OSError:
+                    pass
+        return total
+
+    def over_quota(self):
+        """True if the slot holds more than CODE_EXECUTION_WORKDIR_MAX_BYTES"""
+        return bool(self._pool.max_bytes) and self.usage() > self._pool.max_bytes
+
+    def cleanup(self):
+        """Reset the slot and return it to the pool (idempotent)"""
+        if not self._released:
+            self._released = True
+            self._pool.release(self)
+
+    def __enter__(self):
+        return self.name
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cleanup()
+
+
+class WorkdirPool:
+    """
+    Per-process pool of scratch directory slots (Singleton)
+
+    Up to CODE_EXECUTION_WORKDIR_SLOTS slots are kept; when all are in use
+    (e.g. concurrent async runs) an overflow slot is created and deleted
+    again on release.
+    """
+
+    # Singleton instance
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        """Ensure only one instance exists (Singleton pattern)"""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """Initialize pool configuration (only once)"""
+        if self.__class__._initialized:
+            return
+
+        self.root = Path(getattr(settings, 'CODE_EXECUTION_WORKDIR_ROOT', '/dev/shm/algoitny-work'))
+        self.slots = max(0, getattr(settings, 'CODE_EXECUTION_WORKDIR_SLOTS', 8))
+        self.max_bytes = getattr(settings, 'CODE_EXECUTION_WORKDIR_MAX_BYTES', 64 * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self._idle = []
+        self._next_slot = 0
+        self._pid = None
+        self._process_dir = None
+
+        # Mark as initialized
+        self.__class__._initialized = True
+
+    def _ensure_process_dir(self):
+        """Create this process's slot directory (called with the lock held)"""
+        if self._pid == os.getpid():
+            return self._process_dir
+
+        # New process (or forked worker): never reuse the parent's slots
+        self._pid = os.getpid()
+        self._idle = []
+        self._next_slot = 0
+
+        root = self.root
+        try:
+            root.mkdir(parents=True, exist_ok=True)
+            self._remove_dead_process_dirs(root)
+            process_dir = root / str(self._pid)
+            process_dir.mkdir(exist_ok=True)
+        except OSError as e:
+            root = _fallback_root()
+            logger.warning(f"[WorkdirPool] {self.root} not usable ({e}), using {root}")
+            root.mkdir(parents=True, exist_ok=True)
+            process_dir = root / str(self._pid)
+            process_dir.mkdir(exist_ok=True)
+
+        self._process_dir = process_dir
+        for _ in range(self.slots):
+            self._idle.append(self._new_slot())
+        return process_dir
+
+    @staticmethod
+    def _remove_dead_process_dirs(root):
+        for entry in root.iterdir():
+            if not entry.name.isdigit():
+                continue
+            try:
+                os.kill(int(entry.name), 0)
+            except ProcessLookupError:
+                shutil.rmtree(entry, ignore_errors=True)
+            except OSError:
+                pass
+
+    def _new_slot(self):
+        path = self._process_dir / f'slot-{self._next_slot}'
+        self._next_slot += 1
+        (path / TMP_SUBDIR).mkdir(parents=True, exist_ok=True)
+        return path
+
+    def contains(self, path):
+        """
+        Check that a path (after resolving symlinks) lies inside a pool root
+
+        Args:
+            path: Path to check
+
+        Returns:
+            Path or None: The resolved path, or None if it is outside the pool
+        """
+        resolved = Path(os.path.realpath(path))
+        for root in (self.root, _fallback_root()):
+            if resolved.is_relative_to(os.path.realpath(root)):
+                return resolved
+        return None
+
+    def acquire(self):
+        """
+        Get an empty scratch directory
+
+        Returns:
+            WorkDir: Call cleanup() (or use as a context manager) when done
+        """
+        with self._lock:
+            self._ensure_process_dir()
+            if self._idle:
+                return WorkDir(self, self._idle.pop())
+            path = self._new_slot()
+        return WorkDir(self, path, pooled=False)
+
+    @staticmethod
+    def _reset(path):
+        """Remove everything in a slot but its (emptied) TMPDIR"""
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.unlink(entry.path)
+        os.mkdir(os.path.join(path, TMP_SUBDIR))
+
+    def release(self, workdir):
+        """Reset a slot and make it available again (see WorkDir.cleanup)"""
+        if workdir.pooled and workdir.path.parent == self._process_dir and self._pid == os.getpid():
+            try:
+                self._reset(workdir.path)
+            except OSError as e:
+                logger.warning(f"[WorkdirPool] Dropping slot {workdir.path.name}: {e}")
+            else:
+                with self._lock:
+                    self._idle.append(workdir.path)
+                return
+
+        shutil.rmtree(workdir.path, ignore_errors=True)
@@ -0,0 +1,492 @@
+"""Fork-server ("zygote") runner for Python submissions
+
+A zygote is a long-lived `python3` process that compiles the solution's code
+object once and then forks a fresh child per test case. Each child gets the
+test input as stdin and files for stdout/stderr, runs the pre-compiled code
+as __main__, and exits. This removes interpreter startup and parsing from
+every run while keeping one process per test case.
+
+This module is also the zygote's entry point, so it must only import the
+standard library at module level:
+
+    python3 zygote_runner.py /path/to/solution.py
+    python3 zygote_runner.py                       (spawner mode, no code)
+
+A zygote can also exec arbitrary commands ("argv" in the request): the
+child is forked from the small zygote rather than from the (large) worker
+process, so wait4() rusage such as ru_maxrss reflects the program itself.
+sandbox.run() uses a code-less zygote this way as its process spawner.
+
+Control protocol (JSON lines over the zygote's stdin/stdout):
+    zygote -> parent  {"ready": true} | {"error": "..."}       (once, at startup)
+    parent -> zygote  {"id": n, "stdin": p, "stdout": p, "stderr": p
+                       [, "argv": [...], "cwd": p] [, "limits": {...}]}
+    zygote -> parent  {"id": n, "pid": child_pid}
+    zygote -> parent  {"id": n, "status": exit_code,            (negative = signal)
+                       "cpu_ms": n, "peak_rss_kb": n}
+
+Requests may carry "limits" ({"time_limit", "memory_bytes", "output_bytes"}),
+which the child applies with setrlimit() before running the code.
+
+Node.js has no fork(2), so JavaScript submissions keep the plain subprocess path.
+"""
+import itertools
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+class ZygoteError(Exception):
+    """Raised when the zygote cannot be started or has died"""
+
+
+def _read_all(stream):
+    """Default stdout reader"""
+    return {'output': stream.read().decode(errors='replace')}
+
+
+class _PendingRun:
+    """Bookkeeping for one in-flight run"""
+
+    def __init__(self):
+        self.pid = None
+        self.status = None
+        self.cpu_ms = None
+        self.peak_rss_kb = None
+        self.started = threading.Event()
+        self.finished = threading.Event()
+
+
+class ZygoteRunner:
+    """
+    Parent-side handle for a Python zygote
+
+    run() is thread-safe, so several test cases can be in flight at once
+    (e.g. from AsyncPreparedProgram via asyncio.to_thread).
+    """
+
+    STARTUP_TIMEOUT = 10  # seconds
+
+    def __init__(self, source_path, work_dir, interpreter='python3'):
+        """
+        Args:
+            source_path: Path of the solution .py file (None for a spawner
+                         that only execs commands)
+            work_dir: Directory for per-run stdin/stdout/stderr files
+            interpreter: Python executable used for the zygote
+        """
+        self.source_path = str(source_path) if source_path is not None else None
+        self.work_dir = Path(work_dir)
+        self.interpreter = interpreter
+        self._process = None
+        self._reader = None
+        self._write_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._ready = threading.Event()
+        self._startup_error = None
+        self._alive = False
+
+    def start(self):
+        """
+        Launch the zygote and wait until the code object is compiled
+
+        Raises:
+            ZygoteError: If the zygote fails to start or the code does not compile
+        """
+        self._process = subprocess.Popen(
+            [self.interpreter, os.path.abspath(__file__)] + ([self.source_path] if self.source_path else []),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=str(self.work_dir)
+        )
+        self._alive = True
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+        if not self._ready.wait(self.STARTUP_TIMEOUT) or self._startup_error:
+            error = self._startup_error or 'Zygote startup timeout'
+            self.close()
+            raise ZygoteError(error)
+
+    @property
+    def alive(self):
+        """True while the zygote can accept runs"""
+        return self._alive
+
+    def _read_loop(self):
+        """Dispatch zygote responses to waiting runs"""
+        for line in self._process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+
+            if 'ready' in message or ('error' in message and 'id' not in message):
+                self._startup_error = message.get('error')
+                self._ready.set()
+                continue
+
+            with self._pending_lock:
+                pending = self._pending.get(message.get('id'))
+            if pending is None:
+                continue
+
+            if 'pid' in message:
+                pending.pid = message['pid']
+                pending.started.set()
+            elif 'status' in message:
+                pending.status = message['status']
+                pending.cpu_ms = message.get('cpu_ms')
+                pending.peak_rss_kb = message.get('peak_rss_kb')
+                pending.finished.set()
+
+        # Zygote exited: wake up everyone still waiting
+        self._alive = False
+        self._ready.set()
+        with self._pending_lock:
+            for pending in self._pending.values():
+                pending.started.set()
+                pending.finished.set()
+
+    def run(self, input_data, timeout, limits=None, argv=None, cwd=None, read_output=None):
+        """
+        Run the solution once in a forked child
+
+        Args:
+            input_data: Program input (str, bytes or program_input.InputFile)
+            timeout: Wall-clock limit in seconds
+            limits: Optional rlimits for the child, see sandbox.get_limits()
+            argv: Exec this command instead of the solution's code
+            cwd: Working directory for argv
+            read_output: Callable(binary stdout file) -> dict of output fields
+                         (default: {'output': full decoded stdout})
+
+        Returns:
+            dict: {
+                'output': str,  (plus any other fields from read_output)
+                'output_size': int,
+                'error': str,
+                'exit_code': int,
+                'cpu_ms': int,
+                'wall_ms': int,
+                'peak_rss_kb': int,
+                'timed_out': bool
+            }
+
+        Raises:
+            ZygoteError: If the zygote has died
+        """
+        if not self._alive:
+            raise ZygoteError('Zygote is not running')
+
+        # Parent side only: the zygote entry point must not import the package
+        from .program_input import stage
+
+        run_id = next(self._ids)
+        paths = {
+            name: self.work_dir / f'.run{run_id}.{name}'
+            for name in ('stdin', 'stdout', 'stderr')
+        }
+        # An InputFile is opened by the child directly, nothing is copied
+        stdin_path = stage(input_data, paths['stdin'])
+
+        pending = _PendingRun()
+        with self._pending_lock:
+            self._pending[run_id] = pending
+
+        try:
+            request = {'id': run_id, **{name: str(path) for name, path in paths.items()}, 'stdin': str(stdin_path)}
+            if limits:
+                request['limits'] = limits
+            if argv:
+                request['argv'] = list(argv)
+                request['cwd'] = cwd
+            started = time.monotonic()
+            try:
+                with self._write_lock:
+                    self._process.stdin.write((json.dumps(request) + '\n').encode())
+                    self._process.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                self._alive = False
+                raise ZygoteError(f'Zygote is not running: {e}')
+
+            pending.started.wait(self.STARTUP_TIMEOUT)
+            if pending.pid is None:
+                raise ZygoteError('Zygote exited before starting the run')
+
+            timed_out = not pending.finished.wait(timeout)
+            if timed_out:
+                try:
+                    # Children run in their own session, so this also kills grandchildren
+                    os.killpg(pending.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                pending.finished.wait()
+
+            wall_ms = int((time.monotonic() - started) * 1000)
+            if pending.status is None:
+                raise ZygoteError('Zygote exited during the run')
+
+            with open(paths['stdout'], 'rb') as stdout:
+                output_fields = (read_output or _read_all)(stdout)
+
+            return {
+                'output_size': paths['stdout'].stat().st_size,
+                **output_fields,
+                'error': paths['stderr'].read_text(errors='replace'),
+                'exit_code': pending.status,
+                'cpu_ms': pending.cpu_ms,
+                'wall_ms': wall_ms,
+                'peak_rss_kb': pending.peak_rss_kb,
+                'timed_out': timed_out
+            }
+        finally:
+            with self._pending_lock:
+                self._pending.pop(run_id, None)
+            for path in paths.values():
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def close(self):
+        """Stop the zygote"""
+        self._alive = False
+        if self._process is None:
+            return
+
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+
+# ============================================================================
+# Zygote process (runs under `python3 zygote_runner.py solution.py`)
+# ============================================================================
+
+# Modules commonly used by solutions, imported once so children inherit them
+_WARM_MODULES = [
+    'math', 'collections', 'itertools', 'functools', 'heapq', 'bisect',
+    're', 'string', 'random', 'decimal', 'fractions', 'io', 'traceback',
+]
+
+
+def _send(message):
+    os.write(1, (json.dumps(message) + '\n').encode())
+
+
+def _apply_limits(limits):
+    """setrlimit() for a child (mirrors sandbox.apply_limits, stdlib only)"""
+    import math
+    import resource
+
+    cpu_seconds = max(1, math.ceil(limits['time_limit']))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    if limits.get('memory_bytes'):
+        resource.setrlimit(resource.RLIMIT_AS, (limits['memory_bytes'], limits['memory_bytes']))
+    if limits.get('output_bytes'):
+        resource.setrlimit(resource.RLIMIT_FSIZE, (limits['output_bytes'], limits['output_bytes']))
+
+
+def _reseed_child():
+    """
+    Reseed random state inherited from the zygote, so every child (like a
+    fresh `python3`) sees its own unseeded random sequence
+    """
+    random_module = sys.modules.get('random')
+    if random_module is not None:
+        # The module instance is also reseeded by random's at-fork hook;
+        # seeding again keeps that independent of the interpreter version
+        random_module.seed()
+
+
+def _run_child(code, source_path, request, wake_fds):
+    """Body of a forked child: rewire stdio and run the code object as __main__ (or exec argv)"""
+    import io
+    import traceback
+    import types
+
+    # Own session so the parent can kill the whole process group on timeout
+    os.setsid()
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    for fd in wake_fds:
+        os.close(fd)
+
+    limits = request.get('limits')
+    if limits:
+        _apply_limits(limits)
+
+    fd_in = os.open(request['stdin'], os.O_RDONLY)
+    fd_out = os.open(request['stdout'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    fd_err = os.open(request['stderr'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.dup2(fd_in, 0)
+    os.dup2(fd_out, 1)
+    os.dup2(fd_err, 2)
+    for fd in (fd_in, fd_out, fd_err):
+        os.close(fd)
+
+    if request.get('argv'):
+        _exec_child(request)
+
+    sys.stdin = sys.__stdin__ = open(0, 'r', closefd=False)
+    sys.stdout = sys.__stdout__ = open(1, 'w', closefd=False)
+    sys.stderr = sys.__stderr__ = open(2, 'w', closefd=False)
+    sys.argv = [source_path]
+    _reseed_child()
+
+    main_module = types.ModuleType('__main__')
+    main_module.__file__ = source_path
+    main_module.__builtins__ = __builtins__
+    sys.modules['__main__'] = main_module
+
+    exit_code = 0
+    try:
+        exec(code, main_module.__dict__)
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException as e:
+        # Skip this frame so the traceback matches `python3 solution.py`
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        exit_code = 1
+
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except (OSError, ValueError, io.UnsupportedOperation):
+            pass
+    os._exit(exit_code & 0xFF)
+
+
+def _exec_child(request):
+    """Replace a forked child with request['argv'] (stdio already rewired)"""
+    # Python ignores these; a plain exec should see default dispositions
+    for signum in (signal.SIGPIPE, signal.SIGXFSZ):
+        signal.signal(signum, signal.SIG_DFL)
+    try:
+        if request.get('cwd'):
+            os.chdir(request['cwd'])
+        os.execvp(request['argv'][0], request['argv'])
+    except OSError as e:
+        os.write(2, f'{e}\n'.encode())
+    os._exit(127)
+
+
+def _serve(source_path=None):
+    """Zygote main loop: compile once, fork per request, report exit statuses"""
+    import importlib
+    import traceback
+
+    code = None
+    if source_path is not None:
+        source_path = os.path.abspath(source_path)
+        # Match `python3 solution.py` import semantics
+        sys.path[0] = os.path.dirname(source_path)
+
+        try:
+            with open(source_path, 'rb') as f:
+                code = compile(f.read(), source_path, 'exec')
+        except BaseException:
+            _send({'error': traceback.format_exc()})
+            return
+
+        for module_name in _WARM_MODULES:
+            try:
+                importlib.import_module(module_name)
+            except ImportError:
+                pass
+
+    # Wake the select() loop whenever a child exits
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    _send({'ready': True})
+
+    children = {}
+    buffer = b''
+    control_open = True
+
+    while control_open or children:
+        watched = [wake_r] + ([0] if control_open else [])
+        try:
+            readable, _, _ = select.select(watched, [], [])
+        except InterruptedError:
+            readable = []
+
+        if wake_r in readable:
+            try:
+                while os.read(wake_r, 512):
+                    pass
+            except BlockingIOError:
+                pass
+
+        # Reap finished children
+        while children:
+            try:
+                pid, status, rusage = os.wait4(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            run_id = children.pop(pid, None)
+            if run_id is not None:
+                _send({
+                    'id': run_id,
+                    'status': os.waitstatus_to_exitcode(status),
+                    'cpu_ms': int((rusage.ru_utime + rusage.ru_stime) * 1000),
+                    'peak_rss_kb': int(rusage.ru_maxrss)
+                })
+
+        if 0 in readable:
+            data = os.read(0, 65536)
+            if not data:
+                # Parent closed the control channel; kill what is left
+                control_open = False
+                for pid in children:
+                    try:
+                        os.killpg(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                continue
+
+            buffer += data
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                pid = os.fork()
+                if pid == 0:
+                    _run_child(code, source_path, request, (wake_r, wake_w))
+                children[pid] = request['id']
+                _send({'id': request['id'], 'pid': pid})
+
+
+if __name__ == '__main__':
+    _serve(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -24,6 +24,7 @@ from django.core import signing
 from django.utils import timezone
 
 from api.dynamodb.async_client import AsyncDynamoDBClient
+from api.dynamodb.pagination import iter_scan
 from asgiref.sync import async_to_sync
 
 logger = logging.getLogger(__name__)
@@ -293,7 +294,8 @@ class AsyncDynamoDBSessionStore(SessionBase):
                 current_time = int(time.time())
 
                 # Scan for expired sessions (this is expensive, use TTL instead)
-                response = await table.scan(
+                items = iter_scan(
+                    table,
                     FilterExpression='#tp = :tp AND #exp < :now',
                     ExpressionAttributeNames={
                         '#tp': 'tp',
@@ -302,23 +304,22 @@ class AsyncDynamoDBSessionStore(SessionBase):
                     ExpressionAttributeValues={
                         ':tp': 'session',
                         ':now': current_time
-                    }
+                    },
+                    ProjectionExpression='PK, SK'
                 )
 
-                items = response.get('Items', [])
                 deleted_count = 0
 
-                # Delete expired sessions in batch
-                if items:
-                    async with table.batch_writer() as batch:
-                        for item in items:
-                            await batch.delete_item(
-                                Key={
-                                    'PK': item['PK'],
-                                    'SK': item['SK']
-                                }
-                            )
-                            deleted_count += 1
+                # Delete expired sessions in batch as the scan pages arrive
+                async with table.batch_writer() as batch:
+                    async for item in items:
+                        await batch.delete_item(
+                            Key={
+                                'PK': item['PK'],
+                                'SK': item['SK']
+                            }
+                        )
+                        deleted_count += 1
 
                 logger.info(f"Cleared {deleted_count} expired sessions")
                 return deleted_count
@@ -3,10 +3,15 @@ from celery import shared_task
 from django.core.cache import cache
 from .services.llm_factory import LLMServiceFactory
 from .services.code_execution_service import CodeExecutionService
+from .services import execution_memo, program_input
 from .utils.job_helper import JobHelper
+from .utils.progress import ProgressReporter
 from .tasks_solution_generation import generate_solution_with_retry
 import base64
+import queue
 import re
+import threading
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -251,21 +256,11 @@ def generate_outputs_task(self, platform, problem_id):
 
         # Update test case outputs in DynamoDB
         failed_cases = []
-        success_count = 0
+        outputs = {}
 
         for tc, result in zip(test_cases, test_results):
             if result['status'] == 'success':
-                # Update test case output
-                pk = f"PROB#{platform}#{problem_id}"
-                sk = f"TC#{tc['testcase_id']}"
-                problem_repo.update_item(
-                    pk=pk,
-                    sk=sk,
-                    update_expression='SET dat.#out = :out',
-                    expression_attribute_values={':out': result['output']},
-                    expression_attribute_names={'#out': 'out'}
-                )
-                success_count += 1
+                outputs[tc['testcase_id']] = result['output']
             else:
                 failed_cases.append({
                     'input': result.get('input', '')[:50],
@@ -274,6 +269,10 @@ def generate_outputs_task(self, platform, problem_id):
 
         failed_count = len(failed_cases)
 
+        # One batched rewrite (S3-backed cases re-uploaded concurrently) and one
+        # test set version bump, which invalidates memoized executions
+        success_count = problem_repo.update_testcase_outputs(platform, problem_id, outputs) if outputs else 0
+
         # Log summary and failures
         logger.info(
             f"Output generation for {platform}/{problem_id}: "
@@ -318,20 +317,24 @@ def generate_outputs_task(self, platform, problem_id):
     retry_backoff_max=300,
     retry_jitter=True,
 )
-def generate_testcases_task(self, platform, problem_id):
+def generate_testcases_task(self, platform, problem_id, base_seed=None):
     """
     Generate test case inputs and outputs for a problem
 
     Args:
         platform: Platform name (e.g., 'baekjoon', 'codeforces')
         problem_id: Problem ID
+        base_seed: Case i is generated after random.seed(base_seed + i)
+                   (default: a random base seed); recorded on each TC# item
 
     Returns:
         dict: Result with status and count
     """
     try:
+        from django.conf import settings
         from api.dynamodb.repositories import ProblemRepository
         from api.services.test_case_generator import TestCaseGenerator
+        from api.services.generator_worker import GeneratorPool, new_base_seed
 
         logger.info(f"[generate_testcases_task] Starting for {platform}/{problem_id}")
 
@@ -355,27 +358,16 @@ def generate_testcases_task(self, platform, problem_id):
             logger.error(f"[generate_testcases_task] No solution_code for {platform}/{problem_id}")
             return {'status': 'FAILED', 'error': 'No solution_code'}
 
-        # Generate 5 small + 5 medium test case inputs
-        logger.info(f"[generate_testcases_task] Generating test case inputs...")
-        test_case_inputs = []
+        # Generate 5 small + 5 medium test case inputs in parallel, each with its own seed
+        if base_seed is None:
+            base_seed = new_base_seed()
+        cases = [(difficulty, base_seed + i) for i, difficulty in enumerate(['small'] * 5 + ['medium'] * 5)]
+        logger.info(f"[generate_testcases_task] Generating {len(cases)} test case inputs (base_seed={base_seed})...")
 
-        # 5 small
-        small_cases = TestCaseGenerator.execute_generator_code(
-            code=generator_code,
-            num_cases=5,
-            size='small'
-        )
-        test_case_inputs.extend(small_cases)
-        logger.info(f"[generate_testcases_task] Generated {len(small_cases)} small test cases")
-
-        # 5 medium
-        medium_cases = TestCaseGenerator.execute_generator_code(
-            code=generator_code,
-            num_cases=5,
-            size='medium'
-        )
-        test_case_inputs.extend(medium_cases)
-        logger.info(f"[generate_testcases_task] Generated {len(medium_cases)} medium test cases")
+        TestCaseGenerator.validate_code(generator_code)
+        with GeneratorPool(generator_code) as pool:
+            test_case_inputs = [test_case for _, test_case in pool.imap(cases)]
+        logger.info(f"[generate_testcases_task] Generated {len(test_case_inputs)} test cases")
 
         # Execute solution code to get outputs
         logger.info(f"[generate_testcases_task] Executing solution code ({len(solution_code)} chars)")
@@ -397,26 +389,36 @@ def generate_testcases_task(self, platform, problem_id):
                 f"input_len={len(r.get('input', ''))}, output_len={len(r.get('output', ''))}"
             )
 
-        # Store as TC# items
-        successful_testcases = [r for r in test_results if r['status'] == 'success']
+        # Store as TC# items (with the seed and difficulty that reproduce each input)
+        successful_testcases = [(r, case) for r, case in zip(test_results, cases) if r['status'] == 'success']
 
         if successful_testcases:
             logger.info(f"[generate_testcases_task] Storing {len(successful_testcases)} test cases as TC# items")
 
-            for idx, r in enumerate(successful_testcases):
-                testcase_id = str(idx + 1)
-                try:
-                    problem_repo.add_testcase(
-                        platform=platform,
-                        problem_id=problem_id,
-                        testcase_id=testcase_id,
-                        input_str=r['input'],
-                        output_str=r['output']
-                    )
-                    logger.info(f"[generate_testcases_task] Stored TC#{testcase_id}")
-                except Exception as e:
-                    logger.error(f"[generate_testcases_task] Failed to store TC#{testcase_id}: {e}")
-                    raise
+            # Large inputs can then be stored as (generator hash, seed, size) instead of in S3
+            generator_hash = None
+            if settings.TEST_CASE_LAZY_INPUTS:
+                generator_hash = problem_repo.put_generator(platform, problem_id, generator_code)
+
+            try:
+                problem_repo.add_testcases(
+                    platform=platform,
+                    problem_id=problem_id,
+                    cases=[
+                        {
+                            'testcase_id': str(idx + 1),
+                            'input': r['input'],
+                            'output': r['output'],
+                            'seed': seed,
+                            'difficulty': difficulty
+                        }
+                        for idx, (r, (difficulty, seed)) in enumerate(successful_testcases)
+                    ],
+                    generator_hash=generator_hash
+                )
+            except Exception as e:
+                logger.error(f"[generate_testcases_task] Failed to store test cases: {e}")
+                raise
 
             logger.info(f"[generate_testcases_task] Successfully stored {len(successful_testcases)} test cases")
         else:
@@ -426,6 +428,7 @@ def generate_testcases_task(self, platform, problem_id):
             'status': 'COMPLETED',
             'count': len(successful_testcases),
             'failed_count': failed_count,
+            'base_seed': base_seed,
             'message': f'Generated {len(successful_testcases)} test cases'
         }
 
@@ -437,6 +440,34 @@ def generate_testcases_task(self, platform, problem_id):
 # ============================================================================
 # OPTIMIZED CODE EXECUTION TASK
 # ============================================================================
+# Number of smallest test cases run before the historically failing ones
+SMALL_TESTS_FIRST = 3
+
+
+def _order_test_cases(test_cases, failure_counts):
+    """
+    Order test cases so a wrong submission fails as early as possible
+
+    The SMALL_TESTS_FIRST smallest inputs run first (cheap and usually the
+    samples), then the rest by how often they failed in past executions of
+    this problem, smaller inputs first on ties.
+
+    Args:
+        test_cases: List of {'id', 'input', 'output'} dicts
+        failure_counts: {test_case_id (str): failure count} (problem 'tc_failures')
+
+    Returns:
+        list: Indexes into test_cases in execution order
+    """
+    by_size = sorted(range(len(test_cases)), key=lambda i: program_input.size(test_cases[i]['input']))
+    small = by_size[:SMALL_TESTS_FIRST]
+    rest = sorted(
+        by_size[SMALL_TESTS_FIRST:],
+        key=lambda i: (-int(failure_counts.get(str(test_cases[i]['id']), 0)), program_input.size(test_cases[i]['input']))
+    )
+    return small + rest
+
+
 @shared_task(
     bind=True,
     max_retries=MAX_RETRIES,
@@ -449,7 +480,7 @@ def generate_testcases_task(self, platform, problem_id):
     retry_backoff_max=60,
     retry_jitter=True,
 )
-def execute_code_task(self, code, language, platform=None, problem_identifier=None, problem_id=None, user_id=None, user_identifier='anonymous', is_code_public=False):
+def execute_code_task(self, code, language, platform=None, problem_identifier=None, problem_id=None, user_id=None, user_identifier='anonymous', is_code_public=False, fail_fast=False, memo_key=None):
     """
     Async task to execute code against test cases - DynamoDB implementation
 
@@ -469,15 +500,24 @@ def execute_code_task(self, code, language, platform=None, problem_identifier=No
         user_id: User ID (if authenticated)
         user_identifier: User email or identifier
         is_code_public: Whether to make code public
+        fail_fast: Stop at the first failing test case (remaining ones are
+                   reported with status 'skipped')
+        memo_key: Execution memo key claimed by ExecuteCodeView; released if
+                  this execution fails so identical requests run again
 
     Returns:
         dict: Execution results
     """
     from api.dynamodb.client import DynamoDBClient
     from api.dynamodb.repositories import ProblemRepository
+    from api.services.generated_inputs import GeneratedInputError
+    from api.services.workdir_pool import WorkdirPool
     import logging
     logger = logging.getLogger(__name__)
 
+    # tmpfs slot holding the large (byte) inputs for the whole execution
+    input_dir = None
+
     try:
         # Determine platform and problem_identifier
         if platform and problem_identifier:
@@ -485,11 +525,22 @@ def execute_code_task(self, code, language, platform=None, problem_identifier=No
             table = DynamoDBClient.get_table()
             problem_repo = ProblemRepository(table)
 
-            # Get problem with test cases from DynamoDB
-            problem_data = problem_repo.get_problem_with_testcases(
-                platform=platform,
-                problem_id=problem_identifier
-            )
+            # Get problem with test cases from DynamoDB; large (S3) cases stay bytes all the
+            # way to the child's stdin and are only decoded for the response payload
+            try:
+                problem_data = problem_repo.get_problem_with_testcases(
+                    platform=platform,
+                    problem_id=problem_identifier,
+                    raw=True
+                )
+            except GeneratedInputError as e:
+                # Regeneration is deterministic, so retrying would fail the same way
+                logger.error(f"Test cases of {platform}/{problem_identifier} are unavailable: {e}")
+                execution_memo.forget(memo_key, self.request.id)
+                return {
+                    'status': 'FAILED',
+                    'error': f'Test cases are unavailable: {e}'
+                }
 
             if not problem_data:
                 logger.error(f"Problem {platform}/{problem_identifier} not found in DynamoDB")
@@ -507,12 +558,18 @@ def execute_code_task(self, code, language, platform=None, problem_identifier=No
                     'error': 'No test cases available for this problem'
                 }
 
-            # Convert DynamoDB test cases to expected format
+            # Convert DynamoDB test cases to expected format. Byte (S3) inputs are written
+            # to tmpfs once, so executors and the daemon read that file instead of copying per run
             test_cases = []
             for tc in test_cases_data:
+                test_input = tc['input']
+                if isinstance(test_input, program_input.BYTES_TYPES):
+                    if input_dir is None:
+                        input_dir = WorkdirPool().acquire()
+                    test_input = program_input.spill(test_input, input_dir.path / f"input-{len(test_cases)}")
                 test_cases.append({
                     'id': tc['testcase_id'],
-                    'input': tc['input'],
+                    'input': test_input,
                     'output': tc['output']
                 })
 
@@ -526,69 +583,119 @@ def execute_code_task(self, code, language, platform=None, problem_identifier=No
         # Now we have test_cases in the expected format
         total_tests = len(test_cases)
 
-        # Update initial state
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'current': 0,
-                'total': total_tests,
-                'status': 'Starting execution...'
-            }
-        )
+        # Update initial state; per-test progress is coalesced to bound result backend writes
+        progress = ProgressReporter(self, total_tests)
+        progress.update(0, 'Starting execution...', force=True)
 
         # Execute code with progress tracking
         test_results = []
         passed_count = 0
         failed_count = 0
-        results = []
-        history_results = []
-
-        for idx, tc in enumerate(test_cases, 1):
-            # Update progress
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    'current': idx,
-                    'total': total_tests,
-                    'status': f'Testing {idx}/{total_tests}...'
-                }
-            )
+        skipped_count = 0
+        results = [None] * total_tests
+        history_results = [None] * total_tests
+
+        # Cheap and historically failing cases first, so fail-fast finds a counterexample early
+        failure_counts = problem_data.get('tc_failures', {})
+        execution_order = _order_test_cases(test_cases, failure_counts)
+
+        # Compile once, then run against every test case
+        with CodeExecutionService.prepare(code, language) as submission:
+            batch_results = None
+            if submission.remote:
+                # Judge0: one batch for all test cases instead of a round trip per case
+                # (everything runs anyway, so fail-fast does not skip any results)
+                progress.update(0, f'Testing {total_tests} cases on Judge0...', force=True)
+                batch = submission.execute_with_test_cases(
+                    [test_cases[i]['input'] for i in execution_order],
+                    expected_outputs=[test_cases[i]['output'] for i in execution_order]
+                )
+                batch_results = dict(zip(execution_order, batch))
+            elif submission.streaming and not fail_fast:
+                # Execution daemon: all test cases run in parallel, results stream back as they finish
+                batch_results = {}
+                for done, (position, result) in enumerate(submission.iter_results(
+                    [test_cases[i]['input'] for i in execution_order],
+                    expected_outputs=[test_cases[i]['output'] for i in execution_order]
+                ), 1):
+                    batch_results[execution_order[position]] = result
+                    progress.update(done, f'Testing {done}/{total_tests}...')
+
+            for idx, tc_index in enumerate(execution_order, 1):
+                tc = test_cases[tc_index]
+
+                if fail_fast and failed_count and batch_results is None:
+                    skipped_count += 1
+                    results[tc_index] = {
+                        'test_case_id': tc['id'],
+                        'input': program_input.to_text(tc['input']),
+                        'expected': program_input.to_text(tc['output']),
+                        'output': '',
+                        'passed': False,
+                        'error': None,
+                        'status': 'skipped'
+                    }
+                    history_results[tc_index] = {
+                        'test_case_id': tc['id'],
+                        'output': '',
+                        'passed': False,
+                        'error': None,
+                        'status': 'skipped'
+                    }
+                    continue
 
-            # Execute single test case
-            test_input = tc['input']
-            single_result = CodeExecutionService.execute_with_test_cases(
-                code=code,
-                language=language,
-                test_inputs=[test_input]
-            )[0]
+                if batch_results is not None:
+                    result = batch_results[tc_index]
+                else:
+                    # Update progress
+                    progress.update(idx, f'Testing {idx}/{total_tests}...')
 
-            result = single_result
-            passed = result['status'] == 'success' and result['output'].strip() == tc['output'].strip()
+                    # Execute single test case; stdout is compared token-wise while it is read
+                    # and only a bounded prefix (plus hash and size) is kept
+                    test_input = tc['input']
+                    result = submission.execute_with_test_cases([test_input], expected_outputs=[tc['output']])[0]
 
-            if passed:
-                passed_count += 1
-            else:
-                failed_count += 1
-
-            # For frontend - includes input and expected
-            results.append({
-                'test_case_id': tc['id'],
-                'input': tc['input'],
-                'expected': tc['output'],
-                'output': result.get('output', ''),
-                'passed': passed,
-                'error': result.get('error'),
-                'status': result['status']
-            })
+                passed = result['status'] == 'success' and result.get('matched', False)
 
-            # For database - only output (smaller storage)
-            history_results.append({
-                'test_case_id': tc['id'],
-                'output': result.get('output', ''),
-                'passed': passed,
-                'error': result.get('error'),
-                'status': result['status']
-            })
+                if passed:
+                    passed_count += 1
+                else:
+                    failed_count += 1
+
+                # For frontend - includes input and expected (kept in original test case order)
+                results[tc_index] = {
+                    'test_case_id': tc['id'],
+                    'input': program_input.to_text(tc['input']),
+                    'expected': program_input.to_text(tc['output']),
+                    'output': result.get('output', ''),
+                    'output_truncated': result.get('output_truncated', False),
+                    'output_size': result.get('output_size'),
+                    'output_hash': result.get('output_hash'),
+                    'passed': passed,
+                    'error': result.get('error'),
+                    'status': result['status'],
+                    'verdict': result.get('verdict'),
+                    'cpu_ms': result.get('cpu_ms'),
+                    'wall_ms': result.get('wall_ms'),
+                    'peak_rss_kb': result.get('peak_rss_kb')
+                }
+
+                # For database - only output (smaller storage)
+                history_results[tc_index] = {
+                    'test_case_id': tc['id'],
+                    'output': result.get('output', ''),
+                    'output_size': result.get('output_size'),
+                    'output_hash': result.get('output_hash'),
+                    'passed': passed,
+                    'error': result.get('error'),
+                    'status': result['status'],
+                    'verdict': result.get('verdict'),
+                    'cpu_ms': result.get('cpu_ms'),
+                    'wall_ms': result.get('wall_ms'),
+                    'peak_rss_kb': result.get('peak_rss_kb')
+                }
+
+        progress.flush()
 
         # Save to search history in DynamoDB
         execution_id = None
@@ -610,10 +717,16 @@ def execute_code_task(self, code, language, platform=None, problem_identifier=No
             for result in history_results:
                 dynamodb_test_results.append({
                     'tid': result['test_case_id'],  # test_case_id
-                    'out': result.get('output', ''),  # output
+                    'out': result.get('output', ''),  # output (bounded prefix)
+                    'osz': result.get('output_size'),  # output_size (bytes)
+                    'ohs': result.get('output_hash'),  # output_hash (sha256)
                     'pas': result.get('passed', False),  # passed
                     'err': result.get('error'),  # error
-                    'sts': result.get('status', '')  # status
+                    'sts': result.get('status', ''),  # status
+                    'vrd': result.get('verdict'),  # verdict (OK/RE/TLE/MLE/OLE/CE)
+                    'cpu': result.get('cpu_ms'),  # cpu_ms
+                    'wal': result.get('wall_ms'),  # wall_ms
+                    'mem': result.get('peak_rss_kb')  # peak_rss_kb
                 })
 
             # Encode code as base64 before storing
@@ -632,6 +745,7 @@ def execute_code_task(self, code, language, platform=None, problem_identifier=No
                 'res': 'Passed' if failed_count == 0 else 'Failed',  # result_summary
                 'psc': passed_count,  # passed_count
                 'fsc': failed_count,  # failed_count
+                'skc': skipped_count,  # skipped_count (fail-fast)
                 'toc': len(test_cases),  # total_count
                 'pub': is_code_public,  # is_code_public
                 'trs': dynamodb_test_results,  # test_results
@@ -691,19 +805,14 @@ def execute_code_task(self, code, language, platform=None, problem_identifier=No
                 logger.error(f"[STATS] Failed to update user stats: {e}")
                 # Don't fail the task if stats update fails
 
-            # Update problem execution count in DynamoDB metadata
-            current_metadata = problem_data.get('metadata', {}) if problem_data else {}
-            execution_count = current_metadata.get('execution_count', 0) + 1
-
-            problem_repo.update_problem(
+            # Update problem execution count and per-test failure counts (atomic counters)
+            problem_repo.record_execution(
                 platform=platform,
                 problem_id=problem_identifier,
-                updates={
-                    'metadata': {
-                        **current_metadata,
-                        'execution_count': execution_count
-                    }
-                }
+                failed_testcase_ids=[
+                    str(result['test_case_id']) for result in history_results
+                    if result['status'] != 'skipped' and not result['passed']
+                ]
             )
 
             logger.info(
@@ -714,6 +823,10 @@ def execute_code_task(self, code, language, platform=None, problem_identifier=No
         except Exception as e:
             logger.error(f"Failed to save search history to DynamoDB: {str(e)}", exc_info=True)
 
+        if execution_id is None:
+            # Results are not in the history, so a memoized resubmission could not find them
+            execution_memo.forget(memo_key, self.request.id)
+
         return {
             'status': 'COMPLETED',
             'execution_id': execution_id,
@@ -721,15 +834,21 @@ def execute_code_task(self, code, language, platform=None, problem_identifier=No
             'summary': {
                 'total': len(test_cases),
                 'passed': passed_count,
-                'failed': failed_count
+                'failed': failed_count,
+                'skipped': skipped_count
             }
         }
 
     except Exception as e:
         logger.error(f"Error in execute_code_task: {str(e)}", exc_info=True)
+        execution_memo.forget(memo_key, self.request.id)
         # Don't retry - handled by autoretry_for
         raise
 
+    finally:
+        if input_dir is not None:
+            input_dir.cleanup()
+
 
 # ============================================================================
 # OPTIMIZED PROBLEM INFO EXTRACTION TASK
@@ -1945,6 +2064,67 @@ def recover_orphaned_jobs_task(self, timeout_minutes=30):
 # ============================================================================
 # TEST CASE EXECUTION TASK
 # ============================================================================
+# Cases buffered between the generate -> solve -> store stages of execute_test_cases_task
+TEST_CASE_PIPELINE_DEPTH = 4
+# Most test cases stored in one add_testcases() call (one BatchWriteItem request)
+TEST_CASE_STORE_BATCH = 25
+# Longest wait (seconds) for the next solved case before the pipeline is considered stuck
+TEST_CASE_PIPELINE_TIMEOUT = 180
+_PIPELINE_END = object()
+
+
+def _pipeline_put(stage_queue, item, stop):
+    """
+    Put an item on a pipeline queue, waiting while it is full
+
+    Returns:
+        bool: False if the pipeline was stopped before the item could be queued
+    """
+    while not stop.is_set():
+        try:
+            stage_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _pipeline_get(stage_queue, stop, producers=(), timeout=None):
+    """
+    Get the next item of a pipeline queue
+
+    Args:
+        stage_queue: Queue to read
+        stop: Event that stops the pipeline
+        producers: Threads feeding the queue (directly or through earlier stages);
+                   once none is alive and the queue is empty, no item will come
+        timeout: Seconds to wait for the item (None = no limit)
+
+    Returns:
+        The item, or _PIPELINE_END once the pipeline is stopped
+
+    Raises:
+        RuntimeError: If the producers exited without ending the queue
+        TimeoutError: If no item arrived within timeout
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    while not stop.is_set():
+        try:
+            return stage_queue.get(timeout=0.1)
+        except queue.Empty:
+            pass
+
+        if producers and not any(producer.is_alive() for producer in producers):
+            # The last item may have been queued right before the producer exited
+            try:
+                return stage_queue.get_nowait()
+            except queue.Empty:
+                raise RuntimeError('Pipeline stages exited without finishing')
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f'No pipeline progress for {timeout}s')
+    return _PIPELINE_END
+
+
 @shared_task(
     bind=True,
     max_retries=MAX_RETRIES,
@@ -1955,10 +2135,10 @@ def recover_orphaned_jobs_task(self, timeout_minutes=30):
     retry_backoff_max=300,
     retry_jitter=True,
 )
-def execute_test_cases_task(self, generator_code, num_cases=10, platform=None, problem_id=None, difficulties=None):
+def execute_test_cases_task(self, generator_code, num_cases=10, platform=None, problem_id=None, difficulties=None, base_seed=None):
     """
     Async task to execute generator code and produce test case inputs
-    PROCESS ISOLATION: Each test case runs in separate process for memory isolation
+    PROCESS ISOLATION: Test cases are generated in parallel in separate (recycled) generator processes
     REAL-TIME: Updates Problem.test_case_count incrementally for UI progress
 
     Args:
@@ -1968,16 +2148,18 @@ def execute_test_cases_task(self, generator_code, num_cases=10, platform=None, p
         problem_id: Problem ID (optional, for real-time updates)
         difficulties: List of difficulties for each test case (e.g., ['small', 'small', 'medium', 'large'])
                      If not provided, defaults to 'mixed' for all cases
+        base_seed: Case i is generated after random.seed(base_seed + i), so results do
+                   not depend on scheduling (default: a random base seed); recorded
+                   with the difficulty on each TC# item
 
     Returns:
         dict: Result with test_cases (array of strings ONLY)
     """
+    solution = None
     try:
-        import subprocess
-        import sys
-        import json
-        import tempfile
+        from django.conf import settings
         from api.services.test_case_generator import TestCaseGenerator
+        from api.services.generator_worker import GeneratorPool, new_base_seed
 
         # If difficulties not provided, generate mixed test cases
         if not difficulties:
@@ -2003,187 +2185,164 @@ def execute_test_cases_task(self, generator_code, num_cases=10, platform=None, p
 
         # Get problem repository for real-time updates
         problem_repo = None
+        generator_hash = None
         if platform and problem_id:
             from api.dynamodb.repositories import ProblemRepository
             problem_repo = ProblemRepository()
 
-        test_case_count = 0
-        test_case_inputs = []
+            # Large inputs can then be stored as (generator hash, seed, size) instead of in S3
+            if settings.TEST_CASE_LAZY_INPUTS:
+                generator_hash = problem_repo.put_generator(platform, problem_id, generator_code)
 
-        # Generate ONE test case at a time in SEPARATE PROCESS
-        for i in range(num_cases):
-            difficulty = difficulties[i]
-            logger.info(f"[Execute Test Cases Task] Generating test case {i+1}/{num_cases} with difficulty={difficulty}")
+        # Compile the solution once for all generated test cases
+        if problem_repo:
             try:
-                # Create wrapper script that executes in subprocess
-                # Use the difficulty variable from outer scope
-                wrapper_script = f'''
-import json
-import sys
-
-# Safe builtins
-safe_builtins = {{
-    'abs': abs, 'all': all, 'any': any, 'bin': bin, 'bool': bool,
-    'chr': chr, 'dict': dict, 'divmod': divmod, 'enumerate': enumerate,
-    'filter': filter, 'float': float, 'format': format, 'hex': hex,
-    'int': int, 'isinstance': isinstance, 'len': len, 'list': list,
-    'map': map, 'max': max, 'min': min, 'oct': oct, 'ord': ord,
-    'pow': pow, 'range': range, 'repr': repr, 'reversed': reversed,
-    'round': round, 'set': set, 'slice': slice, 'sorted': sorted,
-    'str': str, 'sum': sum, 'tuple': tuple, 'type': type, 'zip': zip,
-    'True': True, 'False': False, 'None': None,
-}}
-
-safe_globals = {{
-    '__builtins__': safe_builtins,
-}}
-
-# Import safe modules
-import random
-import math
-import string
-import itertools
-import collections
-
-safe_globals.update({{
-    'random': random,
-    'math': math,
-    'string': string,
-    'itertools': itertools,
-    'collections': collections,
-}})
-
-# Execute generator code
-{generator_code}
-
-# Generate test case
-if 'generate_test_cases' not in globals():
-    print(json.dumps({{"error": "generate_test_cases function not found"}}))
-    sys.exit(1)
-
-try:
-    # Try calling with size parameter first (new signature)
-    import inspect
-    sig = inspect.signature(generate_test_cases)
-    if 'size' in sig.parameters:
-        result = generate_test_cases(1, size="{difficulty}")
-    else:
-        # Fallback to old signature
-        result = generate_test_cases(1)
-
-    if not isinstance(result, list) or len(result) == 0:
-        print(json.dumps({{"error": "generate_test_cases(1) must return a list with 1 element"}}))
-        sys.exit(1)
-
-    test_case = result[0]
-    if not isinstance(test_case, str):
-        print(json.dumps({{"error": f"Test case is not a string: {{type(test_case)}}"}}))
-        sys.exit(1)
-
-    print(json.dumps({{"test_case": test_case}}))
-except Exception as e:
-    print(json.dumps({{"error": str(e)}}))
-    sys.exit(1)
-'''
-
-                # Execute in subprocess with 10 minute timeout
-                result = subprocess.run(
-                    [sys.executable, '-c', wrapper_script],
-                    capture_output=True,
-                    text=True,
-                    timeout=600  # 10 minutes per test case
-                )
-
-                if result.returncode != 0:
-                    error_msg = f"Subprocess failed with code {result.returncode}"
-                    if result.stderr:
-                        error_msg += f": {result.stderr}"
-                    logger.error(f"[Execute Test Cases Task] {error_msg}")
-                    raise ValueError(error_msg)
-
-                # Parse JSON output
+                problem = problem_repo.get_problem(platform, problem_id)
+                if problem and problem.get('solution_code'):
+                    solution = CodeExecutionService.prepare(
+                        code=problem['solution_code'],
+                        language=problem.get('language', 'python')
+                    )
+                else:
+                    logger.warning(f"[Execute Test Cases Task] No solution_code found for {platform}/{problem_id}")
+            except Exception as prepare_error:
+                logger.error(f"[Execute Test Cases Task] Error preparing solution code: {prepare_error}")
+
+        # Each case has its own seed, so results do not depend on scheduling
+        if base_seed is None:
+            base_seed = new_base_seed()
+        cases = [(difficulties[i], base_seed + i) for i in range(num_cases)]
+        logger.info(f"[Execute Test Cases Task] Base seed: {base_seed}")
+
+        # Pipeline: generate (parallel generator processes) -> solve (prepared solution)
+        # -> store (this thread), connected by bounded queues so a slow stage throttles
+        # the others; cases go through every stage in order
+        generated = queue.Queue(maxsize=TEST_CASE_PIPELINE_DEPTH)
+        solved = queue.Queue(maxsize=TEST_CASE_PIPELINE_DEPTH)
+        stop = threading.Event()
+
+        def generate_stage(pool):
+            count = 0
+            try:
+                for _, test_case in pool.imap(cases):
+                    count += 1
+                    logger.info(f"[Execute Test Cases Task] Generated test case {count}/{num_cases}")
+                    if not _pipeline_put(generated, test_case, stop):
+                        return
+            except Exception as e:
+                logger.error(f"[Execute Test Cases Task] Error generating test case {count+1}: {e}")
+                _pipeline_put(generated, ValueError(f'Failed to generate test case {count+1}: {str(e)}'), stop)
+            finally:
+                _pipeline_put(generated, _PIPELINE_END, stop)
+
+        def solve_stage():
+            count = 0
+            while True:
+                test_case = _pipeline_get(generated, stop)
+                if test_case is _PIPELINE_END or isinstance(test_case, Exception):
+                    _pipeline_put(solved, test_case, stop)
+                    if test_case is _PIPELINE_END:
+                        return
+                    continue
+
+                # Generate output using solution_code
+                count += 1
+                output_str = ''
                 try:
-                    output_data = json.loads(result.stdout)
-                    if 'error' in output_data:
-                        raise ValueError(output_data['error'])
-
-                    test_case = output_data['test_case']
-                    test_case_inputs.append(test_case)
-                    test_case_count += 1
+                    if solution is not None:
+                        logger.info(f"[Execute Test Cases Task] Generating output for testcase {count}")
+                        exec_result = solution.execute_with_test_cases([test_case])
+
+                        if exec_result and len(exec_result) > 0 and exec_result[0]['status'] == 'success':
+                            output_str = exec_result[0]['output']
+                            logger.info(f"[Execute Test Cases Task] Generated output for testcase {count}, length={len(output_str)}")
+                        else:
+                            error_msg = exec_result[0].get('error', 'Unknown error') if exec_result else 'No result'
+                            logger.warning(f"[Execute Test Cases Task] Failed to generate output for testcase {count}: {error_msg}")
+                except Exception as exec_error:
+                    logger.error(f"[Execute Test Cases Task] Error generating output: {exec_error}")
+
+                if not _pipeline_put(solved, (test_case, output_str), stop):
+                    return
 
-                    logger.info(f"[Execute Test Cases Task] Generated test case {i+1}/{num_cases}")
+        test_case_count = 0
+        test_case_inputs = []
 
-                    # Save testcase to DynamoDB or S3 immediately
-                    # add_testcase automatically handles S3/DynamoDB routing and creates TC# item
-                    if problem_repo and platform and problem_id:
+        stages = []
+        try:
+            with GeneratorPool(generator_code) as pool:
+                stages = [
+                    threading.Thread(target=generate_stage, args=(pool,), name='testcase-generate', daemon=True),
+                    threading.Thread(target=solve_stage, name='testcase-solve', daemon=True)
+                ]
+                for stage in stages:
+                    stage.start()
+
+                finished = False
+                error = None
+                while not finished:
+                    # Store every case that is already solved in one batch
+                    batch = []
+                    item = _pipeline_get(solved, stop, stages, TEST_CASE_PIPELINE_TIMEOUT)
+                    while True:
+                        if item is _PIPELINE_END or isinstance(item, Exception):
+                            finished = True
+                            error = item if item is not _PIPELINE_END else None
+                            break
+                        batch.append(item)
+                        if len(batch) >= TEST_CASE_STORE_BATCH:
+                            break
                         try:
-                            testcase_id = str(test_case_count)
-
-                            # Generate output using solution_code
-                            output_str = ''
-                            try:
-                                problem = problem_repo.get_problem(platform, problem_id)
-                                if problem and problem.get('solution_code'):
-                                    solution_code = problem['solution_code']
-                                    language = problem.get('language', 'python')
-
-                                    logger.info(f"[Execute Test Cases Task] Generating output for testcase {testcase_id}")
-                                    result = CodeExecutionService.execute_with_test_cases(
-                                        code=solution_code,
-                                        language=language,
-                                        test_inputs=[test_case]
-                                    )
-
-                                    if result and len(result) > 0 and result[0]['status'] == 'success':
-                                        output_str = result[0]['output']
-                                        logger.info(f"[Execute Test Cases Task] Generated output for testcase {testcase_id}, length={len(output_str)}")
-                                    else:
-                                        error_msg = result[0].get('error', 'Unknown error') if result else 'No result'
-                                        logger.warning(f"[Execute Test Cases Task] Failed to generate output for testcase {testcase_id}: {error_msg}")
-                                else:
-                                    logger.warning(f"[Execute Test Cases Task] No solution_code found for {platform}/{problem_id}")
-                            except Exception as exec_error:
-                                logger.error(f"[Execute Test Cases Task] Error generating output: {exec_error}")
-
-                            # Use add_testcase which automatically:
-                            # 1. Stores large test cases (>100KB) in S3
-                            # 2. Creates TC# item in DynamoDB with S3 reference or direct data
-                            problem_repo.add_testcase(
-                                platform=platform,
-                                problem_id=problem_id,
-                                testcase_id=testcase_id,
-                                input_str=test_case,
-                                output_str=output_str
-                            )
-                            logger.info(f"[Execute Test Cases Task] Stored testcase {testcase_id} with output_len={len(output_str)}")
-
-                            # Update Problem.test_case_count
-                            problem_repo.update_problem(
+                            item = solved.get_nowait()
+                        except queue.Empty:
+                            break
+
+                    new_cases = []
+                    for test_case, output_str in batch:
+                        difficulty, seed = cases[test_case_count]
+                        test_case_inputs.append(test_case)
+                        test_case_count += 1
+                        new_cases.append({
+                            'testcase_id': str(test_case_count),
+                            'input': test_case,
+                            'output': output_str,
+                            'seed': seed,
+                            'difficulty': difficulty
+                        })
+
+                    # Save test cases to DynamoDB or S3 immediately
+                    if new_cases and problem_repo and platform and problem_id:
+                        try:
+                            # add_testcases stores large test cases (>100KB) in S3 (or by seed with
+                            # TEST_CASE_LAZY_INPUTS), writes the TC# items in a batch and sets
+                            # Problem.test_case_count (and the test set version) in one update
+                            problem_repo.add_testcases(
                                 platform=platform,
                                 problem_id=problem_id,
-                                updates={'test_case_count': test_case_count}
+                                cases=new_cases,
+                                generator_hash=generator_hash,
+                                test_case_count=test_case_count
                             )
-                            logger.info(f"[Execute Test Cases Task] Updated {platform}/{problem_id} count to {test_case_count}")
+                            logger.info(f"[Execute Test Cases Task] Stored {len(new_cases)} testcases, updated {platform}/{problem_id} count to {test_case_count}")
                         except Exception as update_error:
-                            logger.warning(f"[Execute Test Cases Task] Failed to save testcase: {update_error}")
-
-                except json.JSONDecodeError as e:
-                    logger.error(f"[Execute Test Cases Task] Failed to parse output: {result.stdout}")
-                    raise ValueError(f"Invalid JSON output from generator: {str(e)}")
+                            logger.warning(f"[Execute Test Cases Task] Failed to save testcases: {update_error}")
 
-            except subprocess.TimeoutExpired:
-                logger.error(f"[Execute Test Cases Task] Test case {i+1} generation timed out after 10 minutes")
-                raise ValueError(f'Test case {i+1} generation timed out')
-            except Exception as e:
-                logger.error(f"[Execute Test Cases Task] Error generating test case {i+1}: {e}")
-                raise ValueError(f'Failed to generate test case {i+1}: {str(e)}')
+                    if error is not None:
+                        raise error
+        finally:
+            # Unblock the stages if storing stopped early (closing the pool ended generation);
+            # a stage stuck in a run is a daemon thread and is not waited for indefinitely
+            stop.set()
+            for stage in stages:
+                stage.join(timeout=TEST_CASE_PIPELINE_TIMEOUT)
 
         logger.info(f"[Execute Test Cases Task] Successfully generated {test_case_count} test cases")
 
         return {
             'status': 'SUCCESS',
             'test_cases': test_case_inputs,
-            'count': test_case_count
+            'count': test_case_count,
+            'base_seed': base_seed
         }
 
     except ValueError as e:
@@ -2202,3 +2361,6 @@ except Exception as e:
             'test_cases': [],
             'count': 0
         }
+    finally:
+        if solution is not None:
+            solution.close()
@@ -0,0 +1,90 @@
+"""Coalesced Celery task progress reporting"""
+import time
+
+
+class ProgressReporter:
+    """
+    Rate-limited wrapper around task.update_state(state='PROGRESS')
+
+    Every update_state() is a write to the result backend (a DynamoDB
+    put_item), so reporting before each test case costs one write per case.
+    This reporter only writes when at least MIN_INTERVAL seconds have passed
+    or progress advanced by MIN_STEP of the total since the last write, and
+    flush() writes the latest state if it was held back. Reported progress
+    never goes backwards.
+
+    Usage:
+        progress = ProgressReporter(self, total_tests)
+        progress.update(0, 'Starting execution...', force=True)
+        for idx, tc in enumerate(test_cases, 1):
+            progress.update(idx, f'Testing {idx}/{total_tests}...')
+            ...
+        progress.flush()
+    """
+
+    MIN_INTERVAL = 0.25  # seconds between writes
+    MIN_STEP = 0.1  # fraction of total that always triggers a write
+
+    def __init__(self, task, total, min_interval=None, min_step=None):
+        """
+        Args:
+            task: Bound Celery task (self in a bind=True task)
+            total: Total number of steps
+            min_interval: Override MIN_INTERVAL
+            min_step: Override MIN_STEP
+        """
+        self.task = task
+        self.total = total
+        self.min_interval = self.MIN_INTERVAL if min_interval is None else min_interval
+        self.step = max(1, int(total * (self.MIN_STEP if min_step is None else min_step)))
+
+        self.writes = 0
+        self._current = 0
+        self._status = None
+        self._written_current = None
+        self._written_status = None
+        self._last_write = None
+
+    def update(self, current, status, force=False):
+        """
+        Record progress, writing it to the backend if the budget allows
+
+        Args:
+            current: Steps completed (lower values than already seen are ignored)
+            status: Status message
+            force: Write regardless of the budget
+        """
+        if current < self._current:
+            return
+        self._current = current
+        self._status = status
+
+        now = time.monotonic()
+        due = (
+            force
+            or self._last_write is None
+            or current >= self.total
+            or current - self._written_current >= self.step
+            or now - self._last_write >= self.min_interval
+        )
+        if due:
+            self._write(now)
+
+    def flush(self):
+        """Write the latest state if it has not been written yet"""
+        if self._status is not None and (self._current, self._status) != (self._written_current, self._written_status):
+            self._write(time.monotonic())
+
+    def _write(self, now):
+        self.task.update_state(
+            state='PROGRESS',
+            meta={
+                'current': self._current,
+                'total': self.total,
+                'status': self._status
+            }
+        )
+        self.writes += 1
+        self._written_current = self._current
+        self._written_status = self._status
+        self._last_write = now
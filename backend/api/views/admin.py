@@ -110,13 +110,18 @@ class UserManagementView(APIView):
                 # Get today's date for usage stats
                 today = datetime.now().strftime('%Y%m%d')
 
+                # Get the subscription plans of all listed users in one batch - async
+                plans = await plan_repo.get_plans(
+                    [user['subscription_plan_id'] for user in users if user.get('subscription_plan_id')]
+                )
+
                 # Transform DynamoDB users to serializer format (inside async context)
                 users_data = []
                 for user in users:
-                    # Get subscription plan details - async
+                    # Subscription plan details
                     plan_data = None
                     if user.get('subscription_plan_id'):
-                        plan = await plan_repo.get_plan(user['subscription_plan_id'])
+                        plan = plans.get(user['subscription_plan_id'])
                         if plan:
                             plan_data = {
                                 'id': plan['id'],
@@ -614,28 +619,35 @@ class UsageStatsView(APIView):
             # Get top 10 users by activity
             sorted_users = sorted(user_activity.items(), key=lambda x: x[1], reverse=True)[:10]
 
-            # Get plan names for top users - async
+            # Get plan names for top users in one batch - async
+            users_by_id = {u['id']: u for u in active_users}
+            top_users = [
+                (users_by_id[user_id], activity_count)
+                for user_id, activity_count in sorted_users
+                if user_id in users_by_id
+            ]
+
             top_users_data = []
             async with AsyncDynamoDBClient.get_resource() as resource:
                 table = await resource.Table(AsyncDynamoDBClient._table_name)
                 plan_repo = AsyncSubscriptionPlanRepository(table)
+                top_plans = await plan_repo.get_plans(
+                    [user['subscription_plan_id'] for user, _ in top_users if user.get('subscription_plan_id')]
+                )
+
+                for user, activity_count in top_users:
+                    plan_name = 'None'
+                    if user.get('subscription_plan_id'):
+                        plan = top_plans.get(user['subscription_plan_id'])
+                        if plan:
+                            plan_name = plan['name']
 
-                for user_id, activity_count in sorted_users:
-                    # Find user data
-                    user = next((u for u in active_users if u['id'] == user_id), None)
-                    if user:
-                        plan_name = 'None'
-                        if user.get('subscription_plan_id'):
-                            plan = await plan_repo.get_plan(user['subscription_plan_id'])
-                            if plan:
-                                plan_name = plan['name']
-
-                        top_users_data.append({
-                            'email': user['email'],
-                            'name': user.get('name', ''),
-                            'activity_count': activity_count,
-                            'subscription_plan': plan_name
-                        })
+                    top_users_data.append({
+                        'email': user['email'],
+                        'name': user.get('name', ''),
+                        'activity_count': activity_count,
+                        'subscription_plan': plan_name
+                    })
 
             # Subscription plan distribution
             plan_counts = {}
@@ -746,34 +758,24 @@ class ProblemReviewView(APIView):
             limit = int(request.query_params.get('limit', 50))
             all_problems = all_problems[:limit]
 
-            # Transform to response format with test case count - async
+            # Transform to response format with the denormalized test case count (no N+1 queries)
             problems_data = []
-            async with AsyncDynamoDBClient.get_resource() as resource:
-                table = await resource.Table(AsyncDynamoDBClient._table_name)
-                problem_repo = AsyncProblemRepository(table)
-
-                for problem in all_problems:
-                    # Get test cases count - async
-                    testcases = await problem_repo.get_testcases(
-                        platform=problem['platform'],
-                        problem_id=problem['problem_id']
-                    )
-
-                    problems_data.append({
-                        'platform': problem['platform'],
-                        'problem_id': problem['problem_id'],
-                        'title': problem['title'],
-                        'problem_url': problem.get('problem_url', ''),
-                        'tags': problem.get('tags', []),
-                        'language': problem.get('language', ''),
-                        'is_completed': problem.get('is_completed', False),
-                        'needs_review': problem.get('needs_review', False),
-                        'verified_by_admin': problem.get('verified_by_admin', False),
-                        'review_notes': problem.get('review_notes'),
-                        'reviewed_at': problem.get('reviewed_at'),
-                        'test_case_count': len(testcases),
-                        'created_at': problem.get('created_at')
-                    })
+            for problem in all_problems:
+                problems_data.append({
+                    'platform': problem['platform'],
+                    'problem_id': problem['problem_id'],
+                    'title': problem['title'],
+                    'problem_url': problem.get('problem_url', ''),
+                    'tags': problem.get('tags', []),
+                    'language': problem.get('language', ''),
+                    'is_completed': problem.get('is_completed', False),
+                    'needs_review': problem.get('needs_review', False),
+                    'verified_by_admin': problem.get('verified_by_admin', False),
+                    'review_notes': problem.get('review_notes'),
+                    'reviewed_at': problem.get('reviewed_at'),
+                    'test_case_count': problem.get('test_case_count', 0),
+                    'created_at': problem.get('created_at')
+                })
 
             return Response({
                 'problems': problems_data,
@@ -852,12 +854,6 @@ class ProblemReviewView(APIView):
                     updates=updates
                 )
 
-                # Get test cases count - async
-                testcases = await problem_repo.get_testcases(
-                    platform=platform,
-                    problem_id=problem_identifier
-                )
-
             # Return updated problem
             problem_data = {
                 'platform': updated_problem['platform'],
@@ -871,7 +867,7 @@ class ProblemReviewView(APIView):
                 'verified_by_admin': updated_problem.get('verified_by_admin', False),
                 'review_notes': updated_problem.get('review_notes'),
                 'reviewed_at': updated_problem.get('reviewed_at'),
-                'test_case_count': len(testcases),
+                'test_case_count': problem.get('test_case_count', 0),
                 'created_at': updated_problem.get('created_at')
             }
 
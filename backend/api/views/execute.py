@@ -8,6 +8,7 @@ from ..authentication import CustomJWTAuthentication
 from ..serializers import ExecuteCodeSerializer
 from ..utils.rate_limit import check_rate_limit, log_usage
 from ..dynamodb.async_client import AsyncDynamoDBClient
+from ..services import execution_memo
 import logging
 
 logger = logging.getLogger(__name__)
@@ -68,6 +69,7 @@ class ExecuteCodeView(APIView):
         language = serializer.validated_data['language']
         user_identifier = serializer.validated_data.get('user_identifier', 'anonymous')
         is_code_public = serializer.validated_data.get('is_code_public', False)
+        fail_fast = serializer.validated_data.get('fail_fast', False)
 
         # Extract problem identification - support both legacy and new approaches
         problem_id = serializer.validated_data.get('problem_id')
@@ -101,6 +103,7 @@ class ExecuteCodeView(APIView):
                     # Always use dat.tcc for test case count
                     dat = problem_data.get('dat', {})
                     test_case_count = int(dat.get('tcc', 0))
+                    test_set_version = int(dat.get('tsv', 0))
 
                     if test_case_count == 0:
                         return Response(
@@ -132,16 +135,56 @@ class ExecuteCodeView(APIView):
             # Get user ID (sync operation)
             user_id = await sync_to_async(lambda: request.user.id if request.user.is_authenticated else None)()
 
-            # Delay celery task (sync operation)
-            task = await sync_to_async(execute_code_task.delay)(
-                code=code,
-                language=language,
-                platform=platform,
-                problem_identifier=problem_identifier,
-                user_id=user_id,
+            # Identical resubmission (same code, test set, user and options):
+            # reuse the earlier or in-flight execution instead of running again
+            memo_key = execution_memo.make_key(
+                code, language, platform, problem_identifier, test_set_version,
+                user_id or user_identifier,
                 user_identifier=user_identifier,
-                is_code_public=is_code_public
+                is_code_public=is_code_public,
+                fail_fast=fail_fast
             )
+            task_id, is_new = await sync_to_async(execution_memo.claim)(memo_key)
+            if not is_new:
+                # A reused execution still counts toward the user's usage
+                await sync_to_async(log_usage)(
+                    user=request.user,
+                    action='execution',
+                    problem=None,
+                    metadata={
+                        'task_id': task_id, 'language': language, 'platform': platform,
+                        'problem_id': problem_identifier, 'memoized': True
+                    }
+                )
+                return Response({
+                    'message': 'Code execution task started',
+                    'task_id': task_id,
+                    'memoized': True,
+                    'usage': {
+                        'current_count': current_count + 1,
+                        'limit': limit
+                    }
+                }, status=status.HTTP_202_ACCEPTED)
+
+            # Queue celery task under the claimed task id (sync operation)
+            try:
+                task = await sync_to_async(execute_code_task.apply_async)(
+                    kwargs={
+                        'code': code,
+                        'language': language,
+                        'platform': platform,
+                        'problem_identifier': problem_identifier,
+                        'user_id': user_id,
+                        'user_identifier': user_identifier,
+                        'is_code_public': is_code_public,
+                        'fail_fast': fail_fast,
+                        'memo_key': memo_key
+                    },
+                    task_id=task_id
+                )
+            except Exception:
+                await sync_to_async(execution_memo.forget)(memo_key, task_id)
+                raise
 
             # Log usage (wrap sync function)
             await sync_to_async(log_usage)(
@@ -88,7 +88,8 @@ class SearchHistoryListView(APIView):
                     items, next_key = await history_repo.list_user_history(
                         user_id=user_id,
                         limit=limit,
-                        last_evaluated_key=last_evaluated_key
+                        last_evaluated_key=last_evaluated_key,
+                        projection='history.list_row'
                     )
                 else:
                     # Return empty result if not authenticated
@@ -108,7 +109,8 @@ class SearchHistoryListView(APIView):
                     user_items, _ = await history_repo.list_user_history(
                         user_id=user_id,
                         limit=min(limit * 2, 100),  # Cap at 100 items max
-                        last_evaluated_key=None  # Start from beginning
+                        last_evaluated_key=None,  # Start from beginning
+                        projection='history.list_row'
                     )
 
                     # Fetch public history from others (time-partitioned)
@@ -124,7 +126,8 @@ class SearchHistoryListView(APIView):
 
                         items_batch, _ = await history_repo.list_public_history_by_partition(
                             partition=hour_partition,
-                            limit=max(limit // hours_to_query, 5)  # Distribute limit across partitions
+                            limit=max(limit // hours_to_query, 5),  # Distribute limit across partitions
+                            keys_only=True
                         )
                         public_items.extend(items_batch)
 
@@ -132,6 +135,9 @@ class SearchHistoryListView(APIView):
                         if len(public_items) >= min(limit * 2, 100):
                             break
 
+                    # GSI2 only projects keys: fetch the items of all partitions in one batch
+                    public_items = await history_repo.get_histories(public_items, projection='history.list_row')
+
                     # Merge: Remove duplicates (user's own public history appears in both queries)
                     # and sort by timestamp descending
                     seen_ids = set()
@@ -153,7 +159,8 @@ class SearchHistoryListView(APIView):
                     # Anonymous users see only public history
                     items, next_key = await history_repo.list_public_history(
                         limit=limit,
-                        last_evaluated_key=last_evaluated_key
+                        last_evaluated_key=last_evaluated_key,
+                        projection='history.list_row'
                     )
 
             # Filter by task_id if provided
@@ -436,7 +443,9 @@ class SearchHistoryDetailView(APIView):
 
         Args:
             test_results: List of test result dictionaries with format:
-                [{'tid': test_case_id, 'out': output, 'pas': passed, 'err': error, 'sts': status}, ...]
+                [{'tid': test_case_id, 'out': output, 'pas': passed, 'err': error, 'sts': status,
+                  'vrd': verdict, 'cpu': cpu_ms, 'wal': wall_ms, 'mem': peak_rss_kb,
+                  'osz': output_size, 'ohs': output_hash}, ...]
             platform: Platform name (e.g., 'baekjoon', 'leetcode')
             problem_id: Problem identifier
 
@@ -467,7 +476,8 @@ class SearchHistoryDetailView(APIView):
                         'output': result.get('out', ''),
                         'passed': result.get('pas', False),
                         'error': result.get('err'),
-                        'status': result.get('sts', '')
+                        'status': result.get('sts', ''),
+                        **self._resource_fields(result)
                     }
                     for result in test_results
                 ]
@@ -493,7 +503,8 @@ class SearchHistoryDetailView(APIView):
                     'output': result.get('out', ''),
                     'passed': result.get('pas', False),
                     'error': result.get('err'),
-                    'status': result.get('sts', '')
+                    'status': result.get('sts', ''),
+                    **self._resource_fields(result)
                 }
                 enriched.append(enriched_result)
 
@@ -513,11 +524,28 @@ class SearchHistoryDetailView(APIView):
                     'output': result.get('out', ''),
                     'passed': result.get('pas', False),
                     'error': result.get('err'),
-                    'status': result.get('sts', '')
+                    'status': result.get('sts', ''),
+                    **self._resource_fields(result)
                 }
                 for result in test_results
             ]
 
+    @staticmethod
+    def _resource_fields(result: dict) -> dict:
+        """Verdict, resource usage and output digest of a stored test result (absent on older histories)"""
+        def _to_int(value):
+            # DynamoDB returns Decimal for numbers
+            return int(value) if value is not None else None
+
+        return {
+            'verdict': result.get('vrd'),
+            'cpu_ms': _to_int(result.get('cpu')),
+            'wall_ms': _to_int(result.get('wal')),
+            'peak_rss_kb': _to_int(result.get('mem')),
+            'output_size': _to_int(result.get('osz')),
+            'output_hash': result.get('ohs')
+        }
+
     def _format_timestamp(self, timestamp: int) -> str:
         """Format Unix timestamp to ISO 8601 string"""
         from datetime import datetime, timezone
@@ -9,6 +9,8 @@ from asgiref.sync import sync_to_async
 from datetime import datetime
 from decimal import Decimal
 from ..dynamodb.async_client import AsyncDynamoDBClient
+from ..dynamodb.pagination import iter_query
+from ..dynamodb.projections import projection_params
 import logging
 import time
 
@@ -59,17 +61,17 @@ class ProblemListView(APIView):
                 # Query for completed problems using GSI3
                 # GSI3PK = 'PROB#COMPLETED' for completed problems
                 # GSI3SK = timestamp (sort key)
-                response = await table.query(
+                problems = [item async for item in iter_query(
+                    table,
+                    max_items=1000,
                     IndexName='GSI3',
                     KeyConditionExpression='GSI3PK = :pk',
                     ExpressionAttributeValues={
                         ':pk': 'PROB#COMPLETED'
                     },
                     ScanIndexForward=False,  # Newest first (descending by timestamp)
-                    Limit=1000
-                )
-
-                problems = response.get('Items', [])
+                    **projection_params('problem.summary', 'GSI3')  # No solution code or constraints
+                )]
 
             # Filter out deleted problems (dat.del field)
             problems = [p for p in problems if not p.get('dat', {}).get('del', False)]
@@ -214,26 +216,40 @@ class ProblemDetailView(APIView):
                     )
 
                 # Get test cases from TC# items
-                testcases_response = await table.query(
+                test_case_items = [item async for item in iter_query(
+                    table,
                     KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
                     ExpressionAttributeValues={
                         ':pk': f'PROB#{platform}#{problem_identifier}',
                         ':sk': 'TC#'
                     }
-                )
-
-                test_case_items = testcases_response.get('Items', [])
+                )]
 
                 # Process test cases - handle both DynamoDB and S3 storage
                 from api.services.async_s3_testcase_service import AsyncS3TestCaseService
                 s3_service = AsyncS3TestCaseService()
 
+                # Inputs stored by generator seed are regenerated (or read from the local cache);
+                # raises GeneratedInputError rather than showing fewer test cases
+                generated_inputs = {}
+                if any(tc.get('dat', {}).get('storage') == 'generated' for tc in test_case_items):
+                    from ..dynamodb.repositories import ProblemRepository
+                    generated_inputs = await sync_to_async(
+                        lambda: ProblemRepository().load_generated_inputs(platform, problem_identifier, test_case_items)
+                    )()
+
                 processed_test_cases = []
                 for tc in test_case_items:
                     testcase_id = tc.get('SK', '').replace('TC#', '')
                     storage_type = tc.get('dat', {}).get('storage', 'dynamodb')
 
-                    if storage_type == 's3':
+                    if storage_type == 'generated':
+                        processed_test_cases.append({
+                            'id': testcase_id,
+                            'input': generated_inputs[testcase_id],
+                            'output': tc.get('dat', {}).get('out', '')
+                        })
+                    elif storage_type == 's3':
                         # Retrieve from S3
                         try:
                             testcase_data = await s3_service.retrieve_testcase(
@@ -373,15 +389,14 @@ class ProblemDetailView(APIView):
                 pk = f'PROB#{platform}#{problem_identifier}'
 
                 # Delete all test cases first
-                testcases_response = await table.query(
+                test_cases = [item async for item in iter_query(
+                    table,
                     KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
                     ExpressionAttributeValues={
                         ':pk': pk,
                         ':sk': 'TESTCASE#'
                     }
-                )
-
-                test_cases = testcases_response.get('Items', [])
+                )]
                 logger.info(f"Found {len(test_cases)} test cases to delete")
 
                 # Delete test cases in parallel
@@ -535,14 +550,14 @@ class ProblemDetailView(APIView):
                 updated_problem = updated_problem_response['Item']
 
                 # Get test cases
-                testcases_response = await table.query(
+                test_cases = [item async for item in iter_query(
+                    table,
                     KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
                     ExpressionAttributeValues={
                         ':pk': f'PROB#{platform}#{problem_identifier}',
                         ':sk': 'TESTCASE#'
                     }
-                )
-                test_cases = testcases_response.get('Items', [])
+                )]
 
                 # Extract platform and problem_id from PK
                 pk_parts = updated_problem['PK'].split('#')
@@ -693,14 +708,14 @@ class ProblemDetailView(APIView):
                     updated_problem = updated_problem_response['Item']
 
                     # Get test cases
-                    testcases_response = await table.query(
+                    test_cases = [item async for item in iter_query(
+                        table,
                         KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
                         ExpressionAttributeValues={
                             ':pk': f'PROB#{platform}#{problem_identifier}',
                             ':sk': 'TESTCASE#'
                         }
-                    )
-                    test_cases = testcases_response.get('Items', [])
+                    )]
 
                     # Extract platform and problem_id from PK
                     pk_parts = updated_problem['PK'].split('#')
@@ -812,17 +827,17 @@ class ProblemDraftsView(APIView):
                 # Query for draft problems using GSI3
                 # GSI3PK = 'PROB#DRAFT' for draft problems
                 # GSI3SK = timestamp (sort key)
-                response = await table.query(
+                problems = [item async for item in iter_query(
+                    table,
+                    max_items=1000,
                     IndexName='GSI3',
                     KeyConditionExpression='GSI3PK = :pk',
                     ExpressionAttributeValues={
                         ':pk': 'PROB#DRAFT'
                     },
                     ScanIndexForward=False,  # Newest first (descending by timestamp)
-                    Limit=1000
-                )
-
-                problems = response.get('Items', [])
+                    **projection_params('problem.summary', 'GSI3')  # No solution code or constraints
+                )]
 
             # Filter out deleted problems (dat.del field)
             problems = [p for p in problems if not p.get('dat', {}).get('del', False)]
@@ -986,17 +1001,17 @@ class ProblemRegisteredView(APIView):
                 # Query for completed problems using GSI3
                 # GSI3PK = 'PROB#COMPLETED' for completed problems
                 # GSI3SK = timestamp (sort key)
-                response = await table.query(
+                problems = [item async for item in iter_query(
+                    table,
+                    max_items=1000,
                     IndexName='GSI3',
                     KeyConditionExpression='GSI3PK = :pk',
                     ExpressionAttributeValues={
                         ':pk': 'PROB#COMPLETED'
                     },
                     ScanIndexForward=False,  # Newest first (descending by timestamp)
-                    Limit=1000
-                )
-
-                problems = response.get('Items', [])
+                    **projection_params('problem.summary', 'GSI3')  # No solution code or constraints
+                )]
 
             # Filter out deleted problems (dat.del field)
             problems = [p for p in problems if not p.get('dat', {}).get('del', False)]
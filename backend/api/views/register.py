@@ -766,62 +766,27 @@ class SaveTestCaseInputsView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            # Initialize S3 service for large test cases
-            from api.services.s3_testcase_service import S3TestCaseService
-            s3_service = S3TestCaseService()
-
-            # Store testcases and build metadata
-            s3_keys = []  # Only store S3 keys in dat.testcases
-
-            for idx, inp in enumerate(test_inputs, start=1):
-                testcase_id = str(idx)
-                # Empty output for now - will be filled when outputs are generated
-                output_str = ''
-
-                # Check if should store in S3 (based on size)
-                use_s3 = s3_service.should_use_s3(inp, output_str)
-
-                if use_s3:
-                    # Store in S3 and save s3_key reference
-                    try:
-                        s3_metadata = await sync_to_async(s3_service.store_testcase)(
-                            platform=platform,
-                            problem_id=problem_id,
-                            testcase_id=testcase_id,
-                            input_str=inp,
-                            output_str=output_str
-                        )
-
-                        # Store S3 key in dat.testcases
-                        s3_keys.append({
-                            'testcase_id': testcase_id,
-                            's3_key': s3_metadata['s3_key']
-                        })
-
-                        logger.info(
-                            f"Stored large test case in S3: {platform}/{problem_id}/{testcase_id} "
-                            f"({s3_metadata['size']} bytes)"
-                        )
+            # Store all inputs at once: large ones go to S3 (concurrently), TC# items are
+            # batch written and the test case count is set in the same pass.
+            # Empty outputs for now - will be filled when outputs are generated
+            items = await problem_repo.add_testcases(
+                platform=platform,
+                problem_id=problem_id,
+                cases=[
+                    {'testcase_id': str(idx), 'input': inp, 'output': ''}
+                    for idx, inp in enumerate(test_inputs, start=1)
+                ],
+                test_case_count=len(test_inputs)
+            )
 
-                    except Exception as e:
-                        logger.error(f"Failed to store test case in S3, falling back to DynamoDB: {e}")
-                        # Fallback to DynamoDB TC# item (no dat.testcases entry needed)
-                        await problem_repo.add_testcase(
-                            platform=platform,
-                            problem_id=problem_id,
-                            testcase_id=testcase_id,
-                            input_str=inp,
-                            output_str=output_str
-                        )
-                else:
-                    # Store in DynamoDB as TC# item (queryable by PK/SK)
-                    await problem_repo.add_testcase(
-                        platform=platform,
-                        problem_id=problem_id,
-                        testcase_id=testcase_id,
-                        input_str=inp,
-                        output_str=output_str
-                    )
+            # Only store S3 keys in dat.testcases
+            s3_keys = [
+                {
+                    'testcase_id': item['SK'].replace('TC#', ''),
+                    's3_key': item['dat']['s3_key']
+                }
+                for item in items if item['dat'].get('storage') == 's3'
+            ]
 
             # Get existing metadata
             metadata = problem.get('metadata', {})
@@ -833,7 +798,6 @@ class SaveTestCaseInputsView(APIView):
                 problem_id=problem_id,
                 updates={
                     'testcases': s3_keys,  # Only S3 references
-                    'test_case_count': len(test_inputs),
                     'metadata': {
                         **metadata,
                         'script_execution_task_id': ''  # Clear task_id
@@ -1614,13 +1578,25 @@ class GetTestCasesView(APIView):
 
             logger.info(f"[GetTestCasesView] Found {len(items)} TC# items for {platform}/{problem_id}")
 
+            # Inputs stored by generator seed are regenerated (or read from the local cache);
+            # raises GeneratedInputError rather than returning fewer test cases
+            generated_inputs = await sync_to_async(problem_repo._repo.load_generated_inputs)(
+                platform, problem_id, items
+            )
+
             for item in items:
                 testcase_id = item['SK'].replace('TC#', '')
                 dat = item.get('dat', {})
                 storage = dat.get('storage', 'dynamodb')
 
                 try:
-                    if storage == 's3':
+                    if storage == 'generated':
+                        testcases.append({
+                            'testcase_id': testcase_id,
+                            'input': generated_inputs[testcase_id],
+                            'output': dat.get('out', '')
+                        })
+                    elif storage == 's3':
                         # Load from S3
                         s3_key = dat.get('s3_key')
                         logger.info(f"[GetTestCasesView] Loading TC#{testcase_id} from S3: {s3_key}")
@@ -54,6 +54,19 @@ def debug_task(self):
     print(f'Request: {self.request!r}')
 
 
+@worker_ready.connect
+def check_cpp_toolchain_on_startup(sender=None, **kwargs):
+    """
+    Build/verify the C++ precompiled headers before the first submission arrives
+    (rebuilt automatically when the g++ toolchain changed)
+    """
+    try:
+        from api.services.cpp_toolchain import CppToolchain
+        CppToolchain().self_check()
+    except Exception as e:
+        logger.error(f"C++ toolchain self-check failed: {e}", exc_info=True)
+
+
 @worker_ready.connect
 def recover_orphaned_jobs_on_startup(sender=None, **kwargs):
     """
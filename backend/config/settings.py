@@ -364,6 +364,27 @@ TESTCASE_S3_BUCKET = config.get(
     default='algoitny-testcases-zteapne2'
 )
 
+# Write single S3 test cases in the binary format (api/services/testcase_blob.py).
+# Every release reads both formats; enable only once no worker older than that
+# reader is running, since older workers cannot read binary objects.
+TESTCASE_S3_BINARY_FORMAT = config.get_bool(
+    'aws.testcase_binary_format',
+    env_var='TESTCASE_S3_BINARY_FORMAT',
+    default=False
+)
+
+# ============================================
+# DynamoDB Configuration
+# ============================================
+
+# Repositories read and write through the low-level client with the single-pass
+# codec in api/dynamodb/codec.py instead of the boto3 resource layer
+DYNAMODB_FAST_CODEC = config.get_bool(
+    'aws.dynamodb.fast_codec',
+    env_var='DYNAMODB_FAST_CODEC',
+    default=False
+)
+
 # ============================================
 # Code Execution Configuration
 # ============================================
@@ -374,6 +395,177 @@ CODE_EXECUTION_TIMEOUT = config.get_int(
     default=5
 )
 
+# Per-run limits enforced with setrlimit (see api/services/sandbox.py)
+CODE_EXECUTION_MEMORY_LIMIT_MB = config.get_int(
+    'application.code_execution_memory_limit_mb',
+    env_var='CODE_EXECUTION_MEMORY_LIMIT_MB',
+    default=256
+)
+CODE_EXECUTION_OUTPUT_LIMIT_BYTES = config.get_int(
+    'application.code_execution_output_limit_mb',
+    env_var='CODE_EXECUTION_OUTPUT_LIMIT_MB',
+    default=64
+) * 1024 * 1024
+# Output kept per test result when comparing against an expected output
+CODE_EXECUTION_OUTPUT_PREFIX_BYTES = config.get_int(
+    'application.code_execution_output_prefix_kb',
+    env_var='CODE_EXECUTION_OUTPUT_PREFIX_KB',
+    default=16
+) * 1024
+
+# Max test cases run concurrently per worker by the async executor (0 = CPU cores)
+CODE_EXECUTION_CONCURRENCY = config.get_int(
+    'application.code_execution_concurrency',
+    env_var='CODE_EXECUTION_CONCURRENCY',
+    default=0
+)
+
+# Run Python submissions from a pre-warmed fork server instead of a fresh interpreter per test
+CODE_EXECUTION_ZYGOTE = config.get_bool(
+    'application.code_execution_zygote',
+    env_var='CODE_EXECUTION_ZYGOTE',
+    default=True
+)
+
+# Warm JVM pool for Java submissions (per worker process)
+JAVA_WARM_POOL_ENABLED = config.get_bool(
+    'application.java_warm_pool.enabled',
+    env_var='JAVA_WARM_POOL_ENABLED',
+    default=True
+)
+JAVA_WARM_POOL_SIZE = config.get_int(
+    'application.java_warm_pool.size',
+    env_var='JAVA_WARM_POOL_SIZE',
+    default=2
+)
+# Recycle a JVM after this many runs
+JAVA_WARM_MAX_RUNS = config.get_int(
+    'application.java_warm_pool.max_runs',
+    env_var='JAVA_WARM_MAX_RUNS',
+    default=200
+)
+
+# Compiled artifact cache (shared by all worker processes on a host)
+CODE_ARTIFACT_CACHE_ENABLED = config.get_bool(
+    'application.artifact_cache.enabled',
+    env_var='CODE_ARTIFACT_CACHE_ENABLED',
+    default=True
+)
+CODE_ARTIFACT_CACHE_DIR = config.get(
+    'application.artifact_cache.dir',
+    env_var='CODE_ARTIFACT_CACHE_DIR',
+    default='/tmp/algoitny-artifacts'
+)
+CODE_ARTIFACT_CACHE_MAX_BYTES = config.get_int(
+    'application.artifact_cache.max_mb',
+    env_var='CODE_ARTIFACT_CACHE_MAX_MB',
+    default=512
+) * 1024 * 1024
+
+# Reusable per-process scratch directories for executors, on tmpfs (see api/services/workdir_pool.py)
+CODE_EXECUTION_WORKDIR_ROOT = config.get(
+    'application.workdir_pool.root',
+    env_var='CODE_EXECUTION_WORKDIR_ROOT',
+    default='/dev/shm/algoitny-work'
+)
+CODE_EXECUTION_WORKDIR_SLOTS = config.get_int(
+    'application.workdir_pool.slots',
+    env_var='CODE_EXECUTION_WORKDIR_SLOTS',
+    default=8
+)
+# Per-slot size cap (compiler outputs and temporaries)
+CODE_EXECUTION_WORKDIR_MAX_BYTES = config.get_int(
+    'application.workdir_pool.max_mb',
+    env_var='CODE_EXECUTION_WORKDIR_MAX_MB',
+    default=64
+) * 1024 * 1024
+
+# Persistent generator process for execute_test_cases_task (see api/services/generator_worker.py)
+TEST_CASE_GENERATOR_TIMEOUT = config.get_int(
+    'application.test_case_generator.timeout',
+    env_var='TEST_CASE_GENERATOR_TIMEOUT',
+    default=60
+)
+# Recycle the generator process after this many cases / above this peak RSS
+TEST_CASE_GENERATOR_MAX_CASES = config.get_int(
+    'application.test_case_generator.max_cases',
+    env_var='TEST_CASE_GENERATOR_MAX_CASES',
+    default=50
+)
+TEST_CASE_GENERATOR_MAX_RSS_MB = config.get_int(
+    'application.test_case_generator.max_rss_mb',
+    env_var='TEST_CASE_GENERATOR_MAX_RSS_MB',
+    default=512
+)
+# Generator processes working in parallel per task (0 = number of CPU cores)
+TEST_CASE_GENERATOR_WORKERS = config.get_int(
+    'application.test_case_generator.workers',
+    env_var='TEST_CASE_GENERATOR_WORKERS',
+    default=0
+)
+
+# Store large generated test inputs as (generator hash, seed, size) instead of in S3;
+# inputs are regenerated on demand into a host-local cache (see api/services/generated_inputs.py)
+TEST_CASE_LAZY_INPUTS = config.get_bool(
+    'application.test_case_generator.lazy_inputs',
+    env_var='TEST_CASE_LAZY_INPUTS',
+    default=False
+)
+TEST_CASE_INPUT_CACHE_DIR = config.get(
+    'application.test_case_generator.input_cache_dir',
+    env_var='TEST_CASE_INPUT_CACHE_DIR',
+    default='/tmp/algoitny-inputs'
+)
+TEST_CASE_INPUT_CACHE_MB = config.get_int(
+    'application.test_case_generator.input_cache_mb',
+    env_var='TEST_CASE_INPUT_CACHE_MB',
+    default=2048
+)
+
+# Per-host execution daemon reached over a Unix socket (see api/services/execution_daemon.py)
+CODE_EXECUTION_DAEMON_ENABLED = config.get_bool(
+    'application.execution_daemon.enabled',
+    env_var='CODE_EXECUTION_DAEMON_ENABLED',
+    default=False
+)
+CODE_EXECUTION_DAEMON_SOCKET = config.get(
+    'application.execution_daemon.socket',
+    env_var='CODE_EXECUTION_DAEMON_SOCKET',
+    default='/tmp/algoitny-exec.sock'
+)
+# Concurrent test runs across all clients (0 = number of CPU cores)
+CODE_EXECUTION_DAEMON_WORKERS = config.get_int(
+    'application.execution_daemon.workers',
+    env_var='CODE_EXECUTION_DAEMON_WORKERS',
+    default=0
+)
+
+# C++ compiler profile for submissions (see api/services/cpp_toolchain.py: judge, validate)
+CPP_COMPILER_PROFILE = config.get(
+    'application.cpp.profile',
+    env_var='CPP_COMPILER_PROFILE',
+    default='judge'
+)
+# Precompiled <bits/stdc++.h> per profile (shared per host, rebuilt when g++ changes)
+CPP_PCH_ENABLED = config.get_bool(
+    'application.cpp.pch_enabled',
+    env_var='CPP_PCH_ENABLED',
+    default=True
+)
+CPP_PCH_DIR = config.get(
+    'application.cpp.pch_dir',
+    env_var='CPP_PCH_DIR',
+    default='/tmp/algoitny-pch'
+)
+
+# Seconds an identical resubmission reuses an earlier execution (0 = disabled).
+# Only takes effect with a shared cache backend (not LocMemCache), see api.services.execution_memo
+CODE_EXECUTION_MEMO_TTL = config.get_int(
+    'application.code_execution_memo_ttl',
+    env_var='CODE_EXECUTION_MEMO_TTL',
+    default=600
+)
+
 # ============================================
 # Admin Configuration
 # ============================================
@@ -637,6 +829,12 @@ USE_JUDGE0 = config.get_bool('api_keys.judge0.enabled', env_var='USE_JUDGE0', de
 JUDGE0_API_URL = config.get('api_keys.judge0.url', env_var='JUDGE0_API_URL', default='https://judge0-ce.p.rapidapi.com')
 JUDGE0_API_KEY = secrets.get('JUDGE0_API_KEY', default='')  # From Secrets Manager
 
+# Submissions per /submissions/batch request (Judge0 allows at most 20 by default)
+JUDGE0_BATCH_SIZE = config.get_int('api_keys.judge0.batch_size', env_var='JUDGE0_BATCH_SIZE', default=20)
+
+# Give up on submissions still queued/processing after this many seconds
+JUDGE0_POLL_TIMEOUT = config.get_int('api_keys.judge0.poll_timeout', env_var='JUDGE0_POLL_TIMEOUT', default=120)
+
 # ============================================
 # Security Settings
 # ============================================
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""Micro-benchmark: resource-layer type conversion vs api/dynamodb/codec.py
+
+Compares, per item, on PROB# META items and HIST# items with test results:
+
+    read   resource layer: TypeDeserializer + BaseRepository._from_dynamodb_item
+           fast path:      codec.decode_item
+    write  resource layer: BaseRepository._to_dynamodb_item + TypeSerializer
+           fast path:      codec.encode_item
+
+No table is needed: both sides convert the same wire-format items that a
+Query would return. Usage:
+
+    python scripts/benchmark_dynamodb_codec.py [--items 200] [--repeat 5]
+"""
+import argparse
+import base64
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from api.dynamodb.codec import decode_item, encode_item
+from api.dynamodb.repositories.base_repository import BaseRepository
+
+
+def problem_item(index):
+    """PROB#...#META item as written by ProblemRepository.create_problem"""
+    solution = '\n'.join(f'    x{i} = int(input()) * {i}' for i in range(120))
+    return {
+        'PK': f'PROB#baekjoon#{1000 + index}',
+        'SK': 'META',
+        'tp': 'prob',
+        'dat': {
+            'tit': f'Problem {index}',
+            'url': f'https://www.acmicpc.net/problem/{1000 + index}',
+            'tag': ['dp', 'graph', 'greedy', 'implementation'],
+            'sol': base64.b64encode(solution.encode()).decode(),
+            'slm': 'model',
+            'lng': 'python',
+            'con': '1 <= N <= 100000\n1 <= A_i <= 10^9\nTime limit: 2 seconds',
+            'cmp': True,
+            'tcc': 40,
+            'tsv': 3,
+            'del': False,
+            'nrv': False,
+            'vrf': True
+        },
+        'crt': 1700000000 + index,
+        'upd': 1700000500 + index,
+        'GSI3PK': 'PROB#COMPLETED',
+        'GSI3SK': 1700000000 + index
+    }
+
+
+def history_item(index, rng):
+    """HIST# item with inline test results as written by execute_code_task"""
+    results = [{
+        'tid': case,
+        'out': str(rng.randrange(10 ** 9)),
+        'osz': rng.randrange(1, 64),
+        'ohs': '%064x' % rng.getrandbits(256),
+        'pas': rng.random() < 0.9,
+        'sts': 'success',
+        'vrd': 'OK',
+        'cpu': rng.randrange(1, 900),
+        'wal': rng.randrange(1, 1000),
+        'mem': rng.randrange(8000, 60000)
+    } for case in range(40)]
+    return {
+        'PK': f'HIST#{7000000 + index}',
+        'SK': 'META',
+        'tp': 'hist',
+        'dat': {
+            'uid': 42,
+            'uidt': 'user@example.com',
+            'plt': 'baekjoon',
+            'pno': str(1000 + index),
+            'ptt': f'Problem {index}',
+            'lng': 'python',
+            'cod': base64.b64encode(b'print(sum(map(int, input().split())))\n' * 20).decode(),
+            'res': 'Passed',
+            'psc': 36,
+            'fsc': 4,
+            'toc': 40,
+            'pub': True,
+            'trs': results
+        },
+        'crt': 1700000000 + index,
+        'GSI1PK': 'USER#42',
+        'GSI1SK': f'HIST#{1700000000 + index}'
+    }
+
+
+def best_of(repeat, function, items):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, time.perf_counter() - started)
+    return best / len(items) * 1e6  # microseconds per item
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    repository = BaseRepository.__new__(BaseRepository)  # conversion methods only, no table
+    deserializer = TypeDeserializer()
+    serializer = TypeSerializer()
+
+    def resource_read(wire):
+        return repository._from_dynamodb_item({name: deserializer.deserialize(value) for name, value in wire.items()})
+
+    def resource_write(item):
+        return {name: serializer.serialize(value) for name, value in repository._to_dynamodb_item(item).items()}
+
+    datasets = {
+        'PROB# META': [problem_item(index) for index in range(args.items)],
+        'HIST# + trs': [history_item(index, rng) for index in range(args.items)],
+    }
+
+    print(f'{"items":<12} {"op":<6} {"resource us":>12} {"codec us":>10} {"speedup":>8}')
+    for name, items in datasets.items():
+        wire_items = [resource_write(item) for item in items]
+
+        # Both paths must agree before they are timed
+        for item, wire in zip(items, wire_items):
+            assert decode_item(wire) == resource_read(wire) == item, name
+            assert decode_item(encode_item(item)) == item, name
+
+        for op, resource, fast, inputs in (
+            ('read', resource_read, decode_item, wire_items),
+            ('write', resource_write, encode_item, items),
+        ):
+            resource_us = best_of(args.repeat, resource, inputs)
+            fast_us = best_of(args.repeat, fast, inputs)
+            print(f'{name:<12} {op:<6} {resource_us:>12.1f} {fast_us:>10.1f} {resource_us / fast_us:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
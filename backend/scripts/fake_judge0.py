@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+"""
+Local fake Judge0 server for testing USE_JUDGE0 offline
+
+Implements the subset of the Judge0 CE API used by Judge0Service and
+AsyncJudge0Service (base64_encoded=false only):
+
+    POST /submissions?wait=true|false
+    GET  /submissions/<token>
+    POST /submissions/batch            {"submissions": [...]}
+    GET  /submissions/batch?tokens=a,b,c
+
+Submissions are queued and run in a thread pool with the local toolchain
+(python3, node, g++, javac/java), so clients have to poll just like with a
+real Judge0. Every request is logged, which makes the number of HTTP round
+trips per execution easy to check.
+
+Usage:
+    python scripts/fake_judge0.py [--port 2358] [--workers 4] [--delay 0.2]
+
+    USE_JUDGE0=true JUDGE0_API_URL=http://127.0.0.1:2358 celery -A config worker ...
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Judge0 CE statuses
+STATUS_IN_QUEUE = {'id': 1, 'description': 'In Queue'}
+STATUS_PROCESSING = {'id': 2, 'description': 'Processing'}
+STATUS_ACCEPTED = {'id': 3, 'description': 'Accepted'}
+STATUS_TLE = {'id': 5, 'description': 'Time Limit Exceeded'}
+STATUS_CE = {'id': 6, 'description': 'Compilation Error'}
+STATUS_RE = {'id': 11, 'description': 'Runtime Error (NZEC)'}
+STATUS_INTERNAL = {'id': 13, 'description': 'Internal Error'}
+
+MAX_BATCH_SIZE = 20
+
+# language_id -> (source file, compile argv or None, run argv)
+LANGUAGES = {
+    71: ('main.py', None, [sys.executable, 'main.py']),
+    63: ('main.js', None, ['node', 'main.js']),
+    54: ('main.cpp', ['g++', '-O2', '-std=c++17', '-o', 'main', 'main.cpp'], ['./main']),
+    62: ('Main.java', ['javac', 'Main.java'], ['java', '-cp', '.', 'Main']),
+}
+
+submissions = {}
+submissions_lock = threading.Lock()
+executor = None
+queue_delay = 0.0
+
+
+def run_submission(token):
+    """Compile and run one submission, updating its stored state"""
+    with submissions_lock:
+        submission = submissions[token]
+    time.sleep(queue_delay)
+    submission['status'] = STATUS_PROCESSING
+
+    language = LANGUAGES.get(submission['language_id'])
+    if language is None:
+        submission.update(status=STATUS_INTERNAL, stderr=f"Unknown language_id {submission['language_id']}")
+        return
+
+    source_name, compile_cmd, run_cmd = language
+    time_limit = float(submission.get('cpu_time_limit') or 5)
+    work_dir = tempfile.mkdtemp(prefix='fake-judge0-')
+    try:
+        Path(work_dir, source_name).write_text(submission['source_code'])
+
+        if compile_cmd:
+            compiled = subprocess.run(compile_cmd, cwd=work_dir, capture_output=True, text=True)
+            if compiled.returncode != 0:
+                submission.update(status=STATUS_CE, compile_output=compiled.stderr)
+                return
+
+        started = time.monotonic()
+        try:
+            process = subprocess.run(
+                run_cmd, cwd=work_dir, input=submission.get('stdin') or '',
+                capture_output=True, text=True, timeout=time_limit
+            )
+        except subprocess.TimeoutExpired:
+            submission.update(status=STATUS_TLE, time=f'{time_limit:.3f}')
+            return
+
+        submission.update(
+            stdout=process.stdout,
+            stderr=process.stderr or None,
+            time=f'{time.monotonic() - started:.3f}',
+            memory=0,
+            status=STATUS_ACCEPTED if process.returncode == 0 else STATUS_RE,
+        )
+    except Exception as e:
+        submission.update(status=STATUS_INTERNAL, stderr=str(e))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def create_submission(data):
+    """Store and queue a submission, returning its token"""
+    token = str(uuid.uuid4())
+    with submissions_lock:
+        submissions[token] = {
+            'token': token,
+            'source_code': data.get('source_code', ''),
+            'language_id': data.get('language_id'),
+            'stdin': data.get('stdin'),
+            'cpu_time_limit': data.get('cpu_time_limit'),
+            'stdout': None,
+            'stderr': None,
+            'compile_output': None,
+            'time': None,
+            'memory': None,
+            'status': STATUS_IN_QUEUE,
+        }
+    return token, executor.submit(run_submission, token)
+
+
+def view(token, fields=None):
+    """Public view of a stored submission (optionally only `fields`)"""
+    with submissions_lock:
+        submission = submissions.get(token)
+    if submission is None:
+        return None
+    data = {key: value for key, value in submission.items() if key not in ('source_code', 'stdin')}
+    if fields:
+        data = {key: value for key, value in data.items() if key in fields}
+    return data
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Judge0 API subset"""
+
+    # Keep-alive, so client connection reuse can be observed
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == '/submissions/batch':
+            items = self._body().get('submissions') or []
+            if len(items) > MAX_BATCH_SIZE:
+                return self._send(400, {'error': f'number of submissions must be at most {MAX_BATCH_SIZE}'})
+            response = []
+            for item in items:
+                if item.get('language_id') not in LANGUAGES:
+                    response.append({'language_id': ['language with given id doesn\'t exist']})
+                else:
+                    response.append({'token': create_submission(item)[0]})
+            return self._send(201, response)
+
+        if url.path == '/submissions':
+            token, future = create_submission(self._body())
+            if query.get('wait', ['false'])[0] == 'true':
+                future.result()
+                return self._send(201, view(token))
+            return self._send(201, {'token': token})
+
+        self._send(404, {'error': 'not found'})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        fields = set(query['fields'][0].split(',')) if 'fields' in query else None
+
+        if url.path == '/submissions/batch':
+            tokens = [t for t in query.get('tokens', [''])[0].split(',') if t]
+            if len(tokens) > MAX_BATCH_SIZE:
+                return self._send(400, {'error': f'number of tokens must be at most {MAX_BATCH_SIZE}'})
+            return self._send(200, {'submissions': [view(token, fields) for token in tokens]})
+
+        if url.path.startswith('/submissions/'):
+            data = view(url.path.rsplit('/', 1)[1], fields)
+            if data is None:
+                return self._send(404, {'error': 'Not found'})
+            return self._send(200, data)
+
+        self._send(404, {'error': 'not found'})
+
+
+def main():
+    global executor, queue_delay
+
+    parser = argparse.ArgumentParser(description='Local fake Judge0 server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2358)
+    parser.add_argument('--workers', type=int, default=4, help='Submissions run in parallel')
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds each submission stays "In Queue"')
+    args = parser.parse_args()
+
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+    queue_delay = args.delay
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f'Fake Judge0 listening on http://{args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == '__main__':
+    main()
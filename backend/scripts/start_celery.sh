@@ -145,6 +145,9 @@ echo ""
 # With 4 workers, total prefetch = 4 (not 16)
 export DJANGO_SETTINGS_MODULE=config.settings
 
+# Per-host execution daemon (CODE_EXECUTION_DAEMON_ENABLED=true): started lazily by the
+# worker on the first submission and restarted by it if it dies (api/services/execution_daemon.py)
+
 echo "🎯 Executing celery command with INFO logging..."
 set -x  # Enable command tracing
 # Use DEBUG level to see connection errors
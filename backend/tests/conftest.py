@@ -541,11 +541,13 @@ def mock_celery_task():
 
 @pytest.fixture
 def mock_celery_delay():
-    """Mock Celery task.delay()"""
-    with patch('api.tasks.execute_code_task.delay') as mock:
+    """Mock execute_code_task.apply_async() (queued under the memo's task id)"""
+    def apply_async(*args, task_id=None, **kwargs):
         mock_result = Mock()
-        mock_result.id = 'task-123'
-        mock.return_value = mock_result
+        mock_result.id = task_id or 'task-123'
+        return mock_result
+
+    with patch('api.tasks.execute_code_task.apply_async', side_effect=apply_async) as mock:
         yield mock
 
 
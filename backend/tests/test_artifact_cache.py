@@ -0,0 +1,229 @@
+"""Tests for the compiled artifact cache (api.services.artifact_cache)"""
+import fcntl
+import os
+import shutil
+import pytest
+from api.services import artifact_cache
+from api.services.artifact_cache import ArtifactCache
+
+SOURCE = 'int main() { return 0; }'
+
+
+@pytest.fixture
+def cache(settings, tmp_path, monkeypatch):
+    """A fresh ArtifactCache rooted in tmp_path, with fixed compiler versions"""
+    settings.CODE_ARTIFACT_CACHE_ENABLED = True
+    settings.CODE_ARTIFACT_CACHE_DIR = str(tmp_path / 'cache')
+    settings.CODE_ARTIFACT_CACHE_MAX_BYTES = 1024 * 1024
+    monkeypatch.setattr(ArtifactCache, '_instance', None)
+    monkeypatch.setattr(ArtifactCache, '_initialized', False)
+    monkeypatch.setattr(ArtifactCache, '_toolchain_versions', {'g++': 'g++ 13.2.0', 'clang++': 'clang 17.0.6'})
+    return ArtifactCache()
+
+
+def make_files(directory, files):
+    """Write {name: content} into directory and return the paths"""
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, content in files.items():
+        path = directory / name
+        path.write_bytes(content)
+        paths.append(path)
+    return paths
+
+
+def entries(cache):
+    return sorted(path.name for path in cache.root.iterdir() if not path.name.startswith('.'))
+
+
+class TestMakeKey:
+    """Test deriving cache keys"""
+
+    def test_same_inputs_same_key(self, cache):
+        """The key only depends on its inputs"""
+        assert cache.make_key(SOURCE, 'cpp', ['-O2'], 'g++') == cache.make_key(SOURCE, 'cpp', ['-O2'], 'g++')
+
+    @pytest.mark.parametrize('args', [
+        (SOURCE + ' ', 'cpp', ['-O2'], 'g++'),
+        (SOURCE, 'c', ['-O2'], 'g++'),
+        (SOURCE, 'cpp', ['-O3'], 'g++'),
+        (SOURCE, 'cpp', [], 'g++'),
+        (SOURCE, 'cpp', ['-O2'], 'clang++'),
+    ], ids=['code', 'language', 'flags', 'no-flags', 'compiler'])
+    def test_each_input_changes_key(self, cache, args):
+        """Changing the code, language, flags or compiler gives another key"""
+        assert cache.make_key(*args) != cache.make_key(SOURCE, 'cpp', ['-O2'], 'g++')
+
+    def test_parts_are_separated(self, cache):
+        """Moving text between parts does not collide"""
+        assert cache.make_key('b', 'a', [], 'g++') != cache.make_key('', 'ab', [], 'g++')
+
+    def test_toolchain_version_resolved_once(self, cache, monkeypatch):
+        """The compiler is asked for its version once per process"""
+        calls = []
+
+        def run(command, **kwargs):
+            calls.append(command)
+            return artifact_cache.subprocess.CompletedProcess(command, 0, stdout='javac 21.0.2\n', stderr='')
+
+        monkeypatch.setattr(artifact_cache.subprocess, 'run', run)
+
+        first = cache.make_key(SOURCE, 'java', [], 'javac')
+        second = cache.make_key(SOURCE, 'java', [], 'javac')
+
+        assert first == second
+        assert calls == [['javac', '-version']]
+        assert ArtifactCache.toolchain_version('javac') == 'javac 21.0.2'
+
+
+class TestFetch:
+    """Test reading entries into a work directory"""
+
+    def test_miss(self, cache, tmp_path):
+        """An unknown key is a miss and copies nothing"""
+        dest = tmp_path / 'work'
+        dest.mkdir()
+
+        assert cache.fetch('0' * 64, dest) is False
+        assert list(dest.iterdir()) == []
+        assert cache.stats()['misses'] == 1
+
+    def test_hit_copies_files(self, cache, tmp_path):
+        """A hit copies every file; the copy is independent of the entry"""
+        key = cache.make_key(SOURCE, 'cpp', ['-O2'], 'g++')
+        cache.store(key, make_files(tmp_path / 'build', {'main': b'\x7fELF binary', 'extra': b'data'}))
+        dest = tmp_path / 'work'
+        dest.mkdir()
+
+        assert cache.fetch(key, dest) is True
+
+        copied = dest / 'main'
+        assert copied.read_bytes() == b'\x7fELF binary'
+        assert (dest / 'extra').read_bytes() == b'data'
+        assert copied.stat().st_ino != (cache.root / key / 'main').stat().st_ino
+
+        # The program may rewrite its own copy without touching the entry
+        copied.chmod(0o644)
+        copied.write_bytes(b'poisoned')
+        assert (cache.root / key / 'main').read_bytes() == b'\x7fELF binary'
+        assert cache.stats()['hits'] == 1
+
+    def test_hit_touches_entry(self, cache, tmp_path):
+        """A hit marks the entry as recently used"""
+        key = cache.make_key(SOURCE, 'cpp', ['-O2'], 'g++')
+        cache.store(key, make_files(tmp_path / 'build', {'main': b'x'}))
+        os.utime(cache.root / key, (1, 1))
+
+        cache.fetch(key, tmp_path)
+
+        assert (cache.root / key).stat().st_mtime > 1
+
+    def test_disabled(self, cache, tmp_path):
+        """A disabled cache never hits"""
+        key = cache.make_key(SOURCE, 'cpp', ['-O2'], 'g++')
+        cache.store(key, make_files(tmp_path / 'build', {'main': b'x'}))
+        cache.enabled = False
+
+        assert cache.fetch(key, tmp_path) is False
+
+
+class TestStore:
+    """Test publishing entries"""
+
+    def test_entry_is_read_only(self, cache, tmp_path):
+        """Stored files have their write bits stripped"""
+        key = cache.make_key(SOURCE, 'cpp', ['-O2'], 'g++')
+
+        assert cache.store(key, make_files(tmp_path / 'build', {'main': b'x'})) is True
+
+        assert (cache.root / key / 'main').stat().st_mode & 0o222 == 0
+        assert cache.stats()['stores'] == 1
+
+    def test_entry_appears_only_when_complete(self, cache, tmp_path, monkeypatch):
+        """Files are staged elsewhere; the entry appears by a single rename"""
+        key = cache.make_key(SOURCE, 'cpp', ['-O2'], 'g++')
+        files = make_files(tmp_path / 'build', {'a': b'1', 'b': b'2', 'c': b'3'})
+        real_copy = shutil.copy2
+        visible_during_copy = []
+
+        def copy2(src, dst):
+            visible_during_copy.append((cache.root / key).exists())
+            return real_copy(src, dst)
+
+        monkeypatch.setattr(artifact_cache.shutil, 'copy2', copy2)
+
+        cache.store(key, files)
+
+        assert visible_during_copy == [False, False, False]
+        assert sorted(path.name for path in (cache.root / key).iterdir()) == ['a', 'b', 'c']
+        assert entries(cache) == [key]
+        assert not any(name.startswith('.staging-') for name in os.listdir(cache.root))
+
+    def test_failed_rename_leaves_nothing(self, cache, tmp_path, monkeypatch):
+        """A failed publish removes its staging directory and stores no entry"""
+        key = cache.make_key(SOURCE, 'cpp', ['-O2'], 'g++')
+
+        def rename(src, dst):
+            raise OSError('disk full')
+
+        monkeypatch.setattr(artifact_cache.os, 'rename', rename)
+
+        assert cache.store(key, make_files(tmp_path / 'build', {'main': b'x'})) is False
+        assert list(cache.root.iterdir()) == []
+
+    def test_existing_entry_is_kept(self, cache, tmp_path):
+        """A second store of the same key does not replace the entry"""
+        key = cache.make_key(SOURCE, 'cpp', ['-O2'], 'g++')
+        cache.store(key, make_files(tmp_path / 'first', {'main': b'first'}))
+
+        assert cache.store(key, make_files(tmp_path / 'second', {'main': b'second'})) is False
+        assert (cache.root / key / 'main').read_bytes() == b'first'
+
+    def test_no_files(self, cache):
+        """Nothing is stored for an empty file list"""
+        assert cache.store(cache.make_key(SOURCE, 'cpp', [], 'g++'), []) is False
+        assert entries(cache) == []
+
+
+class TestEvict:
+    """Test LRU eviction"""
+
+    def store_sized(self, cache, tmp_path, name, size, mtime):
+        key = cache.make_key(name, 'cpp', [], 'g++')
+        cache.store(key, make_files(tmp_path / name, {'main': b'x' * size}))
+        os.utime(cache.root / key, (mtime, mtime))
+        return key
+
+    def test_least_recently_used_go_first(self, cache, tmp_path):
+        """Storing past max_bytes removes the oldest entries until the cache fits"""
+        cache.max_bytes = 2500
+        oldest = self.store_sized(cache, tmp_path, 'oldest', 1000, 100)
+        used = self.store_sized(cache, tmp_path, 'used', 1000, 200)
+        cache.fetch(used, tmp_path)  # touched: now the most recently used
+
+        newest = self.store_sized(cache, tmp_path, 'newest', 1000, 300)
+
+        assert entries(cache) == sorted([used, newest])
+        assert oldest not in entries(cache)
+        assert cache.stats()['evictions'] == 1
+
+    def test_under_capacity(self, cache, tmp_path):
+        """Nothing is removed while the cache fits"""
+        self.store_sized(cache, tmp_path, 'one', 100, 100)
+
+        assert cache.evict() == 0
+        assert len(entries(cache)) == 1
+
+    def test_skipped_while_another_process_evicts(self, cache, tmp_path):
+        """Eviction is skipped while another holder has the eviction lock"""
+        self.store_sized(cache, tmp_path, 'one', 1000, 100)
+        self.store_sized(cache, tmp_path, 'two', 1000, 200)
+        cache.max_bytes = 0
+
+        with open(cache.root / '.evict.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            assert cache.evict() == 0
+            assert len(entries(cache)) == 2
+
+        assert cache.evict() == 2
+        assert entries(cache) == []
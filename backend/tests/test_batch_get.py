@@ -0,0 +1,175 @@
+"""Tests for multi-key reads (api.dynamodb.batch)"""
+import threading
+from types import SimpleNamespace
+import pytest
+from api.dynamodb import batch
+from api.dynamodb.batch import BATCH_GET_ATTEMPTS, BATCH_GET_SIZE, batch_get, batch_get_async
+
+TABLE = 'algoitny_test'
+
+
+class FakeClient:
+    """
+    In-memory stand-in for the low-level client's batch_get_item()
+
+    Responses list found items in reverse key order (BatchGetItem gives no
+    order guarantee); the first `throttled` requests hand back all but
+    one of their keys as UnprocessedKeys.
+    """
+
+    def __init__(self, items, throttled=0):
+        self.items = {(item['PK'], item['SK']): item for item in items}
+        self.throttled = throttled
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def batch_get_item(self, RequestItems):
+        with self._lock:
+            self.requests.append(RequestItems)
+            throttle = len(self.requests) <= self.throttled
+
+        request = RequestItems[TABLE]
+        keys = request['Keys']
+        if len(keys) != len({(key['PK'], key['SK']) for key in keys}):
+            raise ValueError('Provided list of item keys contains duplicates')
+
+        processed, unprocessed = (keys[:1], keys[1:]) if throttle else (keys, [])
+        found = [self.items[(key['PK'], key['SK'])] for key in processed if (key['PK'], key['SK']) in self.items]
+
+        response = {'Responses': {TABLE: list(reversed(found))}}
+        if unprocessed:
+            response['UnprocessedKeys'] = {TABLE: dict(request, Keys=unprocessed)}
+        return response
+
+
+class AsyncFakeClient(FakeClient):
+    """FakeClient with a coroutine batch_get_item(), like aioboto3"""
+
+    async def batch_get_item(self, RequestItems):
+        return FakeClient.batch_get_item(self, RequestItems=RequestItems)
+
+
+def make_table(client):
+    return SimpleNamespace(name=TABLE, meta=SimpleNamespace(client=client))
+
+
+def make_items(count):
+    return [{'PK': f'PROB#test#{index}', 'SK': 'META', 'val': index} for index in range(count)]
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(batch, '_backoff', lambda attempt: 0)
+
+
+class TestBatchGet:
+    """Test batch_get on a boto3 table"""
+
+    def test_items_in_key_order(self):
+        """Items come back in the order of the keys, whatever the response order"""
+        items = make_items(5)
+        table = make_table(FakeClient(items))
+        keys = [(item['PK'], item['SK']) for item in reversed(items)]
+
+        assert [item['val'] for item in batch_get(table, keys)] == [4, 3, 2, 1, 0]
+
+    def test_missing_keys_are_none(self):
+        """Keys without an item give None in their position"""
+        table = make_table(FakeClient(make_items(2)))
+        keys = [('PROB#test#0', 'META'), ('PROB#test#9', 'META'), ('PROB#test#1', 'META')]
+
+        result = batch_get(table, keys)
+
+        assert [item and item['val'] for item in result] == [0, None, 1]
+
+    def test_dict_keys(self):
+        """Keys may be given as {'PK', 'SK'} dicts"""
+        table = make_table(FakeClient(make_items(1)))
+
+        assert batch_get(table, [{'PK': 'PROB#test#0', 'SK': 'META'}])[0]['val'] == 0
+
+    def test_duplicate_keys_are_requested_once(self):
+        """Duplicate keys are sent once but answered at every position"""
+        client = FakeClient(make_items(2))
+        keys = [('PROB#test#0', 'META'), ('PROB#test#1', 'META'), ('PROB#test#0', 'META')]
+
+        result = batch_get(make_table(client), keys)
+
+        assert [item['val'] for item in result] == [0, 1, 0]
+        assert len(client.requests[0][TABLE]['Keys']) == 2
+
+    def test_keys_are_split_into_requests(self):
+        """More than BATCH_GET_SIZE keys are split into several requests"""
+        items = make_items(BATCH_GET_SIZE * 2 + 10)
+        client = FakeClient(items)
+
+        result = batch_get(make_table(client), [(item['PK'], item['SK']) for item in items])
+
+        assert [item['val'] for item in result] == list(range(len(items)))
+        assert sorted(len(request[TABLE]['Keys']) for request in client.requests) == [10, BATCH_GET_SIZE, BATCH_GET_SIZE]
+
+    def test_unprocessed_keys_are_retried(self):
+        """UnprocessedKeys are requested again until every key is read"""
+        items = make_items(4)
+        client = FakeClient(items, throttled=2)
+
+        result = batch_get(make_table(client), [(item['PK'], item['SK']) for item in items])
+
+        assert [item['val'] for item in result] == [0, 1, 2, 3]
+        assert [len(request[TABLE]['Keys']) for request in client.requests] == [4, 3, 2]
+
+    def test_unprocessed_keys_give_up(self):
+        """Keys still unprocessed after BATCH_GET_ATTEMPTS requests raise"""
+        items = make_items(BATCH_GET_ATTEMPTS + 2)
+        client = FakeClient(items, throttled=BATCH_GET_ATTEMPTS)
+
+        with pytest.raises(RuntimeError):
+            batch_get(make_table(client), [(item['PK'], item['SK']) for item in items])
+        assert len(client.requests) == BATCH_GET_ATTEMPTS
+
+    def test_projection_is_sent(self):
+        """A projection becomes the request's ProjectionExpression"""
+        client = FakeClient(make_items(1))
+
+        batch_get(make_table(client), [('PROB#test#0', 'META')], projection=['dat.tit'])
+
+        request = client.requests[0][TABLE]
+        assert request['ProjectionExpression'] == '#p0, #p1, #p2.#p3'
+        assert request['ExpressionAttributeNames'] == {'#p0': 'PK', '#p1': 'SK', '#p2': 'dat', '#p3': 'tit'}
+
+    def test_projection_survives_retry(self):
+        """Retried keys keep the projection of the first request"""
+        client = FakeClient(make_items(2), throttled=1)
+
+        batch_get(make_table(client), [('PROB#test#0', 'META'), ('PROB#test#1', 'META')], projection=['dat.tit'])
+
+        assert all('ProjectionExpression' in request[TABLE] for request in client.requests)
+
+    def test_no_keys(self):
+        """No keys make no requests"""
+        client = FakeClient([])
+
+        assert batch_get(make_table(client), []) == []
+        assert client.requests == []
+
+
+class TestBatchGetAsync:
+    """Test batch_get_async on an aioboto3 table"""
+
+    async def test_items_in_key_order_with_retries(self):
+        """Items come back in key order after retrying unprocessed keys"""
+        items = make_items(BATCH_GET_SIZE + 5)
+        client = AsyncFakeClient(items, throttled=3)
+        keys = [(item['PK'], item['SK']) for item in reversed(items)] + [('PROB#test#0', 'META')]
+
+        result = await batch_get_async(make_table(client), keys)
+
+        assert [item['val'] for item in result] == list(reversed(range(len(items)))) + [0]
+
+    async def test_unprocessed_keys_give_up(self):
+        """Keys still unprocessed after BATCH_GET_ATTEMPTS requests raise"""
+        items = make_items(BATCH_GET_ATTEMPTS + 2)
+        client = AsyncFakeClient(items, throttled=BATCH_GET_ATTEMPTS)
+
+        with pytest.raises(RuntimeError):
+            await batch_get_async(make_table(client), [(item['PK'], item['SK']) for item in items])
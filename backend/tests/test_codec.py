@@ -0,0 +1,176 @@
+"""Tests for the single-pass DynamoDB codec (api.dynamodb.codec)"""
+from decimal import Decimal
+from unittest.mock import Mock
+import pytest
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from api.dynamodb.codec import decode_item, encode_item, encode_value
+from api.dynamodb.repositories.base_repository import BaseRepository
+
+# A problem-like item covering every type the tables store
+ITEM = {
+    'PK': 'PROB#baekjoon#1000',
+    'SK': 'META',
+    'tp': 'prob',
+    'crt': 1700000000,
+    'dat': {
+        'tit': 'A+B',
+        'tcc': 12,
+        'tsv': 0,
+        'neg': -3,
+        'rat': 0.25,
+        'vrf': True,
+        'del': False,
+        'tag': ['math', 'implementation'],
+        'met': {'execution_count': 7, 'nested': {'deep': [1, {'x': 'y'}, []]}},
+        'tcf': {},
+        'txt': '',
+        'uni': '한글 ✓'
+    }
+}
+
+
+@pytest.fixture
+def repository(settings):
+    """Resource-layer conversions (_to_dynamodb_item / _from_dynamodb_item) to compare against"""
+    settings.DYNAMODB_FAST_CODEC = False
+    return BaseRepository(Mock())
+
+
+def resource_encode(repository, item):
+    """What the resource layer sends: _to_dynamodb_item, then boto3's TypeSerializer"""
+    serializer = TypeSerializer()
+    return {key: serializer.serialize(value) for key, value in repository._to_dynamodb_item(item).items()}
+
+
+def resource_decode(repository, wire):
+    """What the resource layer returns: boto3's TypeDeserializer, then _from_dynamodb_item"""
+    deserializer = TypeDeserializer()
+    return repository._from_dynamodb_item({key: deserializer.deserialize(value) for key, value in wire.items()})
+
+
+class TestEncodeItem:
+    """Test Python -> wire format"""
+
+    def test_matches_type_serializer(self, repository):
+        """encode_item produces what the resource layer would send"""
+        assert encode_item(ITEM) == resource_encode(repository, ITEM)
+
+    def test_none_map_entries_are_skipped(self, repository):
+        """None values in maps are not written, like _to_dynamodb_item"""
+        item = {'PK': 'P', 'SK': 'S', 'gone': None, 'dat': {'gone': None, 'kept': 1}}
+
+        assert encode_item(item) == {'PK': {'S': 'P'}, 'SK': {'S': 'S'}, 'dat': {'M': {'kept': {'N': '1'}}}}
+        assert encode_item(item) == resource_encode(repository, item)
+
+    def test_none_in_list_is_null(self):
+        """None inside a list is kept as NULL"""
+        assert encode_item({'l': [None, 'a']}) == {'l': {'L': [{'NULL': True}, {'S': 'a'}]}}
+
+    def test_numbers(self):
+        """int, Decimal and float are written as N strings"""
+        assert encode_item({'i': 42, 'd': Decimal('1.50'), 'f': 0.1}) == {
+            'i': {'N': '42'}, 'd': {'N': '1.50'}, 'f': {'N': '0.1'}
+        }
+
+    def test_floats_in_lists(self):
+        """Floats nested in lists are encoded too"""
+        assert encode_item({'l': [1.5]}) == {'l': {'L': [{'N': '1.5'}]}}
+
+    def test_sets(self):
+        """Sets become SS, NS or BS"""
+        wire = encode_item({'ss': {'a', 'b'}, 'ns': {1, 2}, 'bs': {b'x'}})
+
+        assert sorted(wire['ss']['SS']) == ['a', 'b']
+        assert sorted(wire['ns']['NS']) == ['1', '2']
+        assert wire['bs'] == {'BS': [b'x']}
+
+    def test_bytes(self):
+        """bytes and bytearray become B"""
+        assert encode_item({'b': b'\x00\xff', 'ba': bytearray(b'ab')}) == {'b': {'B': b'\x00\xff'}, 'ba': {'B': b'ab'}}
+
+    def test_unsupported_type(self):
+        """Values DynamoDB cannot store raise TypeError"""
+        with pytest.raises(TypeError):
+            encode_item({'o': object()})
+
+    def test_encode_value(self):
+        """encode_value encodes a single value, None included"""
+        assert encode_value('x') == {'S': 'x'}
+        assert encode_value({'a': [1]}) == {'M': {'a': {'L': [{'N': '1'}]}}}
+        assert encode_value(None) == {'NULL': True}
+
+
+class TestDecodeItem:
+    """Test wire format -> Python"""
+
+    def test_matches_type_deserializer(self, repository):
+        """decode_item returns what the resource layer would"""
+        wire = TypeSerializer().serialize(repository._to_dynamodb_item(ITEM))['M']
+
+        assert decode_item(wire) == resource_decode(repository, wire)
+
+    @pytest.mark.parametrize('text, expected', [
+        ('10', 10),
+        ('-3', -3),
+        ('0', 0),
+        ('1.50', 1.5),
+        ('2.0', 2),
+        ('1e3', 1000),
+        ('-2.5E-1', -0.25),
+        ('12345678901234567890', 12345678901234567890),
+    ])
+    def test_numbers(self, repository, text, expected):
+        """N values become int when integral, float otherwise, like _from_dynamodb_item"""
+        wire = {'n': {'N': text}}
+        value = decode_item(wire)['n']
+
+        assert value == expected
+        assert type(value) is type(expected)
+        assert value == resource_decode(repository, wire)['n']
+
+    def test_sets(self):
+        """SS, NS and BS become sets"""
+        wire = {'ss': {'SS': ['a', 'b']}, 'ns': {'NS': ['1', '2.5']}, 'bs': {'BS': [b'x']}}
+
+        assert decode_item(wire) == {'ss': {'a', 'b'}, 'ns': {1, 2.5}, 'bs': {b'x'}}
+
+    def test_null_and_bytes(self):
+        """NULL becomes None and B bytes"""
+        assert decode_item({'n': {'NULL': True}, 'b': {'B': b'\x01'}}) == {'n': None, 'b': b'\x01'}
+
+    def test_none(self):
+        """A missing item decodes to None"""
+        assert decode_item(None) is None
+
+    def test_unknown_type(self):
+        """Unknown type tags raise TypeError"""
+        with pytest.raises(TypeError):
+            decode_item({'x': {'ZZ': 1}})
+
+
+class TestRoundTrip:
+    """Test encode_item followed by decode_item"""
+
+    def test_item_round_trip(self):
+        """Plain items survive a round trip unchanged"""
+        assert decode_item(encode_item(ITEM)) == ITEM
+
+    def test_sets_and_bytes_round_trip(self):
+        """Sets and bytes survive a round trip"""
+        item = {'ss': {'a', 'b'}, 'ns': {1, 2}, 'bs': {b'x', b'y'}, 'b': b'\x00'}
+
+        assert decode_item(encode_item(item)) == item
+
+    def test_deep_nesting(self):
+        """Deeply nested items do not hit the recursion limit"""
+        depth = 5000
+        item = value = {}
+        for _ in range(depth):
+            value['c'] = [{}]
+            value = value['c'][0]
+
+        # Walked iteratively: comparing with == would recurse as deep as the item
+        value = decode_item(encode_item(item))
+        for _ in range(depth):
+            value = value['c'][0]
+        assert value == {}
@@ -341,3 +341,129 @@ class TestExecuteCodeEdgeCases:
         })
 
         assert response.status_code == status.HTTP_202_ACCEPTED
+
+
+@pytest.mark.django_db
+class TestExecuteCodeMemo:
+    """Test that identical resubmissions share one execution (api.services.execution_memo)"""
+
+    CODE = 'a, b = map(int, input().split())\nprint(a + b)'
+
+    @pytest.fixture(autouse=True)
+    def memo(self, settings, monkeypatch):
+        """Memoize with the test LocMemCache (one process plays web and worker)"""
+        from api.services import execution_memo
+        settings.CODE_EXECUTION_MEMO_TTL = 600
+        settings.CELERY_RESULT_BACKEND = None
+        monkeypatch.setattr(execution_memo, '_LOCAL_CACHE_BACKENDS', ())
+        return execution_memo
+
+    @pytest.fixture
+    def problem(self, sample_problem):
+        """sample_problem with one test case (test set version 1)"""
+        from api.dynamodb.repositories import ProblemRepository
+        platform, problem_id = sample_problem.platform, sample_problem.problem_id
+        ProblemRepository().add_testcase(platform, problem_id, '1', '1 2', '3')
+        return platform, problem_id
+
+    def submit(self, client, problem, **overrides):
+        platform, problem_id = problem
+        return client.post('/api/execute/', {
+            'code': self.CODE,
+            'language': 'python',
+            'platform': platform,
+            'problem_identifier': problem_id,
+            **overrides
+        })
+
+    def test_identical_resubmission_reuses_task(self, authenticated_client, sample_user, problem, mock_celery_delay):
+        """The same request again gets the first task id without queueing"""
+        client = authenticated_client(sample_user)
+
+        first = self.submit(client, problem)
+        second = self.submit(client, problem)
+
+        assert first.status_code == second.status_code == status.HTTP_202_ACCEPTED
+        assert second.data['task_id'] == first.data['task_id']
+        assert second.data['memoized'] is True
+        assert 'memoized' not in first.data
+        assert mock_celery_delay.call_count == 1
+        assert mock_celery_delay.call_args.kwargs['task_id'] == first.data['task_id']
+
+    def test_changed_request_runs_again(self, authenticated_client, sample_user, problem, mock_celery_delay):
+        """Other code or options are a different request"""
+        client = authenticated_client(sample_user)
+
+        first = self.submit(client, problem)
+        other_code = self.submit(client, problem, code=self.CODE + '\n')
+        other_options = self.submit(client, problem, fail_fast=True)
+
+        assert len({first.data['task_id'], other_code.data['task_id'], other_options.data['task_id']}) == 3
+        assert mock_celery_delay.call_count == 3
+
+    def test_test_set_version_bump_invalidates(self, authenticated_client, sample_user, problem, mock_celery_delay):
+        """Changing the test cases (bumping dat.tsv) runs the same code again"""
+        from api.dynamodb.repositories import ProblemRepository
+        client = authenticated_client(sample_user)
+
+        first = self.submit(client, problem)
+        ProblemRepository().bump_test_set_version(*problem)
+        second = self.submit(client, problem)
+        third = self.submit(client, problem)
+
+        assert second.data['task_id'] != first.data['task_id']
+        assert 'memoized' not in second.data
+        assert third.data['task_id'] == second.data['task_id']
+        assert mock_celery_delay.call_count == 2
+
+    def test_failed_execution_releases_key(self, authenticated_client, sample_user, problem, mock_celery_delay, memo):
+        """After the worker forgets a failed execution, the next request runs again"""
+        client = authenticated_client(sample_user)
+
+        first = self.submit(client, problem)
+        memo_key = mock_celery_delay.call_args.kwargs['kwargs']['memo_key']
+        # What execute_code_task does when the execution fails
+        memo.forget(memo_key, first.data['task_id'])
+        second = self.submit(client, problem)
+
+        assert second.data['task_id'] != first.data['task_id']
+        assert 'memoized' not in second.data
+        assert mock_celery_delay.call_count == 2
+
+    def test_forget_keeps_reclaimed_key(self, authenticated_client, sample_user, problem, mock_celery_delay, memo):
+        """A stale forget() from an older task does not release a newer claim"""
+        client = authenticated_client(sample_user)
+
+        first = self.submit(client, problem)
+        memo_key = mock_celery_delay.call_args.kwargs['kwargs']['memo_key']
+        memo.forget(memo_key, 'some-older-task')
+
+        assert self.submit(client, problem).data['task_id'] == first.data['task_id']
+
+    def test_queue_failure_releases_key(self, authenticated_client, sample_user, problem, mock_celery_delay):
+        """A request whose task could not be queued does not block the next one"""
+        client = authenticated_client(sample_user)
+        apply_async = mock_celery_delay.side_effect
+        mock_celery_delay.side_effect = ConnectionError('broker down')
+
+        failed = self.submit(client, problem)
+        mock_celery_delay.side_effect = apply_async
+        retried = self.submit(client, problem)
+
+        assert failed.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert retried.status_code == status.HTTP_202_ACCEPTED
+        assert 'memoized' not in retried.data
+        assert mock_celery_delay.call_count == 2
+
+    def test_failed_task_state_is_reclaimed(self, authenticated_client, sample_user, problem, mock_celery_delay,
+                                            mock_celery_task, settings):
+        """A key whose task the result backend reports as failed is run again"""
+        settings.CELERY_RESULT_BACKEND = 'cache+memory://'
+        mock_celery_task.return_value.state = 'FAILURE'
+        client = authenticated_client(sample_user)
+
+        first = self.submit(client, problem)
+        second = self.submit(client, problem)
+
+        assert second.data['task_id'] != first.data['task_id']
+        assert mock_celery_delay.call_count == 2
@@ -0,0 +1,100 @@
+"""Tests for seeded test case generation (api.services.generator_worker)"""
+import pytest
+from api.services.generator_worker import GeneratorError, GeneratorPool, _unseeded_randomness
+
+GENERATOR = '''
+import random
+
+def generate_test_cases(n, size='small'):
+    count = {'small': 5, 'large': 50}[size]
+    rng = random.Random()
+    return [
+        ' '.join(str(random.randint(1, 10 ** 9)) for _ in range(count))
+        + ' ' + str(rng.random())
+        + ' ' + ','.join(sorted({str(random.random()) for _ in range(3)}, key=hash))
+        for _ in range(n)
+    ]
+'''
+
+CASES = [('small' if index % 3 else 'large', 1000 + index) for index in range(12)]
+
+
+def generate(code, cases, workers):
+    with GeneratorPool(code, workers=workers) as pool:
+        return [test_case for _, test_case in pool.imap(cases)]
+
+
+class TestGeneratorPool:
+    """Test that cases depend only on (generator code, size, seed)"""
+
+    def test_same_seeds_same_inputs_across_pool_sizes(self):
+        """Different pool sizes (and so scheduling) produce identical inputs"""
+        single = generate(GENERATOR, CASES, workers=1)
+        parallel = generate(GENERATOR, CASES, workers=3)
+
+        assert single == parallel
+        assert len(set(single)) == len(CASES)
+
+    def test_order_does_not_matter(self):
+        """A case generated after other cases equals the same case generated alone"""
+        all_cases = generate(GENERATOR, CASES, workers=2)
+
+        assert generate(GENERATOR, [CASES[7]], workers=1) == [all_cases[7]]
+
+    def test_bare_seed_keeps_case_seed(self):
+        """random.seed() without an argument runs and keeps the per-case seed"""
+        code = '''
+import random
+random.seed()
+
+def generate_test_cases(n, size='small'):
+    random.seed()
+    return [str(random.random()) for _ in range(n)]
+'''
+        cases = [('small', 1), ('small', 2), ('small', 1)]
+        first = generate(code, cases, workers=1)
+
+        assert first == generate(code, cases, workers=2)
+        assert first[0] == first[2] != first[1]
+
+    def test_unseeded_randomness_is_rejected(self):
+        """Generators importing unseedable randomness fail to start"""
+        code = '''
+import os
+
+def generate_test_cases(n, size='small'):
+    return [os.urandom(4).hex() for _ in range(n)]
+'''
+        with pytest.raises(GeneratorError):
+            generate(code, [('small', 1)], workers=1)
+
+
+class TestUnseededRandomness:
+    """Test detecting randomness the worker cannot seed"""
+
+    @pytest.mark.parametrize('code, found', [
+        ('import secrets', 'secrets'),
+        ('import secrets as s', 'secrets'),
+        ('from secrets import token_hex', 'secrets.token_hex'),
+        ('import os\nx = os.urandom(8)', 'os.urandom'),
+        ('from os import urandom', 'os.urandom'),
+        ('import uuid\nx = uuid.uuid4()', 'uuid.uuid4'),
+        ('from uuid import uuid1', 'uuid.uuid1'),
+        ('r = random.SystemRandom()', 'random.SystemRandom'),
+    ])
+    def test_detected(self, code, found):
+        """Imports and module attribute uses are found"""
+        assert _unseeded_randomness(code) == found
+
+    @pytest.mark.parametrize('code', [
+        '# secrets, uuid4 and os.urandom are not used here',
+        'doc = "uses secrets and urandom"',
+        'secrets = [1, 2]\nuuid4 = secrets[0]',
+        'from random import *\nx = randint(1, 2)',
+        'import uuid\nx = uuid.UUID(int=random.getrandbits(128))',
+        'import os\nx = os.path.join("a", "b")',
+        'def broken(:',
+    ])
+    def test_not_detected(self, code):
+        """Comments, strings, local names and seedable uses are allowed"""
+        assert _unseeded_randomness(code) is None
@@ -0,0 +1,156 @@
+"""Tests for Judge0 batch execution against the local fake server (scripts/fake_judge0.py)"""
+import asyncio
+import importlib.util
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+import pytest
+from api.services import async_judge0_service, judge0_service
+from api.services.async_judge0_service import AsyncJudge0Service
+from api.services.judge0_service import Judge0Service
+
+FAKE_JUDGE0 = Path(__file__).resolve().parent.parent / 'scripts' / 'fake_judge0.py'
+
+# Echoes its input doubled, so every output identifies its test case
+DOUBLE = 'print(int(input()) * 2)\n'
+
+
+@pytest.fixture
+def fake_judge0():
+    """Fake Judge0 on a free local port; submissions stay "In Queue" for 0.2s"""
+    spec = importlib.util.spec_from_file_location('fake_judge0', FAKE_JUDGE0)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.executor = ThreadPoolExecutor(max_workers=4)
+    module.queue_delay = 0.2
+
+    requests_seen = []
+    handler = type('RecordingHandler', (module.Handler,), {
+        'log_message': lambda self, format, *args: requests_seen.append(self.command + ' ' + self.path.split('?')[0])
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    module.requests_seen = requests_seen
+    module.url = f'http://127.0.0.1:{server.server_address[1]}'
+    yield module
+
+    server.shutdown()
+    server.server_close()
+    module.executor.shutdown(wait=False, cancel_futures=True)
+
+
+@pytest.fixture
+def judge0_settings(settings, fake_judge0):
+    settings.JUDGE0_API_URL = fake_judge0.url
+    settings.JUDGE0_API_KEY = ''
+    settings.JUDGE0_BATCH_SIZE = 4
+    settings.JUDGE0_POLL_TIMEOUT = 30
+    settings.CODE_EXECUTION_TIMEOUT = 5
+    return settings
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Delays the sync service waits between polls"""
+    delays = []
+    real_sleep = time.sleep
+
+    def sleep(delay):
+        delays.append(delay)
+        real_sleep(delay)
+
+    monkeypatch.setattr(judge0_service.time, 'sleep', sleep)
+    return delays
+
+
+class TestJudge0Service:
+    """Test Judge0Service.execute_batch / execute_with_test_cases"""
+
+    def test_results_map_to_their_inputs(self, judge0_settings, sleeps):
+        """Results come back in input order across several batches"""
+        inputs = [f'{index}\n' for index in range(10)]
+
+        results = Judge0Service().execute_with_test_cases(DOUBLE, 'python', inputs)
+
+        assert [result['output'] for result in results] == [str(index * 2) for index in range(10)]
+        assert all(result['status'] == 'success' and result['verdict'] == 'OK' for result in results)
+
+    def test_batches_and_polls(self, judge0_settings, fake_judge0, sleeps):
+        """Inputs are submitted JUDGE0_BATCH_SIZE at a time and polled by batch, not per token"""
+        Judge0Service().execute_batch(DOUBLE, 'python', [f'{index}\n' for index in range(10)])
+
+        seen = fake_judge0.requests_seen
+        assert seen.count('POST /submissions/batch') == 3
+        assert all(request.endswith('/submissions/batch') for request in seen)
+
+    def test_polling_backs_off(self, judge0_settings, sleeps):
+        """The delay between polls doubles up to POLL_MAX_DELAY"""
+        Judge0Service().execute_batch(DOUBLE, 'python', ['1\n'])
+
+        assert sleeps[0] == Judge0Service.POLL_INITIAL_DELAY
+        assert all(later == min(earlier * 2, Judge0Service.POLL_MAX_DELAY) for earlier, later in zip(sleeps, sleeps[1:]))
+        assert len(sleeps) >= 2
+
+    def test_failures_keep_their_position(self, judge0_settings, sleeps):
+        """A failing input is reported at its own index"""
+        results = Judge0Service().execute_with_test_cases(DOUBLE, 'python', ['1\n', 'x\n', '3\n'])
+
+        assert [result['status'] for result in results] == ['success', 'error', 'success']
+        assert results[1]['verdict'] == 'RE'
+        assert 'ValueError' in results[1]['error']
+
+    def test_rejected_submissions(self, judge0_settings, sleeps):
+        """Submissions Judge0 rejects become errors without polling"""
+        service = Judge0Service()
+        service.LANGUAGE_IDS = {'python': 999}
+
+        results = service.execute_batch(DOUBLE, 'python', ['1\n', '2\n'])
+
+        assert all(isinstance(result, Exception) for result in results)
+        assert sleeps == []
+
+    def test_polling_timeout(self, judge0_settings, sleeps):
+        """Submissions not finished within JUDGE0_POLL_TIMEOUT become errors"""
+        judge0_settings.JUDGE0_POLL_TIMEOUT = 0
+
+        results = Judge0Service().execute_batch(DOUBLE, 'python', ['1\n'])
+
+        assert str(results[0]) == 'Judge0 polling timeout'
+
+
+class TestAsyncJudge0Service:
+    """Test AsyncJudge0Service.execute_batch / execute_with_test_cases"""
+
+    async def test_results_map_to_their_inputs(self, judge0_settings, fake_judge0):
+        """Results come back in input order; batches are submitted and polled by batch"""
+        inputs = [f'{index}\n' for index in range(10)]
+
+        results = await AsyncJudge0Service().execute_with_test_cases(DOUBLE, 'python', inputs)
+
+        assert [result['output'] for result in results] == [str(index * 2) for index in range(10)]
+        assert fake_judge0.requests_seen.count('POST /submissions/batch') == 3
+        assert all(request.endswith('/submissions/batch') for request in fake_judge0.requests_seen)
+
+    async def test_polling_timeout(self, judge0_settings):
+        """Submissions not finished within JUDGE0_POLL_TIMEOUT become errors"""
+        judge0_settings.JUDGE0_POLL_TIMEOUT = 0
+
+        results = await AsyncJudge0Service().execute_batch(DOUBLE, 'python', ['1\n'])
+
+        assert str(results[0]) == 'Judge0 polling timeout'
+
+    def test_client_closed_with_its_loop(self, judge0_settings):
+        """The shared client is reused within a loop and closed when the loop shuts down"""
+        async def run_twice():
+            first = await async_judge0_service._get_client()
+            await AsyncJudge0Service().execute_batch(DOUBLE, 'python', ['1\n'])
+            assert await async_judge0_service._get_client() is first
+            return first
+
+        client = asyncio.run(run_twice())
+
+        assert client.is_closed
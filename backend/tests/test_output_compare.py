@@ -0,0 +1,112 @@
+"""Tests for streaming output comparison (api.services.output_compare)"""
+import hashlib
+import io
+import pytest
+from api.services import output_compare
+from api.services.output_compare import OutputCheck, read_full_output
+
+
+class TestOutputCheck:
+    """Test token-mode comparison of stdout streams"""
+
+    def check(self, expected, actual, prefix_bytes=1024):
+        return OutputCheck(expected, prefix_bytes=prefix_bytes).read(io.BytesIO(actual))
+
+    def test_exact_match(self):
+        """Identical output matches"""
+        assert self.check('1 2 3\n', b'1 2 3\n')['matched'] is True
+
+    def test_whitespace_is_ignored(self):
+        """Outputs that differ only in whitespace match"""
+        result = self.check('1 2\n3\n', b'  1\t2 3\r\n\n')
+        assert result['matched'] is True
+
+    def test_different_token(self):
+        """A different token is a mismatch"""
+        assert self.check('1 2 3', b'1 2 4')['matched'] is False
+
+    def test_missing_token(self):
+        """Output ending early is a mismatch"""
+        assert self.check('1 2 3', b'1 2\n')['matched'] is False
+
+    def test_extra_token(self):
+        """Output with trailing extra tokens is a mismatch"""
+        assert self.check('1 2', b'1 2 3\n')['matched'] is False
+
+    def test_token_prefix_is_not_a_match(self):
+        """A token that is a prefix of the expected one does not match"""
+        assert self.check('123', b'12')['matched'] is False
+        assert self.check('12', b'123')['matched'] is False
+
+    def test_empty_output(self):
+        """Empty output matches only an empty (or blank) expected output"""
+        assert self.check('', b'')['matched'] is True
+        assert self.check(' \n', b'\n')['matched'] is True
+        assert self.check('0', b'')['matched'] is False
+
+    def test_bytes_expected(self):
+        """Expected output may be given as bytes"""
+        assert self.check(b'ok\n', b'ok')['matched'] is True
+
+    @pytest.mark.parametrize('chunk_size', [1, 2, 3, 5])
+    def test_tokens_split_across_chunks(self, monkeypatch, chunk_size):
+        """Tokens spanning chunk boundaries are compared whole"""
+        monkeypatch.setattr(output_compare, 'CHUNK_SIZE', chunk_size)
+        assert self.check('12345 678 9', b'12345 678\n9\n')['matched'] is True
+        assert self.check('12345 678 9', b'12345 679\n9\n')['matched'] is False
+        assert self.check('12345 678', b'12345 6789')['matched'] is False
+
+    def test_overlong_token_is_a_mismatch(self, monkeypatch):
+        """A token longer than the whole expected output stops the comparison"""
+        monkeypatch.setattr(output_compare, 'CHUNK_SIZE', 4)
+        result = self.check('1', b'x' * 64)
+        assert result['matched'] is False
+        assert result['output_size'] == 64
+
+    def test_size_and_hash_cover_full_output(self, monkeypatch):
+        """Size and hash describe the whole output, even after a mismatch"""
+        monkeypatch.setattr(output_compare, 'CHUNK_SIZE', 8)
+        actual = b'wrong ' + b'0123456789' * 10
+        result = self.check('right', actual, prefix_bytes=16)
+
+        assert result['matched'] is False
+        assert result['output_size'] == len(actual)
+        assert result['output_hash'] == hashlib.sha256(actual).hexdigest()
+
+    def test_prefix_is_bounded(self):
+        """Only prefix_bytes of the output are kept"""
+        actual = b'a' * 100
+        result = self.check('a' * 100, actual, prefix_bytes=10)
+
+        assert result['output'] == 'a' * 10
+        assert result['output_truncated'] is True
+        assert result['matched'] is True
+
+    def test_short_output_is_not_truncated(self):
+        """Output shorter than the prefix is returned whole"""
+        result = self.check('hello', b'hello\n')
+
+        assert result['output'] == 'hello\n'
+        assert result['output_truncated'] is False
+
+    def test_invalid_utf8_is_replaced(self):
+        """Undecodable bytes do not break the prefix"""
+        result = self.check('x', b'\xff\n')
+        assert result['output'] == '�\n'
+        assert result['matched'] is False
+
+    def test_check_string(self):
+        """check_string compares an in-memory output like read()"""
+        check = OutputCheck('1 2', prefix_bytes=1024)
+
+        assert check.check_string('1\n2\n')['matched'] is True
+        assert check.check_string('1 3')['matched'] is False
+        assert check.check_string(None)['matched'] is False
+
+
+class TestReadFullOutput:
+    """Test the default stdout reader"""
+
+    def test_decodes_whole_stream(self):
+        """The whole stream is decoded"""
+        assert read_full_output(io.BytesIO(b'line 1\nline 2\n')) == {'output': 'line 1\nline 2\n'}
@@ -0,0 +1,211 @@
+"""Tests for lazily paginated DynamoDB reads (api.dynamodb.pagination)"""
+from decimal import Decimal
+from unittest.mock import Mock
+import pytest
+from api.dynamodb.pagination import PagedItems, item_key, item_size, iter_query
+from api.dynamodb.repositories.base_repository import BaseRepository
+
+
+class FakeTable:
+    """
+    In-memory stand-in for a boto3 table's query()
+
+    Pages hold at most page_size items (like DynamoDB's 1MB pages), or
+    fewer if the request's Limit is smaller; a FilterExpression keeps
+    items whose 'keep' attribute is true.
+    """
+
+    def __init__(self, items, page_size=3):
+        self.items = items
+        self.page_size = page_size
+        self.requests = []
+
+    def query(self, **params):
+        self.requests.append(params)
+        start = 0
+        if 'ExclusiveStartKey' in params:
+            start_sk = params['ExclusiveStartKey']['SK']
+            start = next(index for index, item in enumerate(self.items) if item['SK'] == start_sk) + 1
+
+        evaluated = self.items[start:start + min(self.page_size, params.get('Limit', self.page_size))]
+        response = {'Items': evaluated}
+        if 'FilterExpression' in params:
+            response['Items'] = [item for item in evaluated if item.get('keep')]
+        if evaluated and start + len(evaluated) < len(self.items):
+            response['LastEvaluatedKey'] = item_key(evaluated[-1])
+        return response
+
+
+class AsyncFakeTable(FakeTable):
+    """FakeTable whose query() is a coroutine function, like an aioboto3 table"""
+
+    async def query(self, **params):
+        return FakeTable.query(self, **params)
+
+
+def make_items(count):
+    return [{'PK': 'PROB#test#1', 'SK': f'TC#{index:03d}', 'val': index} for index in range(count)]
+
+
+class TestPagedItems:
+    """Test page-by-page iteration of Query results"""
+
+    def test_reads_every_page(self):
+        """All items are yielded, following LastEvaluatedKey"""
+        table = FakeTable(make_items(10))
+        items = PagedItems(table.query, {'KeyConditionExpression': 'PK = :pk'})
+
+        assert [item['val'] for item in items] == list(range(10))
+        assert items.pages == 4
+        assert items.count == 10
+        assert items.exhausted is True
+        assert items.cursor is None
+
+    def test_max_items_stops_early(self):
+        """max_items stops the iteration and is sent as Limit, so no extra items are read"""
+        table = FakeTable(make_items(10))
+        items = PagedItems(table.query, {}, max_items=5)
+
+        assert [item['val'] for item in items] == list(range(5))
+        assert [request['Limit'] for request in table.requests] == [5, 2]
+        assert items.exhausted is False
+
+    def test_page_limit_is_kept_below_max_items(self):
+        """A smaller Limit stays the page size"""
+        table = FakeTable(make_items(10), page_size=100)
+        items = PagedItems(table.query, {'Limit': 2}, max_items=5)
+
+        assert len(list(items)) == 5
+        assert [request['Limit'] for request in table.requests] == [2, 2, 1]
+
+    def test_filter_does_not_cap_limit(self):
+        """With a FilterExpression, Limit is not lowered to the remaining budget"""
+        items = make_items(10)
+        for item in items:
+            item['keep'] = item['val'] % 2 == 0
+        table = FakeTable(items)
+
+        result = list(PagedItems(table.query, {'FilterExpression': 'keep'}, max_items=3))
+
+        assert [item['val'] for item in result] == [0, 2, 4]
+        assert all('Limit' not in request for request in table.requests)
+
+    def test_cursor_resumes_after_last_item(self):
+        """An iteration started from .cursor continues with the next item"""
+        table = FakeTable(make_items(10))
+        first = PagedItems(table.query, {}, max_items=4)
+        first_values = [item['val'] for item in first]
+
+        second = PagedItems(table.query, {}, start_key=first.cursor)
+
+        assert first_values == [0, 1, 2, 3]
+        assert [item['val'] for item in second] == list(range(4, 10))
+
+    def test_cursor_inside_page(self):
+        """Stopping in the middle of a page points the cursor at the last item yielded"""
+        table = FakeTable(make_items(10))
+        paged = PagedItems(table.query, {})
+        for item in paged:
+            if item['val'] == 1:
+                break
+
+        assert paged.cursor == {'PK': 'PROB#test#1', 'SK': 'TC#001'}
+
+    def test_index_cursor_includes_index_keys(self):
+        """Items read from a GSI resume from the table and index keys"""
+        item = {'PK': 'P', 'SK': 'S', 'GSI1PK': 'G', 'GSI1SK': 'H', 'val': 1}
+
+        assert item_key(item, 'GSI1') == {'PK': 'P', 'SK': 'S', 'GSI1PK': 'G', 'GSI1SK': 'H'}
+        assert item_key(item) == {'PK': 'P', 'SK': 'S'}
+
+    def test_max_bytes_stops_before_overflow(self):
+        """max_bytes stops before the item that would exceed it"""
+        table = FakeTable(make_items(10))
+        one_item = item_size(make_items(1)[0])
+
+        items = list(PagedItems(table.query, {}, max_bytes=one_item * 2 + 1))
+
+        assert len(items) == 2
+
+    def test_max_bytes_yields_at_least_one_item(self):
+        """An item larger than max_bytes is still yielded on its own"""
+        table = FakeTable(make_items(10))
+
+        assert len(list(PagedItems(table.query, {}, max_bytes=1))) == 1
+
+    def test_convert_is_applied(self):
+        """convert is applied to every yielded item"""
+        table = FakeTable(make_items(4))
+        items = PagedItems(table.query, {}, convert=lambda item: item['val'])
+
+        assert list(items) == [0, 1, 2, 3]
+
+    def test_empty_result(self):
+        """An empty result makes one request and is exhausted"""
+        table = FakeTable([])
+        items = PagedItems(table.query, {})
+
+        assert list(items) == []
+        assert items.pages == 1
+        assert items.exhausted is True
+
+    async def test_async_iteration(self):
+        """async for reads pages from a coroutine fetch function"""
+        table = AsyncFakeTable(make_items(7))
+
+        values = [item['val'] async for item in iter_query(table, max_items=6)]
+
+        assert values == list(range(6))
+
+
+class TestItemSize:
+    """Test the approximate item size"""
+
+    def test_scalar_sizes(self):
+        """Strings count UTF-8 bytes, numbers at most 21 bytes"""
+        assert item_size('abc') == 3
+        assert item_size('가') == 3
+        assert item_size(b'\x00\x01') == 2
+        assert item_size(True) == 1
+        assert item_size(Decimal('12.5')) == 4
+        assert item_size(10 ** 40) == 21
+
+    def test_nested_sizes(self):
+        """Maps and lists add 3 bytes plus their contents"""
+        assert item_size({'a': 'bc'}) == 3 + 1 + 2
+        assert item_size(['a', 'b']) == 3 + 2
+
+
+class TestRepositoryIterQuery:
+    """Test BaseRepository.iter_query and query limits"""
+
+    @pytest.fixture
+    def repository(self, settings):
+        settings.DYNAMODB_FAST_CODEC = False
+        table = FakeTable(make_items(10))
+        repository = BaseRepository(Mock())
+        repository.table = table
+        return repository
+
+    def test_query_limit_is_max_items(self, repository):
+        """query(limit=n) returns n items, reading as many pages as needed"""
+        items = repository.query('PK = :pk', limit=5)
+
+        assert [item['val'] for item in items] == list(range(5))
+        assert len(repository.table.requests) == 2
+
+    def test_query_without_limit_reads_all(self, repository):
+        """query() without a limit reads every page"""
+        assert len(repository.query('PK = :pk')) == 10
+
+    def test_page_size_is_sent_as_limit(self, repository):
+        """page_size is the Limit of each request"""
+        list(repository.iter_query('PK = :pk', page_size=2, max_items=3))
+
+        assert [request['Limit'] for request in repository.table.requests] == [2, 1]
+
+    def test_decimals_are_converted(self, repository):
+        """Items are converted from DynamoDB types"""
+        repository.table.items = [{'PK': 'P', 'SK': 'S', 'n': Decimal('3'), 'f': Decimal('1.5')}]
+
+        assert repository.query('PK = :pk') == [{'PK': 'P', 'SK': 'S', 'n': 3, 'f': 1.5}]
@@ -0,0 +1,49 @@
+"""Tests for the test case pipeline queues (api.tasks._pipeline_get)"""
+import queue
+import threading
+import pytest
+from api.tasks import _PIPELINE_END, _pipeline_get
+
+
+class TestPipelineGet:
+    """Test reading a pipeline queue"""
+
+    @pytest.fixture
+    def stop(self):
+        return threading.Event()
+
+    def finished_thread(self):
+        thread = threading.Thread(target=lambda: None)
+        thread.start()
+        thread.join()
+        return thread
+
+    def test_returns_queued_item(self, stop):
+        """A queued item is returned"""
+        stage_queue = queue.Queue()
+        stage_queue.put('case')
+
+        assert _pipeline_get(stage_queue, stop) == 'case'
+
+    def test_stopped_pipeline_ends(self, stop):
+        """A stopped pipeline yields _PIPELINE_END"""
+        stop.set()
+
+        assert _pipeline_get(queue.Queue(), stop) is _PIPELINE_END
+
+    def test_item_left_by_finished_producer(self, stop):
+        """The last item of a producer that already exited is still returned"""
+        stage_queue = queue.Queue()
+        stage_queue.put(_PIPELINE_END)
+
+        assert _pipeline_get(stage_queue, stop, [self.finished_thread()]) is _PIPELINE_END
+
+    def test_dead_producers_raise(self, stop):
+        """An empty queue whose producers all exited raises instead of blocking"""
+        with pytest.raises(RuntimeError):
+            _pipeline_get(queue.Queue(), stop, [self.finished_thread()])
+
+    def test_timeout_raises(self, stop):
+        """No item within the timeout raises TimeoutError"""
+        with pytest.raises(TimeoutError):
+            _pipeline_get(queue.Queue(), stop, timeout=0.2)
@@ -0,0 +1,129 @@
+"""Tests for coalesced Celery progress reporting (api.utils.progress)"""
+import pytest
+from unittest.mock import Mock
+from api.utils import progress as progress_module
+from api.utils.progress import ProgressReporter
+
+
+class FakeClock:
+    """Controllable replacement for time.monotonic()"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class TestProgressReporter:
+    """Test ProgressReporter write coalescing"""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(progress_module, 'time', clock)
+        return clock
+
+    @pytest.fixture
+    def task(self):
+        return Mock()
+
+    def written(self, task):
+        """Meta dicts passed to update_state, in order"""
+        return [call.kwargs['meta'] for call in task.update_state.call_args_list]
+
+    def test_first_update_is_written(self, clock, task):
+        """The first update always reaches the backend"""
+        reporter = ProgressReporter(task, 100)
+        reporter.update(0, 'Starting')
+
+        task.update_state.assert_called_once_with(
+            state='PROGRESS',
+            meta={'current': 0, 'total': 100, 'status': 'Starting'}
+        )
+        assert reporter.writes == 1
+
+    def test_updates_within_budget_are_coalesced(self, clock, task):
+        """Small, quick steps are held back"""
+        reporter = ProgressReporter(task, 100, min_interval=1.0, min_step=0.1)
+        reporter.update(0, 'Starting')
+        for current in range(1, 10):
+            reporter.update(current, f'Testing {current}')
+
+        assert reporter.writes == 1
+
+    def test_step_triggers_write(self, clock, task):
+        """Advancing by min_step of the total writes immediately"""
+        reporter = ProgressReporter(task, 100, min_interval=1.0, min_step=0.1)
+        reporter.update(0, 'Starting')
+        reporter.update(10, 'Testing 10')
+
+        assert [meta['current'] for meta in self.written(task)] == [0, 10]
+
+    def test_interval_triggers_write(self, clock, task):
+        """An update after min_interval is written even for a small step"""
+        reporter = ProgressReporter(task, 100, min_interval=1.0, min_step=0.5)
+        reporter.update(0, 'Starting')
+        clock.now += 0.5
+        reporter.update(1, 'Testing 1')
+        clock.now += 0.5
+        reporter.update(2, 'Testing 2')
+
+        assert [meta['current'] for meta in self.written(task)] == [0, 2]
+
+    def test_completion_is_always_written(self, clock, task):
+        """Reaching the total writes regardless of the budget"""
+        reporter = ProgressReporter(task, 3, min_interval=10.0, min_step=1.0)
+        reporter.update(0, 'Starting')
+        reporter.update(1, 'Testing 1')
+        reporter.update(3, 'Done')
+
+        assert [meta['current'] for meta in self.written(task)] == [0, 3]
+
+    def test_force_writes(self, clock, task):
+        """force=True bypasses the budget"""
+        reporter = ProgressReporter(task, 100, min_interval=10.0)
+        reporter.update(0, 'Starting')
+        reporter.update(0, 'Compiling', force=True)
+
+        assert [meta['status'] for meta in self.written(task)] == ['Starting', 'Compiling']
+
+    def test_progress_never_goes_backwards(self, clock, task):
+        """Lower values than already seen are ignored"""
+        reporter = ProgressReporter(task, 100, min_interval=0)
+        reporter.update(5, 'Testing 5')
+        reporter.update(3, 'Testing 3', force=True)
+
+        assert [meta['current'] for meta in self.written(task)] == [5]
+
+    def test_flush_writes_held_back_state(self, clock, task):
+        """flush() writes the latest state if it was not written"""
+        reporter = ProgressReporter(task, 100, min_interval=10.0)
+        reporter.update(0, 'Starting')
+        reporter.update(4, 'Testing 4')
+        reporter.flush()
+
+        assert self.written(task)[-1] == {'current': 4, 'total': 100, 'status': 'Testing 4'}
+        assert reporter.writes == 2
+
+    def test_flush_skips_written_state(self, clock, task):
+        """flush() does nothing when the latest state is already written"""
+        reporter = ProgressReporter(task, 100)
+        reporter.update(0, 'Starting')
+        reporter.flush()
+
+        assert reporter.writes == 1
+
+    def test_flush_without_updates(self, clock, task):
+        """flush() before any update writes nothing"""
+        ProgressReporter(task, 100).flush()
+
+        task.update_state.assert_not_called()
+
+    def test_small_totals_use_single_steps(self, clock, task):
+        """The step is at least one, so every case of a tiny run can be written"""
+        reporter = ProgressReporter(task, 2, min_interval=10.0, min_step=0.1)
+        reporter.update(0, 'Starting')
+        reporter.update(1, 'Testing 1')
+
+        assert reporter.writes == 2
@@ -0,0 +1,118 @@
+"""Tests for named projections (api.dynamodb.projections)"""
+from unittest.mock import Mock
+import pytest
+from api.dynamodb.projections import VIEWS, projection_params
+from api.dynamodb.repositories.base_repository import BaseRepository
+
+
+def resolve(params):
+    """ProjectionExpression with placeholders replaced by attribute names"""
+    paths = []
+    for path in params['ProjectionExpression'].split(', '):
+        segments = []
+        for segment in path.split('.'):
+            name, _, index = segment.partition('[')
+            segments.append(params['ExpressionAttributeNames'][name] + ('[' + index if index else ''))
+        paths.append('.'.join(segments))
+    return paths
+
+
+class TestProjectionParams:
+    """Test building ProjectionExpression parameters"""
+
+    def test_paths_with_table_keys(self):
+        """Table keys come first, followed by the requested paths"""
+        params = projection_params(['crt', 'dat.tit'])
+
+        assert params == {
+            'ProjectionExpression': '#p0, #p1, #p2, #p3.#p4',
+            'ExpressionAttributeNames': {'#p0': 'PK', '#p1': 'SK', '#p2': 'crt', '#p3': 'dat', '#p4': 'tit'}
+        }
+
+    def test_index_keys_are_included(self):
+        """Querying a GSI adds its key attributes, so cursors can be built"""
+        assert resolve(projection_params(['crt'], 'GSI3')) == ['PK', 'SK', 'GSI3PK', 'GSI3SK', 'crt']
+
+    def test_keys_are_not_repeated(self):
+        """Keys listed in the projection appear once"""
+        assert resolve(projection_params(['SK', 'crt'])) == ['PK', 'SK', 'crt']
+
+    def test_names_share_placeholders(self):
+        """An attribute name used in several paths gets one placeholder"""
+        params = projection_params(['dat.tit', 'dat.url'])
+
+        assert params['ProjectionExpression'] == '#p0, #p1, #p2.#p3, #p2.#p4'
+        assert list(params['ExpressionAttributeNames'].values()).count('dat') == 1
+
+    def test_list_index_is_kept(self):
+        """List indexes stay outside the placeholder"""
+        params = projection_params(['dat.hnt[0]'])
+
+        assert params['ProjectionExpression'].endswith('#p3[0]')
+        assert resolve(params)[-1] == 'dat.hnt[0]'
+
+    def test_reserved_words_use_placeholders(self):
+        """Reserved words never appear in the expression itself"""
+        params = projection_params(['name', 'size.count'])
+
+        assert 'name' not in params['ProjectionExpression']
+        assert resolve(params) == ['PK', 'SK', 'name', 'size.count']
+
+    @pytest.mark.parametrize('view', sorted(VIEWS))
+    def test_views(self, view):
+        """Every view resolves to the table keys plus its paths"""
+        assert resolve(projection_params(view)) == ['PK', 'SK'] + VIEWS[view]
+
+    def test_unknown_view(self):
+        """An unknown view name raises KeyError"""
+        with pytest.raises(KeyError):
+            projection_params('problem.nope')
+
+    @pytest.mark.parametrize('path', ['dat..tit', 'dat.hnt[x]', 'dat.[0]', ''])
+    def test_malformed_path(self, path):
+        """Malformed paths raise ValueError"""
+        with pytest.raises(ValueError):
+            projection_params([path])
+
+    def test_new_names_dict_every_call(self):
+        """Each call returns its own ExpressionAttributeNames (boto3 adds to it)"""
+        first = projection_params('problem.summary')
+        first['ExpressionAttributeNames']['#extra'] = 'x'
+
+        assert '#extra' not in projection_params('problem.summary')['ExpressionAttributeNames']
+
+
+class TestApplyProjection:
+    """Test adding projections to repository requests"""
+
+    @pytest.fixture
+    def repository(self, settings):
+        settings.DYNAMODB_FAST_CODEC = False
+        return BaseRepository(Mock())
+
+    def test_merges_attribute_names(self, repository):
+        """Existing ExpressionAttributeNames are kept"""
+        params = {'ExpressionAttributeNames': {'#st': 'status'}}
+
+        repository._apply_projection(params, ['crt'])
+
+        assert params['ExpressionAttributeNames'] == {'#st': 'status', '#p0': 'PK', '#p1': 'SK', '#p2': 'crt'}
+        assert params['ProjectionExpression'] == '#p0, #p1, #p2'
+
+    def test_no_projection(self, repository):
+        """Without a projection the request is unchanged"""
+        params = {'Limit': 5}
+
+        repository._apply_projection(params, None)
+
+        assert params == {'Limit': 5}
+
+    def test_get_item_sends_projection(self, repository):
+        """get_item passes the projection to the table"""
+        repository.table.get_item.return_value = {'Item': {'PK': 'P', 'SK': 'S'}}
+
+        repository.get_item('P', 'S', projection=['crt'])
+
+        kwargs = repository.table.get_item.call_args.kwargs
+        assert kwargs['ProjectionExpression'] == '#p0, #p1, #p2'
+        assert kwargs['Key'] == {'PK': 'P', 'SK': 'S'}
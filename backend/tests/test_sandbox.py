@@ -0,0 +1,75 @@
+"""Tests for running programs under resource limits (api.services.sandbox)"""
+import sys
+import pytest
+from api.services import sandbox
+
+
+@pytest.fixture(params=[True, False], ids=['spawner', 'direct'])
+def limits(request, settings):
+    """Small limits, run both through the spawner and by forking directly"""
+    settings.CODE_EXECUTION_ZYGOTE = request.param
+    settings.CODE_EXECUTION_TIMEOUT = 1
+    settings.CODE_EXECUTION_MEMORY_LIMIT_MB = 128
+    settings.CODE_EXECUTION_OUTPUT_LIMIT_BYTES = 1024 * 1024
+    return settings
+
+
+def run_python(code, input_data=''):
+    return sandbox.run([sys.executable, '-c', code], input_data)
+
+
+class TestRunVerdicts:
+    """Test the verdict of runs that hit a limit or fail"""
+
+    def test_ok(self, limits):
+        """A normal run is OK and reports its output and resource usage"""
+        result = run_python('print(int(input()) * 2)', '21\n')
+
+        assert result['verdict'] == sandbox.VERDICT_OK
+        assert result['success'] is True
+        assert result['output'] == '42\n'
+        assert result['cpu_ms'] is not None and result['peak_rss_kb'] > 0
+
+    def test_infinite_loop_is_tle(self, limits):
+        """Spinning past the time limit is TLE, with the output dropped"""
+        result = run_python('print("partial", flush=True)\nwhile True: pass')
+
+        assert result['verdict'] == sandbox.VERDICT_TLE
+        assert result['success'] is False
+        assert result['output'] == ''
+        assert result['error'] == 'Execution timeout'
+
+    def test_sleeping_is_tle(self, limits):
+        """Blocking without using CPU is stopped by the wall-clock limit"""
+        result = run_python('import time\ntime.sleep(30)')
+
+        assert result['verdict'] == sandbox.VERDICT_TLE
+        assert result['wall_ms'] < 10000
+
+    def test_large_allocation_is_mle(self, limits):
+        """Allocating past the memory limit is MLE"""
+        result = run_python('data = bytearray(512 * 1024 * 1024)')
+
+        assert result['verdict'] == sandbox.VERDICT_MLE
+        assert 'MemoryError' in result['error']
+
+    def test_output_flood_is_ole(self, limits):
+        """Writing past the output limit is OLE"""
+        result = run_python('import sys\nwhile True: sys.stdout.write("x" * 65536)')
+
+        assert result['verdict'] == sandbox.VERDICT_OLE
+        assert result['error'] == 'Output limit exceeded'
+
+    def test_non_zero_exit_is_re(self, limits):
+        """An exception (non-zero exit) is RE with its stderr"""
+        result = run_python('print("before")\n1 / 0')
+
+        assert result['verdict'] == sandbox.VERDICT_RE
+        assert result['output'] == 'before\n'
+        assert 'ZeroDivisionError' in result['error']
+
+    def test_killed_by_signal_is_re(self, limits):
+        """A crash (killed by a signal) is RE"""
+        result = run_python('import os, signal\nos.kill(os.getpid(), signal.SIGSEGV)')
+
+        assert result['verdict'] == sandbox.VERDICT_RE
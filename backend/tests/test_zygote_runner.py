@@ -0,0 +1,36 @@
+"""Tests for the Python fork-server runner (api.services.zygote_runner)"""
+import pytest
+from api.services.zygote_runner import ZygoteRunner
+
+
+class TestZygoteRunner:
+    """Test runs forked from a zygote"""
+
+    @pytest.fixture
+    def zygote(self, tmp_path):
+        source = tmp_path / 'solution.py'
+        source.write_text('import random\nprint(random.random(), random.getrandbits(64))\n')
+        zygote = ZygoteRunner(str(source), tmp_path)
+        zygote.start()
+        yield zygote
+        zygote.close()
+
+    def test_children_do_not_share_random_state(self, zygote):
+        """Unseeded random gives every child its own sequence, like a fresh python3"""
+        outputs = [zygote.run('', timeout=5)['output'] for _ in range(5)]
+
+        assert len(set(outputs)) == len(outputs)
+
+    def test_runs_solution_with_input(self, tmp_path):
+        """stdin reaches the child and stdout comes back"""
+        source = tmp_path / 'echo.py'
+        source.write_text('print(int(input()) * 2)\n')
+        zygote = ZygoteRunner(str(source), tmp_path)
+        zygote.start()
+        try:
+            result = zygote.run('21\n', timeout=5)
+        finally:
+            zygote.close()
+
+        assert result['output'] == '42\n'
+        assert result['exit_code'] == 0